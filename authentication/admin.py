@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import UserProfile, Department
+from django.utils import timezone
+from .models import OutboxMessage, UserProfile, Department
 
 @admin.register(Department)
 class DepartmentAdmin(admin.ModelAdmin):
@@ -103,4 +104,19 @@ class UserProfileAdmin(admin.ModelAdmin):
             name = obj.manager.user.get_full_name() or obj.manager.user.username
             return format_html('<a href="/admin/authentication/userprofile/{}/change/">{}</a>', obj.manager.id, name)
         return "—"
-    manager_display.short_description = "Manager"
\ No newline at end of file
+    manager_display.short_description = "Manager"
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ("subject", "to", "status", "attempts", "next_attempt_at", "sent_at", "created_at")
+    list_filter = ("status",)
+    search_fields = ("subject", "to")
+    readonly_fields = ("created_at", "sent_at", "last_error")
+    actions = ["retry_now"]
+
+    @admin.action(description="Retry selected messages now")
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status=OutboxMessage.SENT).update(
+            status=OutboxMessage.PENDING, next_attempt_at=timezone.now(), attempts=0
+        )
+        self.message_user(request, f"{updated} message(s) queued for the next outbox batch.")
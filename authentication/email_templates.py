@@ -0,0 +1,225 @@
+"""
+Template-based rendering of transactional emails.
+
+Every email is a pair of Django templates, <name>.html and <name>.txt. The
+HTML ones extend authentication/email/base.html. Both are compiled on first
+use and kept for the life of the process. Many mail clients drop <style>
+blocks, so the shared CSS is kept here as per-element declarations. It is
+turned into inline style strings once, at import time, and templates use
+them as style="{{ styles.<name> }}".
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+
+from django.template.loader import get_template
+
+EMAIL_STYLES = {
+    "body": {
+        "margin": "0",
+        "padding": "0",
+        "background-color": "#f0f0f0",
+        "font-family": "'Montserrat', Arial, sans-serif",
+    },
+    "container": {
+        "width": "100%",
+        "max-width": "600px",
+        "margin": "0 auto",
+        "border-collapse": "collapse",
+        "background-color": "#ffffff",
+        "box-shadow": "0 3px 10px rgba(0, 0, 0, 0.1)",
+    },
+    "header": {
+        "background-color": "#1a1a1a",
+        "text-align": "center",
+        "padding": "25px 20px",
+        "border-bottom": "3px solid #e74c3c",
+    },
+    "header_title": {
+        "color": "#ffffff",
+        "font-size": "24px",
+        "margin": "10px 0 0",
+        "font-weight": "600",
+        "letter-spacing": "0.5px",
+    },
+    "content": {
+        "padding": "30px 25px",
+        "background-color": "#ffffff",
+    },
+    "paragraph": {
+        "font-size": "16px",
+        "color": "#333333",
+        "line-height": "1.6",
+    },
+    "strong": {
+        "color": "#e74c3c",
+    },
+    "highlight": {
+        "font-size": "18px",
+        "color": "#e74c3c",
+        "font-weight": "600",
+        "background-color": "#f9f9f9",
+        "padding": "15px",
+        "border-left": "4px solid #e74c3c",
+        "margin": "20px 0",
+    },
+    "details": {
+        "background-color": "#f9f9f9",
+        "padding": "15px",
+        "border-left": "4px solid #e74c3c",
+        "margin": "20px 0",
+    },
+    "details_title": {
+        "color": "#1a1a1a",
+        "margin": "0 0 10px",
+    },
+    "list": {
+        "list-style": "none",
+        "padding": "0",
+        "margin": "0",
+    },
+    "list_item": {
+        "margin": "5px 0",
+    },
+    "status_confirmed": {
+        "background-color": "#f9f9f9",
+        "padding": "15px",
+        "border-left": "4px solid #28a745",
+        "margin": "20px 0",
+    },
+    "status_rejected": {
+        "background-color": "#f9f9f9",
+        "padding": "15px",
+        "border-left": "4px solid #dc3545",
+        "margin": "20px 0",
+    },
+    "buttons": {
+        "text-align": "center",
+        "margin": "30px 0",
+    },
+    "button_confirm": {
+        "display": "inline-block",
+        "padding": "12px 25px",
+        "margin": "0 10px",
+        "text-decoration": "none",
+        "border-radius": "5px",
+        "font-weight": "600",
+        "color": "#ffffff",
+        "background-color": "#28a745",
+    },
+    "button_reject": {
+        "display": "inline-block",
+        "padding": "12px 25px",
+        "margin": "0 10px",
+        "text-decoration": "none",
+        "border-radius": "5px",
+        "font-weight": "600",
+        "color": "#ffffff",
+        "background-color": "#dc3545",
+    },
+    "note": {
+        "font-size": "14px",
+        "color": "#666666",
+    },
+    "footer": {
+        "background-color": "#1a1a1a",
+        "padding": "20px",
+        "text-align": "center",
+        "border-top": "1px solid #e74c3c",
+    },
+    "footer_text": {
+        "color": "#ffffff",
+        "font-size": "14px",
+        "margin": "5px 0",
+    },
+}
+
+
+def inline_styles(styles):
+    """Turn {name: {property: value}} into {name: 'property: value; ...'}."""
+    return {
+        name: "; ".join(f"{prop}: {value}" for prop, value in declarations.items())
+        for name, declarations in styles.items()
+    }
+
+
+# Computed once per process; every render reuses the same strings
+INLINE_STYLES = inline_styles(EMAIL_STYLES)
+
+
+@dataclass(frozen=True)
+class RenderedEmail:
+    """Plain-text body and HTML alternative of one email."""
+
+    text: str
+    html: str
+
+
+@lru_cache(maxsize=None)
+def get_email_templates(name):
+    """Compiled (text, html) templates of an email, loaded once per process."""
+    return get_template(f"{name}.txt"), get_template(f"{name}.html")
+
+
+def render_email(name, context):
+    """
+    Render an email's plain-text and HTML versions.
+
+    Args:
+        name: Template path without extension (e.g. 'authentication/email/gift_card')
+        context: Template context; the inline styles are added as 'styles'
+
+    Returns:
+        RenderedEmail
+    """
+    text_template, html_template = get_email_templates(name)
+    context = {**context, "styles": INLINE_STYLES}
+    return RenderedEmail(text=text_template.render(context), html=html_template.render(context))
+
+
+# Sample contexts for every email, used by the preview_emails and
+# benchmark_email_rendering commands
+EMAIL_PREVIEWS = {
+    "gift_card": ("authentication/email/gift_card", {
+        "company_name": "Amazon",
+        "amount": 50,
+        "reason": "Outstanding customer feedback on the Miller move",
+    }),
+    "issue_uniform": ("authentication/email/uniform_notification", {
+        "heading": "Uniform Issue Notification",
+        "action": "You have been assigned the uniform item:",
+        "employee": "Sam Carter",
+        "uniform": "Winter Jacket",
+    }),
+    "return_uniform": ("authentication/email/uniform_notification", {
+        "heading": "Uniform Return Notification",
+        "action": "You have returned the uniform item:",
+        "employee": "Sam Carter",
+        "uniform": "Winter Jacket",
+    }),
+    "order_request": ("authentication/email/order_request", {
+        "job_id": "FM-10422",
+        "order_date": "October 12, 2026",
+        "requested_by": "scarter",
+        "materials": [("Small Boxes", 20), ("Tape", 6), ("Bubble Wrap", 2)],
+        "confirm_url": "https://example.com/packaging/orders/1/confirmed/",
+        "reject_url": "https://example.com/packaging/orders/1/rejected/",
+    }),
+    "order_status_update": ("authentication/email/order_status_update", {
+        "confirmed": True,
+        "employee_name": "scarter",
+        "status": "Confirmed",
+        "job_id": "FM-10422",
+        "order_date": "October 12, 2026",
+        "materials": [("Small Boxes", 20), ("Tape", 6), ("Bubble Wrap", 2)],
+    }),
+    "evaluation_submitted": ("evaluation/email/evaluation_submitted", {
+        "evaluatee_name": "Sam Carter",
+        "evaluator_name": "Alex Morgan",
+        "evaluator_role": "manager",
+        "period_start": date(2026, 10, 12),
+        "period_end": date(2026, 10, 18),
+        "evaluation_url": "https://example.com/evaluation/view/1/",
+    }),
+}
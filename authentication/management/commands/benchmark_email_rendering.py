@@ -0,0 +1,71 @@
+"""
+Management command measuring the CPU cost and size of rendering each email.
+
+"cached" is the production path (render_email: templates compiled once,
+styles inlined once). "uncached" loads and compiles the templates and
+inlines the styles for every email, which is what a render costs without
+those caches.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.template import Context, Engine, engines
+
+from authentication.email_templates import EMAIL_PREVIEWS, EMAIL_STYLES, inline_styles, render_email
+
+
+def _uncached_engine():
+    """Template engine like the project's, but without the cached loader."""
+    engine = engines['django'].engine
+    return Engine(
+        dirs=engine.dirs,
+        loaders=[
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ],
+        libraries=engine.libraries,
+        builtins=engine.builtins,
+    )
+
+
+def _cpu_micros(func, iterations):
+    """Average CPU time of func() in microseconds."""
+    start = time.process_time()
+    for _ in range(iterations):
+        func()
+    return (time.process_time() - start) / iterations * 1_000_000
+
+
+class Command(BaseCommand):
+    help = 'Benchmark per-email CPU cost and output size of the email templates'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=1000,
+            help='Renders per measurement (default 1000)',
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        engine = _uncached_engine()
+
+        def render_uncached(template_name, context):
+            context = Context({**context, 'styles': inline_styles(EMAIL_STYLES)})
+            text = engine.get_template(f'{template_name}.txt').render(context)
+            html = engine.get_template(f'{template_name}.html').render(context)
+            return text, html
+
+        self.stdout.write(f'📏 Email rendering ({iterations:,} iterations, CPU µs per email)')
+        for name, (template_name, context) in EMAIL_PREVIEWS.items():
+            email = render_email(template_name, context)
+            cached = _cpu_micros(lambda: render_email(template_name, context), iterations)
+            uncached = _cpu_micros(lambda: render_uncached(template_name, context), iterations)
+            self.stdout.write(
+                f'  {name}: cached {cached:.1f} µs, uncached {uncached:.1f} µs, '
+                f'html {len(email.html.encode()):,} B, text {len(email.text.encode()):,} B'
+            )
+
+        self.stdout.write(self.style.SUCCESS('✅ Benchmark complete'))
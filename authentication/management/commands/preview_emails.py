@@ -0,0 +1,52 @@
+"""
+Management command rendering every transactional email with sample data
+into a local directory, for checking layout and text offline.
+"""
+
+import os
+
+from django.core.management.base import BaseCommand
+
+from authentication.email_templates import EMAIL_PREVIEWS, render_email
+
+
+class Command(BaseCommand):
+    help = 'Render every email template with sample data to <output-dir>/<name>.html and .txt'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output-dir',
+            default='email_previews',
+            help='Directory to write the previews to (default: ./email_previews)',
+        )
+        parser.add_argument(
+            'names',
+            nargs='*',
+            help=f'Emails to render (default: all of {", ".join(EMAIL_PREVIEWS)})',
+        )
+
+    def handle(self, *args, **options):
+        output_dir = options['output_dir']
+        names = options['names'] or list(EMAIL_PREVIEWS)
+        unknown = [name for name in names if name not in EMAIL_PREVIEWS]
+        if unknown:
+            self.stdout.write(self.style.ERROR(f"❌ Unknown email(s): {', '.join(unknown)}"))
+            return
+
+        os.makedirs(output_dir, exist_ok=True)
+        index = []
+        for name in names:
+            template_name, context = EMAIL_PREVIEWS[name]
+            email = render_email(template_name, context)
+            for extension, content in (('html', email.html), ('txt', email.text)):
+                with open(os.path.join(output_dir, f'{name}.{extension}'), 'w', encoding='utf-8') as preview:
+                    preview.write(content)
+            index.append(f'<li><a href="{name}.html">{name}</a> (<a href="{name}.txt">text</a>)</li>')
+            self.stdout.write(f'  ✉️  {name}: {len(email.html):,} B html, {len(email.text):,} B text')
+
+        with open(os.path.join(output_dir, 'index.html'), 'w', encoding='utf-8') as index_file:
+            index_file.write(f"<html><body><h1>Email previews</h1><ul>{''.join(index)}</ul></body></html>\n")
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Rendered {len(names)} email(s) to {os.path.abspath(output_dir)}/index.html'
+        ))
@@ -0,0 +1,84 @@
+"""
+Management command delivering queued outbox emails.
+
+Run it as a long-lived worker next to the web processes:
+
+    python manage.py process_outbox
+
+or drain the queue once (e.g. from cron) with --once. Several workers can run
+at the same time; each claims different messages.
+"""
+
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from authentication.outbox import BACKEND_ALIASES, deliver_pending
+
+
+class Command(BaseCommand):
+    help = 'Send queued outbox emails in batches, retrying failures with exponential backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Deliver everything that is due, then exit',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Messages claimed per batch (default OUTBOX_BATCH_SIZE)',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=5.0,
+            help='Seconds to wait when the queue is empty (default 5)',
+        )
+        parser.add_argument(
+            '--backend',
+            help=f'Email backend path or one of: {", ".join(BACKEND_ALIASES)} (default OUTBOX_EMAIL_BACKEND)',
+        )
+        parser.add_argument(
+            '--file-path',
+            help='Directory for the file backend',
+        )
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        if not options['once']:
+            signal.signal(signal.SIGTERM, self._stop)
+            signal.signal(signal.SIGINT, self._stop)
+            self.stdout.write(f'📬 Outbox worker started (polling every {options["sleep"]}s)')
+
+        backend_kwargs = {'file_path': options['file_path']} if options['file_path'] else {}
+        totals = {'sent': 0, 'retried': 0, 'failed': 0}
+
+        while not self.stopping:
+            close_old_connections()
+            result = deliver_pending(
+                batch_size=options['batch_size'],
+                backend=options['backend'],
+                **backend_kwargs,
+            )
+            for key in totals:
+                totals[key] += getattr(result, key)
+            if result.claimed:
+                self.stdout.write(
+                    f'  ✉️  {result.sent} sent, {result.retried} to retry, {result.failed} failed'
+                )
+                continue
+            if options['once']:
+                break
+            time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Outbox: {totals['sent']} sent, {totals['retried']} to retry, {totals['failed']} failed"
+        ))
+
+    def _stop(self, signum, frame):
+        self.stdout.write('Stopping after the current batch...')
+        self.stopping = True
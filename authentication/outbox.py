@@ -0,0 +1,245 @@
+"""
+Transactional email outbox.
+
+Request handlers call queue_mail() instead of send_mail(). The message is
+stored as an OutboxMessage in the caller's transaction and delivered later
+by the process_outbox management command, which claims due messages with
+SELECT ... FOR UPDATE SKIP LOCKED (so several workers never send the same
+message), sends each batch over one backend connection and retries failures
+with exponential backoff.
+
+Claiming only holds the row locks for a short transaction that leases the
+messages (pushes their next_attempt_at OUTBOX_LEASE_SECONDS ahead). Sending
+happens outside any transaction and each outcome is saved on its own, so a
+worker dying mid-batch leaves the messages it already sent recorded as sent;
+the rest become due again once the lease runs out.
+
+With OUTBOX_SEND_ON_COMMIT enabled (the default when DEBUG is on) messages
+are also delivered as soon as the transaction commits, so local development
+works without running the worker.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+# Short names accepted by process_outbox --backend
+BACKEND_ALIASES = {
+    "console": "django.core.mail.backends.console.EmailBackend",
+    "file": "django.core.mail.backends.filebased.EmailBackend",
+    "locmem": "django.core.mail.backends.locmem.EmailBackend",
+}
+
+
+@dataclass
+class OutboxBatchResult:
+    """Outcome of one delivery batch."""
+
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+
+    @property
+    def claimed(self):
+        return self.sent + self.retried + self.failed
+
+
+def queue_mail(subject, message, from_email, recipient_list, html_message=None):
+    """
+    Queue an email for the outbox worker; same arguments as send_mail().
+
+    Args:
+        subject: Subject line
+        message: Plain-text body
+        from_email: Sender (defaults to DEFAULT_FROM_EMAIL when empty)
+        recipient_list: List of recipient addresses
+        html_message: Optional HTML alternative
+
+    Returns:
+        OutboxMessage, or None when there are no recipients
+    """
+    recipients = [address for address in recipient_list if address]
+    if not recipients:
+        logger.warning(f"Not queueing email '{subject}' without recipients")
+        return None
+
+    outbox_message = OutboxMessage.objects.create(
+        subject=subject,
+        body=message,
+        html_body=html_message or "",
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=recipients,
+    )
+    logger.info(f"Queued email '{subject}' to {', '.join(recipients)} (outbox #{outbox_message.pk})")
+
+    if getattr(settings, "OUTBOX_SEND_ON_COMMIT", False):
+        transaction.on_commit(lambda: deliver_pending(message_ids=[outbox_message.pk]))
+    return outbox_message
+
+
+def queue_mass_mail(datatuple):
+    """
+    Queue many emails with one INSERT; the counterpart of send_mass_mail().
+
+    Args:
+        datatuple: Iterable of (subject, message, from_email, recipient_list)
+
+    Returns:
+        List of the queued OutboxMessage objects
+    """
+    outbox_messages = []
+    for subject, message, from_email, recipient_list in datatuple:
+        recipients = [address for address in recipient_list if address]
+        if not recipients:
+            logger.warning(f"Not queueing email '{subject}' without recipients")
+            continue
+        outbox_messages.append(OutboxMessage(
+            subject=subject,
+            body=message,
+            from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+            to=recipients,
+        ))
+    if not outbox_messages:
+        return []
+
+    OutboxMessage.objects.bulk_create(outbox_messages)
+    logger.info(f"Queued {len(outbox_messages)} emails")
+
+    if getattr(settings, "OUTBOX_SEND_ON_COMMIT", False):
+        message_ids = [outbox_message.pk for outbox_message in outbox_messages]
+        transaction.on_commit(lambda: deliver_pending(message_ids=message_ids))
+    return outbox_messages
+
+
+def build_email(outbox_message, connection=None):
+    """Build the EmailMultiAlternatives for an OutboxMessage."""
+    email = EmailMultiAlternatives(
+        outbox_message.subject,
+        outbox_message.body,
+        outbox_message.from_email,
+        outbox_message.to,
+        connection=connection,
+    )
+    if outbox_message.html_body:
+        email.attach_alternative(outbox_message.html_body, "text/html")
+    return email
+
+
+def retry_delay(attempts):
+    """Backoff before the next attempt after the given number of failed ones."""
+    base = getattr(settings, "OUTBOX_RETRY_BASE_SECONDS", 60)
+    cap = getattr(settings, "OUTBOX_RETRY_MAX_SECONDS", 6 * 3600)
+    return timedelta(seconds=min(base * 2 ** max(attempts - 1, 0), cap))
+
+
+def _record_failure(outbox_message, error, now, result):
+    outbox_message.attempts += 1
+    outbox_message.last_error = f"{type(error).__name__}: {error}"
+    if outbox_message.attempts >= getattr(settings, "OUTBOX_MAX_ATTEMPTS", 8):
+        outbox_message.status = OutboxMessage.FAILED
+        result.failed += 1
+        logger.error(f"Giving up on outbox #{outbox_message.pk} after {outbox_message.attempts} attempts: {error}")
+    else:
+        outbox_message.next_attempt_at = now + retry_delay(outbox_message.attempts)
+        result.retried += 1
+        logger.warning(
+            f"Outbox #{outbox_message.pk} failed (attempt {outbox_message.attempts}), "
+            f"retrying at {outbox_message.next_attempt_at:%Y-%m-%d %H:%M:%S}: {error}"
+        )
+
+
+def lease_duration():
+    """How long claimed messages are held back from other workers while a batch is sent."""
+    return timedelta(seconds=getattr(settings, "OUTBOX_LEASE_SECONDS", 600))
+
+
+def claim_batch(batch_size, now, message_ids=None):
+    """
+    Lease up to batch_size due messages to this worker.
+
+    Returns:
+        List of the claimed OutboxMessage objects
+    """
+    with transaction.atomic():
+        due = OutboxMessage.objects.filter(status=OutboxMessage.PENDING, next_attempt_at__lte=now)
+        if message_ids is not None:
+            due = due.filter(pk__in=message_ids)
+        batch = list(
+            due.select_for_update(skip_locked=True).order_by("next_attempt_at", "pk")[:batch_size]
+        )
+        if batch:
+            OutboxMessage.objects.filter(pk__in=[outbox_message.pk for outbox_message in batch]).update(
+                next_attempt_at=now + lease_duration()
+            )
+    return batch
+
+
+def _save_outcome(outbox_message):
+    outbox_message.save(update_fields=["status", "attempts", "next_attempt_at", "last_error", "sent_at"])
+
+
+def deliver_pending(batch_size=None, backend=None, message_ids=None, **backend_kwargs):
+    """
+    Claim one batch of due outbox messages and send them.
+
+    The batch is leased in a short transaction (see claim_batch()), then
+    sent without holding any locks; the outcome of each message is saved as
+    soon as it is known. All messages of the batch share one backend
+    connection; a failing message is retried later without affecting the
+    others.
+
+    Args:
+        batch_size: Maximum messages to claim (defaults to OUTBOX_BATCH_SIZE)
+        backend: Email backend path or alias (defaults to OUTBOX_EMAIL_BACKEND,
+            then EMAIL_BACKEND)
+        message_ids: Only deliver these messages (used for send-on-commit)
+        **backend_kwargs: Passed to the backend (e.g. file_path)
+
+    Returns:
+        OutboxBatchResult
+    """
+    batch_size = batch_size or getattr(settings, "OUTBOX_BATCH_SIZE", 50)
+    backend = BACKEND_ALIASES.get(backend, backend) or getattr(settings, "OUTBOX_EMAIL_BACKEND", None)
+    result = OutboxBatchResult()
+    now = timezone.now()
+
+    batch = claim_batch(batch_size, now, message_ids)
+    if not batch:
+        return result
+
+    connection = get_connection(backend, fail_silently=False, **backend_kwargs)
+    try:
+        connection.open()
+    except Exception as error:
+        logger.error(f"Could not open email connection for {len(batch)} outbox messages: {error}")
+        for outbox_message in batch:
+            _record_failure(outbox_message, error, now, result)
+            _save_outcome(outbox_message)
+    else:
+        try:
+            for outbox_message in batch:
+                try:
+                    build_email(outbox_message, connection).send()
+                except Exception as error:
+                    _record_failure(outbox_message, error, now, result)
+                else:
+                    outbox_message.status = OutboxMessage.SENT
+                    outbox_message.sent_at = timezone.now()
+                    outbox_message.attempts += 1
+                    outbox_message.last_error = ""
+                    result.sent += 1
+                _save_outcome(outbox_message)
+        finally:
+            connection.close()
+
+    logger.info(f"Outbox batch: {result.sent} sent, {result.retried} to retry, {result.failed} failed")
+    return result
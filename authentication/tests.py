@@ -1,3 +1,213 @@
-from django.test import TestCase
+import os
+import tempfile
+from datetime import date
+from io import StringIO
+from types import SimpleNamespace
 
-# Create your tests here.
+from django.conf import settings
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend as LocmemBackend
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .email_templates import EMAIL_PREVIEWS, get_email_templates, render_email
+from .mailer import send_gift_card_email, send_issue_uniform_email, send_order_status_update_email
+from .models import OutboxMessage
+from .outbox import deliver_pending, queue_mail
+
+
+class CrashingBackend(LocmemBackend):
+    """Locmem backend whose process dies while sending to crash@example.com"""
+
+    def send_messages(self, messages):
+        for message in messages:
+            if 'crash@example.com' in message.to:
+                raise SystemExit('worker killed')
+        return super().send_messages(messages)
+
+
+class FlakyBackend(LocmemBackend):
+    """Locmem backend that rejects one address and counts opened connections"""
+
+    opened = 0
+
+    def open(self):
+        FlakyBackend.opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        for message in messages:
+            if 'bounce@example.com' in message.to:
+                raise ConnectionError('mailbox unavailable')
+        return super().send_messages(messages)
+
+
+@override_settings(OUTBOX_SEND_ON_COMMIT=False, OUTBOX_RETRY_BASE_SECONDS=60, OUTBOX_MAX_ATTEMPTS=3)
+class OutboxTest(TestCase):
+    """Test cases for the transactional email outbox"""
+
+    def test_queue_mail_follows_transaction(self):
+        """Test queued mail is part of the caller's transaction and nothing is sent right away"""
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                queue_mail('Rolled back', 'Body', None, ['a@example.com'])
+                raise RuntimeError
+        queued = queue_mail('Kept', 'Body', None, ['a@example.com', ''], html_message='<p>Body</p>')
+
+        self.assertEqual(list(OutboxMessage.objects.values_list('subject', flat=True)), ['Kept'])
+        self.assertEqual(queued.to, ['a@example.com'])
+        self.assertEqual(queued.from_email, settings.DEFAULT_FROM_EMAIL)
+        self.assertEqual(mail.outbox, [])
+        self.assertIsNone(queue_mail('Nobody', 'Body', None, ['']))
+
+    def test_deliver_batch_over_one_connection(self):
+        """Test a batch shares one connection and failures are retried with backoff"""
+        queue_mail('First', 'Body', None, ['a@example.com'], html_message='<p>Body</p>')
+        queue_mail('Bounce', 'Body', None, ['bounce@example.com'])
+        queue_mail('Second', 'Body', None, ['b@example.com'])
+        FlakyBackend.opened = 0
+
+        result = deliver_pending(backend='authentication.tests.FlakyBackend')
+
+        self.assertEqual((result.sent, result.retried, result.failed), (2, 1, 0))
+        self.assertEqual(FlakyBackend.opened, 1)
+        self.assertEqual([m.subject for m in mail.outbox], ['First', 'Second'])
+        self.assertEqual(mail.outbox[0].alternatives[0][1], 'text/html')
+
+        bounced = OutboxMessage.objects.get(subject='Bounce')
+        self.assertEqual((bounced.status, bounced.attempts), (OutboxMessage.PENDING, 1))
+        self.assertIn('mailbox unavailable', bounced.last_error)
+        self.assertAlmostEqual(
+            (bounced.next_attempt_at - timezone.now()).total_seconds(), 60, delta=5
+        )
+        # Not due yet, so the next batch is empty
+        self.assertEqual(deliver_pending(backend='authentication.tests.FlakyBackend').claimed, 0)
+
+    def test_gives_up_after_max_attempts(self):
+        """Test backoff doubles per attempt and the message fails after OUTBOX_MAX_ATTEMPTS"""
+        queued = queue_mail('Bounce', 'Body', None, ['bounce@example.com'])
+        delays = []
+        for _ in range(3):
+            OutboxMessage.objects.filter(pk=queued.pk).update(next_attempt_at=timezone.now())
+            before = timezone.now()
+            deliver_pending(backend='authentication.tests.FlakyBackend')
+            queued.refresh_from_db()
+            delays.append(round((queued.next_attempt_at - before).total_seconds() / 60))
+
+        self.assertEqual(queued.status, OutboxMessage.FAILED)
+        self.assertEqual(queued.attempts, 3)
+        self.assertEqual(delays[:2], [1, 2])
+
+    def test_crash_mid_batch_keeps_sent_messages(self):
+        """Test messages sent before a worker dies stay sent and the rest wait for the lease to run out"""
+        queue_mail('First', 'Body', None, ['a@example.com'])
+        queue_mail('Crash', 'Body', None, ['crash@example.com'])
+        queue_mail('Second', 'Body', None, ['b@example.com'])
+
+        with self.assertRaises(SystemExit):
+            deliver_pending(backend='authentication.tests.CrashingBackend')
+
+        self.assertEqual([m.subject for m in mail.outbox], ['First'])
+        first = OutboxMessage.objects.get(subject='First')
+        self.assertEqual((first.status, first.attempts), (OutboxMessage.SENT, 1))
+        for leased in OutboxMessage.objects.exclude(subject='First'):
+            self.assertEqual(leased.status, OutboxMessage.PENDING)
+            self.assertGreater(leased.next_attempt_at, timezone.now())
+        # Leased, so another worker doesn't pick them up right away
+        self.assertEqual(deliver_pending(backend='locmem').claimed, 0)
+
+        OutboxMessage.objects.filter(subject='Crash').update(to=['c@example.com'])
+        OutboxMessage.objects.filter(status=OutboxMessage.PENDING).update(next_attempt_at=timezone.now())
+        self.assertEqual(deliver_pending(backend='locmem').sent, 2)
+        self.assertEqual([m.subject for m in mail.outbox], ['First', 'Crash', 'Second'])
+
+    def test_send_on_commit(self):
+        """Test OUTBOX_SEND_ON_COMMIT delivers right after the transaction commits"""
+        with override_settings(OUTBOX_SEND_ON_COMMIT=True):
+            with self.captureOnCommitCallbacks(execute=True):
+                queue_mail('Now', 'Body', None, ['a@example.com'])
+                self.assertEqual(mail.outbox, [])
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(OutboxMessage.objects.get().status, OutboxMessage.SENT)
+
+    def test_process_outbox_file_backend(self):
+        """Test the worker command drains the queue offline with the file backend"""
+        send_issue_uniform_email('employee@example.com', 'Sam', 'Jacket')
+        out = StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            call_command('process_outbox', once=True, backend='file', file_path=directory, stdout=out)
+            written = os.listdir(directory)
+            with open(os.path.join(directory, written[0])) as email_file:
+                content = email_file.read()
+
+        self.assertEqual(len(written), 1)
+        self.assertIn('Uniform Issue Notification', content)
+        self.assertIn('1 sent', out.getvalue())
+        self.assertEqual(OutboxMessage.objects.get().status, OutboxMessage.SENT)
+
+
+@override_settings(OUTBOX_SEND_ON_COMMIT=False)
+class EmailTemplateTest(TestCase):
+    """Test cases for the template-rendered transactional emails"""
+
+    def test_mailer_queues_inline_styled_html(self):
+        """Test mailer emails carry inline styles and a plain-text alternative"""
+        card = SimpleNamespace(company=SimpleNamespace(name='Amazon'), amount=50)
+        send_gift_card_email(['a@example.com', 'b@example.com'], card, 'Great <work>')
+        queued = OutboxMessage.objects.get()
+
+        self.assertEqual(queued.to, ['a@example.com', 'b@example.com'])
+        self.assertNotIn('<style', queued.html_body)
+        self.assertIn('style="font-size: 18px; color: #e74c3c', queued.html_body)
+        self.assertIn('Great &lt;work&gt;', queued.html_body)
+        self.assertIn('Amazon with quantity 50', queued.body)
+        self.assertIn('Great <work>', queued.body)
+        self.assertNotIn('<', queued.body.replace('<work>', ''))
+
+    def test_order_status_update_renders(self):
+        """Test the order status email renders its materials and status"""
+        order = SimpleNamespace(
+            job_id='FM-1', date=date(2026, 10, 12), small_boxes=3, tape=0,
+            employee=SimpleNamespace(user=SimpleNamespace(username='scarter')),
+        )
+        send_order_status_update_email('a@example.com', order, 'rejected')
+        queued = OutboxMessage.objects.get()
+
+        self.assertEqual(queued.subject, 'Order Status Update')
+        self.assertIn('Rejected', queued.body)
+        self.assertIn('- Small Boxes: 3', queued.body)
+        self.assertNotIn('Tape', queued.body)
+        self.assertIn('#dc3545', queued.html_body)
+
+    def test_templates_compiled_once(self):
+        """Test each email's templates are loaded once and reused"""
+        get_email_templates.cache_clear()
+        for _ in range(3):
+            render_email('authentication/email/gift_card', EMAIL_PREVIEWS['gift_card'][1])
+        info = get_email_templates.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 2))
+
+    def test_every_preview_renders(self):
+        """Test every sample email renders, including the evaluation notification"""
+        for name, (template_name, context) in EMAIL_PREVIEWS.items():
+            with self.subTest(name=name):
+                email = render_email(template_name, context)
+                self.assertTrue(email.text.strip())
+                self.assertIn('</html>', email.html)
+        evaluation = render_email(*EMAIL_PREVIEWS['evaluation_submitted'])
+        self.assertIn('2026-10-12 to 2026-10-18', evaluation.text)
+
+    def test_preview_and_benchmark_commands(self):
+        """Test preview_emails writes every email and the benchmark runs"""
+        out = StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            call_command('preview_emails', output_dir=directory, stdout=out)
+            written = set(os.listdir(directory))
+        self.assertIn('index.html', written)
+        self.assertIn('gift_card.html', written)
+        self.assertIn('evaluation_submitted.txt', written)
+
+        call_command('benchmark_email_rendering', iterations=2, stdout=out)
+        self.assertIn('order_status_update: cached', out.getvalue())
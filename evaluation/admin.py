@@ -6,7 +6,7 @@ from .models import (
     EvalForm, Question, QuestionChoice, 
     DynamicEvaluation, Answer, 
     DynamicManagerEvaluation, ManagerAnswer,
-    ReportHistory
+    ReportHistory, ReportJob
 )
 
 
@@ -188,6 +188,21 @@ class ReportHistoryAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ('report_type', 'status', 'progress', 'requested_by', 'created_at', 'finished_at', 'file_size')
+    list_filter = ('report_type', 'status')
+    search_fields = ('params_hash', 'output_path')
+    ordering = ('-created_at',)
+    readonly_fields = ('params_hash', 'created_at', 'started_at', 'finished_at', 'output_path', 'file_size', 'error')
+    actions = ['requeue']
+
+    @admin.action(description="Build selected reports again")
+    def requeue(self, request, queryset):
+        updated = queryset.exclude(status=ReportJob.RUNNING).update(status=ReportJob.QUEUED, progress=0, error='')
+        self.message_user(request, f"{updated} report(s) queued for the report worker.")
+
+
 # Customize admin site header
 admin.site.site_header = "Firehouse Movers Admin"
 admin.site.site_title = "Firehouse Movers Admin Portal"
@@ -0,0 +1,735 @@
+"""
+Single-pass analytics snapshot for the senior manager analytics dashboard.
+
+Each base table is read once (departments, profiles, rollup statistics,
+per-employee counts, department ratings and recent activity) and the
+department, manager, team and recent-activity sections are assembled in memory
+from dict indexes. The number of queries does not depend on how many
+departments, managers or evaluations exist.
+
+Date-filtered snapshots are composed from per-segment partials (whole past
+quarters, months and weeks) that are cached and shared between ranges.
+
+The result is made of slotted dataclasses holding only ints, strings and ISO
+dates, so cached dashboards never pickle model instances. to_cache() flattens
+a snapshot to nested tuples and from_cache() rebuilds it.
+"""
+
+import calendar
+import logging
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import dataclass, fields
+from datetime import date, datetime, timedelta
+
+from django.db.models import Count, Min, Q, Sum
+from django.utils import timezone
+
+from authentication.models import Department, UserProfile
+from .cache_utils import (
+    TaggedValue, analytics_dashboard_cache_key, build_dependency_tags, get_many_tagged_lru, read_tagged, set_tagged,
+    set_tagged_lru, single_flight,
+)
+from .constants import EvaluationStatus
+from .models import Answer, DynamicEvaluation, DynamicManagerEvaluation, EvaluationStat
+from .utils import determine_status
+
+logger = logging.getLogger(__name__)
+
+RECENT_ACTIVITY_DAYS = 30
+
+# Partials of past segments only change when their evaluations do (tag invalidation)
+PARTIAL_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Bump when the cached tuple layout changes so old entries are treated as misses
+SNAPSHOT_CACHE_VERSION = 1
+
+
+class _CacheableSnapshot:
+    """Tuple (de)serialization for slotted snapshot dataclasses."""
+
+    __slots__ = ()
+
+    # Field name -> snapshot class for fields holding nested snapshots
+    nested = {}
+
+    def to_cache(self):
+        """Flatten to a tuple of plain values in field order."""
+        return tuple(
+            getattr(self, field.name).to_cache() if field.name in self.nested else getattr(self, field.name)
+            for field in fields(self)
+        )
+
+    @classmethod
+    def from_cache(cls, data):
+        """Rebuild a snapshot from the output of to_cache()."""
+        return cls(*(
+            cls.nested[field.name].from_cache(value) if field.name in cls.nested else value
+            for field, value in zip(fields(cls), data)
+        ))
+
+
+@dataclass(slots=True)
+class EvalCounts(_CacheableSnapshot):
+    """Evaluation counts by status."""
+
+    total: int = 0
+    completed: int = 0
+    pending: int = 0
+    overdue: int = 0
+
+    @classmethod
+    def from_stats(cls, stats):
+        return cls(stats['total'], stats['completed'], stats['pending'], stats['overdue'])
+
+    @property
+    def completion_rate(self):
+        return round(self.completed / self.total * 100, 1) if self.total > 0 else 0
+
+    @property
+    def status(self):
+        return determine_status(self.total, self.pending, self.overdue)
+
+
+@dataclass(slots=True)
+class DepartmentSnapshot(_CacheableSnapshot):
+    """Row of the department performance section."""
+
+    department_id: int
+    title: str
+    description: str
+    employee_stats: EvalCounts
+    manager_stats: EvalCounts
+    average_rating: float
+
+    nested = {'employee_stats': EvalCounts, 'manager_stats': EvalCounts}
+
+    @property
+    def employee_completion_rate(self):
+        return self.employee_stats.completion_rate
+
+    @property
+    def manager_completion_rate(self):
+        return self.manager_stats.completion_rate
+
+    @property
+    def has_employee_evals(self):
+        return self.employee_stats.total > 0
+
+    @property
+    def has_manager_evals(self):
+        return self.manager_stats.total > 0
+
+    @property
+    def employee_status(self):
+        return self.employee_stats.status
+
+    @property
+    def manager_status(self):
+        return self.manager_stats.status
+
+    def comparison_row(self):
+        """Entry of the department comparison chart data."""
+        return {
+            'department_name': self.title,
+            'employee_completion_rate': self.employee_completion_rate,
+            'manager_completion_rate': self.manager_completion_rate,
+            'average_rating': self.average_rating,
+            'total_evaluations': self.employee_stats.total + self.manager_stats.total,
+            'completed_evaluations': self.employee_stats.completed + self.manager_stats.completed,
+        }
+
+
+@dataclass(slots=True)
+class ManagerSnapshot(_CacheableSnapshot):
+    """Row of the manager effectiveness and team performance sections."""
+
+    manager_id: int
+    name: str
+    department_title: str
+    senior_manager_name: str
+    team_size: int
+    team_stats: EvalCounts
+    team_member_stats: EvalCounts
+    self_stats: EvalCounts
+
+    nested = {'team_stats': EvalCounts, 'team_member_stats': EvalCounts, 'self_stats': EvalCounts}
+
+    @property
+    def team_completion_rate(self):
+        return self.team_stats.completion_rate
+
+    @property
+    def self_completion_rate(self):
+        return self.self_stats.completion_rate
+
+    @property
+    def team_status(self):
+        """Status of the evaluations the manager conducts."""
+        return self.team_stats.status
+
+    @property
+    def combined_team_status(self):
+        """Status of the whole team: team members' evaluations and the manager's own."""
+        employee_status = self.team_member_stats.status
+        manager_status = self.self_stats.status
+        # If either is critical, team is critical; if either needs attention, team needs attention
+        if employee_status == 'critical' or manager_status == 'critical':
+            return 'critical'
+        if employee_status == 'needs_attention' or manager_status == 'needs_attention':
+            return 'needs_attention'
+        if employee_status == 'awaiting' and manager_status == 'awaiting':
+            return 'awaiting'
+        return 'on_track'
+
+
+@dataclass(slots=True)
+class RecentEvaluationSnapshot(_CacheableSnapshot):
+    """Evaluation submitted within the recent activity window."""
+
+    evaluation_id: int
+    name: str
+    department_name: str
+    form_name: str
+    status: str
+    period_end: str
+    submitted_at: str
+
+
+@dataclass(slots=True)
+class AnalyticsSnapshot:
+    """All data sections of the senior manager analytics dashboard."""
+
+    departments: list
+    managers: list
+    employee_stats: EvalCounts
+    manager_stats: EvalCounts
+    recent_employee_evals: list
+    recent_manager_evals: list
+
+    def to_cache(self):
+        return (
+            SNAPSHOT_CACHE_VERSION,
+            tuple(department.to_cache() for department in self.departments),
+            tuple(manager.to_cache() for manager in self.managers),
+            self.employee_stats.to_cache(),
+            self.manager_stats.to_cache(),
+            tuple(evaluation.to_cache() for evaluation in self.recent_employee_evals),
+            tuple(evaluation.to_cache() for evaluation in self.recent_manager_evals),
+        )
+
+    @classmethod
+    def from_cache(cls, data):
+        """
+        Rebuild a snapshot from the output of to_cache().
+
+        Raises:
+            ValueError: If the data was written with a different cache layout
+        """
+        if not data or data[0] != SNAPSHOT_CACHE_VERSION:
+            raise ValueError("Analytics snapshot cache layout mismatch")
+        _, departments, managers, employee_stats, manager_stats, recent_employee, recent_manager = data
+        return cls(
+            departments=[DepartmentSnapshot.from_cache(row) for row in departments],
+            managers=[ManagerSnapshot.from_cache(row) for row in managers],
+            employee_stats=EvalCounts.from_cache(employee_stats),
+            manager_stats=EvalCounts.from_cache(manager_stats),
+            recent_employee_evals=[RecentEvaluationSnapshot.from_cache(row) for row in recent_employee],
+            recent_manager_evals=[RecentEvaluationSnapshot.from_cache(row) for row in recent_manager],
+        )
+
+    def as_context(self):
+        """Template context for the dashboard sections."""
+        return {
+            'departments': [{'id': dept.department_id, 'title': dept.title} for dept in self.departments],
+            'department_analytics': sorted(self.departments, key=lambda x: x.employee_completion_rate, reverse=True),
+            'teams_analytics': sorted(self.managers, key=lambda x: x.team_member_stats.completion_rate, reverse=True),
+            'manager_effectiveness': sorted(self.managers, key=lambda x: x.team_completion_rate, reverse=True),
+            'employee_stats': {
+                'total_employee_evals': self.employee_stats.total,
+                'completed_employee_evals': self.employee_stats.completed,
+                'pending_employee_evals': self.employee_stats.pending,
+                'overdue_employee_evals': self.employee_stats.overdue,
+            },
+            'manager_stats': {
+                'total_manager_evals': self.manager_stats.total,
+                'completed_manager_evals': self.manager_stats.completed,
+                'pending_manager_evals': self.manager_stats.pending,
+                'overdue_manager_evals': self.manager_stats.overdue,
+            },
+            'overall_employee_completion_rate': self.employee_stats.completion_rate,
+            'overall_manager_completion_rate': self.manager_stats.completion_rate,
+            'recent_employee_evals': self.recent_employee_evals,
+            'recent_manager_evals': self.recent_manager_evals,
+            'recent_employee_evals_count': len(self.recent_employee_evals),
+            'recent_manager_evals_count': len(self.recent_manager_evals),
+            'department_comparison': [dept.comparison_row() for dept in self.departments],
+        }
+
+
+@dataclass(slots=True)
+class SnapshotPartial(_CacheableSnapshot):
+    """
+    Additive statistics of the evaluations counted in one date segment.
+
+    Partials of consecutive segments add up to the statistics of the whole
+    range. Overdue counts are relative to the day the partial was computed;
+    they stay correct up to ``valid_until``, the earliest period end of a
+    pending evaluation (None if nothing is pending).
+    """
+
+    # {(kind, 'overall' | 'department' | 'manager', id): [total, completed, pending, overdue]}
+    counts: dict
+    # {employee_id: [total, completed, pending, overdue]}
+    employee_counts: dict
+    # {department_id: [rating sum, rating count]}
+    ratings: dict
+    valid_until: str = None
+
+    @classmethod
+    def empty(cls):
+        return cls({}, {}, {})
+
+    @classmethod
+    def merge(cls, partials):
+        """Sum partials of disjoint segments."""
+        merged = cls.empty()
+        for partial in partials:
+            for index_name in ('counts', 'employee_counts', 'ratings'):
+                target = getattr(merged, index_name)
+                for key, values in getattr(partial, index_name).items():
+                    merged.add(target, key, values)
+        return merged
+
+    @staticmethod
+    def add(index, key, values):
+        current = index.setdefault(key, [0] * len(values))
+        for position, value in enumerate(values):
+            current[position] += value
+
+    def note_due(self, due_date):
+        """Record the period end of a pending evaluation that is not overdue yet."""
+        if due_date and (self.valid_until is None or due_date.isoformat() < self.valid_until):
+            self.valid_until = due_date.isoformat()
+
+    def is_valid_on(self, today):
+        # Nothing computed as "not overdue" has become overdue by ``today``
+        return self.valid_until is None or today.isoformat() <= self.valid_until
+
+    def stats(self, kind, dimension, key=None):
+        return EvalCounts(*self.counts.get((kind, dimension, key), (0, 0, 0, 0)))
+
+    def employee_stats(self, employee_id):
+        return EvalCounts(*self.employee_counts.get(employee_id, (0, 0, 0, 0)))
+
+    def average_rating(self, department_id):
+        rating_sum, rating_count = self.ratings.get(department_id, (0, 0))
+        return rating_sum / rating_count if rating_count else 0
+
+
+def _overlap_filter(start_field, end_field, start_date, end_date, prefix=''):
+    """Q object selecting evaluations whose period overlaps the date range."""
+    condition = Q()
+    if start_date:
+        condition &= Q(**{f'{prefix}{end_field}__gte': start_date})
+    if end_date:
+        condition &= Q(**{f'{prefix}{start_field}__lte': end_date})
+    return condition
+
+
+def _segment_locator(segments, range_start):
+    """
+    Map an evaluation's start date to the index of the segment it is counted in.
+
+    Evaluations are counted in the segment containing their start date, or in
+    the first segment of the range if they started before the range.
+    """
+    starts = [segment_start for segment_start, _ in segments]
+
+    def locate(period_start):
+        anchor = max(period_start, range_start) if range_start else period_start
+        position = bisect_right(starts, anchor) - 1
+        if position >= 0 and anchor <= segments[position][1]:
+            return position
+        return None
+
+    return locate
+
+
+def _load_partials(today, segments, range_start=None):
+    """
+    Compute the partials of date segments in three grouped queries.
+
+    Args:
+        today: Current date for overdue calculation
+        segments: Sorted, disjoint (start, end) date pairs of one range
+        range_start: Start of the range the segments belong to
+
+    Returns:
+        list: SnapshotPartial per segment
+    """
+    partials = [SnapshotPartial.empty() for _ in segments]
+    span_start, span_end = segments[0][0], segments[-1][1]
+    pending = Q(status=EvaluationStatus.PENDING)
+
+    if len(segments) == 1 and span_start == range_start:
+        # The whole range: a plain overlap filter, no need to group by start date
+        def locate(period_start):
+            return 0
+        start_fields = {}
+    else:
+        locate = _segment_locator(segments, range_start)
+        start_fields = {'period_start', 'week_start', 'instance__week_start'}
+
+    def group_fields(*fields):
+        return [field for field in fields if field in start_fields or not field.endswith('start')]
+
+    # Status counts from the EvaluationStat rollup
+    rows = (
+        EvaluationStat.objects.filter(_overlap_filter('period_start', 'period_end', span_start, span_end))
+        .order_by()
+        .values(*group_fields('kind', 'department_id', 'manager_id', 'status', 'period_start'))
+        .annotate(
+            total=Sum('count'),
+            overdue=Sum('count', filter=pending & Q(period_end__lt=today)),
+            next_due=Min('period_end', filter=pending & Q(period_end__gte=today)),
+        )
+    )
+    for row in rows:
+        position = locate(row.get('period_start'))
+        if position is None:
+            continue
+        partial = partials[position]
+        values = (
+            row['total'],
+            row['total'] if row['status'] == EvaluationStatus.COMPLETED else 0,
+            row['total'] if row['status'] == EvaluationStatus.PENDING else 0,
+            row['overdue'] or 0,
+        )
+        partial.add(partial.counts, (row['kind'], 'overall', None), values)
+        partial.add(partial.counts, (row['kind'], 'department', row['department_id']), values)
+        partial.add(partial.counts, (row['kind'], 'manager', row['manager_id']), values)
+        partial.note_due(row['next_due'])
+
+    # Per-employee counts for team statistics
+    rows = (
+        DynamicEvaluation.objects.filter(_overlap_filter('week_start', 'week_end', span_start, span_end))
+        .order_by()
+        .values(*group_fields('employee_id', 'week_start'))
+        .annotate(
+            total=Count('id'),
+            completed=Count('id', filter=Q(status=EvaluationStatus.COMPLETED)),
+            pending=Count('id', filter=pending),
+            overdue=Count('id', filter=pending & Q(week_end__lt=today)),
+            next_due=Min('week_end', filter=pending & Q(week_end__gte=today)),
+        )
+    )
+    for row in rows:
+        position = locate(row.get('week_start'))
+        if position is None:
+            continue
+        partial = partials[position]
+        partial.add(partial.employee_counts, row['employee_id'],
+                    (row['total'], row['completed'], row['pending'], row['overdue']))
+        partial.note_due(row['next_due'])
+
+    # Rating answers of completed evaluations per department
+    rows = (
+        Answer.objects.filter(
+            _overlap_filter('week_start', 'week_end', span_start, span_end, prefix='instance__'),
+            instance__status=EvaluationStatus.COMPLETED,
+            question__qtype='rating',
+        )
+        .order_by()
+        .values(*group_fields('instance__department_id', 'instance__week_start'))
+        .annotate(rating_sum=Sum('int_value'), rating_count=Count('int_value'))
+    )
+    for row in rows:
+        position = locate(row.get('instance__week_start'))
+        if position is None:
+            continue
+        partial = partials[position]
+        partial.add(partial.ratings, row['instance__department_id'], (row['rating_sum'] or 0, row['rating_count']))
+
+    return partials
+
+
+def split_date_range(start_date, end_date, today):
+    """
+    Split a closed date range into segments whose partials can be cached.
+
+    Complete past quarters and months become one segment each and the other
+    past days are split at week and month boundaries. Everything from the
+    first segment that is not over yet is one live segment.
+
+    Returns:
+        list: (start, end, historical) tuples covering the range in order
+    """
+    segments = []
+    cursor = start_date
+    while cursor <= end_date:
+        month_end = cursor.replace(day=calendar.monthrange(cursor.year, cursor.month)[1])
+        quarter_last_month = (cursor.month - 1) // 3 * 3 + 3
+        quarter_end = date(cursor.year, quarter_last_month, calendar.monthrange(cursor.year, quarter_last_month)[1])
+
+        if cursor.day == 1 and cursor.month % 3 == 1 and quarter_end <= end_date and quarter_end < today:
+            segment_end = quarter_end
+        elif cursor.day == 1 and month_end <= end_date and month_end < today:
+            segment_end = month_end
+        else:
+            segment_end = min(cursor + timedelta(days=6 - cursor.weekday()), month_end, end_date)
+            if segment_end >= today:
+                segments.append((cursor, end_date, False))
+                break
+
+        segments.append((cursor, segment_end, True))
+        cursor = segment_end + timedelta(days=1)
+    return segments
+
+
+def _partial_cache_key(segment_start, segment_end, first_segment):
+    # The first segment of a range also counts evaluations that started before it
+    kind = 'head' if first_segment else 'body'
+    return f"analytics_partial_{kind}_{segment_start}_{segment_end}"
+
+
+def load_range_partial(today, start_date, end_date):
+    """
+    Statistics of a closed date range, composed from per-segment partials.
+
+    Partials of past segments are cached (within the range cache budget) and
+    reused by every range containing them; missing segments and the live
+    segment are computed together in one pass.
+
+    Returns:
+        SnapshotPartial: Statistics of the whole range
+    """
+    segments = split_date_range(start_date, end_date, today)
+    cache_keys = {
+        position: _partial_cache_key(segment_start, segment_end, segment_start == start_date)
+        for position, (segment_start, segment_end, historical) in enumerate(segments)
+        if historical
+    }
+
+    partials = [None] * len(segments)
+    cached = get_many_tagged_lru(list(cache_keys.values()))
+    for position, cache_key in cache_keys.items():
+        if cache_key in cached:
+            partial = SnapshotPartial.from_cache(cached[cache_key])
+            if partial.is_valid_on(today):
+                partials[position] = partial
+
+    missing = [position for position, partial in enumerate(partials) if partial is None]
+    if missing:
+        computed = _load_partials(today, [segments[position][:2] for position in missing], start_date)
+        for position, partial in zip(missing, computed):
+            partials[position] = partial
+            if position in cache_keys:
+                segment_start, segment_end, _ = segments[position]
+                set_tagged_lru(
+                    cache_keys[position],
+                    partial.to_cache(),
+                    build_dependency_tags(start_date=segment_start, end_date=segment_end),
+                    timeout=PARTIAL_CACHE_TIMEOUT,
+                )
+
+    logger.info(
+        f"Analytics range {start_date} to {end_date}: {len(segments)} segments, "
+        f"{len(segments) - len(missing)} from cache"
+    )
+    return SnapshotPartial.merge(partials)
+
+
+def _recent_evaluations(queryset, person, period_end_field):
+    """Read recent evaluations as RecentEvaluationSnapshot rows in one query."""
+    rows = queryset.order_by('-submitted_at').values(
+        'id', 'status', period_end_field, 'submitted_at', 'form__name', 'department__title',
+        f'{person}__user__first_name', f'{person}__user__last_name',
+    )
+    return [
+        RecentEvaluationSnapshot(
+            evaluation_id=row['id'],
+            name=f"{row[f'{person}__user__first_name']} {row[f'{person}__user__last_name']}",
+            department_name=row['department__title'],
+            form_name=row['form__name'],
+            status=row['status'],
+            period_end=row[period_end_field].isoformat() if row[period_end_field] else None,
+            submitted_at=row['submitted_at'].isoformat() if row['submitted_at'] else None,
+        )
+        for row in rows
+    ]
+
+
+def _load_recent_activity(since, start_date, end_date):
+    """Employee and manager evaluations submitted since ``since`` (two queries)."""
+    recent_employee_evals = _recent_evaluations(
+        DynamicEvaluation.objects.filter(
+            _overlap_filter('week_start', 'week_end', start_date, end_date),
+            submitted_at__gte=since,
+        ),
+        'employee', 'week_end',
+    )
+    recent_manager_evals = _recent_evaluations(
+        DynamicManagerEvaluation.objects.filter(
+            _overlap_filter('period_start', 'period_end', start_date, end_date),
+            submitted_at__gte=since,
+        ),
+        'manager', 'period_end',
+    )
+    return recent_employee_evals, recent_manager_evals
+
+
+def _full_name(profile):
+    return profile.user.get_full_name() if profile else ''
+
+
+def build_analytics_snapshot(today, start_date=None, end_date=None):
+    """
+    Build the data sections of the senior manager analytics dashboard.
+
+    Args:
+        today: Current date for overdue calculation
+        start_date: Optional start of the period filter
+        end_date: Optional end of the period filter
+
+    Returns:
+        AnalyticsSnapshot: ORM-free dashboard data, ready for caching
+    """
+    departments = list(Department.objects.only('id', 'title', 'description'))
+
+    # Managers and their team members in one query
+    profiles = list(
+        UserProfile.objects.filter(Q(role='manager') | Q(manager__role='manager'))
+        .select_related('user', 'manager__user', 'managed_department')
+    )
+    managers = [profile for profile in profiles if profile.role == 'manager']
+    team_members_by_manager = defaultdict(list)
+    for profile in profiles:
+        if profile.manager_id is not None:
+            team_members_by_manager[profile.manager_id].append(profile)
+
+    if start_date and end_date:
+        partial = load_range_partial(today, start_date, end_date)
+    else:
+        partial = _load_partials(today, [(start_date, end_date)], start_date)[0]
+    recent_employee_evals, recent_manager_evals = _load_recent_activity(
+        timezone.now() - timedelta(days=RECENT_ACTIVITY_DAYS), start_date, end_date
+    )
+
+    employee_stats = partial.stats(EvaluationStat.EMPLOYEE, 'overall')
+    manager_stats = partial.stats(EvaluationStat.MANAGER, 'overall')
+    logger.info(
+        f"Analytics snapshot: {len(departments)} departments, {len(managers)} managers, "
+        f"{employee_stats.total} employee evals, {manager_stats.total} manager evals"
+    )
+
+    department_snapshots = []
+    for dept in departments:
+        dept_employee_stats = partial.stats(EvaluationStat.EMPLOYEE, 'department', dept.id)
+        dept_avg_rating = partial.average_rating(dept.id) if dept_employee_stats.completed > 0 else 0
+        department_snapshots.append(DepartmentSnapshot(
+            department_id=dept.id,
+            title=dept.title,
+            description=dept.description or '',
+            employee_stats=dept_employee_stats,
+            manager_stats=partial.stats(EvaluationStat.MANAGER, 'department', dept.id),
+            average_rating=round(dept_avg_rating, 1),
+        ))
+
+    manager_snapshots = []
+    for manager in managers:
+        # Team member statistics cover every evaluation of the current team members
+        team_members = team_members_by_manager.get(manager.id, [])
+        team_member_stats = EvalCounts()
+        for member in team_members:
+            member_stats = partial.employee_stats(member.id)
+            team_member_stats.total += member_stats.total
+            team_member_stats.completed += member_stats.completed
+            team_member_stats.pending += member_stats.pending
+            team_member_stats.overdue += member_stats.overdue
+
+        managed_department = getattr(manager, 'managed_department', None)
+        manager_snapshots.append(ManagerSnapshot(
+            manager_id=manager.id,
+            name=_full_name(manager),
+            department_title=managed_department.title if managed_department else '',
+            senior_manager_name=_full_name(manager.manager),
+            team_size=len(team_members),
+            team_stats=partial.stats(EvaluationStat.EMPLOYEE, 'manager', manager.id),
+            team_member_stats=team_member_stats,
+            self_stats=partial.stats(EvaluationStat.MANAGER, 'manager', manager.id),
+        ))
+
+    return AnalyticsSnapshot(
+        departments=department_snapshots,
+        managers=manager_snapshots,
+        employee_stats=employee_stats,
+        manager_stats=manager_stats,
+        recent_employee_evals=recent_employee_evals,
+        recent_manager_evals=recent_manager_evals,
+    )
+
+
+def get_scoped_analytics_snapshot(scope, today, start_date=None, end_date=None, use_cache=True, refresh=False):
+    """
+    Get the dashboard snapshot shared by a permission scope, computing it on a cache miss.
+
+    Cache fills go through single_flight(), so concurrent misses for the same
+    scope and range build the snapshot once, and snapshots past the soft TTL
+    are served while they are rebuilt in the background.
+
+    Args:
+        scope: Permission scope from analytics_scope_for()
+        today: Current date for overdue calculation
+        start_date: Optional start of the period filter
+        end_date: Optional end of the period filter
+        use_cache: Read and store the shared cache entry (default True)
+        refresh: Recompute and store even if an entry is cached
+
+    Returns:
+        tuple: (AnalyticsSnapshot, datetime the data was computed at, refreshing),
+        where refreshing is True if an outdated snapshot is served while it is
+        being recomputed
+    """
+    cache_key = analytics_dashboard_cache_key(scope, today, start_date, end_date)
+    # Arbitrary date ranges count against the range cache budget
+    filtered = bool(start_date or end_date)
+
+    def load():
+        cached = read_tagged(cache_key, lru=filtered)
+        if cached.value is None:
+            return cached
+        try:
+            snapshot = AnalyticsSnapshot.from_cache(cached.value['snapshot'])
+            return cached._replace(value=(snapshot, datetime.fromisoformat(cached.value['data_computed_at'])))
+        except (KeyError, TypeError, ValueError) as e:
+            # Entry written with an older layout - recompute it
+            logger.warning(f"Discarding incompatible analytics dashboard cache entry '{cache_key}': {e}")
+            return TaggedValue(None, False)
+
+    def compute():
+        logger.info(f"Analytics dashboard cache miss for scope '{scope}', computing data...")
+        return build_analytics_snapshot(today, start_date, end_date), timezone.now()
+
+    def store(result):
+        snapshot, data_computed_at = result
+        # Only plain tuples are cached; the org-wide dashboard depends on every department, manager and form
+        set_entry = set_tagged_lru if filtered else set_tagged
+        set_entry(
+            cache_key,
+            {'snapshot': snapshot.to_cache(), 'data_computed_at': data_computed_at.isoformat()},
+            build_dependency_tags(start_date=start_date, end_date=end_date),
+        )
+        logger.info(f"Analytics dashboard data cached for scope '{scope}' (30 min TTL)")
+
+    if not use_cache:
+        return (*compute(), False)
+    if refresh:
+        result = compute()
+        store(result)
+        return (*result, False)
+
+    (snapshot, data_computed_at), refreshing = single_flight(cache_key, load, compute, store)
+    if refreshing:
+        logger.info(f"Serving outdated analytics dashboard for scope '{scope}' while it is refreshed")
+    return snapshot, data_computed_at, refreshing
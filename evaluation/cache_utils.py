@@ -1,90 +1,605 @@
 """
 Cache utilities for evaluation analytics dashboard.
 Provides cache invalidation when evaluation data changes.
+
+Analytics entries are stored with the dependency tags they were computed
+from (departments, managers, forms and the months they cover). Saving an
+evaluation or form only expires the tags it touches, so unrelated entries
+and every other cache alias are left alone.
 """
 
-from django.core.cache import cache, caches
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date
+import pickle
+import threading
+import time
+from typing import Any, NamedTuple, Optional
+import uuid
+
 from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.db.models import Q
 from django.utils import timezone
 import logging
 
+from firehousemovers.utils.permissions import role_checker
+
 logger = logging.getLogger(__name__)
 
+ANALYTICS_CACHE_ALIAS = 'analytics'
+ANALYTICS_CACHE_TIMEOUT = 1800  # 30 minutes - hard TTL, after which requests block on a recomputation
+# Soft TTL (settings.ANALYTICS_CACHE_SOFT_TIMEOUT): older entries are still served
+# while a background thread recomputes them
+DEFAULT_ANALYTICS_CACHE_SOFT_TIMEOUT = 600
+DEFAULT_ANALYTICS_REFRESH_WORKERS = 2
+
+# Entries written with set_tagged_lru() share a budget (settings.ANALYTICS_RANGE_CACHE_MAX_ENTRIES);
+# the least recently used ones are evicted first
+DEFAULT_RANGE_CACHE_MAX_ENTRIES = 200
+RANGE_LRU_INDEX_KEY = 'analytics_range_lru'
+# Updates of the index hold a lock that expires after RANGE_LRU_LOCK_TIMEOUT seconds
+RANGE_LRU_LOCK_TIMEOUT = 5
+
+# Permission scope of users who see organization-wide analytics
+ORG_WIDE_SCOPE = 'org-wide'
+
+# Single-flight cache fills: waiters poll for SINGLE_FLIGHT_WAIT_TIMEOUT seconds,
+# the cache-backend lock expires after SINGLE_FLIGHT_LOCK_TIMEOUT seconds
+SINGLE_FLIGHT_WAIT_TIMEOUT = 5
+SINGLE_FLIGHT_LOCK_TIMEOUT = 120
+SINGLE_FLIGHT_POLL_INTERVAL = 0.1
+FILL_LOCK_PREFIX = 'analytics_fill_lock'
+
+_local_fill_locks = {}
+_local_fill_locks_guard = threading.Lock()
+_lru_index_guard = threading.Lock()
+
+# Background refreshes of soft-expired entries
+_refresh_executor = None
+_pending_refreshes = set()
+_refresh_guard = threading.Lock()
+
+# Dependency tag vocabulary
+ALL_SCOPE = 'all'
+ANY_PERIOD = '*'
+TAG_VERSION_PREFIX = 'analytics_tag'
+
+
+def get_analytics_cache():
+    """Return the cache backend used for analytics data."""
+    return caches[ANALYTICS_CACHE_ALIAS]
+
+
+def analytics_scope_for(user):
+    """
+    Permission scope that determines which analytics data a user sees.
+
+    Users with the same scope see identical numbers, so cached analytics are
+    shared per scope rather than stored once per user. The analytics views
+    are only open to admins and senior management, who all see the whole
+    organization, so they share the single org-wide scope.
+
+    Returns:
+        str or None: 'org-wide' for admins and senior management, None for
+        users without analytics access
+    """
+    if role_checker(user).is_admin_or_senior():
+        return ORG_WIDE_SCOPE
+    return None
+
+
+def analytics_dashboard_cache_key(scope, today, start_date=None, end_date=None):
+    """Cache key of an analytics dashboard entry shared by a permission scope."""
+    return f"analytics_dashboard_{scope}_{today}_{start_date}_{end_date}"
+
+
+def get_cached_entry_size(cache_key):
+    """
+    Size in bytes of a pickled analytics cache entry.
+
+    Returns:
+        int or None: Pickled size, or None if the key is not cached
+    """
+    entry = get_analytics_cache().get(cache_key)
+    if entry is None:
+        return None
+    return len(pickle.dumps(entry, pickle.HIGHEST_PROTOCOL))
+
+
+def _pk(obj):
+    """Accept either a model instance or a raw primary key."""
+    return getattr(obj, 'pk', obj)
+
+
+def _month_buckets(start_date, end_date):
+    """Yield 'YYYY-MM' labels for every month touched by the date range."""
+    year, month = start_date.year, start_date.month
+    while date(year, month, 1) <= end_date:
+        yield f"{year:04d}-{month:02d}"
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+
+
+def _scopes(departments=None, managers=None, forms=None):
+    scopes = [f"department:{_pk(d)}" for d in departments or [] if d is not None]
+    scopes += [f"manager:{_pk(m)}" for m in managers or [] if m is not None]
+    scopes += [f"form:{_pk(f)}" for f in forms or [] if f is not None]
+    return scopes
+
+
+def build_dependency_tags(departments=None, managers=None, forms=None, start_date=None, end_date=None):
+    """
+    Build the tags a cached analytics entry depends on.
+
+    Args:
+        departments: Departments (or ids) the entry reads, None for all
+        managers: Managers (or ids) the entry reads, None for all
+        forms: EvalForms (or ids) the entry reads, None for all
+        start_date: Start of the date range the entry covers (optional)
+        end_date: End of the date range the entry covers (optional)
+
+    Returns:
+        list: Tags to pass to set_tagged()
+    """
+    scopes = _scopes(departments, managers, forms) or [ALL_SCOPE]
+    if start_date and end_date:
+        periods = list(_month_buckets(start_date, end_date))
+    else:
+        # Open-ended ranges depend on every period
+        periods = [ANY_PERIOD]
+
+    tags = []
+    for scope in scopes:
+        tags.append(scope)
+        tags.extend(f"{scope}|{period}" for period in periods)
+    return tags
+
+
+def build_change_tags(departments=None, managers=None, forms=None, start_date=None, end_date=None):
+    """
+    Build the tags expired by a data change.
+
+    Dated changes (an evaluation for a given week or period) expire the
+    matching month buckets of each scope. Undated changes (e.g. a form edit)
+    expire the scope as a whole, whatever period the entries cover.
+    """
+    scopes = _scopes(departments, managers, forms) + [ALL_SCOPE]
+    if not (start_date and end_date):
+        return scopes
+
+    periods = list(_month_buckets(start_date, end_date)) + [ANY_PERIOD]
+    return [f"{scope}|{period}" for scope in scopes for period in periods]
+
+
+def _tag_key(tag):
+    return f"{TAG_VERSION_PREFIX}:{tag}"
+
+
+def _get_tag_versions(tags, create=False):
+    """Fetch current versions for tags, optionally creating missing ones."""
+    analytics_cache = get_analytics_cache()
+    keys = [_tag_key(tag) for tag in tags]
+    versions = analytics_cache.get_many(keys)
+
+    if create:
+        missing = [key for key in keys if key not in versions]
+        for key in missing:
+            # A fresh token never collides with versions recorded before an eviction
+            analytics_cache.add(key, time.time_ns(), timeout=None)
+        if missing:
+            versions.update(analytics_cache.get_many(missing))
+    return versions
+
+
+def set_tagged(cache_key, value, tags, timeout=ANALYTICS_CACHE_TIMEOUT):
+    """
+    Store a value in the analytics cache along with its dependency tags.
+
+    Args:
+        cache_key: Cache key for the entry
+        value: Picklable value to store
+        tags: Tags from build_dependency_tags()
+        timeout: Cache timeout in seconds (default 30 minutes)
+    """
+    versions = _get_tag_versions(tags, create=True)
+    entry = {'tags': versions, 'value': value, 'stored_at': time.time()}
+    get_analytics_cache().set(cache_key, entry, timeout)
+
+
+class TaggedValue(NamedTuple):
+    """An entry read with read_tagged()."""
+
+    value: Any
+    fresh: bool
+    stored_at: Optional[float] = None
+
+    @property
+    def age(self):
+        """Seconds since the value was stored, None if unknown."""
+        if self.stored_at is None:
+            return None
+        return max(time.time() - self.stored_at, 0)
+
+
+def read_tagged(cache_key, lru=False):
+    """
+    Read a value stored with set_tagged() without evicting it when stale.
+
+    Args:
+        cache_key: Cache key of the entry
+        lru: Mark a fresh hit as recently used (entries written with set_tagged_lru())
+
+    Returns:
+        TaggedValue: value is None if the key is missing, fresh is False if
+        any of its tags has been invalidated since it was stored
+    """
+    analytics_cache = get_analytics_cache()
+    entry = analytics_cache.get(cache_key)
+    if not isinstance(entry, dict) or 'tags' not in entry:
+        return TaggedValue(None, False)
+
+    stored_at = entry.get('stored_at')
+    stored_versions = entry['tags']
+    current_versions = analytics_cache.get_many(list(stored_versions))
+    for key, version in stored_versions.items():
+        if current_versions.get(key) != version:
+            logger.debug(f"Analytics cache entry '{cache_key}' is stale ({key} changed)")
+            return TaggedValue(entry['value'], False, stored_at)
+
+    if lru:
+        _touch_lru([cache_key])
+    return TaggedValue(entry['value'], True, stored_at)
+
+
+def get_tagged(cache_key, default=None):
+    """
+    Get a value stored with set_tagged().
+
+    Returns default if the key is missing or any of its tags has been
+    invalidated since the value was stored (the stale entry is evicted).
+    """
+    cached = read_tagged(cache_key)
+    if not cached.fresh:
+        if cached.value is not None:
+            get_analytics_cache().delete(cache_key)
+        return default
+    return cached.value
+
+
+def get_many_tagged(cache_keys):
+    """
+    Get several values stored with set_tagged() in two cache round trips.
+
+    Returns:
+        dict: {cache_key: value} for the keys that are cached and still valid
+    """
+    analytics_cache = get_analytics_cache()
+    entries = {
+        key: entry for key, entry in analytics_cache.get_many(list(cache_keys)).items()
+        if isinstance(entry, dict) and 'tags' in entry
+    }
+    tag_keys = {key for entry in entries.values() for key in entry['tags']}
+    current_versions = analytics_cache.get_many(list(tag_keys)) if tag_keys else {}
+
+    values = {}
+    stale = []
+    for cache_key, entry in entries.items():
+        if all(current_versions.get(key) == version for key, version in entry['tags'].items()):
+            values[cache_key] = entry['value']
+        else:
+            stale.append(cache_key)
+    if stale:
+        logger.debug(f"Evicting {len(stale)} stale analytics cache entries")
+        analytics_cache.delete_many(stale)
+    return values
+
+
+@contextmanager
+def _lru_index_lock():
+    """
+    Serialize updates of the LRU index across threads and worker processes.
+
+    Waits up to SINGLE_FLIGHT_WAIT_TIMEOUT seconds for the cache-backend lock;
+    past that the holder is assumed dead and the update goes ahead (its lock
+    expires after RANGE_LRU_LOCK_TIMEOUT seconds anyway).
+    """
+    deadline = time.monotonic() + SINGLE_FLIGHT_WAIT_TIMEOUT
+    with _lru_index_guard:
+        while True:
+            with cache_fill_lock(RANGE_LRU_INDEX_KEY, RANGE_LRU_LOCK_TIMEOUT) as acquired:
+                if acquired or time.monotonic() >= deadline:
+                    if not acquired:
+                        logger.warning("Timed out waiting for the analytics range LRU lock")
+                    yield
+                    return
+            time.sleep(SINGLE_FLIGHT_POLL_INTERVAL)
+
+
+def _touch_lru(cache_keys):
+    """Mark keys as most recently used and evict entries beyond the budget."""
+    analytics_cache = get_analytics_cache()
+    touched = set(cache_keys)
+    budget = getattr(settings, 'ANALYTICS_RANGE_CACHE_MAX_ENTRIES', DEFAULT_RANGE_CACHE_MAX_ENTRIES)
 
-def get_all_cache_aliases():
+    # The index is read, modified and written back; without the lock concurrent
+    # requests would drop each other's keys from it
+    with _lru_index_lock():
+        index = [key for key in analytics_cache.get(RANGE_LRU_INDEX_KEY) or [] if key not in touched]
+        index.extend(cache_keys)
+        overflow = len(index) - budget
+        if overflow > 0:
+            analytics_cache.delete_many(index[:overflow])
+            logger.debug(f"Evicted {overflow} least recently used analytics range entries")
+            index = index[overflow:]
+        analytics_cache.set(RANGE_LRU_INDEX_KEY, index, timeout=None)
+
+
+def set_tagged_lru(cache_key, value, tags, timeout=ANALYTICS_CACHE_TIMEOUT):
+    """
+    Store a value like set_tagged(), counting it against the range cache budget.
+
+    Used for entries whose key space is open-ended (arbitrary date ranges), so
+    the number of such entries stays bounded.
+    """
+    set_tagged(cache_key, value, tags, timeout)
+    _touch_lru([cache_key])
+
+
+def get_many_tagged_lru(cache_keys):
+    """Like get_many_tagged(), marking the hits as recently used."""
+    values = get_many_tagged(cache_keys)
+    if values:
+        _touch_lru([key for key in cache_keys if key in values])
+    return values
+
+
+@contextmanager
+def local_fill_lock(cache_key):
+    """
+    Per-key lock shared by the threads of this process.
+
+    Yields the threading.Lock for the key; callers acquire it themselves so
+    they can choose between waiting and serving a stale value. The registry
+    entry is dropped once no thread refers to it.
+    """
+    with _local_fill_locks_guard:
+        entry = _local_fill_locks.setdefault(cache_key, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        yield entry[0]
+    finally:
+        with _local_fill_locks_guard:
+            entry[1] -= 1
+            if not entry[1]:
+                _local_fill_locks.pop(cache_key, None)
+
+
+@contextmanager
+def cache_fill_lock(cache_key, timeout=SINGLE_FLIGHT_LOCK_TIMEOUT):
     """
-    Get all configured cache aliases from settings.
-    This ensures we clear all caches, including future ones.
+    Lock in the analytics cache backend shared by every worker process.
+
+    Yields True if this worker holds the lock. The lock expires after
+    timeout seconds, so a crashed worker cannot block the key forever.
     """
+    analytics_cache = get_analytics_cache()
+    lock_key = f"{FILL_LOCK_PREFIX}:{cache_key}"
+    token = uuid.uuid4().hex
+    acquired = analytics_cache.add(lock_key, token, timeout)
+    try:
+        yield acquired
+    finally:
+        # Only release our own lock, not one taken over after a timeout
+        if acquired and analytics_cache.get(lock_key) == token:
+            analytics_cache.delete(lock_key)
+
+
+def get_soft_timeout():
+    """Age in seconds after which cached analytics are refreshed in the background."""
+    return getattr(settings, 'ANALYTICS_CACHE_SOFT_TIMEOUT', DEFAULT_ANALYTICS_CACHE_SOFT_TIMEOUT)
+
+
+def _get_refresh_executor():
+    global _refresh_executor
+    with _refresh_guard:
+        if _refresh_executor is None:
+            _refresh_executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'ANALYTICS_REFRESH_WORKERS', DEFAULT_ANALYTICS_REFRESH_WORKERS),
+                thread_name_prefix='analytics-refresh',
+            )
+        return _refresh_executor
+
+
+def _refresh_entry(cache_key, load, compute, store, soft_timeout):
+    """Recompute a soft-expired entry unless another worker already does."""
+    try:
+        with cache_fill_lock(cache_key) as acquired:
+            if not acquired:
+                logger.debug(f"Another worker is refreshing '{cache_key}'")
+                return
+            current = load()
+            if current.fresh and (current.age or 0) < soft_timeout:
+                return
+            store(compute())
+            logger.info(f"Refreshed analytics cache entry '{cache_key}' in the background")
+    except Exception as e:
+        logger.error(f"Error refreshing analytics cache entry '{cache_key}': {e}")
+    finally:
+        with _refresh_guard:
+            _pending_refreshes.discard(cache_key)
+        # Executor threads open their own database connections
+        connections.close_all()
+
+
+def schedule_refresh(cache_key, load, compute, store, soft_timeout=None):
+    """
+    Recompute a cache entry on the background refresh executor.
+
+    Returns:
+        Future or None: None if a refresh of the key is already pending in this process
+    """
+    with _refresh_guard:
+        if cache_key in _pending_refreshes:
+            return None
+        _pending_refreshes.add(cache_key)
+    soft_timeout = get_soft_timeout() if soft_timeout is None else soft_timeout
+    try:
+        return _get_refresh_executor().submit(_refresh_entry, cache_key, load, compute, store, soft_timeout)
+    except RuntimeError as e:
+        # Executor shut down (interpreter exit)
+        logger.warning(f"Could not schedule refresh of '{cache_key}': {e}")
+        with _refresh_guard:
+            _pending_refreshes.discard(cache_key)
+        return None
+
+
+def single_flight(cache_key, load, compute, store, wait_timeout=SINGLE_FLIGHT_WAIT_TIMEOUT,
+                  lock_timeout=SINGLE_FLIGHT_LOCK_TIMEOUT, soft_timeout=None):
+    """
+    Fill a cache entry with at most one concurrent computation.
+
+    Entries older than the soft TTL are served as they are while a background
+    thread recomputes them. Missing or invalidated entries are computed by the
+    first caller; other threads and workers serve the invalidated value
+    meanwhile, flagged as refreshing, or wait up to wait_timeout seconds for
+    the new value when there is nothing to serve. If the wait runs out they
+    compute it themselves rather than fail the request.
+
+    Args:
+        cache_key: Key being filled, also names the locks
+        load: Callable returning a TaggedValue like read_tagged()
+        compute: Callable computing a new value
+        store: Callable storing a computed value
+        wait_timeout: Seconds to wait for another worker's result
+        lock_timeout: Seconds the cache-backend lock is held at most
+        soft_timeout: Soft TTL in seconds (default settings.ANALYTICS_CACHE_SOFT_TIMEOUT)
+
+    Returns:
+        tuple: (value, refreshing) - refreshing is True when an outdated value
+        is served while it is being recomputed
+    """
+    soft_timeout = get_soft_timeout() if soft_timeout is None else soft_timeout
+    cached = load()
+    if cached.fresh:
+        if cached.age is None or cached.age < soft_timeout:
+            return cached.value, False
+        schedule_refresh(cache_key, load, compute, store, soft_timeout)
+        return cached.value, True
+    value = cached.value
+
+    def fill():
+        new_value = compute()
+        store(new_value)
+        return new_value
+
+    with local_fill_lock(cache_key) as lock:
+        if not lock.acquire(blocking=False):
+            if value is not None:
+                return value, True
+            if not lock.acquire(timeout=wait_timeout):
+                logger.warning(f"Timed out waiting for '{cache_key}' to be filled, computing it here")
+                return fill(), False
+        try:
+            # Another thread may have filled the entry while we waited for the lock
+            current = load()
+            if current.fresh:
+                return current.value, False
+            if current.value is not None:
+                value = current.value
+
+            with cache_fill_lock(cache_key, lock_timeout) as acquired:
+                if acquired:
+                    return fill(), False
+
+            # Another worker is computing the entry
+            if value is not None:
+                return value, True
+            deadline = time.monotonic() + wait_timeout
+            while time.monotonic() < deadline:
+                time.sleep(SINGLE_FLIGHT_POLL_INTERVAL)
+                current = load()
+                if current.fresh:
+                    return current.value, False
+            logger.warning(f"Timed out waiting for another worker to fill '{cache_key}', computing it here")
+            return fill(), False
+        finally:
+            lock.release()
+
+
+def invalidate_cache_tags(tags):
+    """Expire every analytics entry that depends on any of the given tags."""
     try:
-        return list(settings.CACHES.keys())
-    except AttributeError:
-        # Fallback to known aliases if settings not available
-        return ['default', 'analytics']
+        get_analytics_cache().delete_many([_tag_key(tag) for tag in tags])
+        logger.debug(f"Invalidated {len(tags)} analytics cache tags")
+    except Exception as e:
+        logger.error(f"Error invalidating analytics cache tags: {e}")
+
+
+def invalidate_evaluation_cache(evaluation):
+    """
+    Expire analytics entries that depend on an evaluation.
+
+    Works for both DynamicEvaluation (weekly) and DynamicManagerEvaluation
+    (monthly/quarterly/annual) instances.
+    """
+    if hasattr(evaluation, 'week_start'):
+        start_date, end_date = evaluation.week_start, evaluation.week_end
+        managers = [evaluation.manager_id]
+    else:
+        start_date, end_date = evaluation.period_start, evaluation.period_end
+        managers = [evaluation.manager_id, evaluation.senior_manager_id]
+
+    invalidate_cache_tags(build_change_tags(
+        departments=[evaluation.department_id],
+        managers=managers,
+        forms=[evaluation.form_id],
+        start_date=start_date,
+        end_date=end_date,
+    ))
+
+
+def invalidate_form_cache(form):
+    """Expire analytics entries that depend on an evaluation form."""
+    invalidate_cache_tags(build_change_tags(
+        departments=[form.department_id],
+        forms=[form.pk],
+    ))
 
 
 def invalidate_analytics_cache():
     """
-    Invalidate all analytics dashboard cache entries across all configured cache aliases.
-    This should be called when evaluation data changes.
+    Clear the whole analytics cache.
+    Only the analytics alias is touched; sessions and other cached data
+    in the default cache are left alone.
     """
     try:
-        # Get all cache aliases dynamically from settings
-        cache_aliases = get_all_cache_aliases()
-        cleared_caches = []
-        failed_caches = []
-        
-        for alias in cache_aliases:
-            try:
-                cache_instance = caches[alias]
-                cache_instance.clear()
-                cleared_caches.append(alias)
-                logger.info(f"Cache '{alias}' cleared successfully")
-            except Exception as alias_error:
-                failed_caches.append(alias)
-                logger.error(f"Error clearing cache '{alias}': {alias_error}")
-        
-        if cleared_caches:
-            logger.info(f"Analytics caches cleared: {', '.join(cleared_caches)}")
-        if failed_caches:
-            logger.warning(f"Failed to clear caches: {', '.join(failed_caches)}")
-            
-        logger.info("Analytics cache invalidation completed")
-        
+        get_analytics_cache().clear()
+        logger.info(f"Cache '{ANALYTICS_CACHE_ALIAS}' cleared successfully")
     except Exception as e:
         logger.error(f"Error invalidating analytics cache: {e}")
 
 
 def invalidate_user_analytics_cache(user_id=None):
     """
-    Invalidate analytics cache for a specific user or all users across all cache aliases.
+    Invalidate analytics cache for a specific user or all users.
+    
+    The dashboard entry is shared by every user with the same permission
+    scope, so it is dropped for all of them.
     
     Args:
         user_id: Specific user ID to invalidate cache for, or None for all users
     """
     try:
         if user_id:
-            # Invalidate cache for specific user across all cache aliases
-            today = timezone.now().date()
-            cache_key = f"analytics_dashboard_{user_id}_{today}"
-            
-            cache_aliases = get_all_cache_aliases()
-            deleted_from = []
-            failed_from = []
-            
-            for alias in cache_aliases:
-                try:
-                    cache_instance = caches[alias]
-                    cache_instance.delete(cache_key)
-                    deleted_from.append(alias)
-                except Exception as alias_error:
-                    failed_from.append(alias)
-                    logger.error(f"Error deleting cache key from '{alias}': {alias_error}")
+            from django.contrib.auth import get_user_model
             
-            if deleted_from:
-                logger.info(f"Analytics cache key '{cache_key}' deleted from: {', '.join(deleted_from)}")
-            if failed_from:
-                logger.warning(f"Failed to delete cache key from: {', '.join(failed_from)}")
+            user = get_user_model().objects.select_related('userprofile').get(id=user_id)
+            cache_key = analytics_dashboard_cache_key(analytics_scope_for(user), timezone.now().date())
+            get_analytics_cache().delete(cache_key)
+            logger.info(f"Analytics cache key '{cache_key}' deleted")
         else:
             # Invalidate all analytics cache
             invalidate_analytics_cache()
@@ -179,49 +694,68 @@ def get_lean_recent_evaluations(evaluation_queryset, evaluation_type='employee')
         return {'items': [], 'count': 0, 'ids': [], 'cached_at': timezone.now().isoformat()}
 
 
+def get_analytics_dashboard_users():
+    """Active users with access to the senior analytics dashboard."""
+    from django.contrib.auth import get_user_model
+    
+    # Same rule as role_checker().is_admin_or_senior(): staff without a profile have no access
+    return get_user_model().objects.filter(
+        Q(userprofile__is_admin=True) | Q(userprofile__is_senior_management=True)
+        | Q(is_staff=True) | Q(is_superuser=True),
+        is_active=True,
+        userprofile__isnull=False,
+    ).select_related('userprofile').order_by('id')
+
+
+def get_analytics_scope_users(users=None):
+    """
+    Pick one representative user per distinct analytics scope.
+    
+    Args:
+        users: Users to group (default: everyone with dashboard access)
+    
+    Returns:
+        dict: {scope: user}
+    """
+    scopes = {}
+    for user in users if users is not None else get_analytics_dashboard_users():
+        scopes.setdefault(analytics_scope_for(user), user)
+    return scopes
+
+
 def warm_analytics_cache():
     """
     Warm up the analytics cache by pre-computing dashboard data.
     This can be called via management command or scheduled task.
+    
+    The dashboard is computed once per distinct permission scope rather than
+    once per user, since users sharing a scope share the cache entry.
+    
+    Returns:
+        list: Scopes that were warmed
     """
+    from .analytics_snapshot import get_scoped_analytics_snapshot
+    
+    warmed = []
+    today = timezone.now().date()
     try:
-        from .views import senior_manager_analytics_dashboard
-        from django.contrib.auth import get_user_model
-        from django.test import RequestFactory
-        
-        User = get_user_model()
-        
-        # Get all senior managers
-        senior_managers = User.objects.filter(
-            userprofile__role='senior_manager'
-        ).select_related('userprofile')
-        
-        factory = RequestFactory()
-        
-        for user in senior_managers:
+        for scope, user in get_analytics_scope_users().items():
             try:
-                # Create a mock request
-                request = factory.get('/analytics/')
-                request.user = user
-                
-                # Call the view to populate cache
-                response = senior_manager_analytics_dashboard(request)
-                
-                if response.status_code == 200:
-                    logger.info(f"Analytics cache warmed for user {user.id}")
-                else:
-                    logger.warning(f"Failed to warm cache for user {user.id}: {response.status_code}")
-                    
+                get_scoped_analytics_snapshot(scope, today)
+                warmed.append(scope)
+                logger.info(f"Analytics cache warmed for scope '{scope}' (via user {user.id})")
             except Exception as e:
-                logger.error(f"Error warming cache for user {user.id}: {e}")
+                logger.error(f"Error warming cache for scope '{scope}': {e}")
                 
-        logger.info("Analytics cache warming completed")
+        logger.info(f"Analytics cache warming completed for {len(warmed)} scopes")
         
     except Exception as e:
         logger.error(f"Error warming analytics cache: {e}")
+    
+    return warmed
 
 
-def cache_recent_evaluations(cache_key, evaluation_queryset, evaluation_type='employee', timeout=1800, user_id=None):
+def cache_recent_evaluations(cache_key, evaluation_queryset, evaluation_type='employee', timeout=1800, user_id=None, tags=None):
     """
     Cache recent evaluations as lean data structures with user-specific keys.
     
@@ -231,13 +765,9 @@ def cache_recent_evaluations(cache_key, evaluation_queryset, evaluation_type='em
         evaluation_type: 'employee' or 'manager'
         timeout: Cache timeout in seconds (default 30 minutes)
         user_id: User ID for permission-specific caching (SECURITY CRITICAL)
+        tags: Dependency tags from build_dependency_tags() (default: depends on all evaluations)
     """
     try:
-        from django.core.cache import caches
-        
-        # Use analytics cache for better organization
-        analytics_cache = caches['analytics']
-        
         # SECURITY: Make cache key user-specific to prevent data leakage
         if user_id:
             secure_cache_key = f"{cache_key}_user_{user_id}"
@@ -246,7 +776,7 @@ def cache_recent_evaluations(cache_key, evaluation_queryset, evaluation_type='em
             secure_cache_key = cache_key
         
         lean_data = get_lean_recent_evaluations(evaluation_queryset, evaluation_type)
-        analytics_cache.set(secure_cache_key, lean_data, timeout)
+        set_tagged(secure_cache_key, lean_data, tags or build_dependency_tags(), timeout)
         
         logger.info(f"Cached {lean_data['count']} recent {evaluation_type} evaluations under key '{secure_cache_key}'")
         return lean_data
@@ -270,10 +800,6 @@ def get_cached_recent_evaluations(cache_key, fallback_queryset=None, evaluation_
         dict: Lean evaluation data or empty structure
     """
     try:
-        from django.core.cache import caches
-        
-        analytics_cache = caches['analytics']
-        
         # SECURITY: Make cache key user-specific to prevent data leakage
         if user_id:
             secure_cache_key = f"{cache_key}_user_{user_id}"
@@ -281,15 +807,21 @@ def get_cached_recent_evaluations(cache_key, fallback_queryset=None, evaluation_
             logger.warning(f"No user_id provided for cache key '{cache_key}' - potential security risk!")
             secure_cache_key = cache_key
         
-        cached_data = analytics_cache.get(secure_cache_key)
-        
-        if cached_data:
-            logger.debug(f"Cache hit for recent evaluations: {secure_cache_key}")
-            return cached_data
-            
-        if fallback_queryset is not None:
-            logger.debug(f"Cache miss for recent evaluations: {secure_cache_key}, computing...")
-            return cache_recent_evaluations(cache_key, fallback_queryset, evaluation_type, user_id=user_id)
+        if fallback_queryset is None:
+            cached_data = get_tagged(secure_cache_key)
+            if cached_data:
+                logger.debug(f"Cache hit for recent evaluations: {secure_cache_key}")
+                return cached_data
+        else:
+            # Concurrent misses compute the list once; the others get the
+            # previous list flagged as refreshing or wait for the new one
+            cached_data, refreshing = single_flight(
+                secure_cache_key,
+                load=lambda: read_tagged(secure_cache_key),
+                compute=lambda: get_lean_recent_evaluations(fallback_queryset, evaluation_type),
+                store=lambda data: set_tagged(secure_cache_key, data, build_dependency_tags()),
+            )
+            return {**cached_data, 'refreshing': refreshing}
             
         # Return empty structure if no fallback
         return {'items': [], 'count': 0, 'ids': [], 'cached_at': timezone.now().isoformat()}
@@ -8,8 +8,8 @@ from django.contrib import messages
 from django.db import transaction
 from django.db.models import Count, Q
 from django.utils.timezone import now
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
+from authentication.email_templates import render_email
+from authentication.outbox import queue_mail
 from django.conf import settings
 from django.urls import reverse
 import logging
@@ -46,7 +46,7 @@ EMPLOYEE_EVALUATION_CONFIG = EvaluationConfig(
     period_start_field='week_start',
     period_end_field='week_end',
     detail_view_name='evaluation:view_evaluation',
-    email_template='evaluation/email/evaluation_submitted.html',
+    email_template='evaluation/email/evaluation_submitted',
     email_subject_template='Your evaluation for {start}–{end} is ready'
 )
 
@@ -58,7 +58,7 @@ MANAGER_EVALUATION_CONFIG = EvaluationConfig(
     period_start_field='period_start',
     period_end_field='period_end',
     detail_view_name='evaluation:view_manager_evaluation',
-    email_template='evaluation/email/manager_evaluation_submitted.html',
+    email_template='evaluation/email/evaluation_submitted',
     email_subject_template='Your evaluation for {start}–{end} is ready'
 )
 
@@ -355,28 +355,23 @@ def _send_evaluation_notification_email(evaluation, config):
         detail_path = reverse(config.detail_view_name, args=[evaluation.id])
         evaluation_url = f"{settings.BASE_URL}{detail_path}"
         
-        # Plain-text fallback
         evaluator = getattr(evaluation, config.evaluator_field)
-        text_content = (
-            f"Hi {evaluatee.user.get_full_name()},\n\n"
-            f"Your {config.evaluator_field.replace('_', ' ')} {evaluator.user.get_full_name()} has submitted your evaluation "
-            f"for the period {period_start} to {period_end}.\n"
-            f"View your evaluations here: {evaluation_url}\n\n"
-            "Thanks,"
-        )
-        
-        # Render the HTML template
-        html_content = render_to_string(
-            config.email_template,
-            {"ev": evaluation, "evaluation_url": evaluation_url}
-        )
+        email = render_email(config.email_template, {
+            "ev": evaluation,
+            "evaluatee_name": evaluatee.user.get_full_name() or evaluatee.user.username,
+            "evaluator_name": evaluator.user.get_full_name() or evaluator.user.username,
+            "evaluator_role": config.evaluator_field.replace('_', ' '),
+            "period_start": period_start,
+            "period_end": period_end,
+            "evaluation_url": evaluation_url,
+        })
         
-        send_mail(
+        queue_mail(
             subject=config.email_subject_template.format(start=period_start, end=period_end),
-            message=text_content,
+            message=email.text,
             from_email=settings.DEFAULT_FROM_EMAIL,
             recipient_list=[evaluatee.user.email],
-            html_message=html_content,
+            html_message=email.html,
         )
     except Exception as e:
         # Log email errors but keep the saved evaluation
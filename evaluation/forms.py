@@ -4,7 +4,8 @@ from .models import DynamicEvaluation, DynamicManagerEvaluation, Answer, Manager
 from authentication.models import Department
 from django.utils.html import strip_tags
 import logging
-from .constants import QuestionType, NUMERIC_QUESTION_TYPES, TEXT_QUESTION_TYPES
+from .constants import EvaluationStatus, QuestionType, NUMERIC_QUESTION_TYPES, TEXT_QUESTION_TYPES
+from .stats_utils import record_answer_changes
 
 logger = logging.getLogger(__name__)
 
@@ -200,6 +201,8 @@ class DynamicEvaluationForm(forms.Form):
     def __init__(self, *args, instance=None, **kwargs):
         super().__init__(*args, **kwargs)
         self.instance = instance
+        # Answers of completed evaluations are already counted in the answer rollups
+        self.was_completed = instance.status == EvaluationStatus.COMPLETED
         # Store prefetched questions to avoid extra queries in clean() and save()
         self.questions = instance.form.questions.prefetch_related("choices").all()
         self.existing_answers = {a.question_id: a for a in instance.answers.all()}
@@ -266,6 +269,7 @@ class DynamicEvaluationForm(forms.Form):
         ans_by_qid = self.existing_answers
 
         new_answers, updates = [], []
+        rollup_changes = []
 
         for name, value in cleaned.items():
             if not name.startswith("q_"):
@@ -293,9 +297,11 @@ class DynamicEvaluationForm(forms.Form):
 
             if qid in ans_by_qid:
                 a = ans_by_qid[qid]
+                rollup_changes.append((qid, a.int_value, int_val))
                 a.int_value, a.text_value, a.choice_value = int_val, text_val, choice_val
                 updates.append(a)
             else:
+                rollup_changes.append((qid, None, int_val))
                 # Determine which Answer model to use based on instance type
                 if isinstance(inst, DynamicManagerEvaluation):
                     answer_class = ManagerAnswer
@@ -323,6 +329,9 @@ class DynamicEvaluationForm(forms.Form):
             else:
                 Answer.objects.bulk_update(updates, ["int_value", "text_value", "choice_value"])
 
+        # Keep the trend chart rollups in step with the submitted answers
+        record_answer_changes(inst, rollup_changes, self.was_completed)
+
         return inst
 
 class PreviewEvalForm(forms.Form):
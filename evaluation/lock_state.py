@@ -0,0 +1,157 @@
+"""
+Cached overdue-evaluation lock state per user.
+
+The overdue lock middlewares only need to know whether a user has pending
+evaluations past their deadline. That changes when one of the user's
+evaluations is saved or deleted (handled by the evaluation signals) or when
+the next pending deadline passes, so the state is cached until exactly that
+moment and the middlewares become cache reads on the hot path.
+
+Set EVALUATION_LOCK_STATE_CACHE = False to query the database on every
+request instead.
+"""
+
+import logging
+import math
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from authentication.models import UserProfile
+from .constants import EvaluationStatus
+from .models import DynamicEvaluation, DynamicManagerEvaluation
+
+logger = logging.getLogger(__name__)
+
+LOCK_STATE_KEY_PREFIX = 'overdue_lock_state'
+# Lifetime of entries without an upcoming deadline, in case rows are
+# changed without signals (queryset.update(), raw SQL)
+LOCK_STATE_MAX_TIMEOUT = 86400
+
+
+@dataclass(frozen=True, slots=True)
+class OverdueLockState:
+    """Overdue evaluations a user has to complete, and when that next changes."""
+
+    overdue_count: int = 0
+    earliest_overdue_id: Optional[int] = None
+    next_deadline: Optional[date] = None
+    manager_overdue_count: int = 0
+    earliest_overdue_manager_evaluation_id: Optional[int] = None
+    next_manager_deadline: Optional[date] = None
+
+    @property
+    def expires_on(self):
+        """First day on which an evaluation that is pending now becomes overdue."""
+        deadlines = [d for d in (self.next_deadline, self.next_manager_deadline) if d]
+        return min(deadlines) + timedelta(days=1) if deadlines else None
+
+
+def lock_state_cache_enabled():
+    """Whether the middlewares read the cached lock state instead of live queries."""
+    return getattr(settings, 'EVALUATION_LOCK_STATE_CACHE', True)
+
+
+def lock_state_cache_key(user_id):
+    return f"{LOCK_STATE_KEY_PREFIX}_{user_id}"
+
+
+def _summarize(queryset, owner_field, end_field, user_id, today):
+    """Return (overdue count, earliest overdue id, next deadline) of a user's pending evaluations."""
+    pending = queryset.filter(**{f"{owner_field}__user_id": user_id, 'status': EvaluationStatus.PENDING})
+    overdue = Q(**{f"{end_field}__lt": today})
+    summary = pending.aggregate(
+        overdue_count=Count('id', filter=overdue),
+        next_deadline=Min(end_field, filter=~overdue),
+    )
+    earliest_overdue_id = None
+    if summary['overdue_count']:
+        earliest_overdue_id = (
+            pending.filter(overdue).order_by(end_field, 'id').values_list('id', flat=True).first()
+        )
+    return summary['overdue_count'], earliest_overdue_id, summary['next_deadline']
+
+
+def compute_overdue_lock_state(user_id, today):
+    """
+    Query the overdue lock state of a user.
+
+    Args:
+        user_id: User whose evaluations to check
+        today: Evaluations ending before this date are overdue
+
+    Returns:
+        OverdueLockState
+    """
+    overdue_count, earliest_overdue_id, next_deadline = _summarize(
+        DynamicEvaluation.objects, 'manager', 'week_end', user_id, today
+    )
+    manager_overdue_count, earliest_manager_id, next_manager_deadline = _summarize(
+        DynamicManagerEvaluation.objects, 'senior_manager', 'period_end', user_id, today
+    )
+    return OverdueLockState(
+        overdue_count=overdue_count,
+        earliest_overdue_id=earliest_overdue_id,
+        next_deadline=next_deadline,
+        manager_overdue_count=manager_overdue_count,
+        earliest_overdue_manager_evaluation_id=earliest_manager_id,
+        next_manager_deadline=next_manager_deadline,
+    )
+
+
+def _seconds_until(day):
+    """Seconds until midnight UTC at the start of day (the middlewares compare UTC dates)."""
+    boundary = datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+    return max(math.ceil((boundary - timezone.now()).total_seconds()), 1)
+
+
+def get_overdue_lock_state(user_id, today=None):
+    """
+    Get the cached overdue lock state of a user, computing it on a miss.
+
+    The entry expires when the next pending deadline passes, so a cached
+    state never misses an evaluation becoming overdue.
+
+    Args:
+        user_id: User whose state to get
+        today: Current date (defaults to today in UTC, like the middlewares)
+
+    Returns:
+        OverdueLockState
+    """
+    today = today or timezone.now().date()
+    cache_key = lock_state_cache_key(user_id)
+    state = cache.get(cache_key)
+    if isinstance(state, OverdueLockState):
+        return state
+
+    state = compute_overdue_lock_state(user_id, today)
+    timeout = _seconds_until(state.expires_on) if state.expires_on else LOCK_STATE_MAX_TIMEOUT
+    cache.set(cache_key, state, timeout)
+    logger.debug(f"Cached overdue lock state for user {user_id} ({timeout}s)")
+    return state
+
+
+def invalidate_overdue_lock_state(profile_ids):
+    """
+    Drop the cached lock state of the users owning the given profiles.
+
+    The entries are deleted right away and again once the surrounding
+    transaction commits, so a request reading the old rows in between cannot
+    leave a stale entry behind.
+    """
+    profile_ids = {pk for pk in profile_ids if pk}
+    if not profile_ids:
+        return
+    cache_keys = [
+        lock_state_cache_key(user_id)
+        for user_id in UserProfile.objects.filter(pk__in=profile_ids).values_list('user_id', flat=True)
+    ]
+    cache.delete_many(cache_keys)
+    transaction.on_commit(lambda: cache.delete_many(cache_keys))
@@ -0,0 +1,98 @@
+"""
+Management command to measure the per-request overhead of the overdue
+evaluation lock middlewares and their URL policies.
+"""
+
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from evaluation.lock_state import get_overdue_lock_state
+from evaluation.middleware import OverdueEvaluationLockMiddleware
+from evaluation.senior_middleware import OverdueManagerEvaluationLockMiddleware
+from evaluation.url_policy import OVERDUE_EVALUATION_ALLOWED, OVERDUE_MANAGER_EVALUATION_ALLOWED, SKIP_POLICY
+from firehousemovers.utils.request_context import REQUEST_ATTRIBUTE
+
+DEFAULT_PATHS = [
+    '/static/css/output.css',
+    '/media/profile_pictures/avatar.png',
+    '/evaluation/pending/',
+    '/evaluation/manager-evaluations/evaluate/12/',
+    '/goals/',
+]
+
+
+def _time_per_call(func, iterations):
+    """Average wall time of func() in microseconds."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the overdue lock middlewares: URL policy matching and full per-request overhead'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=20000,
+            help='Requests per measurement (default 20000)',
+        )
+        parser.add_argument(
+            '--user-id',
+            type=int,
+            help='Also measure requests of this user (lock state served from cache)',
+        )
+        parser.add_argument(
+            'paths',
+            nargs='*',
+            help='Request paths to measure (default: static, media, allowed and locked pages)',
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        paths = options['paths'] or DEFAULT_PATHS
+        policies = {
+            'skip': SKIP_POLICY,
+            'overdue': OVERDUE_EVALUATION_ALLOWED,
+            'overdue_manager': OVERDUE_MANAGER_EVALUATION_ALLOWED,
+        }
+        stack = OverdueEvaluationLockMiddleware(OverdueManagerEvaluationLockMiddleware(lambda request: HttpResponse()))
+        factory = RequestFactory()
+
+        users = [('anonymous', AnonymousUser())]
+        if options['user_id']:
+            user = get_user_model().objects.get(pk=options['user_id'])
+            get_overdue_lock_state(user.pk)
+            users.append((f'user {user.pk}', user))
+
+        self.stdout.write(f'📏 Overdue lock middleware overhead ({iterations:,} iterations, µs per request)')
+        baseline = _time_per_call(HttpResponse, iterations)
+        self.stdout.write(f'Bare view (no middleware): {baseline:.2f} µs')
+        for path in paths:
+            self.stdout.write(f'\n{path}')
+            for name, policy in policies.items():
+                micros = _time_per_call(lambda: policy.matches(path), iterations)
+                self.stdout.write(f'  {name} policy match: {micros:.2f} µs ({"match" if policy.matches(path) else "no match"})')
+
+            for label, user in users:
+                request = factory.get(path)
+                request.user = user
+                request.session = {}
+                request._messages = FallbackStorage(request)
+
+                # Drop the request-scoped context each time so every call does a request's work
+                def run(request=request):
+                    request.__dict__.pop(REQUEST_ATTRIBUTE, None)
+                    stack(request)
+                micros = _time_per_call(run, iterations)
+                self.stdout.write(f'  both middlewares, {label}: {micros:.2f} µs (+{micros - baseline:.2f} µs)')
+
+        self.stdout.write(self.style.SUCCESS('\n✅ Benchmark complete'))
@@ -0,0 +1,135 @@
+"""
+Management command comparing the old per-combination get_or_create loop of
+create_manager_evaluations with the set-based plan_manager_evaluations() /
+apply_plan() pipeline.
+
+The fixture (managers, each managing their own department, senior managers
+and monthly/quarterly/annual forms per department) is created inside a
+transaction that is rolled back at the end, so the command can be run
+against any database.
+"""
+
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from authentication.models import Department, UserProfile
+from evaluation.management.commands.create_manager_evaluations import Command as CreateManagerEvaluations
+from evaluation.models import DynamicManagerEvaluation, EvalForm, ManagerAnswer
+from evaluation.scaffolding import apply_plan, plan_manager_evaluations
+
+EVALUATION_TYPES = ('Monthly Evaluation', 'Quarterly Evaluation', 'Annual Evaluation')
+
+
+class Command(BaseCommand):
+    help = 'Benchmark set-based manager evaluation creation against the per-row get_or_create loop'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--managers',
+            type=int,
+            default=50,
+            help='Department managers to generate (default 50)',
+        )
+        parser.add_argument(
+            '--senior-managers',
+            type=int,
+            default=5,
+            help='Senior managers to generate (default 5)',
+        )
+
+    def handle(self, *args, **options):
+        periods = {
+            evaluation_type: CreateManagerEvaluations()._get_evaluation_period(evaluation_type)
+            for evaluation_type in EVALUATION_TYPES
+        }
+
+        with transaction.atomic():
+            self.stdout.write(
+                f'👥 Generating {options["managers"]} managers × {options["senior_managers"]} senior managers '
+                f'× {len(EVALUATION_TYPES)} forms...'
+            )
+            managers, senior_managers = self._create_fixture(options['managers'], options['senior_managers'])
+
+            with transaction.atomic():
+                seconds, queries, created = self._measure(
+                    lambda: self._legacy_create(periods, managers, senior_managers)
+                )
+                self.stdout.write(f'  get_or_create loop: {seconds * 1000:.1f} ms, {queries} queries, {created} created')
+                transaction.set_rollback(True)
+
+            def set_based():
+                return sum(
+                    apply_plan(plan_manager_evaluations(start, end, evaluation_type)).created
+                    for evaluation_type, (start, end) in periods.items()
+                )
+
+            for label in ('set-based', 'set-based re-run'):
+                seconds, queries, created = self._measure(set_based)
+                self.stdout.write(f'  {label}: {seconds * 1000:.1f} ms, {queries} queries, {created} created')
+
+            answers = ManagerAnswer.objects.filter(instance__manager__in=managers).count()
+            self.stdout.write(f'  {answers:,} answer stubs')
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('\n✅ Benchmark complete (generated rows rolled back)'))
+
+    def _create_fixture(self, manager_count, senior_manager_count):
+        """Create the benchmark people, departments and forms."""
+        def profiles(prefix, count, role):
+            users = [User.objects.create(username=f'{prefix}{i}', email=f'{prefix}{i}@example.com') for i in range(count)]
+            UserProfile.objects.filter(user__in=users).update(role=role)
+            return list(UserProfile.objects.filter(user__in=users).select_related('user').order_by('pk'))
+
+        managers = profiles('benchmark_manager_', manager_count, 'manager')
+        senior_managers = profiles('benchmark_vp_', senior_manager_count, 'vp')
+        for index, manager in enumerate(managers):
+            department = Department.objects.create(
+                title=f'Benchmark Department {index}', slug=f'benchmark-department-{index}', manager=manager
+            )
+            for evaluation_type in EVALUATION_TYPES:
+                # Created one by one so the default questions are added
+                EvalForm.objects.create(department=department, name=evaluation_type, is_active=True)
+        return managers, senior_managers
+
+    def _legacy_create(self, periods, managers, senior_managers):
+        """The manager × form × senior manager loop the command used to run."""
+        created_count = 0
+        for evaluation_type, (period_start, period_end) in periods.items():
+            for manager in managers:
+                dept = Department.objects.get(manager=manager)
+                for active_form in EvalForm.objects.filter(department=dept, is_active=True, name=evaluation_type):
+                    for senior_manager in senior_managers:
+                        with transaction.atomic():
+                            inst, created = DynamicManagerEvaluation.objects.get_or_create(
+                                form=active_form,
+                                manager=manager,
+                                period_start=period_start,
+                                period_end=period_end,
+                                defaults={'department': dept, 'senior_manager': senior_manager, 'status': 'pending'},
+                            )
+                            if created:
+                                qids = list(active_form.questions.values_list('id', flat=True))
+                                ManagerAnswer.objects.bulk_create(
+                                    [ManagerAnswer(instance=inst, question_id=qid) for qid in qids],
+                                    ignore_conflicts=True,
+                                )
+                                created_count += 1
+        return created_count
+
+    def _measure(self, func):
+        """Return (seconds, query count, result) of func()."""
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            start = time.perf_counter()
+            result = func()
+            seconds = time.perf_counter() - start
+        return seconds, queries, result
@@ -0,0 +1,104 @@
+"""
+Management command measuring the per-chart render time of the report charts.
+
+Each chart is timed three ways, drawing it onto a PDF canvas each time:
+
+- widget: building the chart widgets and drawing them, which lays out the
+  axes and labels during the draw (no flattening, no cache)
+- cold: get_chart() on a cache miss: build, flatten into shapes, store
+- warm: get_chart() on a cache hit, as when an unchanged report is
+  downloaded again
+
+Uses the default cache; only the benchmark's own chart entries are written
+and they are deleted at the end.
+"""
+
+import time
+from datetime import date, timedelta
+from io import BytesIO
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from reportlab.pdfgen.canvas import Canvas
+
+from evaluation.report_charts import CHART_BUILDERS, CHART_HEIGHT, CHART_WIDTH, chart_cache_key, get_chart
+
+
+def _chart_specs():
+    """(label, chart type, data) of charts shaped like the report charts."""
+    weeks = [str(date(2026, 1, 5) + timedelta(weeks=week)) for week in range(52)]
+    months = [f'2026-{month:02d}' for month in range(1, 13)]
+    return [
+        ('weekly averages, 13 weeks', 'line', {
+            'categories': weeks[:13],
+            'series': [('Employee', [3 + (week % 5) / 4 for week in range(13)]),
+                       ('Manager', [3.5 + (week % 3) / 4 for week in range(13)])],
+        }),
+        ('weekly averages, 52 weeks', 'line', {
+            'categories': weeks,
+            'series': [('Employee', [3 + (week % 5) / 4 for week in range(52)]),
+                       ('Manager', [3.5 + (week % 3) / 4 if week % 4 == 0 else None for week in range(52)])],
+        }),
+        ('rating distribution', 'bar', {
+            'categories': [str(score) for score in range(1, 6)],
+            'series': [('Employee', [12, 40, 310, 820, 560]), ('Manager', [1, 3, 20, 48, 31])],
+        }),
+        ('evaluations by month', 'bar', {
+            'categories': months,
+            'series': [('Completed', [40 + month for month in range(12)]),
+                       ('Pending', [month % 4 for month in range(12)])],
+        }),
+    ]
+
+
+def _millis(func, iterations):
+    """Best of 3 rounds of the average wall time of func() in milliseconds."""
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        best = min(best, (time.perf_counter() - start) / iterations * 1000)
+    return best
+
+
+class Command(BaseCommand):
+    help = 'Benchmark per-chart render time: widgets vs cached flattened drawings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=20,
+            help='Renders per round (default 20)',
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        canvas = Canvas(BytesIO())
+        sizes = [(CHART_WIDTH, CHART_HEIGHT), (CHART_WIDTH / 2, CHART_HEIGHT)]
+        cache_keys = []
+
+        def draw(drawing):
+            drawing.drawOn(canvas, 0, 0)
+
+        def cold(chart_type, data, width, height):
+            cache.delete(chart_cache_key(chart_type, data, width, height))
+            draw(get_chart(chart_type, data, width, height))
+
+        self.stdout.write(f'📊 Per-chart render time (best of 3 rounds of {iterations}, ms per chart)')
+        try:
+            for label, chart_type, data in _chart_specs():
+                for width, height in sizes:
+                    cache_keys.append(chart_cache_key(chart_type, data, width, height))
+                    widget = _millis(lambda: draw(CHART_BUILDERS[chart_type](data, width, height)), iterations)
+                    cold_ms = _millis(lambda: cold(chart_type, data, width, height), iterations)
+                    warm = _millis(lambda: draw(get_chart(chart_type, data, width, height)), iterations)
+                    self.stdout.write(
+                        f'  {label} ({width:.0f}x{height:.0f}): widget {widget:.2f}, cold {cold_ms:.2f}, '
+                        f'warm {warm:.2f} ({(1 - warm / widget) * 100:.0f}% less than widget)'
+                    )
+        finally:
+            cache.delete_many(cache_keys)
+
+        self.stdout.write(self.style.SUCCESS('\n✅ Benchmark complete'))
@@ -0,0 +1,188 @@
+"""
+Management command measuring the peak memory of the employee PDF report
+as the number of evaluations grows.
+
+Each report is written in a fresh child process whose peak RSS is reset
+right before the report (Linux /proc/self/clear_refs; elsewhere the
+process-wide ru_maxrss is reported), so the peak only covers that report. The streaming writer
+(write_employee_report) is compared with the in-memory approach the view
+used before: one table holding every row, built into a BytesIO.
+
+The generated evaluations are committed so the child processes can read
+them, and removed again at the end.
+"""
+
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import BytesIO
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import SimpleDocTemplate
+
+from authentication.models import Department, UserProfile
+from evaluation.constants import EvaluationStatus
+from evaluation.models import DynamicEvaluation, EvalForm
+from evaluation.pdf_reports import NARROW_COLUMNS, write_employee_report
+from evaluation.report_resources import get_table_template
+
+DEPARTMENT_SLUG = 'benchmark-reports'
+FIRST_SUBMISSION = datetime(2020, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark peak memory of the streaming employee PDF report from 100 to 100k rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default='100,1000,10000,100000',
+            help='Comma-separated report sizes in rows (default 100,1000,10000,100000)',
+        )
+        parser.add_argument(
+            '--in-memory-max',
+            type=int,
+            default=10000,
+            help='Largest size also rendered the old in-memory way (default 10000; it is quadratic)',
+        )
+        # Used by the child processes
+        parser.add_argument('--measure', type=int, help='Write one report of this many rows and print its stats')
+        parser.add_argument('--in-memory', action='store_true', help='With --measure, use the in-memory writer')
+
+    def handle(self, *args, **options):
+        if options['measure'] is not None:
+            self._measure(options['measure'], options['in_memory'])
+            return
+
+        sizes = sorted(int(size) for size in options['sizes'].split(','))
+        self.stdout.write(f'📄 Generating {sizes[-1]:,} evaluations...')
+        department = self._create_fixture(sizes[-1])
+        try:
+            for size in sizes:
+                modes = [False, True] if size <= options['in_memory_max'] else [False]
+                for in_memory in modes:
+                    stats = self._run_child(size, in_memory)
+                    label = 'in-memory' if in_memory else 'streaming'
+                    self.stdout.write(
+                        f"  {size:>7,} rows {label:>9}: peak RSS {stats['peak_mb']:.1f} MB "
+                        f"(+{stats['peak_mb'] - stats['baseline_mb']:.1f} MB), {stats['seconds']:.2f} s, "
+                        f"{stats['bytes'] / 1024:,.0f} KB"
+                    )
+        finally:
+            self._delete_fixture(department)
+
+        self.stdout.write(self.style.SUCCESS('\n✅ Benchmark complete (generated rows removed)'))
+
+    def _run_child(self, size, in_memory):
+        command = [sys.executable, sys.argv[0], 'benchmark_report_memory', '--measure', str(size)]
+        if in_memory:
+            command.append('--in-memory')
+        output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+    def _reset_peak_rss(self):
+        try:
+            with open('/proc/self/clear_refs', 'w') as clear_refs:
+                clear_refs.write('5')
+        except OSError:
+            pass
+
+    def _peak_rss_mb(self):
+        try:
+            with open('/proc/self/status') as status:
+                for line in status:
+                    if line.startswith('VmHWM:'):
+                        return int(line.split()[1]) / 1024
+        except OSError:
+            pass
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    def _measure(self, size, in_memory):
+        """Write one report and print its peak RSS, duration and size as JSON."""
+        evaluations = DynamicEvaluation.objects.filter(
+            department__slug=DEPARTMENT_SLUG,
+            submitted_at__lt=FIRST_SUBMISSION + timedelta(seconds=size),
+        )
+        output = BytesIO() if in_memory else tempfile.TemporaryFile(suffix='.pdf')
+        self._reset_peak_rss()
+        baseline = self._peak_rss_mb()
+        start = time.perf_counter()
+        if in_memory:
+            self._write_in_memory(output, evaluations)
+            written = output.tell()
+        else:
+            with output:
+                write_employee_report(output, evaluations, 'Benchmark', date(2020, 1, 1), date(2020, 12, 31), False)
+                written = output.tell()
+        seconds = time.perf_counter() - start
+        self.stdout.write(json.dumps({
+            'baseline_mb': baseline,
+            'peak_mb': self._peak_rss_mb(),
+            'seconds': seconds,
+            'bytes': written,
+        }))
+
+    def _write_in_memory(self, output, evaluations):
+        """The previous approach without its 100-row cap."""
+        data = [['Employee', 'Manager', 'Week', 'Status', 'Submitted']]
+        for evaluation in evaluations.select_related('employee__user', 'manager__user'):
+            data.append([
+                evaluation.employee.user.get_full_name(),
+                evaluation.manager.user.get_full_name(),
+                f"{evaluation.week_start} to {evaluation.week_end}",
+                evaluation.status,
+                evaluation.submitted_at.strftime('%Y-%m-%d'),
+            ])
+        table = get_table_template('paged_detail').build(data, NARROW_COLUMNS)
+        SimpleDocTemplate(output, pagesize=letter).build([table])
+
+    def _create_fixture(self, rows):
+        employee_count = 500
+        with transaction.atomic():
+            department = Department.objects.create(title='Benchmark Reports', slug=DEPARTMENT_SLUG)
+            users = User.objects.bulk_create([
+                User(username=f'benchmark_report_{i}', first_name='Employee', last_name=str(i))
+                for i in range(employee_count + 1)
+            ])
+            profiles = UserProfile.objects.bulk_create([
+                UserProfile(user=user, department=department) for user in users
+            ])
+            manager, employees = profiles[0], profiles[1:]
+            form = EvalForm.objects.create(department=department, name='Benchmark Report Form', is_active=True)
+            first_week = date(2020, 1, 6)
+            DynamicEvaluation.objects.bulk_create(
+                (
+                    DynamicEvaluation(
+                        form=form,
+                        department=department,
+                        manager=manager,
+                        employee=employees[i % employee_count],
+                        week_start=first_week + timedelta(weeks=i // employee_count),
+                        week_end=first_week + timedelta(weeks=i // employee_count, days=6),
+                        status=EvaluationStatus.COMPLETED,
+                        submitted_at=FIRST_SUBMISSION + timedelta(seconds=i),
+                    )
+                    for i in range(rows)
+                ),
+                batch_size=2000,
+            )
+        return department
+
+    def _delete_fixture(self, department):
+        with transaction.atomic():
+            # The rows were bulk-created without stats or answers, so they are
+            # removed the same way instead of through the delete signals
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'DELETE FROM {DynamicEvaluation._meta.db_table} WHERE department_id = %s', [department.pk]
+                )
+            EvalForm.objects.filter(department=department).delete()
+            User.objects.filter(username__startswith='benchmark_report_').delete()
+            department.delete()
@@ -0,0 +1,154 @@
+"""
+Management command measuring the CPU the report resources registry saves
+per employee, manager and trends report.
+
+"cached" is the production path: the style sheet, paragraph styles and
+table styles come from the registry. "uncached" runs the same reports inside
+registry.bypass(), so every lookup builds its resource again, which is what
+each report, table and question paragraph cost before the registry.
+
+The fixture (a department with employees, a manager, senior managers and
+completed evaluations with rated trend questions) is created inside a
+transaction that is rolled back at the end.
+"""
+
+import time
+from datetime import timedelta
+from io import BytesIO
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from authentication.models import Department, UserProfile
+from evaluation.constants import EvaluationStatus
+from evaluation.models import (
+    Answer, DynamicEvaluation, DynamicManagerEvaluation, EvalForm, ManagerAnswer, Question,
+)
+from evaluation.pdf_reports import (
+    report_evaluations,
+    write_employee_report,
+    write_manager_report,
+    write_trends_report,
+)
+from evaluation.report_resources import registry, warm_report_resources
+
+ROUNDS = 5
+
+
+def _cpu_millis(func, iterations):
+    """Average CPU time of func() in milliseconds."""
+    start = time.process_time()
+    for _ in range(iterations):
+        func()
+    return (time.process_time() - start) / iterations * 1000
+
+
+class Command(BaseCommand):
+    help = 'Benchmark per-report CPU saved by the shared reportlab styles and table templates'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=10,
+            help='Reports per round (default 10)',
+        )
+        parser.add_argument(
+            '--employees',
+            type=int,
+            default=25,
+            help='Employees with evaluations in the reports (default 25)',
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        warm_report_resources()
+
+        with transaction.atomic():
+            department = self._create_fixture(options['employees'])
+            end_date = timezone.now().date() + timedelta(days=1)
+            start_date = end_date - timedelta(days=90)
+            reports = {
+                'employee': lambda: write_employee_report(
+                    BytesIO(), report_evaluations(DynamicEvaluation, department.pk, start_date, end_date),
+                    department.title, start_date, end_date, False,
+                ),
+                'manager': lambda: write_manager_report(
+                    BytesIO(), report_evaluations(DynamicManagerEvaluation, department.pk, start_date, end_date),
+                    department.title, start_date, end_date, False,
+                ),
+                'trends': lambda: write_trends_report(
+                    BytesIO(), department.pk, department.title, start_date, end_date, 90,
+                ),
+            }
+
+            self.stdout.write(
+                f'📏 Report resources (best of {ROUNDS} rounds of {iterations} iterations, CPU ms per report)'
+            )
+            for name, write in reports.items():
+                write()
+                cached = uncached = float('inf')
+                # Alternating rounds, so drift affects both modes alike
+                for _ in range(ROUNDS):
+                    cached = min(cached, _cpu_millis(write, iterations))
+                    with registry.bypass():
+                        uncached = min(uncached, _cpu_millis(write, iterations))
+                saved = uncached - cached
+                self.stdout.write(
+                    f'  {name}: cached {cached:.2f} ms, uncached {uncached:.2f} ms, '
+                    f'saved {saved:.2f} ms ({saved / uncached * 100:.1f}%)'
+                )
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('\n✅ Benchmark complete (generated rows rolled back)'))
+
+    def _create_fixture(self, employee_count):
+        """Create a department with completed, rated employee and manager evaluations."""
+        department = Department.objects.create(title='Benchmark Resources', slug='benchmark-resources')
+        users = User.objects.bulk_create([
+            User(username=f'benchmark_resources_{i}', first_name='Person', last_name=str(i))
+            for i in range(employee_count + 6)
+        ])
+        profiles = UserProfile.objects.bulk_create([
+            UserProfile(user=user, department=department) for user in users
+        ])
+        senior_manager, managers, employees = profiles[0], profiles[1:6], profiles[6:]
+
+        form = EvalForm.objects.create(department=department, name='Benchmark Resources Form', is_active=True)
+        questions = [
+            Question.objects.create(
+                form=form, text=f'How would you rate area {i} this week?', order=i, include_in_trends=True
+            )
+            for i in range(6)
+        ]
+        submitted_at = timezone.now() - timedelta(days=1)
+        first_week = timezone.now().date() - timedelta(weeks=4)
+
+        evaluations = DynamicEvaluation.objects.bulk_create(
+            DynamicEvaluation(
+                form=form, department=department, manager=managers[index % len(managers)], employee=employee,
+                week_start=first_week + timedelta(weeks=week), week_end=first_week + timedelta(weeks=week, days=6),
+                status=EvaluationStatus.COMPLETED, submitted_at=submitted_at,
+            )
+            for index, employee in enumerate(employees)
+            for week in range(4)
+        )
+        manager_evaluations = DynamicManagerEvaluation.objects.bulk_create(
+            DynamicManagerEvaluation(
+                form=form, department=department, senior_manager=senior_manager, manager=manager,
+                period_start=first_week + timedelta(weeks=4 * month),
+                period_end=first_week + timedelta(weeks=4 * month, days=27),
+                status=EvaluationStatus.COMPLETED, submitted_at=submitted_at,
+            )
+            for manager in managers
+            for month in range(-2, 1)
+        )
+        for answer_model, instances in ((Answer, evaluations), (ManagerAnswer, manager_evaluations)):
+            answer_model.objects.bulk_create(
+                answer_model(instance=instance, question=question, int_value=(instance.pk + question.pk) % 5 + 1)
+                for instance in instances
+                for question in questions
+            )
+        return department
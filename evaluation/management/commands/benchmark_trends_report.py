@@ -0,0 +1,191 @@
+"""
+Management command comparing the wall time and peak memory of the trends
+report aggregates over one year of weekly evaluations across departments.
+
+Three ways of computing the per-question totals and the per-week averages
+of employee and manager evaluations are compared:
+
+- python: what the report did before, prefetching every answer of every
+  evaluation and looping over them in Python
+- sql: get_trend_question_stats / get_trend_period_averages aggregating
+  the answers in the database
+- rollups: the same functions reading the AnswerRollup table
+
+Peak memory is the peak of Python allocations (tracemalloc) while the
+aggregates are computed, measured in a second, untimed run. The fixture is
+created inside a transaction that is rolled back at the end.
+"""
+
+import time
+import tracemalloc
+from collections import Counter
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from authentication.models import Department, UserProfile
+from evaluation.constants import EvaluationStatus
+from evaluation.models import (
+    Answer, DynamicEvaluation, DynamicManagerEvaluation, EvalForm, ManagerAnswer, Question,
+)
+from evaluation.pdf_reports import report_evaluations
+from evaluation.stats_utils import get_trend_period_averages, get_trend_question_stats, rebuild_answer_rollups
+
+WEEKS = 52
+QUESTIONS = 6
+
+
+def _python_aggregates(model, start_date, end_date):
+    """Question totals and weekly averages from prefetched answers, as the report computed them before."""
+    evaluations = report_evaluations(model, 'all', start_date, end_date).filter(
+        status=EvaluationStatus.COMPLETED
+    ).prefetch_related('answers__question__form')
+
+    stats, weeks = {}, {}
+    for evaluation in evaluations:
+        bucket = timezone.localtime(evaluation.submitted_at).date()
+        bucket -= timedelta(days=bucket.weekday())
+        for answer in evaluation.answers.all():
+            if answer.question.include_in_trends and answer.int_value is not None:
+                question_stats = stats.setdefault(answer.question_id, {'count': 0, 'sum': 0, 'histogram': Counter()})
+                question_stats['count'] += 1
+                question_stats['sum'] += answer.int_value
+                question_stats['histogram'][answer.int_value] += 1
+                weeks.setdefault(bucket, []).append(answer.int_value)
+    averages = [(bucket, sum(values) / len(values), len(values)) for bucket, values in sorted(weeks.items())]
+    return stats, averages
+
+
+def _database_aggregates(model, start_date, end_date, use_rollups):
+    return (
+        get_trend_question_stats(model, 'all', start_date, end_date, use_rollups),
+        get_trend_period_averages(model, 'all', start_date, end_date, 'week', use_rollups),
+    )
+
+
+def _measure(func):
+    """
+    Run func() twice, timed and then traced (tracing slows it down).
+
+    Returns:
+        (result, wall seconds, peak traced MB)
+    """
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, seconds, peak / 1024 / 1024
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the trends report aggregates: Python loops vs SQL vs answer rollups'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--departments',
+            type=int,
+            default=5,
+            help='Departments (default 5)',
+        )
+        parser.add_argument(
+            '--employees',
+            type=int,
+            default=20,
+            help='Employees per department, each with one evaluation per week (default 20)',
+        )
+
+    def handle(self, *args, **options):
+        end_date = timezone.now().date()
+        start_date = end_date - timedelta(weeks=WEEKS)
+
+        with transaction.atomic():
+            self.stdout.write(
+                f"📄 Generating {WEEKS} weeks of evaluations for {options['departments']} departments "
+                f"of {options['employees']} employees..."
+            )
+            answers = self._create_fixture(options['departments'], options['employees'], end_date)
+            rows = rebuild_answer_rollups()
+            self.stdout.write(f'  {answers:,} answers, {rows:,} rollup rows')
+
+            modes = {
+                'python': lambda model: _python_aggregates(model, start_date, end_date),
+                'sql': lambda model: _database_aggregates(model, start_date, end_date, False),
+                'rollups': lambda model: _database_aggregates(model, start_date, end_date, True),
+            }
+            for model in (DynamicEvaluation, DynamicManagerEvaluation):
+                self.stdout.write(f'\n📏 {model.__name__}')
+                expected = None
+                for name, aggregate in modes.items():
+                    (stats, averages), seconds, peak_mb = _measure(lambda: aggregate(model))
+                    expected = expected or stats
+                    matches = '' if stats == expected else ' (question totals differ)'
+                    self.stdout.write(
+                        f'  {name:>7}: {seconds * 1000:8.1f} ms, peak {peak_mb:7.2f} MB, '
+                        f'{len(stats)} questions, {len(averages)} weeks{matches}'
+                    )
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('\n✅ Benchmark complete (generated rows rolled back)'))
+
+    def _create_fixture(self, department_count, employee_count, end_date):
+        """Create departments with a year of completed weekly and monthly evaluations; returns the answer count."""
+        first_week = end_date - timedelta(weeks=WEEKS, days=end_date.weekday())
+        answer_count = 0
+        for dept_index in range(department_count):
+            department = Department.objects.create(
+                title=f'Benchmark Trends {dept_index}', slug=f'benchmark-trends-{dept_index}'
+            )
+            users = User.objects.bulk_create([
+                User(username=f'benchmark_trends_{dept_index}_{i}', first_name='Person', last_name=str(i))
+                for i in range(employee_count + 2)
+            ])
+            profiles = UserProfile.objects.bulk_create([
+                UserProfile(user=user, department=department) for user in users
+            ])
+            senior_manager, manager, employees = profiles[0], profiles[1], profiles[2:]
+
+            form = EvalForm.objects.create(department=department, name=f'Benchmark Trends {dept_index}', is_active=True)
+            questions = Question.objects.bulk_create(
+                Question(form=form, text=f'How would you rate area {i} this week?', order=i, include_in_trends=True)
+                for i in range(QUESTIONS)
+            )
+
+            evaluations = DynamicEvaluation.objects.bulk_create(
+                DynamicEvaluation(
+                    form=form, department=department, manager=manager, employee=employee,
+                    week_start=first_week + timedelta(weeks=week), week_end=first_week + timedelta(weeks=week, days=6),
+                    status=EvaluationStatus.COMPLETED,
+                    submitted_at=timezone.now() - timedelta(weeks=WEEKS - week - 1, days=1),
+                )
+                for employee in employees
+                for week in range(WEEKS)
+            )
+            manager_evaluations = DynamicManagerEvaluation.objects.bulk_create(
+                DynamicManagerEvaluation(
+                    form=form, department=department, senior_manager=senior_manager, manager=manager,
+                    period_start=first_week + timedelta(weeks=4 * month),
+                    period_end=first_week + timedelta(weeks=4 * month, days=27),
+                    status=EvaluationStatus.COMPLETED,
+                    submitted_at=timezone.now() - timedelta(weeks=WEEKS - 4 * month - 4, days=1),
+                )
+                for month in range(WEEKS // 4)
+            )
+            for answer_model, instances in ((Answer, evaluations), (ManagerAnswer, manager_evaluations)):
+                created = answer_model.objects.bulk_create(
+                    (
+                        answer_model(instance=instance, question=question, int_value=(instance.pk + question.pk) % 5 + 1)
+                        for instance in instances
+                        for question in questions
+                    ),
+                    batch_size=2000,
+                )
+                answer_count += len(created)
+        return answer_count
@@ -10,6 +10,8 @@ This command creates and manages manager evaluations:
 Key features:
 - Supports Monthly, Quarterly, and Annual evaluation types
 - Creates evaluations based on active manager evaluation forms per department
+- Creates the missing evaluations set-based (see evaluation.scaffolding)
+  and queues one assignment email per senior manager
 - Sends reminders for pending manager evaluations
 - Links to manager evaluation dashboard
 """
@@ -20,10 +22,12 @@ from django.core.management.base import BaseCommand
 from django.utils.timezone import now
 from django.core.mail import send_mail, get_connection
 from django.conf import settings
+from django.urls import reverse
 
-from authentication.models import UserProfile
-from django.db import transaction
-from evaluation.models import EvalForm, DynamicManagerEvaluation, ManagerAnswer, Question
+from authentication.outbox import queue_mass_mail
+from evaluation.models import EvalForm, DynamicManagerEvaluation
+from evaluation.scaffolding import apply_plan, format_timings, plan_manager_evaluations
+from firehousemovers.utils.bulk_mail import render_messages, send_bulk_mail
 
 
 class Command(BaseCommand):
@@ -65,6 +69,21 @@ class Command(BaseCommand):
             "--department",
             help="Limit to a specific department ID (optional).",
         )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Evaluations and answer stubs inserted per query (default: EVALUATION_SCAFFOLD_BATCH_SIZE).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            help="Reminder emails sent per chunk (default: BULK_MAIL_CHUNK_SIZE).",
+        )
+        parser.add_argument(
+            "--rate-limit",
+            type=float,
+            help="Maximum reminder emails per second (default: BULK_MAIL_RATE_LIMIT, unlimited if unset).",
+        )
 
     # -----------------------------
     # Email helpers
@@ -80,6 +99,7 @@ class Command(BaseCommand):
         try:
             conn = get_connection()
             conn.open()
+            conn.close()
             self.stdout.write("   ✅ Email connection initialized.")
         except Exception as e:
             self.stdout.write(f"   ❌ Email connection failed: {e}")
@@ -105,6 +125,33 @@ class Command(BaseCommand):
             logging.error(f"Failed to send email to {to_addr} with subject '{subject}': {str(e)}", exc_info=True)
             return False
 
+    def _send_reminders(self, recipients, options):
+        """
+        Render and send reminder emails over one connection.
+
+        Args:
+            recipients: List of (email, subject, template context)
+            options: Command options (dry_run, chunk_size, rate_limit)
+
+        Returns:
+            BulkMailReport
+        """
+        messages = render_messages("evaluation/email/pending_manager_evaluations_reminder.txt", recipients)
+        if options["dry_run"]:
+            for message in messages:
+                self.stdout.write(f"(dry-run) Would email {message.to[0]} with subject '{message.subject}'")
+
+        report = send_bulk_mail(
+            messages,
+            chunk_size=options.get("chunk_size"),
+            rate_limit=options.get("rate_limit"),
+            dry_run=options["dry_run"],
+        )
+        self.stdout.write(f"📧 Reminder emails: {report.summary()}")
+        for recipient, error in report.failures:
+            self.stdout.write(f"   ❌ {recipient}: {error}")
+        return report
+
     def _month_bounds(self, d: date):
         """Calculate month start and end dates - same logic as generate_review_cycles.py"""
         start = d.replace(day=1)
@@ -171,6 +218,50 @@ class Command(BaseCommand):
         
         return base_date == last_friday
 
+    def _queue_assignment_notifications(self, rows):
+        """
+        Queue one email per senior manager listing their new evaluations.
+
+        Args:
+            rows: Created DynamicManagerEvaluation rows (ScaffoldResult.rows)
+        """
+        evaluations = (
+            DynamicManagerEvaluation.objects
+            .filter(pk__in=[row["pk"] for row in rows])
+            .select_related("senior_manager__user", "manager__user", "form", "department")
+            .order_by("senior_manager_id", "department__title", "form__name", "pk")
+        )
+        assigned = {}
+        for ev in evaluations:
+            assigned.setdefault(ev.senior_manager, []).append(ev)
+
+        dashboard_url = f"{settings.BASE_URL}{reverse('evaluation:manager_evaluation_dashboard')}"
+        recipients = []
+        for senior_mgr, evs in assigned.items():
+            user = senior_mgr.user
+            by_dept_form = {}
+            for ev in evs:
+                mgr_user = ev.manager.user
+                by_dept_form.setdefault(f"{ev.department.title} - {ev.form.name}", []).append(
+                    mgr_user.get_full_name() or mgr_user.username
+                )
+            recipients.append((
+                user.email,
+                "New Manager Evaluations Assigned",
+                {
+                    "name": user.get_full_name() or user.username,
+                    "count": len(evs),
+                    "groups": list(by_dept_form.items()),
+                    "url": dashboard_url,
+                },
+            ))
+
+        messages = render_messages("evaluation/email/new_manager_evaluations.txt", recipients)
+        queued = queue_mass_mail(
+            (message.subject, message.body, message.from_email, message.to) for message in messages
+        )
+        self.stdout.write(f"📬 Queued {len(queued)} assignment notification(s) for senior managers.")
+
     # -----------------------------
     # Main handler
     # -----------------------------
@@ -251,79 +342,46 @@ class Command(BaseCommand):
             
             self.stdout.write(f"Creating evaluation types: {', '.join(eval_types_to_create)}")
 
+            created_rows = []
             for evaluation_type in eval_types_to_create:
-                # Check if this evaluation type has active forms
-                active_forms = EvalForm.objects.filter(is_active=True, name=evaluation_type)
-                if not active_forms.exists():
+                if not EvalForm.objects.filter(is_active=True, name=evaluation_type).exists():
                     self.stdout.write(f"⚠️ No active forms found for {evaluation_type}. Skipping.")
                     continue
-                
-                self.stdout.write(f"   Creating {evaluation_type.lower()} evaluations...")
-
-                # Managers
-                managers_qs = UserProfile.objects.filter(role="manager")
-                if department_id:
-                    managers_qs = managers_qs.filter(department_id=department_id)
-                managers = managers_qs.distinct()
-
-                # Senior Managers
-                senior_managers_qs = UserProfile.objects.filter(role__in=UserProfile.SENIOR_MANAGEMENT_ROLES)
-                if only_senior_manager_email:
-                    senior_managers_qs = senior_managers_qs.filter(user__email__iexact=only_senior_manager_email)
-                senior_managers = senior_managers_qs.distinct()
 
-                created_count = 0
-                skipped_count = 0
                 period_start, period_end = self._get_evaluation_period(evaluation_type)
-
-                for manager in managers:
-                    dept = getattr(manager, 'managed_department', None)
-                    if not dept:
-                        if dry:
-                            self.stdout.write(f"(dry-run) Skipping manager={manager.user.email} - no department assigned")
-                        skipped_count += 1
-                        continue
-
-                    active_forms = EvalForm.objects.filter(department=dept, is_active=True, name=evaluation_type)
-                    if not active_forms.exists():
-                        if dry:
-                            self.stdout.write(f"(dry-run) Skipping manager={manager.user.email} dept={dept.title} - no active form")
-                        skipped_count += 1
-                        continue
-
-                    for active_form in active_forms:
-                        for senior_manager in senior_managers:
-                            if dry:
-                                self.stdout.write(f"(dry-run) Would create evaluation: senior_mgr={senior_manager.user.email}, manager={manager.user.email}, form={active_form.name}, period={period_start}–{period_end}")
-                                continue
-
-                            with transaction.atomic():
-                                inst, created = DynamicManagerEvaluation.objects.get_or_create(
-                                    form=active_form,
-                                    manager=manager,
-                                    period_start=period_start,
-                                    period_end=period_end,
-                                    defaults={
-                                        "department": dept,
-                                        "senior_manager": senior_manager,
-                                        "status": "pending"
-                                    },
-                                )
-                                if created:
-                                    qids = list(active_form.questions.values_list("id", flat=True))
-                                    ManagerAnswer.objects.bulk_create(
-                                        [ManagerAnswer(instance=inst, question_id=qid) for qid in qids],
-                                        ignore_conflicts=True,
-                                    )
-                                    created_count += 1
-                                    self.stdout.write(f"✅ Created {evaluation_type.lower()} for manager {manager.user.username} by {senior_manager.user.username}")
-
-                if not dry:
-                    self.stdout.write(f"✅ Created {created_count} {evaluation_type.lower()} evaluations for period {period_start}–{period_end}")
-                    if skipped_count > 0:
-                        self.stdout.write(f"⚠️ Skipped {skipped_count} managers (no department or active form)")
-                else:
+                plan = plan_manager_evaluations(
+                    period_start,
+                    period_end,
+                    evaluation_type,
+                    senior_manager_email=only_senior_manager_email,
+                    department_id=department_id,
+                )
+                self.stdout.write(f"   Creating {evaluation_type.lower()} evaluations...")
+                if dry:
+                    for email, reason in plan.skipped:
+                        self.stdout.write(f"(dry-run) Skipping manager={email} - {reason}")
+                    self.stdout.write(
+                        f"📋 {len(plan.targets)} to create, {plan.existing} already exist, "
+                        f"{len(plan.skipped)} manager(s) skipped"
+                    )
+                    self.stdout.write(f"⏱️ Planning: {format_timings(plan.timings)}")
                     self.stdout.write(f"✅ Dry-run complete for {evaluation_type.lower()}")
+                    continue
+
+                result = apply_plan(plan, batch_size=options.get("batch_size"))
+                created_rows.extend(result.rows)
+                self.stdout.write(
+                    f"✅ Created {result.created} {evaluation_type.lower()} evaluations ({result.answers} answer stubs) "
+                    f"for period {period_start}–{period_end}"
+                )
+                if plan.existing:
+                    self.stdout.write(f"   {plan.existing} evaluation(s) already existed")
+                if plan.skipped:
+                    self.stdout.write(f"⚠️ Skipped {len(plan.skipped)} managers (no department or active form)")
+                self.stdout.write(f"⏱️ {format_timings({**plan.timings, **result.timings})}")
+
+            if created_rows:
+                self._queue_assignment_notifications(created_rows)
 
         # -----------------------------
         # Send Reminders (last Friday of period)
@@ -339,7 +397,9 @@ class Command(BaseCommand):
                 self.stdout.write("⚠️ No active evaluation forms found. Nothing to remind about.")
             else:
                 self.stdout.write(f"Checking reminders for active evaluation types: {', '.join(eval_types)}")
-                sent_to_total = 0
+                dashboard_url = f"{settings.BASE_URL}{reverse('evaluation:manager_evaluation_dashboard')}"
+                # Reminders of all evaluation types are sent together over one connection
+                recipients = []
 
                 for evaluation_type in eval_types:
                     # Only send reminders for evaluation types where today is the last Friday
@@ -347,7 +407,7 @@ class Command(BaseCommand):
                         self.stdout.write(f"⏭️ Skipping {evaluation_type.lower()} reminders - not last Friday of period")
                         continue
                     
-                    self.stdout.write(f"📧 Sending {evaluation_type.lower()} reminders...")
+                    self.stdout.write(f"📧 Preparing {evaluation_type.lower()} reminders...")
                     
                     period_start, period_end = self._get_evaluation_period(evaluation_type)
                     pending_qs = DynamicManagerEvaluation.objects.filter(
@@ -370,7 +430,7 @@ class Command(BaseCommand):
                         self.stdout.write(f"✅ No pending {evaluation_type.lower()} evaluations for this period.")
                         continue
 
-                    sent_to = 0
+                    queued = 0
                     for senior_mgr, evs in reminders.items():
                         user = senior_mgr.user
                         email = user.email
@@ -378,42 +438,36 @@ class Command(BaseCommand):
                             self.stdout.write(f"⚠️ No email for senior manager {user.username}, skipping.")
                             continue
 
-                        subject = f"Reminder: Complete Pending Manager {evaluation_type}s"
-                        lines = [
-                            f"Hello {user.get_full_name() or user.username},",
-                            "",
-                            f"You have {len(evs)} pending manager {evaluation_type.lower()}(s) for the period {period_start} to {period_end}:",
-                            "",
-                        ]
-
                         by_dept_form = {}
                         for ev in evs:
-                            key = f"{ev.department.title} - {ev.form.name}"
-                            by_dept_form.setdefault(key, []).append(ev)
-
-                        for dept_form, evaluations in by_dept_form.items():
-                            lines.append(f"📋 {dept_form}:")
-                            for ev in evaluations:
-                                mgr_user = ev.manager.user
-                                mgr_name = mgr_user.get_full_name() or mgr_user.username
-                                lines.append(f"  • {mgr_name}")
-                            lines.append("")
-
-                        lines += [
-                            "Please complete these evaluations. Your access may be restricted until all are submitted.",
-                            "",
-                            f"👉 {settings.BASE_URL}/evaluation/manager-evaluations/",
-                        ]
-                        body = "\n".join(lines)
-
-                        if self._send_with_fallback(subject, body, email, dry_run=dry):
-                            sent_to += 1
-
-                    sent_to_total += sent_to
-                    self.stdout.write(f"✅ Reminders for {evaluation_type.lower()} sent to {sent_to} senior manager(s).")
-
-                if sent_to_total == 0 and dry:
-                    self.stdout.write("✅ Dry-run complete (no emails sent).")
+                            mgr_user = ev.manager.user
+                            by_dept_form.setdefault(f"{ev.department.title} - {ev.form.name}", []).append(
+                                mgr_user.get_full_name() or mgr_user.username
+                            )
+
+                        recipients.append((
+                            email,
+                            f"Reminder: Complete Pending Manager {evaluation_type}s",
+                            {
+                                "name": user.get_full_name() or user.username,
+                                "count": len(evs),
+                                "evaluation_type": evaluation_type,
+                                "period_start": period_start,
+                                "period_end": period_end,
+                                "groups": list(by_dept_form.items()),
+                                "url": dashboard_url,
+                            },
+                        ))
+                        queued += 1
+
+                    self.stdout.write(f"   {queued} {evaluation_type.lower()} reminder(s) for senior managers.")
+
+                if recipients:
+                    report = self._send_reminders(recipients, options)
+                    if not dry:
+                        self.stdout.write(f"✅ Reminders sent to {report.sent} senior manager(s).")
+                    else:
+                        self.stdout.write("✅ Dry-run complete (no emails sent).")
 
         # Summary
         if not create_evaluations and not send_reminders:
@@ -21,17 +21,19 @@ from django.core.management.base import BaseCommand
 from django.utils.timezone import now
 from django.core.mail import send_mail, get_connection
 from django.conf import settings
+from django.urls import reverse
 
-from authentication.models import UserProfile
-from django.db import transaction
-from evaluation.models import EvalForm, DynamicEvaluation, Answer, Question
+from evaluation.models import DynamicEvaluation
+from evaluation.scaffolding import apply_plan, format_timings, plan_weekly_evaluations
+from firehousemovers.utils.bulk_mail import render_messages, send_bulk_mail
 
 
 class Command(BaseCommand):
     help = (
         "Mondays: create dynamic weekly evaluations for all employees who report to a manager.\n"
         "Fridays: email managers with any still-pending dynamic evaluations for the current week.\n"
-        "You can force either path with --when monday|friday, dry-run with --dry-run, "
+        "You can force either path with --when monday|friday, dry-run with --dry-run "
+        "(reports what would be created and how long planning took), "
         "filter a single manager with --only-manager <email>, or send a test email with --test-email <to>.\n"
         "Emails will be printed to console in development mode.\n"
         "This v2 command focuses on the dynamic evaluation system with EvalForm and DynamicEvaluation models."
@@ -66,6 +68,21 @@ class Command(BaseCommand):
             "--department",
             help="Limit to a specific department ID (optional).",
         )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Evaluations and answer stubs inserted per query (default: EVALUATION_SCAFFOLD_BATCH_SIZE).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            help="Reminder emails sent per chunk (default: BULK_MAIL_CHUNK_SIZE).",
+        )
+        parser.add_argument(
+            "--rate-limit",
+            type=float,
+            help="Maximum reminder emails per second (default: BULK_MAIL_RATE_LIMIT, unlimited if unset).",
+        )
 
     # -----------------------------
     # Email helpers
@@ -82,6 +99,7 @@ class Command(BaseCommand):
         try:
             conn = get_connection()
             conn.open()
+            conn.close()
             self.stdout.write("   ✅ Email connection initialized.")
         except Exception as e:
             self.stdout.write(f"   ❌ Email connection failed: {e}")
@@ -111,6 +129,33 @@ class Command(BaseCommand):
             logging.error(f"Failed to send email to {to_addr} with subject '{subject}': {str(e)}", exc_info=True)
             return False
 
+    def _send_reminders(self, recipients, options):
+        """
+        Render and send reminder emails over one connection.
+
+        Args:
+            recipients: List of (email, subject, template context)
+            options: Command options (dry_run, chunk_size, rate_limit)
+
+        Returns:
+            BulkMailReport
+        """
+        messages = render_messages("evaluation/email/pending_evaluations_reminder.txt", recipients)
+        if options["dry_run"]:
+            for message in messages:
+                self.stdout.write(f"(dry-run) Would email {message.to[0]} with subject '{message.subject}'")
+
+        report = send_bulk_mail(
+            messages,
+            chunk_size=options.get("chunk_size"),
+            rate_limit=options.get("rate_limit"),
+            dry_run=options["dry_run"],
+        )
+        self.stdout.write(f"📧 Reminder emails: {report.summary()}")
+        for recipient, error in report.failures:
+            self.stdout.write(f"   ❌ {recipient}: {error}")
+        return report
+
     # -----------------------------
     # Main handler
     # -----------------------------
@@ -153,86 +198,39 @@ class Command(BaseCommand):
         if branch == "monday":
             self.stdout.write(f"🔨 Monday path: creating dynamic {evaluation_type.lower()} evaluations...")
 
-            managers_qs = UserProfile.objects.filter(role="manager")
-            if only_manager_email:
-                managers_qs = managers_qs.filter(user__email__iexact=only_manager_email)
-
-            managers = managers_qs.filter(team_members__isnull=False).distinct()
-
-            created_count = 0
-            skipped_count = 0
-            
-            for mgr in managers:
-                team = UserProfile.objects.filter(manager=mgr).distinct()
-                for emp in team:
-                    dept = emp.department
-                    if not dept:
-                        if dry:
-                            self.stdout.write(
-                                f"(dry-run) Skipping emp={emp.user.email} - no department assigned"
-                            )
-                        skipped_count += 1
-                        continue
-
-                    # Filter by specific department if provided
-                    if department_id and str(dept.id) != str(department_id):
-                        continue
-
-                    # Get all active evaluation forms for this department and type
-                    active_forms = EvalForm.objects.filter(
-                        department=dept, 
-                        is_active=True,
-                        name=evaluation_type
-                    )
-
-                    if not active_forms.exists():
-                        if dry:
-                            self.stdout.write(
-                                f"(dry-run) Skipping emp={emp.user.email} dept={dept.title} - no active {evaluation_type.lower()} form"
-                            )
-                        skipped_count += 1
-                        continue
-
-                    # Create evaluations for each active form
-                    for active_form in active_forms:
-                        if dry:
-                            self.stdout.write(
-                                f"(dry-run) Would create DYNAMIC evaluation for mgr={mgr.user.email} emp={emp.user.email} "
-                                f"dept={dept.title} form='{active_form.name}' week={this_monday}–{this_sunday}"
-                            )
-                            continue
-
-                        with transaction.atomic():
-                            inst, created = DynamicEvaluation.objects.get_or_create(
-                                form=active_form,
-                                department=dept,
-                                manager=mgr,
-                                employee=emp,
-                                week_start=this_monday,
-                                week_end=this_sunday,
-                                defaults={"status": "pending"},
-                            )
-                            if created:
-                                # scaffold answers for faster rendering (optional)
-                                qids = list(active_form.questions.values_list("id", flat=True))
-                                Answer.objects.bulk_create(
-                                    [Answer(instance=inst, question_id=qid) for qid in qids],
-                                    ignore_conflicts=True,
-                                )
-                                created_count += 1
-                                self.stdout.write(
-                                    f"✅ Created evaluation for {emp.user.get_full_name() or emp.user.username} "
-                                    f"({dept.title}) using form '{active_form.name}'"
-                                )
-
-            if not dry:
+            plan = plan_weekly_evaluations(
+                this_monday,
+                this_sunday,
+                evaluation_type,
+                manager_email=only_manager_email,
+                department_id=department_id,
+            )
+            if dry:
+                for email, reason in plan.skipped:
+                    self.stdout.write(f"(dry-run) Skipping emp={email} - {reason}")
+                if options["verbosity"] > 1:
+                    for target in plan.targets:
+                        self.stdout.write(
+                            f"(dry-run) Would create DYNAMIC evaluation for mgr_id={target.manager_id} "
+                            f"emp_id={target.employee_id} form_id={target.form_id} week={this_monday}–{this_sunday}"
+                        )
                 self.stdout.write(
-                    f"✅ Created {created_count} dynamic evaluations for week {this_monday}–{this_sunday}"
+                    f"📋 {len(plan.targets)} to create, {plan.existing} already exist, "
+                    f"{len(plan.skipped)} employee(s) skipped"
                 )
-                if skipped_count > 0:
-                    self.stdout.write(f"⚠️ Skipped {skipped_count} employees (no department or active form)")
-            else:
+                self.stdout.write(f"⏱️ Planning: {format_timings(plan.timings)}")
                 self.stdout.write("✅ Dry-run complete (no DB writes).")
+            else:
+                result = apply_plan(plan, batch_size=options.get("batch_size"))
+                self.stdout.write(
+                    f"✅ Created {result.created} dynamic evaluations ({result.answers} answer stubs) "
+                    f"for week {this_monday}–{this_sunday}"
+                )
+                if plan.existing:
+                    self.stdout.write(f"   {plan.existing} evaluation(s) already existed")
+                if plan.skipped:
+                    self.stdout.write(f"⚠️ Skipped {len(plan.skipped)} employees (no department or active form)")
+                self.stdout.write(f"⏱️ {format_timings({**plan.timings, **result.timings})}")
 
         elif branch == "friday":
             self.stdout.write(f"✉️ Friday path: sending pending {evaluation_type.lower()} reminders...")
@@ -260,7 +258,8 @@ class Command(BaseCommand):
                 self.stdout.write(f"✅ No pending {evaluation_type.lower()} evaluations for this week. All set!")
                 return
 
-            sent_to = 0
+            pending_url = f"{settings.BASE_URL}{reverse('evaluation:pending')}"
+            recipients = []
             for mgr, evs in reminders.items():
                 user = mgr.user
                 email = user.email
@@ -268,42 +267,32 @@ class Command(BaseCommand):
                     self.stdout.write(f"⚠️ No email for manager {user.username}, skipping.")
                     continue
 
-                subject = f"Reminder: Complete Pending {evaluation_type}s"
-                lines = [
-                    f"Hello {user.get_full_name() or user.username},",
-                    "",
-                    f"You have {len(evs)} {evaluation_type.lower()}(s) pending for the week {this_monday} to {this_sunday}:",
-                    "",
-                ]
-                
                 # Group by department and form for better organization
                 by_dept_form = {}
                 for ev in evs:
-                    key = f"{ev.department.title} - {ev.form.name}"
-                    if key not in by_dept_form:
-                        by_dept_form[key] = []
-                    by_dept_form[key].append(ev)
-                
-                for dept_form, evaluations in by_dept_form.items():
-                    lines.append(f"📋 {dept_form}:")
-                    for ev in evaluations:
-                        emp_user = ev.employee.user
-                        emp_name = emp_user.get_full_name() or emp_user.username
-                        lines.append(f"  • {emp_name}")
-                    lines.append("")
-                
-                lines += [
-                    "Please complete these by Sunday. Your access may be restricted until all are submitted.",
-                    "",
-                    f"👉 {settings.BASE_URL}/evaluation/pending-v2/",
-                ]
-                body = "\n".join(lines)
-
-                if self._send_with_fallback(subject, body, email, dry_run=dry):
-                    sent_to += 1
+                    emp_user = ev.employee.user
+                    by_dept_form.setdefault(f"{ev.department.title} - {ev.form.name}", []).append(
+                        emp_user.get_full_name() or emp_user.username
+                    )
+
+                recipients.append((
+                    email,
+                    f"Reminder: Complete Pending {evaluation_type}s",
+                    {
+                        "name": user.get_full_name() or user.username,
+                        "count": len(evs),
+                        "evaluation_type": evaluation_type,
+                        "period_start": this_monday,
+                        "period_end": this_sunday,
+                        "groups": list(by_dept_form.items()),
+                        "url": pending_url,
+                    },
+                ))
+
+            report = self._send_reminders(recipients, options)
 
             if not dry:
-                self.stdout.write(f"✅ {evaluation_type} reminders sent to {sent_to} manager(s).")
+                self.stdout.write(f"✅ {evaluation_type} reminders sent to {report.sent} manager(s).")
             else:
                 self.stdout.write("✅ Dry-run complete (no emails sent).")
 
@@ -6,7 +6,11 @@ Provides operations to clear, warm, and inspect analytics cache.
 from django.core.management.base import BaseCommand
 from django.core.cache import cache
 from django.contrib.auth import get_user_model
-from evaluation.cache_utils import invalidate_analytics_cache, warm_analytics_cache
+from django.utils import timezone
+from evaluation.cache_utils import (
+    analytics_dashboard_cache_key, analytics_scope_for, get_analytics_dashboard_users, get_analytics_scope_users,
+    get_cached_entry_size, invalidate_analytics_cache, warm_analytics_cache
+)
 import logging
 
 logger = logging.getLogger(__name__)
@@ -58,40 +62,31 @@ class Command(BaseCommand):
         if user_id:
             self.stdout.write(f'Warming analytics cache for user {user_id}...')
         else:
-            self.stdout.write('Warming analytics cache for all senior managers...')
+            self.stdout.write('Warming analytics cache for every permission scope...')
         
         try:
             if user_id:
-                from django.test import RequestFactory
-                from evaluation.views import senior_manager_analytics_dashboard
+                from evaluation.analytics_snapshot import get_scoped_analytics_snapshot
                 
                 User = get_user_model()
                 try:
-                    user = User.objects.get(id=user_id, userprofile__role='senior_manager')
+                    user = get_analytics_dashboard_users().get(id=user_id)
                 except User.DoesNotExist:
                     self.stdout.write(
-                        self.style.ERROR(f'User {user_id} not found or is not a senior manager')
+                        self.style.ERROR(f'User {user_id} not found or has no analytics dashboard access')
                     )
                     return
                 
-                factory = RequestFactory()
-                request = factory.get('/analytics/')
-                request.user = user
-                
-                response = senior_manager_analytics_dashboard(request)
-                
-                if response.status_code == 200:
-                    self.stdout.write(
-                        self.style.SUCCESS(f'Analytics cache warmed for user {user_id}')
-                    )
-                else:
-                    self.stdout.write(
-                        self.style.WARNING(f'Failed to warm cache for user {user_id}: {response.status_code}')
-                    )
+                # Users sharing the scope share the cache entry
+                scope = analytics_scope_for(user)
+                get_scoped_analytics_snapshot(scope, timezone.now().date())
+                self.stdout.write(
+                    self.style.SUCCESS(f'Analytics cache warmed for user {user_id} (scope {scope})')
+                )
             else:
-                warm_analytics_cache()
+                scopes = warm_analytics_cache()
                 self.stdout.write(
-                    self.style.SUCCESS('Analytics cache warmed for all senior managers!')
+                    self.style.SUCCESS(f'Analytics cache warmed for {len(scopes)} scopes!')
                 )
                 
         except Exception as e:
@@ -145,25 +140,50 @@ class Command(BaseCommand):
             # Clean up test value
             cache.delete(test_key)
             
-            # Show senior managers count
+            # Show dashboard users and the scopes they share
             User = get_user_model()
-            senior_managers_count = User.objects.filter(
-                userprofile__role='senior_manager'
-            ).count()
+            dashboard_users = list(get_analytics_dashboard_users())
+            scope_users = get_analytics_scope_users(dashboard_users)
             
-            self.stdout.write(f'Senior Managers: {senior_managers_count}')
+            self.stdout.write(f'Dashboard Users: {len(dashboard_users)} ({len(scope_users)} cache scopes)')
             
             if user_id:
                 try:
-                    user = User.objects.get(id=user_id, userprofile__role='senior_manager')
-                    self.stdout.write(f'Target User: {user.get_full_name()} (ID: {user_id})')
+                    user = get_analytics_dashboard_users().get(id=user_id)
+                    scope_users = {analytics_scope_for(user): user}
+                    self.stdout.write(f'Target User: {user.get_full_name()} (ID: {user_id}, scope {analytics_scope_for(user)})')
                 except User.DoesNotExist:
                     self.stdout.write(
-                        self.style.WARNING(f'User {user_id} not found or is not a senior manager')
+                        self.style.WARNING(f'User {user_id} not found or has no analytics dashboard access')
                     )
+                    scope_users = {}
+            
+            self.show_dashboard_sizes(scope_users)
             
         except Exception as e:
             self.stdout.write(
                 self.style.ERROR(f'Error checking cache status: {e}')
             )
             logger.error(f"Error checking cache status: {e}")
+
+    def show_dashboard_sizes(self, scopes):
+        """Show the pickled size of today's cached dashboard for each scope."""
+        today = timezone.now().date()
+        total_bytes = 0
+        cached_count = 0
+        
+        self.stdout.write('Cached Dashboards (unfiltered, today):')
+        for scope in sorted(scopes):
+            size = get_cached_entry_size(analytics_dashboard_cache_key(scope, today))
+            if size is None:
+                self.stdout.write(f'  {scope}: not cached')
+                continue
+            total_bytes += size
+            cached_count += 1
+            self.stdout.write(f'  {scope}: {size:,} bytes')
+        
+        if cached_count:
+            self.stdout.write(
+                f'Total: {total_bytes:,} bytes across {cached_count} dashboards '
+                f'(avg {total_bytes // cached_count:,} bytes)'
+            )
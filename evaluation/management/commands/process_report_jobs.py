@@ -0,0 +1,78 @@
+"""
+Management command building queued report PDFs.
+
+Run it as a long-lived worker next to the web processes:
+
+    python manage.py process_report_jobs
+
+or build everything queued once (e.g. from cron) with --once. Several workers
+can run at the same time; each claims different jobs. Expired PDFs are
+purged when the command starts.
+"""
+
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from evaluation.models import ReportJob
+from evaluation.report_jobs import process_next_job, purge_expired_reports
+from evaluation.report_resources import warm_report_resources
+
+
+class Command(BaseCommand):
+    help = 'Build queued report PDFs in the background and store them for download'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Build every queued report, then exit',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=2.0,
+            help='Seconds to wait when the queue is empty (default 2)',
+        )
+        parser.add_argument(
+            '--retention-days',
+            type=int,
+            help='Delete finished reports older than this (default REPORT_JOB_RETENTION_DAYS)',
+        )
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        if not options['once']:
+            signal.signal(signal.SIGTERM, self._stop)
+            signal.signal(signal.SIGINT, self._stop)
+            self.stdout.write(f'📄 Report worker started (polling every {options["sleep"]}s)')
+
+        warm_report_resources()
+        purged = purge_expired_reports(options['retention_days'])
+        if purged:
+            self.stdout.write(f'  🗑️  Purged {purged} expired report(s)')
+
+        totals = {ReportJob.DONE: 0, ReportJob.FAILED: 0}
+        while not self.stopping:
+            close_old_connections()
+            job = process_next_job()
+            if job:
+                totals[job.status] += 1
+                if job.status == ReportJob.DONE:
+                    self.stdout.write(f'  ✅ {job.get_report_type_display()} #{job.pk}: {job.file_size:,} bytes')
+                else:
+                    self.stdout.write(self.style.ERROR(f'  ❌ {job.get_report_type_display()} #{job.pk}: {job.error}'))
+                continue
+            if options['once']:
+                break
+            time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Reports: {totals[ReportJob.DONE]} built, {totals[ReportJob.FAILED]} failed"
+        ))
+
+    def _stop(self, signum, frame):
+        self.stdout.write('Stopping after the current report...')
+        self.stopping = True
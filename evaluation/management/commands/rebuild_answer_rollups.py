@@ -0,0 +1,30 @@
+"""
+Management command to regenerate the trend chart answer rollups.
+Run once after deploying the AnswerRollup table, or whenever answers were
+changed outside DynamicEvaluationForm (admin edits, raw SQL, restores).
+"""
+
+from django.core.management.base import BaseCommand
+from evaluation.cache_utils import invalidate_analytics_cache
+from evaluation.stats_utils import rebuild_answer_rollups
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the AnswerRollup table from the answers of completed evaluations'
+
+    def handle(self, *args, **options):
+        self.stdout.write('🔨 Rebuilding answer rollups...')
+
+        try:
+            row_count = rebuild_answer_rollups()
+            # Cached dashboards may hold charts computed from the old rollup
+            invalidate_analytics_cache()
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'❌ Error rebuilding answer rollups: {e}'))
+            logger.error(f"Error in rebuild_answer_rollups command: {e}")
+            raise
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Wrote {row_count} rollup rows'))
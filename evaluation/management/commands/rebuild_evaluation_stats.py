@@ -0,0 +1,30 @@
+"""
+Management command to backfill the pre-aggregated evaluation statistics.
+Run once after deploying the EvaluationStat table, or whenever evaluations
+were changed without going through the ORM (raw SQL, restores).
+"""
+
+from django.core.management.base import BaseCommand
+from evaluation.cache_utils import invalidate_analytics_cache
+from evaluation.stats_utils import rebuild_evaluation_stats
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the EvaluationStat rollup table from DynamicEvaluation and DynamicManagerEvaluation rows'
+
+    def handle(self, *args, **options):
+        self.stdout.write('🔨 Rebuilding evaluation statistics...')
+
+        try:
+            row_count = rebuild_evaluation_stats()
+            # Cached dashboards may hold numbers computed from the old rollup
+            invalidate_analytics_cache()
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'❌ Error rebuilding evaluation statistics: {e}'))
+            logger.error(f"Error in rebuild_evaluation_stats command: {e}")
+            raise
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Wrote {row_count} rollup rows'))
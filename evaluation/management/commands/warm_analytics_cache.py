@@ -5,16 +5,16 @@ This can be run via cron job or scheduled task to pre-compute analytics data.
 
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
-from django.test import RequestFactory
-from evaluation.views import senior_manager_analytics_dashboard
-from evaluation.cache_utils import warm_analytics_cache
+from django.utils import timezone
+from evaluation.analytics_snapshot import get_scoped_analytics_snapshot
+from evaluation.cache_utils import analytics_scope_for, get_analytics_dashboard_users, warm_analytics_cache
 import logging
 
 logger = logging.getLogger(__name__)
 
 
 class Command(BaseCommand):
-    help = 'Warm up the analytics cache by pre-computing dashboard data for all senior managers'
+    help = 'Warm up the analytics cache by pre-computing dashboard data once per permission scope'
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -41,8 +41,9 @@ class Command(BaseCommand):
                 # Warm cache for specific user
                 self.warm_cache_for_user(user_id, force)
             else:
-                # Warm cache for all senior managers
-                warm_analytics_cache()
+                # One computation per distinct permission scope
+                scopes = warm_analytics_cache()
+                self.stdout.write(f'Warmed {len(scopes)} scopes: {", ".join(scopes) or "none"}')
                 
             self.stdout.write(
                 self.style.SUCCESS('Analytics cache warming completed successfully!')
@@ -66,31 +67,21 @@ class Command(BaseCommand):
         User = get_user_model()
         
         try:
-            user = User.objects.get(id=user_id, userprofile__role='senior_manager')
+            user = get_analytics_dashboard_users().get(id=user_id)
         except User.DoesNotExist:
             self.stdout.write(
-                self.style.ERROR(f'User {user_id} not found or is not a senior manager')
+                self.style.ERROR(f'User {user_id} not found or has no analytics dashboard access')
             )
             return
             
-        factory = RequestFactory()
+        scope = analytics_scope_for(user)
         
         try:
-            # Create a mock request
-            request = factory.get('/analytics/')
-            request.user = user
-            
-            # Call the view to populate cache
-            response = senior_manager_analytics_dashboard(request)
-            
-            if response.status_code == 200:
-                self.stdout.write(
-                    self.style.SUCCESS(f'Analytics cache warmed for user {user_id}')
-                )
-            else:
-                self.stdout.write(
-                    self.style.WARNING(f'Failed to warm cache for user {user_id}: {response.status_code}')
-                )
+            # Users sharing the scope share the cache entry
+            get_scoped_analytics_snapshot(scope, timezone.now().date(), refresh=force)
+            self.stdout.write(
+                self.style.SUCCESS(f'Analytics cache warmed for user {user_id} (scope {scope})')
+            )
                 
         except Exception as e:
             self.stdout.write(
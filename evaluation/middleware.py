@@ -1,47 +1,49 @@
+from functools import cached_property
+
 from django.shortcuts import redirect
-from django.utils.timezone import now
-from evaluation.models import DynamicEvaluation
 from django.contrib import messages
-from firehousemovers.utils.permissions import role_checker
+from django.urls import reverse
+from evaluation.url_policy import OVERDUE_EVALUATION_ALLOWED, SKIP_POLICY
+from firehousemovers.utils.request_context import get_user_context
 
 class OverdueEvaluationLockMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
+        # Resolve the URL allow-lists once at startup
+        SKIP_POLICY.compile()
+        OVERDUE_EVALUATION_ALLOWED.compile()
+
+    @cached_property
+    def redirect_url(self):
+        return reverse("evaluation:pending")
 
     def __call__(self, request):
-        # If they're not logged in or not a manager, do nothing
+        # Static files, media and health checks skip everything, even the session lookup
+        if SKIP_POLICY.matches(request.path_info):
+            return self.get_response(request)
+
+        # If they're not logged in, do nothing
         if not request.user.is_authenticated:
             return self.get_response(request)
 
-        checker = role_checker(request.user)
+        # Check for overdue dynamic evaluations (a cache read unless the
+        # lock state cache is disabled); the profile is only loaded if any
+        user_context = get_user_context(request)
+        overdue_count = user_context.overdue_evaluation_count
+        if not overdue_count:
+            return self.get_response(request)
+
+        # If they're not a manager, do nothing
+        checker = user_context.roles
         if not checker.is_manager() or not checker.user_profile:
             return self.get_response(request)
 
-        today = now().date()
-
-        # Check for overdue dynamic evaluations
-        overdue_dynamic_qs = DynamicEvaluation.objects.filter(
-            manager=checker.user_profile,
-            status="pending",
-            week_end__lt=today,
-        )
-
-        if overdue_dynamic_qs.exists():
-            # Block access to everything except overdue evaluations
-            path = request.path
-            if (
-                not path.startswith("/evaluation/pending")
-                and not path.startswith("/evaluation/evaluate")
-                and not path.startswith("/evaluation/dynamic-evaluation")
-                and not path.startswith("/evaluation/pending-v2")
-                and not path.startswith("/evaluation/evaluate-dynamic")
-                and not path.startswith("/logout")
-                and not path.startswith("/login")
-            ):
-                messages.error(
-                    request,
-                    f"You have {overdue_dynamic_qs.count()} overdue evaluation(s) that must be completed before accessing other pages."
-                )
-                return redirect("evaluation:pending")
+        # Block access to everything except overdue evaluations
+        if not OVERDUE_EVALUATION_ALLOWED.matches(request.path_info):
+            messages.error(
+                request,
+                f"You have {overdue_count} overdue evaluation(s) that must be completed before accessing other pages."
+            )
+            return redirect(self.redirect_url)
 
         return self.get_response(request)
\ No newline at end of file
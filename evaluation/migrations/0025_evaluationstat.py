@@ -0,0 +1,140 @@
+# Generated by Django 5.1.4 on 2026-10-17 20:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_evaluation_stats(apps, schema_editor):
+    """
+    Fill the rollup from the existing evaluations, like rebuild_evaluation_stats.
+
+    The dashboards read their counts from EvaluationStat only, and moving an
+    evaluation that isn't counted yet from pending to completed would leave
+    its pending count behind.
+    """
+    EvaluationStat = apps.get_model("evaluation", "EvaluationStat")
+    sources = [
+        (
+            apps.get_model("evaluation", "DynamicEvaluation"),
+            "employee",
+            ("department_id", "manager_id", "manager_id", "week_start", "week_end"),
+        ),
+        (
+            apps.get_model("evaluation", "DynamicManagerEvaluation"),
+            "manager",
+            ("department_id", "manager_id", "senior_manager_id", "period_start", "period_end"),
+        ),
+    ]
+    rows = []
+    for model, kind, (department, manager, evaluator, start, end) in sources:
+        fields = dict.fromkeys((department, manager, evaluator, start, end, "status"))
+        for item in model.objects.order_by().values(*fields).annotate(total=Count("id")):
+            rows.append(EvaluationStat(
+                kind=kind,
+                department_id=item[department],
+                manager_id=item[manager],
+                evaluator_id=item[evaluator],
+                period_start=item[start],
+                period_end=item[end],
+                status=item["status"],
+                count=item["total"],
+            ))
+    EvaluationStat.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0016_alter_department_slug"),
+        ("evaluation", "0024_dynamicevaluation_is_archived_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EvaluationStat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("employee", "Employee Evaluation"),
+                            ("manager", "Manager Evaluation"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("period_start", models.DateField()),
+                ("period_end", models.DateField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("pending", "Pending"), ("completed", "Completed")],
+                        max_length=10,
+                    ),
+                ),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "department",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="evaluation_stats",
+                        to="authentication.department",
+                    ),
+                ),
+                (
+                    "evaluator",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="evaluator_stats",
+                        to="authentication.userprofile",
+                    ),
+                ),
+                (
+                    "manager",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="evaluation_stats",
+                        to="authentication.userprofile",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["kind", "period_end", "status"],
+                        name="evaluation__kind_154f23_idx",
+                    ),
+                    models.Index(
+                        fields=["kind", "department_id"],
+                        name="evaluation__kind_17ff84_idx",
+                    ),
+                    models.Index(
+                        fields=["kind", "manager_id"],
+                        name="evaluation__kind_a5b790_idx",
+                    ),
+                ],
+                "unique_together": {
+                    (
+                        "kind",
+                        "department",
+                        "manager",
+                        "evaluator",
+                        "period_start",
+                        "period_end",
+                        "status",
+                    )
+                },
+            },
+        ),
+        migrations.RunPython(backfill_evaluation_stats, migrations.RunPython.noop),
+    ]
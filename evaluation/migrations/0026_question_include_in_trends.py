@@ -0,0 +1,42 @@
+# Question.include_in_trends was added to the model without a schema
+# migration (0023 only created ReportHistory despite its name). Some databases
+# already have the column, so it is only added where it is missing.
+
+from django.db import migrations, models
+
+
+def add_include_in_trends_column(apps, schema_editor):
+    Question = apps.get_model("evaluation", "Question")
+    table = Question._meta.db_table
+    with schema_editor.connection.cursor() as cursor:
+        columns = {
+            column.name
+            for column in schema_editor.connection.introspection.get_table_description(cursor, table)
+        }
+    if "include_in_trends" not in columns:
+        field = models.BooleanField(default=False)
+        field.set_attributes_from_name("include_in_trends")
+        field.model = Question
+        schema_editor.add_field(Question, field)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("evaluation", "0025_evaluationstat"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(
+                    model_name="question",
+                    name="include_in_trends",
+                    field=models.BooleanField(default=False),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(add_include_in_trends_column, migrations.RunPython.noop),
+            ],
+        ),
+    ]
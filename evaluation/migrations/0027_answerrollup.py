@@ -0,0 +1,137 @@
+# Generated by Django 5.1.4 on 2026-10-17 20:40
+
+import django.db.models.deletion
+import calendar
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_answer_rollups(apps, schema_editor):
+    """
+    Fill the rollups from the existing answers, like rebuild_answer_rollups.
+
+    The department comparison charts read AnswerRollup only, so they would
+    stay empty until the first rebuild.
+    """
+    AnswerRollup = apps.get_model("evaluation", "AnswerRollup")
+    sources = [
+        (apps.get_model("evaluation", "Answer"), "employee", "week_start", "week_end"),
+        (apps.get_model("evaluation", "ManagerAnswer"), "manager", "period_start", "period_end"),
+    ]
+    rows = {}
+    for answer_model, kind, start_field, end_field in sources:
+        values = (
+            answer_model.objects.filter(instance__status="completed", int_value__isnull=False)
+            .order_by()
+            .values("question_id", "instance__department_id", f"instance__{start_field}",
+                    f"instance__{end_field}", "int_value")
+            .annotate(total=Count("id"))
+        )
+        for item in values:
+            value, total = item["int_value"], item["total"]
+            period_start, period_end = item[f"instance__{start_field}"], item[f"instance__{end_field}"]
+            month_start = period_start.replace(day=1)
+            month_end = period_start.replace(day=calendar.monthrange(period_start.year, period_start.month)[1])
+            for granularity, start, end in (("period", period_start, period_end), ("month", month_start, month_end)):
+                key = (kind, item["question_id"], item["instance__department_id"], granularity, start, end)
+                row = rows.get(key)
+                if row is None:
+                    row = rows[key] = AnswerRollup(
+                        kind=kind, question_id=key[1], department_id=key[2], granularity=granularity,
+                        period_start=start, period_end=end, histogram={},
+                    )
+                row.answer_count += total
+                row.value_sum += value * total
+                row.value_min = value if row.value_min is None else min(row.value_min, value)
+                row.value_max = value if row.value_max is None else max(row.value_max, value)
+                row.histogram[str(value)] = row.histogram.get(str(value), 0) + total
+    AnswerRollup.objects.bulk_create(rows.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0016_alter_department_slug"),
+        ("evaluation", "0026_question_include_in_trends"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AnswerRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("employee", "Employee Evaluation"),
+                            ("manager", "Manager Evaluation"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "granularity",
+                    models.CharField(
+                        choices=[("period", "Evaluation Period"), ("month", "Month")],
+                        max_length=10,
+                    ),
+                ),
+                ("period_start", models.DateField()),
+                ("period_end", models.DateField()),
+                ("answer_count", models.IntegerField(default=0)),
+                ("value_sum", models.BigIntegerField(default=0)),
+                ("value_min", models.IntegerField(blank=True, null=True)),
+                ("value_max", models.IntegerField(blank=True, null=True)),
+                ("histogram", models.JSONField(blank=True, default=dict)),
+                (
+                    "department",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="answer_rollups",
+                        to="authentication.department",
+                    ),
+                ),
+                (
+                    "question",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="answer_rollups",
+                        to="evaluation.question",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["kind", "granularity", "period_start", "period_end"],
+                        name="evaluation__kind_c70b73_idx",
+                    ),
+                    models.Index(
+                        fields=["department_id", "granularity"],
+                        name="evaluation__departm_b26589_idx",
+                    ),
+                ],
+                "unique_together": {
+                    (
+                        "kind",
+                        "question",
+                        "department",
+                        "granularity",
+                        "period_start",
+                        "period_end",
+                    )
+                },
+            },
+        ),
+        migrations.RunPython(backfill_answer_rollups, migrations.RunPython.noop),
+    ]
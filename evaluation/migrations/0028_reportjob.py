@@ -0,0 +1,49 @@
+# Generated by Django 5.1.4 on 2026-10-17 22:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0017_outboxmessage'),
+        ('evaluation', '0027_answerrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report_type', models.CharField(choices=[('employee', 'Employee Evaluation Report'), ('manager', 'Manager Evaluation Report'), ('trends', 'Performance Trends Report')], max_length=20)),
+                ('parameters', models.JSONField(default=dict)),
+                ('params_hash', models.CharField(max_length=64)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=10)),
+                ('progress', models.PositiveSmallIntegerField(default=0)),
+                ('output_path', models.CharField(blank=True, max_length=255)),
+                ('file_size', models.PositiveIntegerField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='report_jobs', to='authentication.userprofile')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='reporthistory',
+            name='job',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='history', to='evaluation.reportjob'),
+        ),
+        migrations.AddIndex(
+            model_name='reportjob',
+            index=models.Index(fields=['params_hash', 'status', 'finished_at'], name='report_job_reuse_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reportjob',
+            index=models.Index(fields=['status', 'created_at'], name='report_job_claim_idx'),
+        ),
+    ]
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from django.db import models
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
 from authentication.models import UserProfile, Department
 from .constants import EvaluationStatus
@@ -139,6 +139,18 @@ class DynamicEvaluation(models.Model):
             models.Index(fields=["submitted_at", "status"]),  # For recent completed evaluations
         ]
 
+    def save(self, *args, **kwargs):
+        # Keep EvaluationStat in the same transaction as the evaluation write
+        from .stats_utils import affects_stats, record_stat_change, stat_key_for, stored_stat_key_for
+        if not affects_stats(self, kwargs.get('update_fields')):
+            return super().save(*args, **kwargs)
+        with transaction.atomic():
+            old_key = None if self._state.adding else stored_stat_key_for(self)
+            # The save signal also refreshes the previous evaluator's overdue lock state
+            self._stored_evaluator_id = old_key['evaluator_id'] if old_key else None
+            super().save(*args, **kwargs)
+            record_stat_change(old_key, stat_key_for(self))
+
     def __str__(self) -> str:
         return f"{self.employee} • {self.week_start}–{self.week_end} ({self.form})"
 
@@ -190,6 +202,18 @@ class DynamicManagerEvaluation(models.Model):
             models.Index(fields=["submitted_at", "status"]),  # For recent completed evaluations
         ]
 
+    def save(self, *args, **kwargs):
+        # Keep EvaluationStat in the same transaction as the evaluation write
+        from .stats_utils import affects_stats, record_stat_change, stat_key_for, stored_stat_key_for
+        if not affects_stats(self, kwargs.get('update_fields')):
+            return super().save(*args, **kwargs)
+        with transaction.atomic():
+            old_key = None if self._state.adding else stored_stat_key_for(self)
+            # The save signal also refreshes the previous evaluator's overdue lock state
+            self._stored_evaluator_id = old_key['evaluator_id'] if old_key else None
+            super().save(*args, **kwargs)
+            record_stat_change(old_key, stat_key_for(self))
+
     def __str__(self) -> str:
         return f"{self.manager} • {self.period_start}–{self.period_end} ({self.form})"
 
@@ -221,6 +245,8 @@ class ReportHistory(models.Model):
     date_from = models.DateField()
     date_to = models.DateField()
     generated_at = models.DateTimeField(auto_now_add=True)
+    # The background job that built (or reused) the PDF
+    job = models.ForeignKey("ReportJob", on_delete=models.SET_NULL, null=True, blank=True, related_name="history")
     
     class Meta:
         ordering = ['-generated_at']
@@ -229,3 +255,134 @@ class ReportHistory(models.Model):
     def __str__(self):
         dept_name = self.department.title if self.department else "All Departments"
         return f"{self.get_report_type_display()} - {dept_name} ({self.generated_at.strftime('%Y-%m-%d %H:%M')})"
+
+
+class ReportJob(models.Model):
+    """
+    Report PDF built off-request by the process_report_jobs worker.
+
+    Jobs with the same parameters share their params_hash; a request for a
+    report that finished within REPORT_JOB_FRESHNESS_SECONDS (or is still
+    being built) gets the existing job instead of a new one. The PDF is kept
+    in the report storage under output_path; see report_jobs.
+    """
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = (
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    )
+
+    report_type = models.CharField(max_length=20, choices=ReportHistory.REPORT_TYPES)
+    parameters = models.JSONField(default=dict)
+    params_hash = models.CharField(max_length=64)
+    requested_by = models.ForeignKey(UserProfile, on_delete=models.SET_NULL, null=True, blank=True, related_name="report_jobs")
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    progress = models.PositiveSmallIntegerField(default=0)  # Percent
+    output_path = models.CharField(max_length=255, blank=True)
+    file_size = models.PositiveIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            # Reuse lookup: the latest job with the same parameters
+            models.Index(fields=["params_hash", "status", "finished_at"], name="report_job_reuse_idx"),
+            # The worker's claim query: queued jobs, oldest first
+            models.Index(fields=["status", "created_at"], name="report_job_claim_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_report_type_display()} #{self.pk} ({self.status}, {self.progress}%)"
+
+
+class EvaluationStat(models.Model):
+    """
+    Pre-aggregated evaluation counts per department, manager, evaluator,
+    period and status. Maintained by the evaluation models' save() and
+    post_delete signals; see stats_utils.
+    """
+    EMPLOYEE = "employee"
+    MANAGER = "manager"
+    KINDS = (
+        (EMPLOYEE, "Employee Evaluation"),
+        (MANAGER, "Manager Evaluation"),
+    )
+    STATUS = (
+        (EvaluationStatus.PENDING, "Pending"),
+        (EvaluationStatus.COMPLETED, "Completed")
+    )
+
+    kind = models.CharField(max_length=10, choices=KINDS)
+    department = models.ForeignKey(Department, on_delete=models.CASCADE, related_name="evaluation_stats")
+    # Team leader for employee evaluations, evaluated manager for manager evaluations
+    manager = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name="evaluation_stats")
+    evaluator = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name="evaluator_stats")
+
+    period_start = models.DateField()
+    period_end = models.DateField()
+
+    status = models.CharField(max_length=10, choices=STATUS)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = [("kind", "department", "manager", "evaluator", "period_start", "period_end", "status")]
+        indexes = [
+            models.Index(fields=["kind", "period_end", "status"]),
+            models.Index(fields=["kind", "department_id"]),
+            models.Index(fields=["kind", "manager_id"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.kind} • {self.department_id} • {self.period_start}–{self.period_end} {self.status}: {self.count}"
+
+
+class AnswerRollup(models.Model):
+    """
+    Pre-aggregated numeric answers of completed evaluations per question,
+    department and time bucket. Maintained by DynamicEvaluationForm.save and
+    the evaluation post_delete signals; see stats_utils.
+    """
+    PERIOD = "period"  # The evaluation's own period (a week for employee evaluations)
+    MONTH = "month"
+    GRANULARITIES = (
+        (PERIOD, "Evaluation Period"),
+        (MONTH, "Month"),
+    )
+
+    kind = models.CharField(max_length=10, choices=EvaluationStat.KINDS)
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name="answer_rollups")
+    department = models.ForeignKey(Department, on_delete=models.CASCADE, related_name="answer_rollups")
+
+    granularity = models.CharField(max_length=10, choices=GRANULARITIES)
+    period_start = models.DateField()
+    period_end = models.DateField()
+
+    answer_count = models.IntegerField(default=0)
+    value_sum = models.BigIntegerField(default=0)
+    value_min = models.IntegerField(null=True, blank=True)
+    value_max = models.IntegerField(null=True, blank=True)
+    histogram = models.JSONField(default=dict, blank=True)  # {"<value>": count}
+
+    class Meta:
+        unique_together = [("kind", "question", "department", "granularity", "period_start", "period_end")]
+        indexes = [
+            models.Index(fields=["kind", "granularity", "period_start", "period_end"]),
+            models.Index(fields=["department_id", "granularity"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.question_id} • {self.department_id} • {self.granularity} {self.period_start}: {self.answer_count}"
+
+    @property
+    def average(self):
+        return self.value_sum / self.answer_count if self.answer_count else None
@@ -0,0 +1,596 @@
+"""
+Evaluation PDF reports: employee, manager and performance trends.
+
+The detail rows are read with .iterator(chunk_size=REPORT_CHUNK_SIZE) and
+turned into one table per page while reportlab lays the document out
+(PagedTable), so neither the rows nor the flowables of the whole report are
+held in memory at once and a table never has to be split across thousands
+of rows. Each finished page is compressed right away, so what remains in
+memory until the document is saved is roughly the size of the PDF itself.
+The document is written to a temporary file that the response streams
+from disk.
+
+The trends report aggregates its averages and rating counts in the database
+(see stats_utils) instead of loading every answer of the period. The trends
+and manager reports include charts, drawn from the chart cache
+(report_charts).
+"""
+
+import logging
+import tempfile
+from collections import Counter
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.db.models.functions import TruncMonth
+from django.http import FileResponse
+from django.utils import timezone
+from reportlab import rl_config
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.units import inch
+from reportlab.pdfbase.pdfdoc import PDFArray, PDFBase85Encode, PDFName, PDFStream, PDFZCompress
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import Flowable, FrameBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from .constants import EvaluationStatus
+from .models import DynamicEvaluation, DynamicManagerEvaluation, Question
+from .report_charts import get_chart
+from .report_resources import get_pdf_styles, get_table_template
+from .report_utils import (
+    create_chart_metrics_table,
+    create_individual_question_table,
+    create_person_header,
+    create_question_paragraph,
+    create_summary_table,
+)
+from .stats_utils import get_trend_period_averages, get_trend_question_stats, trend_answers, use_trend_rollups
+
+logger = logging.getLogger(__name__)
+
+# Column widths of the detail tables with and without the department column
+WIDE_COLUMNS = [1.3*inch, 1.2*inch, 1.3*inch, 1.3*inch, 0.8*inch, 0.8*inch]
+NARROW_COLUMNS = [1.5*inch, 1.5*inch, 1.5*inch, 1*inch, 1*inch]
+
+# Trends reports over up to this many days average by week, longer ones by month
+TREND_WEEKLY_MAX_DAYS = 90
+
+# Answer model lookups of the person each kind of evaluation is about
+TREND_PEOPLE = {
+    DynamicEvaluation: 'instance__employee__user',
+    DynamicManagerEvaluation: 'instance__manager__user',
+}
+
+# Column widths of the trends report question tables
+CHART_METRICS_COLUMNS = [3*inch, 0.7*inch, 0.45*inch, 0.45*inch, 0.45*inch, 0.45*inch, 0.45*inch, 0.45*inch]
+INDIVIDUAL_QUESTION_COLUMNS = [2.6*inch, 1.4*inch, 0.7*inch, 1.1*inch]
+
+
+def get_report_chunk_size():
+    """Rows fetched from the database per round trip."""
+    return getattr(settings, 'REPORT_CHUNK_SIZE', 2000)
+
+
+class _CompressingCanvas(Canvas):
+    """
+    Canvas that compresses each page's content stream when the page is
+    finished. reportlab otherwise keeps every page uncompressed until the
+    document is saved, so memory grew with the page count.
+    """
+
+    def showPage(self):
+        super().showPage()
+        page = self._doc.Pages[-1]
+        if not (page.compression and page.stream):
+            return
+        # The filters PDFPage would apply when the document is saved
+        filters = [PDFBase85Encode, PDFZCompress] if rl_config.useA85 else [PDFZCompress]
+        content = page.stream
+        for stream_filter in reversed(filters):
+            content = stream_filter.encode(content)
+        contents = PDFStream(content=content)
+        contents.dictionary['Filter'] = PDFArray([PDFName(stream_filter.pdfname) for stream_filter in filters])
+        contents.__Comment__ = 'page stream'
+        page.Contents = contents
+        page.stream = None
+
+
+def _full_name(first_name, last_name):
+    """Same as User.get_full_name() for values() rows."""
+    return f"{first_name} {last_name}".strip()
+
+
+def _submitted(submitted_at):
+    return submitted_at.strftime('%Y-%m-%d') if submitted_at else 'N/A'
+
+
+class PagedTable(Flowable):
+    """
+    Table over an iterator of rows that is built one page at a time.
+
+    The flowable never fits as a whole, so reportlab asks it to split at
+    every page: each split pulls as many rows as fit in the space left and
+    returns them as a table with the header on top, followed by the
+    flowable itself while rows remain. Row heights are measured once from a
+    sample row, which assumes the cells do not wrap.
+    """
+
+    def __init__(self, header, rows, col_widths, template='paged_detail'):
+        super().__init__()
+        self.header = header
+        self.col_widths = col_widths
+        self.template = get_table_template(template)
+        self._rows = iter(rows)
+        self._next = next(self._rows, None)
+        sample = self._table([['X'] * len(header)])
+        sample.wrap(sum(col_widths), 0)
+        self._header_height, self._row_height = sample._rowHeights
+
+    def _table(self, rows):
+        table = Table([self.header, *rows], colWidths=self.col_widths, repeatRows=1)
+        table.setStyle(self.template.style)
+        return table
+
+    def wrap(self, availWidth, availHeight):
+        self.width = sum(self.col_widths)
+        if self._next is None:
+            return self.width, 0
+        # Too tall for any frame, so the layout calls split()
+        return self.width, availHeight + self._row_height
+
+    def split(self, availWidth, availHeight):
+        count = int((availHeight - self._header_height) // self._row_height)
+        if self._next is None:
+            return []
+        if count < 1:
+            # Returning [] would mark the flowable as postponed, and it comes
+            # back on every page, so move on to the next page explicitly
+            return [] if self._frame._atTop else [FrameBreak(), self]
+        rows = []
+        while self._next is not None and len(rows) < count:
+            rows.append(self._next)
+            self._next = next(self._rows, None)
+        if self._next is None:
+            return [self._table(rows)]
+        return [self._table(rows), self]
+
+    def draw(self):
+        pass
+
+
+def evaluation_counts(evaluations):
+    """Total, completed and pending evaluations of a queryset in one query."""
+    return evaluations.aggregate(
+        total=Count('pk'),
+        completed=Count('pk', filter=Q(status=EvaluationStatus.COMPLETED)),
+        pending=Count('pk', filter=Q(status=EvaluationStatus.PENDING)),
+    )
+
+
+def _with_progress(rows, total, progress):
+    """Yield rows, passing the percentage consumed so far to progress()."""
+    for index, row in enumerate(rows, 1):
+        yield row
+        progress(index * 100 // total)
+
+
+def report_evaluations(model, department_id, start_date, end_date):
+    """Evaluations of a model submitted in the period, of one department or 'all'."""
+    evaluations = model.objects.filter(submitted_at__gte=start_date, submitted_at__lte=end_date)
+    if department_id != 'all':
+        evaluations = evaluations.filter(department_id=department_id)
+    return evaluations
+
+
+def write_evaluation_report(output, title, dept_name, start_date, end_date, counts, header, rows, col_widths,
+                            progress=None, charts=()):
+    """
+    Write an evaluation report PDF.
+
+    Args:
+        output: Binary file object the PDF is written to
+        title: Report title
+        dept_name: Department shown in the report header
+        start_date: Start of the reported period
+        end_date: End of the reported period
+        counts: evaluation_counts() of the reported evaluations
+        header: Detail table header row
+        rows: Iterable of detail rows (consumed lazily)
+        col_widths: Detail table column widths
+        progress: Optional callable receiving the percentage of rows laid out
+        charts: Flowables shown between the summary and the details
+    """
+    doc = SimpleDocTemplate(output, pagesize=letter, rightMargin=72, leftMargin=72,
+                            topMargin=72, bottomMargin=18)
+    styles, title_style, heading_style = get_pdf_styles()
+    total = counts['total']
+    if progress and total:
+        rows = _with_progress(rows, total, progress)
+
+    def story():
+        yield Paragraph(title, title_style)
+        yield Paragraph(f"Department: {dept_name}", styles['Normal'])
+        yield Paragraph(f"Period: {start_date} to {end_date}", styles['Normal'])
+        yield Paragraph(f"Generated: {timezone.now().strftime('%Y-%m-%d %H:%M')}", styles['Normal'])
+        yield Spacer(1, 20)
+
+        yield Paragraph("Executive Summary", heading_style)
+        yield create_summary_table([
+            ['Metric', 'Count'],
+            ['Total Evaluations', str(total)],
+            ['Completed Evaluations', str(counts['completed'])],
+            ['Pending Evaluations', str(counts['pending'])],
+            ['Completion Rate', f"{(counts['completed'] / total * 100):.1f}%" if total > 0 else 'N/A'],
+        ], [3*inch, 2*inch])
+        yield Spacer(1, 20)
+        yield from charts
+
+        if total > 0:
+            yield Paragraph("Evaluation Details", heading_style)
+            yield PagedTable(header, rows, col_widths)
+        else:
+            yield Paragraph("No evaluations found for the selected period.", styles['Normal'])
+
+    doc.build(list(story()), canvasmaker=_CompressingCanvas)
+    logger.debug(f"Wrote '{title}' with {total} evaluations ({doc.page} pages)")
+
+
+def monthly_status_chart(evaluations, period_field):
+    """
+    Heading and bar chart of the completed and pending evaluations per month
+    of their period start, or [] without evaluations.
+    """
+    months = list(
+        evaluations.annotate(month=TruncMonth(period_field))
+        .order_by().values('month')
+        .annotate(
+            completed=Count('pk', filter=Q(status=EvaluationStatus.COMPLETED)),
+            pending=Count('pk', filter=Q(status=EvaluationStatus.PENDING)),
+        )
+        .order_by('month')
+    )
+    if not months:
+        return []
+    _, _, heading_style = get_pdf_styles()
+    chart = get_chart('bar', {
+        'categories': [row['month'].strftime('%Y-%m') for row in months],
+        'series': [
+            ('Completed', [row['completed'] for row in months]),
+            ('Pending', [row['pending'] for row in months]),
+        ],
+    })
+    return [Paragraph("Evaluations by Month", heading_style), chart, Spacer(1, 20)]
+
+
+def write_employee_report(output, evaluations, dept_name, start_date, end_date, include_department, progress=None):
+    """
+    Write the employee evaluation report for a DynamicEvaluation queryset.
+
+    Args:
+        include_department: Add a department column (for all-department reports)
+        progress: Optional callable receiving the percentage of rows laid out
+    """
+    fields = [
+        'employee__user__first_name', 'employee__user__last_name', 'department__title',
+        'manager__user__first_name', 'manager__user__last_name',
+        'week_start', 'week_end', 'status', 'submitted_at',
+    ]
+    rows = (
+        [
+            _full_name(emp_first, emp_last),
+            *([department] if include_department else []),
+            _full_name(mgr_first, mgr_last),
+            f"{week_start} to {week_end}",
+            status,
+            _submitted(submitted_at),
+        ]
+        for emp_first, emp_last, department, mgr_first, mgr_last, week_start, week_end, status, submitted_at
+        in evaluations.order_by('submitted_at', 'pk').values_list(*fields).iterator(chunk_size=get_report_chunk_size())
+    )
+    if include_department:
+        header, col_widths = ['Employee', 'Department', 'Manager', 'Week', 'Status', 'Submitted'], WIDE_COLUMNS
+    else:
+        header, col_widths = ['Employee', 'Manager', 'Week', 'Status', 'Submitted'], NARROW_COLUMNS
+
+    write_evaluation_report(
+        output, "Employee Evaluation Report", dept_name, start_date, end_date,
+        evaluation_counts(evaluations), header, rows, col_widths, progress,
+    )
+
+
+def write_manager_report(output, evaluations, dept_name, start_date, end_date, include_department, progress=None):
+    """
+    Write the manager evaluation report for a DynamicManagerEvaluation queryset.
+
+    Args:
+        include_department: Add a department column (for all-department reports)
+        progress: Optional callable receiving the percentage of rows laid out
+    """
+    fields = [
+        'manager__user__first_name', 'manager__user__last_name', 'department__title',
+        'senior_manager__user__first_name', 'senior_manager__user__last_name',
+        'period_start', 'period_end', 'status', 'submitted_at',
+    ]
+    rows = (
+        [
+            _full_name(mgr_first, mgr_last),
+            *([department] if include_department else []),
+            _full_name(senior_first, senior_last),
+            f"{period_start} to {period_end}",
+            status,
+            _submitted(submitted_at),
+        ]
+        for mgr_first, mgr_last, department, senior_first, senior_last, period_start, period_end, status, submitted_at
+        in evaluations.order_by('submitted_at', 'pk').values_list(*fields).iterator(chunk_size=get_report_chunk_size())
+    )
+    if include_department:
+        header, col_widths = ['Manager', 'Department', 'Evaluator', 'Period', 'Status', 'Submitted'], WIDE_COLUMNS
+    else:
+        header, col_widths = ['Manager', 'Evaluator', 'Period', 'Status', 'Submitted'], NARROW_COLUMNS
+
+    write_evaluation_report(
+        output, "Manager Evaluation Report", dept_name, start_date, end_date,
+        evaluation_counts(evaluations), header, rows, col_widths, progress,
+        charts=monthly_status_chart(evaluations, 'period_start'),
+    )
+
+
+def _question_performance_rows(question_stats, question_keys):
+    """
+    Chart metrics rows (question, responses, average and the number of 5 to
+    1 ratings) of get_trend_question_stats(), merging questions that share
+    a "form - question" key.
+    """
+    merged = {}
+    for question_id, stats in question_stats.items():
+        key = question_keys.get(question_id)
+        if key is None:
+            continue
+        totals = merged.setdefault(key, {'count': 0, 'sum': 0, 'histogram': Counter()})
+        totals['count'] += stats['count']
+        totals['sum'] += stats['sum']
+        totals['histogram'].update(stats['histogram'])
+
+    return [
+        [
+            create_question_paragraph(key),
+            str(totals['count']),
+            f"{totals['sum'] / totals['count']:.2f}",
+            *[str(totals['histogram'][score]) for score in range(5, 0, -1)],
+        ]
+        for key, totals in sorted(merged.items())
+        if totals['count'] > 0
+    ]
+
+
+def _individual_performance(model, department_id, start_date, end_date):
+    """
+    Trend answers per person and question text, read as plain values.
+
+    Returns:
+        Dictionary mapping a person's name to {'department', 'questions'},
+        questions mapping the question text to {'type', 'responses'} and
+        responses being (score, submission date) tuples
+    """
+    person = TREND_PEOPLE[model]
+    qtypes = dict(Question.QType.choices)
+    fields = [
+        f'{person}__first_name', f'{person}__last_name', 'instance__department__title',
+        'question__text', 'question__qtype', 'int_value', 'instance__submitted_at',
+    ]
+    answers = (
+        trend_answers(model, department_id, start_date, end_date)
+        .order_by('instance__submitted_at', 'instance_id', 'id')
+        .values_list(*fields)
+        .iterator(chunk_size=get_report_chunk_size())
+    )
+
+    people = {}
+    for first_name, last_name, department, text, qtype, score, submitted_at in answers:
+        data = people.setdefault(_full_name(first_name, last_name), {'department': department, 'questions': {}})
+        question = data['questions'].setdefault(text, {'type': qtypes.get(qtype, qtype), 'responses': []})
+        question['responses'].append((score, _submitted(submitted_at)))
+    return people
+
+
+def _merge_period_averages(employee_averages, manager_averages):
+    """
+    (bucket, [employee, manager]) per week or month with answers, each side
+    being an (average, answer count) tuple or None.
+    """
+    buckets = {}
+    for column, averages in enumerate((employee_averages, manager_averages)):
+        for bucket, average, total in averages:
+            buckets.setdefault(bucket, [None, None])[column] = (average, total)
+    return sorted(buckets.items())
+
+
+def _period_average_rows(periods):
+    """Rows of the average-by-period table."""
+    return [
+        [
+            str(bucket),
+            *[
+                value
+                for cell in cells
+                for value in ((f'{cell[0]:.2f}', str(cell[1])) if cell else ('-', '0'))
+            ],
+        ]
+        for bucket, cells in periods
+    ]
+
+
+def _period_average_chart(periods):
+    """Line chart data of the average-by-period table."""
+    return {
+        'categories': [str(bucket) for bucket, _ in periods],
+        'series': [
+            (name, [round(cells[column][0], 2) if cells[column] else None for _, cells in periods])
+            for column, name in enumerate(('Employee', 'Manager'))
+        ],
+    }
+
+
+def write_trends_report(output, department_id, dept_name, start_date, end_date, period):
+    """
+    Write the performance trends report.
+
+    Averages and rating counts are aggregated in the database; only the
+    individual details read answer rows, as plain values.
+
+    Args:
+        output: Binary file object the PDF is written to
+        department_id: Department id, or 'all'
+        dept_name: Department shown in the report header
+        start_date: Start of the reported period
+        end_date: End of the reported period
+        period: Length of the period in days
+    """
+    trunc_kind = 'week' if period <= TREND_WEEKLY_MAX_DAYS else 'month'
+    question_keys = {
+        question.id: f"{question.form.name} - {question.text}"
+        for question in Question.objects.filter(include_in_trends=True).select_related('form')
+    }
+
+    sides = {}
+    for model, person in ((DynamicEvaluation, 'employee'), (DynamicManagerEvaluation, 'manager')):
+        use_rollups = use_trend_rollups(model)
+        evaluations = report_evaluations(model, department_id, start_date, end_date).filter(
+            status=EvaluationStatus.COMPLETED
+        )
+        question_stats = get_trend_question_stats(model, department_id, start_date, end_date, use_rollups)
+        sides[model] = {
+            'counts': evaluations.aggregate(completed=Count('pk'), people=Count(person, distinct=True)),
+            'questions': _question_performance_rows(question_stats, question_keys),
+            'ratings': sum(
+                (stats['histogram'] for question_id, stats in question_stats.items() if question_id in question_keys),
+                Counter(),
+            ),
+            'averages': get_trend_period_averages(
+                model, department_id, start_date, end_date, trunc_kind, use_rollups
+            ),
+        }
+    employee, manager = sides[DynamicEvaluation], sides[DynamicManagerEvaluation]
+    logger.info(
+        f"Trends report: {employee['counts']['completed']} employee evals, "
+        f"{manager['counts']['completed']} manager evals"
+    )
+
+    # Create PDF
+    doc = SimpleDocTemplate(output, pagesize=letter, rightMargin=72, leftMargin=72,
+                           topMargin=72, bottomMargin=18)
+    
+    elements = []
+    styles, title_style, heading_style = get_pdf_styles()
+    
+    elements.append(Paragraph("Performance Trends Report", title_style))
+    elements.append(Paragraph(f"Department: {dept_name}", styles['Normal']))
+    elements.append(Paragraph(f"Period: Last {period} days ({start_date} to {end_date})", styles['Normal']))
+    elements.append(Paragraph(f"Generated: {timezone.now().strftime('%Y-%m-%d %H:%M')}", styles['Normal']))
+    elements.append(Spacer(1, 20))
+    
+    # Overall Summary Statistics
+    elements.append(Paragraph("Evaluation Summary", heading_style))
+    
+    summary_data = [
+        ['Metric', 'Employee', 'Manager'],
+        ['Completed Evaluations', str(employee['counts']['completed']), str(manager['counts']['completed'])],
+        ['Questions Tracked for Trends', str(len(employee['questions'])), str(len(manager['questions']))],
+        ['Total Employees/Managers', str(employee['counts']['people']), str(manager['counts']['people'])],
+    ]
+    
+    summary_table = create_summary_table(summary_data, [2.5*inch, 1.5*inch, 1.5*inch])
+    # Override center alignment for columns 1 and 2
+    summary_table.setStyle(TableStyle([
+        ('ALIGN', (1, 0), (-1, -1), 'CENTER'),
+    ]))
+    
+    elements.append(summary_table)
+    elements.append(Spacer(1, 20))
+
+    # Average score per week or month
+    periods = _merge_period_averages(employee['averages'], manager['averages'])
+    if periods:
+        elements.append(Paragraph(f"Average Score by {trunc_kind.title()}", heading_style))
+        elements.append(get_chart('line', _period_average_chart(periods)))
+        elements.append(Spacer(1, 10))
+        elements.append(create_chart_metrics_table(
+            [[f'{trunc_kind.title()} of', 'Employee Avg', 'Responses', 'Manager Avg', 'Responses'],
+             *_period_average_rows(periods)],
+            [1.5*inch, 1.1*inch, 0.9*inch, 1.1*inch, 0.9*inch],
+        ))
+        elements.append(Spacer(1, 20))
+
+    # Question Performance (Chart Questions)
+    if question_keys:
+        for side, title, stars in ((employee, 'Employee', '⭐'), (manager, 'Manager', '')):
+            elements.append(Paragraph(f"{title} Performance by Question (Chart Metrics)", heading_style))
+            if side['questions']:
+                header = ['Question', 'Responses', 'Avg', *[f'{score}{stars}' for score in range(5, 0, -1)]]
+                elements.append(create_chart_metrics_table([header, *side['questions']], CHART_METRICS_COLUMNS))
+            else:
+                elements.append(Paragraph(
+                    f"No {title.lower()} questions marked for charts in this period.", styles['Normal']
+                ))
+            elements.append(Spacer(1, 20))
+
+    # Rating distribution over all trend questions
+    if employee['ratings'] or manager['ratings']:
+        elements.append(Paragraph("Rating Distribution", heading_style))
+        elements.append(get_chart('bar', {
+            'categories': [str(score) for score in range(1, 6)],
+            'series': [
+                (title, [side['ratings'][score] for score in range(1, 6)])
+                for side, title in ((employee, 'Employee'), (manager, 'Manager'))
+            ],
+        }))
+        elements.append(Spacer(1, 20))
+
+    # Individual Performance - Detailed by Person
+    for model, title in ((DynamicEvaluation, 'Employee'), (DynamicManagerEvaluation, 'Manager')):
+        if not sides[model]['counts']['completed']:
+            continue
+        elements.append(Paragraph(f"Individual {title} Performance Details", heading_style))
+        elements.append(Spacer(1, 10))
+
+        people = _individual_performance(model, department_id, start_date, end_date)
+        for name, data in sorted(people.items()):
+            # Person header with red background
+            elements.append(create_person_header(name, data['department']))
+            elements.append(Spacer(1, 8))
+
+            # Questions table with dates; question text and type only on the first response
+            table_data = [['Question', 'Type', 'Score', 'Date']]
+            for question_text, q_data in sorted(data['questions'].items()):
+                for i, (score, submitted) in enumerate(q_data['responses']):
+                    table_data.append([
+                        create_question_paragraph(question_text) if i == 0 else '',
+                        q_data['type'] if i == 0 else '',
+                        str(score),
+                        submitted,
+                    ])
+
+            elements.append(create_individual_question_table(table_data, INDIVIDUAL_QUESTION_COLUMNS))
+            elements.append(Spacer(1, 20))
+    
+    doc.build(elements)
+
+
+def pdf_file_response(write, filename):
+    """
+    Write a PDF into a temporary file and stream it from disk.
+
+    Args:
+        write: Callable writing the PDF to the binary file object it is given
+        filename: Download file name
+
+    Returns:
+        FileResponse; the temporary file is removed when the response is closed
+    """
+    output = tempfile.TemporaryFile(suffix='.pdf')
+    try:
+        write(output)
+        output.seek(0)
+    except Exception:
+        output.close()
+        raise
+    return FileResponse(output, as_attachment=True, filename=filename, content_type='application/pdf')
@@ -0,0 +1,177 @@
+"""
+Charts embedded in the PDF reports (reportlab graphics).
+
+A chart widget lays itself out again every time it is drawn: axes, ticks
+and every label are recomputed into shapes on each render. get_chart()
+expands the widgets into their primitive shapes once and keeps the
+flattened Drawing in the default cache under a key made of the chart type,
+its size and a hash of its data. An unchanged report downloaded again
+draws the cached shapes instead of laying the charts out again (see
+benchmark_report_charts). The key covers everything the drawing depends on,
+so entries never go stale and only expire after REPORT_CHART_CACHE_TIMEOUT.
+
+The cache hands out a fresh copy on every get, so a drawing is never drawn
+by two documents at the same time; reportlab sets temporary attributes on
+the shapes while it renders them.
+"""
+
+import hashlib
+import json
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.charts.legends import Legend
+from reportlab.graphics.charts.linecharts import HorizontalLineChart
+from reportlab.graphics.shapes import Drawing, Group, UserNode
+from reportlab.graphics.widgets.markers import makeMarker
+from reportlab.lib import colors as pdf_colors
+from reportlab.lib.units import inch
+
+from .report_resources import GRID, RED
+
+logger = logging.getLogger(__name__)
+
+CHART_CACHE_PREFIX = 'report_chart'
+
+# Full text width of the letter-sized reports (1 inch margins)
+CHART_WIDTH = 6.5*inch
+CHART_HEIGHT = 2.6*inch
+
+# Colors of the first, second, ... series
+SERIES_COLORS = [RED, '#6B7280', '#2563EB', '#059669']
+
+# Category axis labels shown at most; the others are left blank
+MAX_CATEGORY_LABELS = 13
+
+
+def get_chart_cache_timeout():
+    """Seconds a rendered chart is kept (REPORT_CHART_CACHE_TIMEOUT)."""
+    return getattr(settings, 'REPORT_CHART_CACHE_TIMEOUT', 24 * 3600)
+
+
+def chart_cache_key(chart_type, data, width, height):
+    """Cache key of a chart: its type, size and a hash of its data."""
+    payload = json.dumps(data, sort_keys=True, default=str)
+    data_hash = hashlib.sha256(payload.encode()).hexdigest()
+    return f'{CHART_CACHE_PREFIX}:{chart_type}:{width:g}x{height:g}:{data_hash}'
+
+
+def _series_color(index):
+    return pdf_colors.HexColor(SERIES_COLORS[index % len(SERIES_COLORS)])
+
+
+def _sparse_labels(categories):
+    """Category names with only every n-th one kept, so the labels don't overlap."""
+    step = -(-len(categories) // MAX_CATEGORY_LABELS) or 1
+    return [str(name) if index % step == 0 else '' for index, name in enumerate(categories)]
+
+
+def _legend(data, width, height):
+    legend = Legend()
+    legend.colorNamePairs = [(_series_color(index), name) for index, (name, _) in enumerate(data['series'])]
+    legend.x, legend.y = width - 8, height - 6
+    legend.boxAnchor = 'ne'
+    legend.alignment = 'right'
+    legend.columnMaximum = 1
+    legend.deltax = 70
+    legend.dx = legend.dy = 7
+    legend.fontName = 'Helvetica'
+    legend.fontSize = 8
+    return legend
+
+
+def _style_axes(chart, data):
+    chart.valueAxis.valueMin = 0
+    chart.valueAxis.labels.fontName = 'Helvetica'
+    chart.valueAxis.labels.fontSize = 7
+    chart.valueAxis.visibleGrid = True
+    chart.valueAxis.gridStrokeColor = pdf_colors.HexColor(GRID)
+    chart.valueAxis.gridStrokeWidth = 0.5
+    chart.categoryAxis.categoryNames = _sparse_labels(data['categories'])
+    chart.categoryAxis.labels.fontName = 'Helvetica'
+    chart.categoryAxis.labels.fontSize = 7
+    if len(data['categories']) > 6:
+        chart.categoryAxis.labels.angle = 30
+        chart.categoryAxis.labels.boxAnchor = 'ne'
+
+
+def _build_line_chart(data, width, height):
+    drawing = Drawing(width, height)
+    chart = HorizontalLineChart()
+    chart.x, chart.y = 30, 40
+    chart.width, chart.height = width - 40, height - 65
+    chart.data = [values for _, values in data['series']]
+    chart.joinedLines = 0
+    _style_axes(chart, data)
+    for index, (_, values) in enumerate(data['series']):
+        # A line needs two points; a series with fewer only shows its marker
+        if sum(value is not None for value in values) > 1:
+            chart.lines[index].lineStyle = 'joinedLine'
+        chart.lines[index].strokeColor = _series_color(index)
+        chart.lines[index].strokeWidth = 1.5
+        chart.lines[index].symbol = makeMarker('FilledCircle', size=3)
+    drawing.add(chart)
+    drawing.add(_legend(data, width, height))
+    return drawing
+
+
+def _build_bar_chart(data, width, height):
+    drawing = Drawing(width, height)
+    chart = VerticalBarChart()
+    chart.x, chart.y = 30, 40
+    chart.width, chart.height = width - 40, height - 65
+    chart.data = [values for _, values in data['series']]
+    chart.groupSpacing = 8
+    chart.barSpacing = 1
+    _style_axes(chart, data)
+    for index in range(len(data['series'])):
+        chart.bars[index].fillColor = _series_color(index)
+        chart.bars[index].strokeColor = None
+    drawing.add(chart)
+    drawing.add(_legend(data, width, height))
+    return drawing
+
+
+CHART_BUILDERS = {
+    'line': _build_line_chart,
+    'bar': _build_bar_chart,
+}
+
+
+def flatten_drawing(node):
+    """Replace the widgets in a drawing, recursively, by the shapes they draw."""
+    while isinstance(node, UserNode):
+        node = node.provideNode()
+    if isinstance(node, Group):
+        node.contents = [flatten_drawing(child) for child in node.contents]
+    return node
+
+
+def render_chart(chart_type, data, width=CHART_WIDTH, height=CHART_HEIGHT):
+    """
+    Build a chart and flatten it into shapes.
+
+    Args:
+        chart_type: 'line' or 'bar'
+        data: {'categories': [...], 'series': [(name, [value per category]), ...]};
+            None values are skipped
+        width: Drawing width in points
+        height: Drawing height in points
+
+    Returns:
+        Drawing (a flowable) of primitive shapes
+    """
+    return flatten_drawing(CHART_BUILDERS[chart_type](data, width, height))
+
+
+def get_chart(chart_type, data, width=CHART_WIDTH, height=CHART_HEIGHT):
+    """render_chart() through the chart cache; returns a Drawing of this report's own."""
+    cache_key = chart_cache_key(chart_type, data, width, height)
+    drawing = cache.get(cache_key)
+    if drawing is None:
+        drawing = render_chart(chart_type, data, width, height)
+        cache.set(cache_key, drawing, get_chart_cache_timeout())
+        logger.debug(f"Rendered {chart_type} chart {cache_key}")
+    return drawing
@@ -0,0 +1,250 @@
+"""
+Background report generation.
+
+The report page used to build every PDF inside the request. Now it asks for
+a ReportJob (request_report), polls the job and downloads the PDF once the
+process_report_jobs command has built it off-request. Finished PDFs are kept
+in the report storage (REPORT_STORAGE) under the job's output_path.
+
+Jobs are keyed by a hash of their resolved parameters (report type,
+department and dates), so the same weekly report requested by several people
+on a Monday morning is built once: a request matching a job that is queued,
+running, or finished within REPORT_JOB_FRESHNESS_SECONDS gets that job.
+
+With REPORT_JOBS_RUN_ON_COMMIT enabled (the default when DEBUG is on) a new
+job is also built right after the requesting transaction commits, so local
+development works without running the worker.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import DynamicEvaluation, DynamicManagerEvaluation, ReportJob
+from .pdf_reports import report_evaluations, write_employee_report, write_manager_report, write_trends_report
+from .report_utils import get_department_info
+
+logger = logging.getLogger(__name__)
+
+# Progress is written to the job row in steps of this many percent
+PROGRESS_STEP = 5
+
+
+def get_report_storage():
+    """Storage the finished report PDFs are kept in (REPORT_STORAGE)."""
+    config = getattr(settings, "REPORT_STORAGE", None) or {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+        "OPTIONS": {"location": os.path.join(settings.BASE_DIR, "report_artifacts")},
+    }
+    return import_string(config["BACKEND"])(**config.get("OPTIONS", {}))
+
+
+def report_parameters(department_id, start_date, end_date, period=None):
+    """
+    Resolved, JSON-serializable parameters of a report.
+
+    Args:
+        department_id: Department id, or 'all'
+        start_date: Start of the reported period
+        end_date: End of the reported period
+        period: Length of the period in days (trends report)
+    """
+    parameters = {
+        "department": str(department_id),
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+    }
+    if period is not None:
+        parameters["period"] = int(period)
+    return parameters
+
+
+def params_hash(report_type, parameters):
+    """Stable hash of a report type and its parameters."""
+    payload = json.dumps({"report_type": report_type, **parameters}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def report_filename(job):
+    """Download file name, the same the synchronous report views use."""
+    return f"{job.report_type}_report_{job.parameters['start_date']}_{job.parameters['end_date']}.pdf"
+
+
+def find_reusable_job(report_type, parameters):
+    """
+    The latest job with the same parameters that is queued, running, or
+    finished within the freshness window, or None.
+    """
+    fresh_since = timezone.now() - timedelta(seconds=getattr(settings, "REPORT_JOB_FRESHNESS_SECONDS", 6 * 3600))
+    return (
+        ReportJob.objects.filter(params_hash=params_hash(report_type, parameters))
+        .filter(
+            Q(status__in=[ReportJob.QUEUED, ReportJob.RUNNING])
+            | Q(status=ReportJob.DONE, finished_at__gte=fresh_since)
+        )
+        .order_by("-created_at")
+        .first()
+    )
+
+
+def request_report(report_type, parameters, requested_by=None):
+    """
+    Get a job building the report, reusing a matching one if there is one.
+
+    Args:
+        report_type: One of ReportHistory.REPORT_TYPES
+        parameters: report_parameters() of the report
+        requested_by: UserProfile asking for the report
+
+    Returns:
+        (ReportJob, reused)
+    """
+    with transaction.atomic():
+        job = find_reusable_job(report_type, parameters)
+        if job:
+            logger.info(f"Reusing report job #{job.pk} ({job.status}) for {report_type} {parameters}")
+            return job, True
+
+        job = ReportJob.objects.create(
+            report_type=report_type,
+            parameters=parameters,
+            params_hash=params_hash(report_type, parameters),
+            requested_by=requested_by,
+        )
+        logger.info(f"Queued report job #{job.pk} for {report_type} {parameters}")
+
+        if getattr(settings, "REPORT_JOBS_RUN_ON_COMMIT", False):
+            job_id = job.pk
+            transaction.on_commit(lambda: process_next_job(job_ids=[job_id]))
+    return job, False
+
+
+def claim_next_job(job_ids=None):
+    """
+    Mark the oldest queued job as running and return it (None when idle).
+
+    Jobs left running longer than REPORT_JOB_TIMEOUT_SECONDS (a worker that
+    died) are claimed again. Other workers skip the row while it is claimed.
+    """
+    now = timezone.now()
+    stale_before = now - timedelta(seconds=getattr(settings, "REPORT_JOB_TIMEOUT_SECONDS", 1800))
+    with transaction.atomic():
+        due = ReportJob.objects.filter(
+            Q(status=ReportJob.QUEUED) | Q(status=ReportJob.RUNNING, started_at__lt=stale_before)
+        )
+        if job_ids is not None:
+            due = due.filter(pk__in=job_ids)
+        job = due.select_for_update(skip_locked=True).order_by("created_at", "pk").first()
+        if job is None:
+            return None
+        job.status = ReportJob.RUNNING
+        job.started_at = now
+        job.progress = 0
+        job.save(update_fields=["status", "started_at", "progress"])
+    return job
+
+
+class _ProgressRecorder:
+    """Writes a job's progress to its row when it advanced by PROGRESS_STEP."""
+
+    def __init__(self, job):
+        self.job = job
+        self.recorded = 0
+
+    def __call__(self, percent):
+        # 100% is only recorded once the file is stored
+        percent = min(percent, 99)
+        if percent - self.recorded >= PROGRESS_STEP:
+            self.recorded = percent
+            ReportJob.objects.filter(pk=self.job.pk).update(progress=percent)
+
+
+def write_job_report(job, output, progress=None):
+    """Write the PDF of a job to a binary file object."""
+    parameters = job.parameters
+    department_id = parameters["department"]
+    start_date = date.fromisoformat(parameters["start_date"])
+    end_date = date.fromisoformat(parameters["end_date"])
+    dept_name, _ = get_department_info(department_id)
+    include_department = department_id == "all"
+
+    if job.report_type == "employee":
+        evaluations = report_evaluations(DynamicEvaluation, department_id, start_date, end_date)
+        write_employee_report(output, evaluations, dept_name, start_date, end_date, include_department, progress)
+    elif job.report_type == "manager":
+        evaluations = report_evaluations(DynamicManagerEvaluation, department_id, start_date, end_date)
+        write_manager_report(output, evaluations, dept_name, start_date, end_date, include_department, progress)
+    elif job.report_type == "trends":
+        write_trends_report(output, department_id, dept_name, start_date, end_date, parameters["period"])
+    else:
+        raise ValueError(f"Unknown report type '{job.report_type}'")
+
+
+def run_job(job):
+    """
+    Build a claimed job's PDF and store it.
+
+    Returns:
+        The job, done or failed
+    """
+    try:
+        with tempfile.TemporaryFile(suffix=".pdf") as output:
+            write_job_report(job, output, _ProgressRecorder(job))
+            job.file_size = output.tell()
+            output.seek(0)
+            name = f"reports/{job.report_type}/{job.pk}_{report_filename(job)}"
+            job.output_path = get_report_storage().save(name, File(output, name=name))
+    except Exception as error:
+        logger.exception(f"Report job #{job.pk} failed")
+        job.status = ReportJob.FAILED
+        job.error = f"{type(error).__name__}: {error}"
+    else:
+        job.status = ReportJob.DONE
+        job.progress = 100
+        job.error = ""
+        logger.info(f"Report job #{job.pk} done: {job.output_path} ({job.file_size} bytes)")
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "progress", "output_path", "file_size", "error", "finished_at"])
+    return job
+
+
+def process_next_job(job_ids=None):
+    """Claim and build the next queued job; returns it, or None when idle."""
+    job = claim_next_job(job_ids)
+    if job is None:
+        return None
+    return run_job(job)
+
+
+def purge_expired_reports(retention_days=None):
+    """
+    Delete finished jobs older than REPORT_JOB_RETENTION_DAYS and their PDFs.
+
+    The report history keeps its rows; only the link to the job is cleared.
+
+    Returns:
+        Number of jobs deleted
+    """
+    retention_days = retention_days or getattr(settings, "REPORT_JOB_RETENTION_DAYS", 30)
+    expired = ReportJob.objects.filter(
+        status__in=[ReportJob.DONE, ReportJob.FAILED],
+        finished_at__lt=timezone.now() - timedelta(days=retention_days),
+    )
+    storage = get_report_storage()
+    for output_path in expired.exclude(output_path="").values_list("output_path", flat=True):
+        storage.delete(output_path)
+    deleted = expired.count()
+    expired.delete()
+    if deleted:
+        logger.info(f"Purged {deleted} report jobs older than {retention_days} days")
+    return deleted
@@ -0,0 +1,263 @@
+"""
+Process-level registry of the reportlab resources shared by the PDF reports.
+
+The style sheet, paragraph styles and table styles of the reports never
+change, but the report helpers used to rebuild them for every report, and
+for every table and question paragraph in it. The registry builds each of
+them on first use and hands out the same object afterwards, so they must be
+treated as read-only.
+
+Fork safety: the resources are plain Python objects without file handles or
+threads, so when gunicorn preloads the application the master can build them
+once (warm_report_resources()) and the workers inherit them copy-on-write.
+The lock guarding a first build is replaced in forked children, so a fork
+that happens during a build cannot leave a worker with a lock nobody will
+release.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from reportlab.lib import colors as pdf_colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.pdfbase import pdfmetrics
+from reportlab.platypus import Table, TableStyle
+
+# Fonts used by the table and paragraph styles below
+REPORT_FONTS = ('Helvetica', 'Helvetica-Bold')
+
+RED = '#DC2626'
+GRID = '#D1D5DB'
+STRIPE = '#F3F4F6'
+
+# Cell padding and alignment of the body tables
+_BODY_TABLE_LAYOUT = [
+    ('TOPPADDING', (0, 0), (-1, 0), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+    ('TOPPADDING', (0, 1), (-1, -1), 6),
+    ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
+    ('LEFTPADDING', (0, 0), (-1, -1), 8),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+    ('BACKGROUND', (0, 1), (-1, -1), 'white'),
+    ('GRID', (0, 0), (-1, -1), 0.5, GRID),
+]
+
+# TableStyle commands of every table template; colors are given as names or
+# hex strings and converted once when the template is built
+TABLE_STYLES = {
+    'summary': [
+        ('BACKGROUND', (0, 0), (-1, 0), RED),
+        ('TEXTCOLOR', (0, 0), (-1, 0), 'whitesmoke'),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), STRIPE),
+        ('GRID', (0, 0), (-1, -1), 1, GRID),
+    ],
+    'detail': [
+        ('BACKGROUND', (0, 0), (-1, 0), RED),
+        ('TEXTCOLOR', (0, 0), (-1, 0), 'whitesmoke'),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 9),
+        ('FONTSIZE', (0, 1), (-1, -1), 7),
+        *_BODY_TABLE_LAYOUT,
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), ['white', STRIPE]),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ],
+    # One page of the streamed employee and manager detail rows
+    'paged_detail': [
+        ('BACKGROUND', (0, 0), (-1, 0), RED),
+        ('TEXTCOLOR', (0, 0), (-1, 0), 'whitesmoke'),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 9),
+        ('FONTSIZE', (0, 1), (-1, -1), 7),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), 'white'),
+        ('GRID', (0, 0), (-1, -1), 0.5, GRID),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), ['white', STRIPE]),
+    ],
+    'chart_metrics': [
+        ('BACKGROUND', (0, 0), (-1, 0), RED),
+        ('TEXTCOLOR', (0, 0), (-1, 0), 'whitesmoke'),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('ALIGN', (1, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 9),
+        ('FONTSIZE', (0, 1), (-1, -1), 8),
+        *_BODY_TABLE_LAYOUT,
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), ['white', STRIPE]),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ],
+    'person_header': [
+        ('BACKGROUND', (0, 0), (-1, -1), RED),
+        ('TEXTCOLOR', (0, 0), (-1, -1), 'white'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 13),
+        ('FONTSIZE', (0, 1), (-1, 1), 10),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('LEFTPADDING', (0, 0), (-1, -1), 12),
+        ('TOPPADDING', (0, 0), (-1, 0), 8),
+        ('BOTTOMPADDING', (0, 1), (-1, 1), 8),
+    ],
+    'individual_question': [
+        ('BACKGROUND', (0, 0), (-1, 0), '#6B7280'),
+        ('TEXTCOLOR', (0, 0), (-1, 0), 'white'),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('ALIGN', (2, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 9),
+        ('FONTSIZE', (0, 1), (-1, -1), 8),
+        *_BODY_TABLE_LAYOUT,
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), ['white', '#F9FAFB']),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ],
+}
+
+# Table() options of the templates that need any
+TABLE_OPTIONS = {
+    'individual_question': {'repeatRows': 1},
+}
+
+
+class ResourceRegistry:
+    """
+    Memo of resource factories: each (factory, args) is built once per
+    process.
+
+    Inside bypass() every lookup calls the factory again, which is what the
+    reports cost before the registry (used by benchmark_report_resources).
+    """
+
+    def __init__(self):
+        self._resources = {}
+        # Reentrant: factories look up the resources they are built from
+        self._lock = threading.RLock()
+        self._bypass = False
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset_lock)
+
+    def get(self, factory, *args):
+        key = (factory, args)
+        if self._bypass:
+            return factory(*args)
+        try:
+            return self._resources[key]
+        except KeyError:
+            pass
+        with self._lock:
+            if key not in self._resources:
+                self._resources[key] = factory(*args)
+            return self._resources[key]
+
+    def clear(self):
+        with self._lock:
+            self._resources.clear()
+
+    def __len__(self):
+        return len(self._resources)
+
+    @contextmanager
+    def bypass(self):
+        self._bypass = True
+        try:
+            yield
+        finally:
+            self._bypass = False
+
+    def _reset_lock(self):
+        self._lock = threading.RLock()
+
+
+registry = ResourceRegistry()
+
+
+@dataclass(frozen=True)
+class TableTemplate:
+    """A shared TableStyle plus Table() options, applied to any rows."""
+
+    style: TableStyle
+    options: dict
+
+    def build(self, data, col_widths):
+        table = Table(data, colWidths=col_widths, **self.options)
+        table.setStyle(self.style)
+        return table
+
+
+def _color(value):
+    if isinstance(value, list):
+        return [_color(item) for item in value]
+    if isinstance(value, str) and value.startswith('#'):
+        return pdf_colors.HexColor(value)
+    if isinstance(value, str) and hasattr(pdf_colors, value):
+        return getattr(pdf_colors, value)
+    return value
+
+
+def _build_table_template(name):
+    commands = [
+        (command, start, stop, *[_color(value) for value in values])
+        for command, start, stop, *values in TABLE_STYLES[name]
+    ]
+    return TableTemplate(TableStyle(commands), TABLE_OPTIONS.get(name, {}))
+
+
+def _build_pdf_styles():
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        textColor=pdf_colors.HexColor(RED),
+        spaceAfter=30,
+        alignment=TA_CENTER
+    )
+    heading_style = ParagraphStyle(
+        'CustomHeading',
+        parent=styles['Heading2'],
+        fontSize=16,
+        textColor=pdf_colors.HexColor('#1a1a1a'),
+        spaceAfter=12,
+    )
+    return styles, title_style, heading_style
+
+
+def _build_question_style(font_size):
+    styles, _, _ = registry.get(_build_pdf_styles)
+    return ParagraphStyle('QuestionText', parent=styles['Normal'], fontSize=font_size, leading=9, wordWrap='CJK')
+
+
+def get_pdf_styles():
+    """(style sheet, title style, heading style) shared by the reports."""
+    return registry.get(_build_pdf_styles)
+
+
+def get_question_style(font_size=8):
+    """Paragraph style of wrapped question text."""
+    return registry.get(_build_question_style, font_size)
+
+
+def get_table_template(name):
+    """TableTemplate of one of the TABLE_STYLES."""
+    return registry.get(_build_table_template, name)
+
+
+def warm_report_resources():
+    """
+    Build every resource now, e.g. in a preloading gunicorn master before it
+    forks its workers. Also loads the metrics of the report fonts, which
+    reportlab otherwise reads on the first string width it measures.
+    """
+    for font_name in REPORT_FONTS:
+        pdfmetrics.getFont(font_name)
+    get_pdf_styles()
+    get_question_style()
+    for name in TABLE_STYLES:
+        get_table_template(name)
+    return len(registry)
@@ -0,0 +1,333 @@
+"""
+Set-based creation of pending evaluations and their blank answers.
+
+The scheduled commands used to loop over every (evaluator, evaluated, form)
+combination with a get_or_create per row. Instead, a plan is computed in a
+few queries:
+
+1. active forms are resolved per department once,
+2. the target rows for the period are built in memory,
+3. the targets are diffed against the stored rows in one query,
+
+and apply_plan() inserts the missing evaluations and answer stubs with
+chunked bulk_create(ignore_conflicts=True).
+
+bulk_create bypasses save() and the post_save signals, so apply_plan() keeps
+EvaluationStat, the analytics cache and the overdue lock state up to date
+itself.
+"""
+
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import transaction
+
+from authentication.models import UserProfile
+from .cache_utils import build_change_tags, invalidate_cache_tags
+from .constants import EvaluationStatus
+from .lock_state import invalidate_overdue_lock_state
+from .models import Answer, DynamicEvaluation, DynamicManagerEvaluation, EvalForm, ManagerAnswer, Question
+from .stats_utils import STAT_KEY_FIELDS, record_bulk_creation
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ScaffoldSpec:
+    """How one evaluation model is scaffolded."""
+
+    answer_model: type
+    start_field: str
+    end_field: str
+    # The person being evaluated; together with the form it identifies a
+    # target within one period
+    subject_field: str
+    # The person filling the evaluation in
+    owner_field: str
+
+
+SCAFFOLD_SPECS = {
+    DynamicEvaluation: ScaffoldSpec(Answer, 'week_start', 'week_end', 'employee_id', 'manager_id'),
+    DynamicManagerEvaluation: ScaffoldSpec(
+        ManagerAnswer, 'period_start', 'period_end', 'manager_id', 'senior_manager_id'
+    ),
+}
+
+
+@dataclass
+class ScaffoldPlan:
+    """Evaluations to create for one period."""
+
+    model: type
+    period_start: object
+    period_end: object
+    targets: list = field(default_factory=list)  # Unsaved model instances
+    existing: int = 0
+    skipped: list = field(default_factory=list)  # [(email, reason)]
+    timings: dict = field(default_factory=dict)  # {step: seconds}
+
+    @property
+    def spec(self):
+        return SCAFFOLD_SPECS[self.model]
+
+    def key(self, values):
+        """Target key of an instance or a values() row."""
+        spec = self.spec
+        if isinstance(values, dict):
+            return values[spec.subject_field], values['form_id']
+        return getattr(values, spec.subject_field), values.form_id
+
+    def existing_keys(self):
+        """Keys of the stored rows for the plan's forms and period (one query)."""
+        spec = self.spec
+        form_ids = {target.form_id for target in self.targets}
+        return set(
+            self.model.objects.filter(
+                form_id__in=form_ids,
+                **{spec.start_field: self.period_start, spec.end_field: self.period_end},
+            ).values_list(spec.subject_field, 'form_id')
+        )
+
+
+@dataclass
+class ScaffoldResult:
+    """Outcome of apply_plan()."""
+
+    rows: list = field(default_factory=list)  # values() of the created rows, including 'pk'
+    answers: int = 0
+    timings: dict = field(default_factory=dict)  # {step: seconds}
+
+    @property
+    def created(self):
+        return len(self.rows)
+
+
+def format_timings(timings):
+    """'step 1.2 ms, step 3.4 ms' for command output."""
+    return ', '.join(f"{step} {seconds * 1000:.1f} ms" for step, seconds in timings.items())
+
+
+class _Timer:
+    """Records the duration of consecutive steps into a timings dict."""
+
+    def __init__(self, timings):
+        self.timings = timings
+        self.last = time.perf_counter()
+
+    def lap(self, step):
+        now = time.perf_counter()
+        self.timings[step] = self.timings.get(step, 0.0) + now - self.last
+        self.last = now
+
+
+def _active_forms_by_department(evaluation_type):
+    """Ids of the active forms of one type, per department id."""
+    forms = EvalForm.objects.filter(is_active=True, name=evaluation_type)
+    forms_by_department = defaultdict(list)
+    for form_id, form_department_id in forms.order_by('pk').values_list('pk', 'department_id'):
+        forms_by_department[form_department_id].append(form_id)
+    return forms_by_department
+
+
+def _drop_existing(plan):
+    """Remove the targets that are already stored from the plan."""
+    if not plan.targets:
+        return
+    existing = plan.existing_keys()
+    targets = len(plan.targets)
+    plan.targets = [target for target in plan.targets if plan.key(target) not in existing]
+    plan.existing = targets - len(plan.targets)
+
+
+def plan_weekly_evaluations(week_start, week_end, evaluation_type, manager_email=None, department_id=None):
+    """
+    Plan the weekly evaluations every manager owes their team.
+
+    Args:
+        week_start: Monday of the week
+        week_end: Sunday of the week
+        evaluation_type: Form name (e.g. 'Weekly Evaluation')
+        manager_email: Only plan the team of this manager
+        department_id: Only plan employees of this department
+
+    Returns:
+        ScaffoldPlan whose targets are the evaluations not stored yet
+    """
+    plan = ScaffoldPlan(DynamicEvaluation, week_start, week_end)
+    timer = _Timer(plan.timings)
+    forms_by_department = _active_forms_by_department(evaluation_type)
+
+    employees = UserProfile.objects.filter(manager__role='manager')
+    if manager_email:
+        employees = employees.filter(manager__user__email__iexact=manager_email)
+    rows = employees.order_by('manager_id', 'pk').values_list('pk', 'manager_id', 'department_id', 'user__email')
+    timer.lap('resolve')
+
+    for employee_id, manager_id, employee_department_id, email in rows:
+        if not employee_department_id:
+            plan.skipped.append((email, 'no department assigned'))
+            continue
+        if department_id and str(employee_department_id) != str(department_id):
+            continue
+        form_ids = forms_by_department.get(employee_department_id)
+        if not form_ids:
+            plan.skipped.append((email, f'no active {evaluation_type.lower()} form'))
+            continue
+        plan.targets.extend(
+            DynamicEvaluation(
+                form_id=form_id,
+                department_id=employee_department_id,
+                manager_id=manager_id,
+                employee_id=employee_id,
+                week_start=week_start,
+                week_end=week_end,
+                status=EvaluationStatus.PENDING,
+            )
+            for form_id in form_ids
+        )
+    timer.lap('plan')
+
+    _drop_existing(plan)
+    timer.lap('diff')
+    return plan
+
+
+def plan_manager_evaluations(period_start, period_end, evaluation_type, senior_manager_email=None,
+                             department_id=None):
+    """
+    Plan the evaluations senior management owes the department managers.
+
+    Each manager gets one evaluation per active form of their department,
+    assigned to the first senior manager (by id) matching the filter, the
+    same row the old per-manager get_or_create produced.
+
+    Args:
+        period_start: First day of the evaluation period
+        period_end: Last day of the evaluation period
+        evaluation_type: Form name (e.g. 'Monthly Evaluation')
+        senior_manager_email: Assign the evaluations to this senior manager
+        department_id: Only plan managers of this department
+
+    Returns:
+        ScaffoldPlan whose targets are the evaluations not stored yet
+    """
+    plan = ScaffoldPlan(DynamicManagerEvaluation, period_start, period_end)
+    timer = _Timer(plan.timings)
+    forms_by_department = _active_forms_by_department(evaluation_type)
+
+    senior_managers = UserProfile.objects.filter(role__in=UserProfile.SENIOR_MANAGEMENT_ROLES)
+    if senior_manager_email:
+        senior_managers = senior_managers.filter(user__email__iexact=senior_manager_email)
+    senior_manager_id = senior_managers.order_by('pk').values_list('pk', flat=True).first()
+
+    managers = UserProfile.objects.filter(role='manager')
+    if department_id:
+        managers = managers.filter(department_id=department_id)
+    rows = managers.order_by('pk').values_list('pk', 'managed_department', 'user__email')
+    timer.lap('resolve')
+
+    if senior_manager_id is None:
+        return plan
+
+    for manager_id, managed_department_id, email in rows:
+        if not managed_department_id:
+            plan.skipped.append((email, 'no department assigned'))
+            continue
+        form_ids = forms_by_department.get(managed_department_id)
+        if not form_ids:
+            plan.skipped.append((email, f'no active {evaluation_type.lower()} form'))
+            continue
+        plan.targets.extend(
+            DynamicManagerEvaluation(
+                form_id=form_id,
+                department_id=managed_department_id,
+                senior_manager_id=senior_manager_id,
+                manager_id=manager_id,
+                period_start=period_start,
+                period_end=period_end,
+                status=EvaluationStatus.PENDING,
+            )
+            for form_id in form_ids
+        )
+    timer.lap('plan')
+
+    _drop_existing(plan)
+    timer.lap('diff')
+    return plan
+
+
+def apply_plan(plan, batch_size=None):
+    """
+    Insert the planned evaluations and their blank answers.
+
+    Runs in one transaction. The plan's forms are locked first, so concurrent
+    runs for the same forms take turns, and the targets are diffed again
+    under the lock: a re-run (or a run that lost the race) inserts nothing.
+
+    Args:
+        plan: ScaffoldPlan from one of the plan_* functions
+        batch_size: Rows per INSERT (default EVALUATION_SCAFFOLD_BATCH_SIZE)
+
+    Returns:
+        ScaffoldResult
+    """
+    batch_size = batch_size or getattr(settings, 'EVALUATION_SCAFFOLD_BATCH_SIZE', 500)
+    spec = plan.spec
+    result = ScaffoldResult()
+    if not plan.targets:
+        return result
+
+    timer = _Timer(result.timings)
+    form_ids = sorted({target.form_id for target in plan.targets})
+    with transaction.atomic():
+        list(EvalForm.objects.select_for_update().filter(pk__in=form_ids).order_by('pk').values_list('pk'))
+        existing = plan.existing_keys()
+        missing = {plan.key(target): target for target in plan.targets if plan.key(target) not in existing}
+        timer.lap('diff')
+        if not missing:
+            return result
+
+        plan.model.objects.bulk_create(missing.values(), batch_size=batch_size, ignore_conflicts=True)
+        # ignore_conflicts leaves the primary keys unset, so read the new rows back
+        created = [
+            row for row in plan.model.objects.filter(
+                form_id__in=form_ids,
+                **{spec.start_field: plan.period_start, spec.end_field: plan.period_end},
+            ).values('pk', 'form_id', *{*STAT_KEY_FIELDS[plan.model], spec.subject_field, spec.owner_field})
+            if plan.key(row) in missing
+        ]
+        result.rows = created
+        timer.lap('insert')
+
+        questions = defaultdict(list)
+        for form_id, question_id in Question.objects.filter(form_id__in=form_ids).values_list('form_id', 'pk'):
+            questions[form_id].append(question_id)
+        answers = [
+            spec.answer_model(instance_id=row['pk'], question_id=question_id)
+            for row in created
+            for question_id in questions[row['form_id']]
+        ]
+        spec.answer_model.objects.bulk_create(answers, batch_size=batch_size, ignore_conflicts=True)
+        result.answers = len(answers)
+        timer.lap('answers')
+
+        # What save() and the post_save signals would have done per row
+        record_bulk_creation(plan.model, created)
+        invalidate_cache_tags(build_change_tags(
+            departments={row['department_id'] for row in created},
+            managers={row['manager_id'] for row in created} | {row[spec.owner_field] for row in created},
+            forms=form_ids,
+            start_date=plan.period_start,
+            end_date=plan.period_end,
+        ))
+        invalidate_overdue_lock_state({row[spec.owner_field] for row in created})
+        timer.lap('stats')
+
+    logger.info(
+        f"Created {result.created} {plan.model.__name__} rows and {result.answers} answer stubs "
+        f"for {plan.period_start}–{plan.period_end} ({format_timings(result.timings)})"
+    )
+    return result
@@ -2,7 +2,9 @@ from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.db import transaction
 from .models import EvalForm, Question, QuestionChoice, DynamicEvaluation, DynamicManagerEvaluation
-from .cache_utils import invalidate_analytics_cache, invalidate_user_analytics_cache
+from .cache_utils import invalidate_evaluation_cache, invalidate_form_cache
+from .lock_state import invalidate_overdue_lock_state
+from .stats_utils import affects_stats, record_stat_change, remove_evaluation_answers, stat_key_for
 from authentication.models import Department
 import logging
 
@@ -100,19 +102,33 @@ DEFAULT_QUESTIONS = {
 def invalidate_cache_for_instance(instance, action="updated"):
     """
     Helper function to invalidate analytics cache for evaluation-related changes.
+    Only entries depending on the instance's department, managers, form or
+    period are expired.
     """
-    logger.info(f"{instance.__class__.__name__} {action}: {instance.id}, invalidating analytics cache")
-    invalidate_analytics_cache()
+    logger.info(f"{instance.__class__.__name__} {action}: {instance.id}, invalidating dependent analytics cache")
+    if isinstance(instance, EvalForm):
+        invalidate_form_cache(instance)
+    else:
+        invalidate_evaluation_cache(instance)
 
-    # Invalidate related user caches if available
-    for attr in ["manager", "senior_manager"]:
-        if hasattr(instance, attr):
-            obj = getattr(instance, attr)
-            if obj and hasattr(obj, "user"):
-                invalidate_user_analytics_cache(obj.user.id)
 
 
 
+def invalidate_lock_state_for_instance(instance, update_fields=None):
+    """
+    Drop the cached overdue lock state of the user who has to complete an evaluation.
+
+    Saves that don't touch status, dates or assignees leave it alone. If the
+    evaluation was reassigned, the previous evaluator's state is dropped too.
+    """
+    if not affects_stats(instance, update_fields):
+        return
+    if isinstance(instance, DynamicManagerEvaluation):
+        owner_id = instance.senior_manager_id
+    else:
+        owner_id = instance.manager_id
+    invalidate_overdue_lock_state({owner_id, getattr(instance, '_stored_evaluator_id', None)})
+
 
 @receiver(post_save, sender=EvalForm)
 def create_default_questions_for_evaluations(sender, instance, created, **kwargs):
@@ -158,23 +174,33 @@ def create_default_questions_for_evaluations(sender, instance, created, **kwargs
 
 # Cache Invalidation Signals
 @receiver(post_save, sender=DynamicEvaluation)
-def on_dynamic_evaluation_save(sender, instance, created, **kwargs):
+def on_dynamic_evaluation_save(sender, instance, created, update_fields=None, **kwargs):
     invalidate_cache_for_instance(instance, "created" if created else "updated")
+    invalidate_lock_state_for_instance(instance, update_fields)
 
 
 @receiver(post_delete, sender=DynamicEvaluation)
 def on_dynamic_evaluation_delete(sender, instance, **kwargs):
+    # Runs inside the deletion transaction, also for queryset deletes
+    record_stat_change(stat_key_for(instance), None)
+    remove_evaluation_answers(instance)
     invalidate_cache_for_instance(instance, "deleted")
+    invalidate_lock_state_for_instance(instance)
 
 
 @receiver(post_save, sender=DynamicManagerEvaluation)
-def on_manager_evaluation_save(sender, instance, created, **kwargs):
+def on_manager_evaluation_save(sender, instance, created, update_fields=None, **kwargs):
     invalidate_cache_for_instance(instance, "created" if created else "updated")
+    invalidate_lock_state_for_instance(instance, update_fields)
 
 
 @receiver(post_delete, sender=DynamicManagerEvaluation)
 def on_manager_evaluation_delete(sender, instance, **kwargs):
+    # Runs inside the deletion transaction, also for queryset deletes
+    record_stat_change(stat_key_for(instance), None)
+    remove_evaluation_answers(instance)
     invalidate_cache_for_instance(instance, "deleted")
+    invalidate_lock_state_for_instance(instance)
 
 
 @receiver(post_save, sender=EvalForm)
@@ -71,6 +71,66 @@ function hideLoading() {
     }
 }
 
+// Update the progress line of the loading modal
+function setLoadingProgress(text) {
+    const progress = document.getElementById('loading-progress');
+    if (progress) {
+        progress.textContent = text;
+    }
+}
+
+// Milliseconds between report job status checks
+const REPORT_POLL_INTERVAL = 1500;
+
+// Queue a report job (or reuse an identical recent one) and download the PDF when it is built
+function requestReport(params) {
+    showLoading();
+    setLoadingProgress('Queued...');
+    
+    fetch('/evaluation/reports/jobs/', {
+        method: 'POST',
+        headers: {'X-CSRFToken': getCSRFToken()},
+        body: new URLSearchParams(params),
+    })
+        .then(response => response.json())
+        .then(data => {
+            if (!data.success) {
+                throw new Error(data.error || 'Request failed');
+            }
+            pollReportJob(data.job);
+        })
+        .catch(error => {
+            hideLoading();
+            alert(`Could not generate the report: ${error.message}`);
+        });
+}
+
+// Follow a report job until it is done or failed
+function pollReportJob(job) {
+    if (job.status === 'done') {
+        setLoadingProgress('Downloading...');
+        window.location.href = job.download_url;
+        setTimeout(hideLoading, 1000);
+        return;
+    }
+    if (job.status === 'failed') {
+        hideLoading();
+        alert(job.error);
+        return;
+    }
+    
+    setLoadingProgress(job.status === 'running' ? `${job.progress}% complete` : 'Waiting for the report worker...');
+    setTimeout(() => {
+        fetch(job.status_url)
+            .then(response => response.json())
+            .then(data => pollReportJob(data.job))
+            .catch(error => {
+                hideLoading();
+                alert(`Could not check the report status: ${error.message}`);
+            });
+    }, REPORT_POLL_INTERVAL);
+}
+
 // Generate Employee Report
 function generateEmployeeReport() {
     const form = document.getElementById('employee-report-form');
@@ -93,30 +153,22 @@ function generateEmployeeReport() {
         }
     }
     
-    // Build URL with parameters
-    let url = '/evaluation/reports/employee-pdf/?';
-    url += `department=${encodeURIComponent(department)}`;
-    url += `&date_range=${encodeURIComponent(dateRange)}`;
+    // Build report parameters
+    const params = {
+        report_type: 'employee',
+        department: department,
+        date_range: dateRange,
+    };
     
     if (dateRange === 'custom') {
-        url += `&start_date=${encodeURIComponent(startDate)}`;
-        url += `&end_date=${encodeURIComponent(endDate)}`;
+        params.start_date = startDate;
+        params.end_date = endDate;
     }
     
-    // Show loading
-    showLoading();
-    
-    // Download PDF (currently only PDF is implemented)
+    // Generate PDF in the background (currently only PDF is implemented)
     if (format === 'pdf') {
-        // Open PDF in new window/download
-        window.location.href = url;
-        
-        // Hide loading after a short delay
-        setTimeout(() => {
-            hideLoading();
-        }, 1000);
+        requestReport(params);
     } else {
-        hideLoading();
         alert(`${format.toUpperCase()} export format is not yet implemented. Currently only PDF is available.`);
     }
 }
@@ -143,30 +195,22 @@ function generateManagerReport() {
         }
     }
     
-    // Build URL with parameters
-    let url = '/evaluation/reports/manager-pdf/?';
-    url += `department=${encodeURIComponent(department)}`;
-    url += `&date_range=${encodeURIComponent(dateRange)}`;
+    // Build report parameters
+    const params = {
+        report_type: 'manager',
+        department: department,
+        date_range: dateRange,
+    };
     
     if (dateRange === 'custom') {
-        url += `&start_date=${encodeURIComponent(startDate)}`;
-        url += `&end_date=${encodeURIComponent(endDate)}`;
+        params.start_date = startDate;
+        params.end_date = endDate;
     }
     
-    // Show loading
-    showLoading();
-    
-    // Download PDF (currently only PDF is implemented)
+    // Generate PDF in the background (currently only PDF is implemented)
     if (format === 'pdf') {
-        // Open PDF in new window/download
-        window.location.href = url;
-        
-        // Hide loading after a short delay
-        setTimeout(() => {
-            hideLoading();
-        }, 1000);
+        requestReport(params);
     } else {
-        hideLoading();
         alert(`${format.toUpperCase()} export format is not yet implemented. Currently only PDF is available.`);
     }
 }
@@ -180,25 +224,14 @@ function generateTrendsReport() {
     const period = formData.get('period');
     const format = formData.get('format');
     
-    // Build URL with parameters
-    let url = '/evaluation/reports/trends-pdf/?';
-    url += `department=${encodeURIComponent(department)}`;
-    url += `&period=${encodeURIComponent(period)}`;
-    
-    // Show loading
-    showLoading();
-    
-    // Download PDF (currently only PDF is implemented)
+    // Generate PDF in the background (currently only PDF is implemented)
     if (format === 'pdf') {
-        // Open PDF in new window/download
-        window.location.href = url;
-        
-        // Hide loading after a short delay
-        setTimeout(() => {
-            hideLoading();
-        }, 1000);
+        requestReport({
+            report_type: 'trends',
+            department: department,
+            period: period,
+        });
     } else {
-        hideLoading();
         alert(`${format.toUpperCase()} export format is not yet implemented. Currently only PDF is available.`);
     }
 }
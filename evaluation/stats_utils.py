@@ -0,0 +1,627 @@
+"""
+Pre-aggregated evaluation statistics.
+
+EvaluationStat rows hold the number of evaluations per (kind, department,
+manager, evaluator, period, status). They are maintained incrementally in the
+same transaction as the evaluation write and can be rebuilt from scratch with
+the ``rebuild_evaluation_stats`` management command.
+
+Overdue counts are not stored: a pending row is overdue once its period has
+ended, so it is derived at read time from ``period_end``.
+
+AnswerRollup rows hold sum/count/min/max and a histogram of the numeric
+answers of completed evaluations per question, department and period or
+month bucket, so trend charts don't have to load every Answer row. They are
+updated by DynamicEvaluationForm.save and rebuilt by ``rebuild_answer_rollups``.
+
+The trends report aggregates the answers of its questions in the database
+(get_trend_question_stats, get_trend_period_averages). With
+TRENDS_REPORT_USE_ROLLUPS enabled it reads the answer rollups instead, once
+they have been built.
+"""
+
+import calendar
+import logging
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Avg, Count, DateField, F, Q, Sum
+from django.db.models.functions import Coalesce, Trunc
+
+from .constants import EvaluationStatus
+from .models import (
+    Answer, AnswerRollup, DynamicEvaluation, DynamicManagerEvaluation, EvaluationStat, ManagerAnswer,
+)
+
+logger = logging.getLogger(__name__)
+
+# Fields of each evaluation model that determine its rollup row
+STAT_KEY_FIELDS = {
+    DynamicEvaluation: ('department_id', 'manager_id', 'week_start', 'week_end', 'status'),
+    DynamicManagerEvaluation: ('department_id', 'manager_id', 'senior_manager_id', 'period_start', 'period_end', 'status'),
+}
+
+# EvaluationStat fields identifying a rollup row, in stat_key_from_values order
+STAT_LOOKUP_FIELDS = ('kind', 'department_id', 'manager_id', 'evaluator_id', 'period_start', 'period_end', 'status')
+
+
+def stat_key_from_values(model, values):
+    """
+    Build the rollup key for an evaluation from its field values.
+
+    Args:
+        model: DynamicEvaluation or DynamicManagerEvaluation
+        values: Mapping of the model's STAT_KEY_FIELDS to values
+
+    Returns:
+        Dictionary of EvaluationStat lookup fields
+    """
+    if model is DynamicEvaluation:
+        return {
+            'kind': EvaluationStat.EMPLOYEE,
+            'department_id': values['department_id'],
+            'manager_id': values['manager_id'],
+            'evaluator_id': values['manager_id'],
+            'period_start': values['week_start'],
+            'period_end': values['week_end'],
+            'status': values['status'],
+        }
+    return {
+        'kind': EvaluationStat.MANAGER,
+        'department_id': values['department_id'],
+        'manager_id': values['manager_id'],
+        'evaluator_id': values['senior_manager_id'],
+        'period_start': values['period_start'],
+        'period_end': values['period_end'],
+        'status': values['status'],
+    }
+
+
+def _stat_row_key(stat):
+    """Return the lookup key of a stored EvaluationStat row."""
+    return {field: getattr(stat, field) for field in STAT_LOOKUP_FIELDS}
+
+
+def stat_key_for(evaluation):
+    """Return the rollup key for an in-memory evaluation instance."""
+    model = type(evaluation)
+    return stat_key_from_values(model, {field: getattr(evaluation, field) for field in STAT_KEY_FIELDS[model]})
+
+
+def affects_stats(evaluation, update_fields):
+    """Return whether a save with ``update_fields`` can change the rollup key."""
+    if update_fields is None:
+        return True
+    key_fields = {field.removesuffix('_id') for field in STAT_KEY_FIELDS[type(evaluation)]}
+    return any(field.removesuffix('_id') in key_fields for field in update_fields)
+
+
+def stored_stat_key_for(evaluation):
+    """
+    Return the rollup key of the evaluation as currently stored in the database.
+
+    The row is locked so concurrent status changes of the same evaluation are
+    applied one after the other. Must be called inside a transaction.
+    """
+    model = type(evaluation)
+    if evaluation.pk is None:
+        return None
+    values = (
+        model.objects.select_for_update()
+        .filter(pk=evaluation.pk)
+        .values(*STAT_KEY_FIELDS[model])
+        .first()
+    )
+    return stat_key_from_values(model, values) if values else None
+
+
+def _increment(key, amount):
+    """Add ``amount`` to the rollup row for ``key``, creating it if needed."""
+    updated = EvaluationStat.objects.filter(**key).update(count=F('count') + amount)
+    if updated or amount < 0:
+        return
+    try:
+        with transaction.atomic():
+            EvaluationStat.objects.create(count=amount, **key)
+    except IntegrityError:
+        # Another transaction created the row first
+        EvaluationStat.objects.filter(**key).update(count=F('count') + amount)
+
+
+def record_stat_change(old_key, new_key):
+    """
+    Move one evaluation from ``old_key`` to ``new_key`` in the rollup table.
+
+    Either key may be None for creations and deletions. Rows that drop to zero
+    are removed so the table only holds populated buckets.
+    """
+    if old_key == new_key:
+        return
+    if old_key:
+        _increment(old_key, -1)
+        EvaluationStat.objects.filter(count__lte=0, **old_key).delete()
+    if new_key:
+        _increment(new_key, 1)
+
+
+def record_bulk_creation(model, rows):
+    """
+    Count evaluations inserted with bulk_create, which bypasses save().
+
+    Existing rollup rows are incremented with one bulk UPDATE and missing ones
+    inserted with one bulk INSERT, whatever the number of keys.
+
+    Args:
+        model: DynamicEvaluation or DynamicManagerEvaluation
+        rows: Mappings of the model's STAT_KEY_FIELDS of the new rows
+    """
+    counts = Counter(tuple(stat_key_from_values(model, row).items()) for row in rows)
+    if not counts:
+        return
+    keys = [dict(key) for key in counts]
+
+    with transaction.atomic():
+        stored = {
+            tuple(_stat_row_key(stat).items()): stat
+            for stat in EvaluationStat.objects.filter(
+                kind__in={key['kind'] for key in keys},
+                manager_id__in={key['manager_id'] for key in keys},
+                period_start__in={key['period_start'] for key in keys},
+            )
+        }
+        updated = []
+        for key, amount in counts.items():
+            if key in stored:
+                stored[key].count = F('count') + amount
+                updated.append(stored[key])
+        EvaluationStat.objects.bulk_update(updated, ['count'], batch_size=500)
+
+        missing = [(dict(key), amount) for key, amount in counts.items() if key not in stored]
+        try:
+            with transaction.atomic():
+                EvaluationStat.objects.bulk_create(
+                    [EvaluationStat(count=amount, **key) for key, amount in missing], batch_size=500
+                )
+        except IntegrityError:
+            # Another transaction created some of the rows first
+            for key, amount in missing:
+                _increment(key, amount)
+
+
+def rebuild_evaluation_stats():
+    """
+    Recompute the whole rollup table from the evaluation tables.
+
+    Returns:
+        Number of rollup rows written
+    """
+    rows = []
+    for model in STAT_KEY_FIELDS:
+        fields = STAT_KEY_FIELDS[model]
+        for values in model.objects.order_by().values(*fields).annotate(total=Count('id')):
+            rows.append(EvaluationStat(count=values['total'], **stat_key_from_values(model, values)))
+
+    with transaction.atomic():
+        EvaluationStat.objects.all().delete()
+        EvaluationStat.objects.bulk_create(rows, batch_size=1000)
+
+    logger.info(f"Rebuilt evaluation statistics: {len(rows)} rollup rows")
+    return len(rows)
+
+
+def _stats_queryset(kind, start_date=None, end_date=None, **filters):
+    """Rollup rows of one kind overlapping the optional date range."""
+    queryset = EvaluationStat.objects.filter(kind=kind, **filters)
+    if start_date:
+        queryset = queryset.filter(period_end__gte=start_date)
+    if end_date:
+        queryset = queryset.filter(period_start__lte=end_date)
+    return queryset
+
+
+def _stat_aggregates(today):
+    return {
+        'total': Coalesce(Sum('count'), 0),
+        'completed': Coalesce(Sum('count', filter=Q(status=EvaluationStatus.COMPLETED)), 0),
+        'pending': Coalesce(Sum('count', filter=Q(status=EvaluationStatus.PENDING)), 0),
+        'overdue': Coalesce(Sum('count', filter=Q(status=EvaluationStatus.PENDING, period_end__lt=today)), 0),
+    }
+
+
+def empty_stats():
+    """Statistics for a scope without evaluations."""
+    return {'total': 0, 'completed': 0, 'pending': 0, 'overdue': 0}
+
+
+def get_rollup_stats(kind, today, start_date=None, end_date=None, **filters):
+    """
+    Read evaluation statistics from the rollup table.
+
+    Args:
+        kind: EvaluationStat.EMPLOYEE or EvaluationStat.MANAGER
+        today: Current date for overdue calculation
+        start_date: Optional start of the period filter
+        end_date: Optional end of the period filter
+        **filters: Extra EvaluationStat lookups (e.g. department=dept)
+
+    Returns:
+        Dictionary with total, completed, pending, overdue counts, matching
+        the shape of calculate_eval_stats
+    """
+    return _stats_queryset(kind, start_date, end_date, **filters).aggregate(**_stat_aggregates(today))
+
+
+def get_rollup_stats_by(kind, group_field, today, start_date=None, end_date=None, **filters):
+    """
+    Read evaluation statistics grouped by a rollup dimension.
+
+    Args:
+        kind: EvaluationStat.EMPLOYEE or EvaluationStat.MANAGER
+        group_field: Dimension to group by ('department', 'manager' or 'evaluator')
+        today: Current date for overdue calculation
+        start_date: Optional start of the period filter
+        end_date: Optional end of the period filter
+        **filters: Extra EvaluationStat lookups
+
+    Returns:
+        Dictionary mapping the dimension's id to a statistics dictionary.
+        Use ``.get(id, empty_stats())`` for ids without evaluations.
+    """
+    group_column = f"{group_field}_id"
+    rows = (
+        _stats_queryset(kind, start_date, end_date, **filters)
+        .order_by()
+        .values(group_column)
+        .annotate(**_stat_aggregates(today))
+    )
+    return {
+        row[group_column]: {key: row[key] for key in ('total', 'completed', 'pending', 'overdue')}
+        for row in rows
+    }
+
+
+# ---------------------------------------------------------------------------
+# Answer rollups
+# ---------------------------------------------------------------------------
+
+# Answer model and period fields of each evaluation model
+ANSWER_SOURCES = {
+    DynamicEvaluation: (Answer, EvaluationStat.EMPLOYEE, 'week_start', 'week_end'),
+    DynamicManagerEvaluation: (ManagerAnswer, EvaluationStat.MANAGER, 'period_start', 'period_end'),
+}
+
+
+def _month_bounds(day):
+    """First and last day of the month containing ``day``."""
+    return day.replace(day=1), day.replace(day=calendar.monthrange(day.year, day.month)[1])
+
+
+def _answer_buckets(period_start, period_end):
+    """Period and month buckets an evaluation's answers are counted in."""
+    month_start, month_end = _month_bounds(period_start)
+    return [
+        (AnswerRollup.PERIOD, period_start, period_end),
+        (AnswerRollup.MONTH, month_start, month_end),
+    ]
+
+
+def _answer_rollup_keys(evaluation, question_id):
+    model = type(evaluation)
+    _, kind, start_field, end_field = ANSWER_SOURCES[model]
+    return [
+        {
+            'kind': kind,
+            'question_id': question_id,
+            'department_id': evaluation.department_id,
+            'granularity': granularity,
+            'period_start': start,
+            'period_end': end,
+        }
+        for granularity, start, end in _answer_buckets(getattr(evaluation, start_field), getattr(evaluation, end_field))
+    ]
+
+
+def _recompute_answer_rollup(key):
+    """Recompute one rollup row from the answer table."""
+    model = next(m for m, source in ANSWER_SOURCES.items() if source[1] == key['kind'])
+    answer_model, _, start_field, _ = ANSWER_SOURCES[model]
+    answers = answer_model.objects.filter(
+        question_id=key['question_id'],
+        instance__department_id=key['department_id'],
+        instance__status=EvaluationStatus.COMPLETED,
+        int_value__isnull=False,
+    )
+    if key['granularity'] == AnswerRollup.PERIOD:
+        answers = answers.filter(**{
+            f'instance__{start_field}': key['period_start'],
+            f'instance__{ANSWER_SOURCES[model][3]}': key['period_end'],
+        })
+    else:
+        answers = answers.filter(**{
+            f'instance__{start_field}__gte': key['period_start'],
+            f'instance__{start_field}__lte': key['period_end'],
+        })
+
+    histogram = {
+        str(row['int_value']): row['total']
+        for row in answers.order_by().values('int_value').annotate(total=Count('id'))
+    }
+    if not histogram:
+        AnswerRollup.objects.filter(**key).delete()
+        return
+
+    values = [int(value) for value in histogram]
+    AnswerRollup.objects.update_or_create(defaults={
+        'answer_count': sum(histogram.values()),
+        'value_sum': sum(int(value) * count for value, count in histogram.items()),
+        'value_min': min(values),
+        'value_max': max(values),
+        'histogram': histogram,
+    }, **key)
+
+
+def _apply_answer_delta(key, old_value, new_value):
+    """Replace ``old_value`` by ``new_value`` in one rollup row (either may be None)."""
+    with transaction.atomic():
+        row = AnswerRollup.objects.select_for_update().filter(**key).first()
+        if row is None:
+            if old_value is not None:
+                # Row missing although a value was counted: rebuild it from the answers
+                _recompute_answer_rollup(key)
+                return
+            row = AnswerRollup(histogram={}, **key)
+
+        if old_value is not None:
+            if row.value_min is None or row.value_max is None or not row.histogram.get(str(old_value)):
+                # Row doesn't count the value it should: rebuild it from the answers
+                _recompute_answer_rollup(key)
+                return
+            if old_value <= row.value_min or old_value >= row.value_max:
+                # Removing an extreme value: min/max can only be found by rescanning the bucket
+                _recompute_answer_rollup(key)
+                return
+            row.answer_count -= 1
+            row.value_sum -= old_value
+            row.histogram[str(old_value)] -= 1
+            if not row.histogram[str(old_value)]:
+                del row.histogram[str(old_value)]
+
+        if new_value is not None:
+            row.answer_count += 1
+            row.value_sum += new_value
+            row.value_min = new_value if row.value_min is None else min(row.value_min, new_value)
+            row.value_max = new_value if row.value_max is None else max(row.value_max, new_value)
+            row.histogram[str(new_value)] = row.histogram.get(str(new_value), 0) + 1
+
+        try:
+            with transaction.atomic():
+                row.save()
+        except IntegrityError:
+            # Row created concurrently; fall back to a full recompute of the bucket
+            _recompute_answer_rollup(key)
+
+
+def record_answer_changes(evaluation, changes, was_completed):
+    """
+    Apply submitted answer changes of one evaluation to the answer rollups.
+
+    Args:
+        evaluation: DynamicEvaluation or DynamicManagerEvaluation after the save
+        changes: Iterable of (question_id, old_int_value, new_int_value)
+        was_completed: Whether the old values were already counted, i.e. the
+            evaluation was completed before this submission
+    """
+    is_completed = evaluation.status == EvaluationStatus.COMPLETED
+    for question_id, old_value, new_value in changes:
+        old_value = old_value if was_completed else None
+        new_value = new_value if is_completed else None
+        if old_value == new_value:
+            continue
+        for key in _answer_rollup_keys(evaluation, question_id):
+            _apply_answer_delta(key, old_value, new_value)
+
+
+def remove_evaluation_answers(evaluation):
+    """Recompute the rollups an evaluation's answers were counted in (after deletion)."""
+    if evaluation.status != EvaluationStatus.COMPLETED:
+        return
+    question_ids = AnswerRollup.objects.filter(
+        kind=ANSWER_SOURCES[type(evaluation)][1],
+        department_id=evaluation.department_id,
+        question__form_id=evaluation.form_id,
+    ).values_list('question_id', flat=True).distinct()
+    for question_id in list(question_ids):
+        for key in _answer_rollup_keys(evaluation, question_id):
+            _recompute_answer_rollup(key)
+
+
+def rebuild_answer_rollups():
+    """
+    Recompute all answer rollups from the answer tables.
+
+    Returns:
+        Number of rollup rows written
+    """
+    rows = {}
+    for model, (answer_model, kind, start_field, end_field) in ANSWER_SOURCES.items():
+        values = (
+            answer_model.objects.filter(instance__status=EvaluationStatus.COMPLETED, int_value__isnull=False)
+            .order_by()
+            .values('question_id', 'instance__department_id', f'instance__{start_field}',
+                    f'instance__{end_field}', 'int_value')
+            .annotate(total=Count('id'))
+        )
+        for item in values:
+            value, total = item['int_value'], item['total']
+            for granularity, start, end in _answer_buckets(item[f'instance__{start_field}'], item[f'instance__{end_field}']):
+                key = (kind, item['question_id'], item['instance__department_id'], granularity, start, end)
+                row = rows.get(key)
+                if row is None:
+                    row = rows[key] = AnswerRollup(
+                        kind=kind, question_id=key[1], department_id=key[2], granularity=granularity,
+                        period_start=start, period_end=end, histogram={},
+                    )
+                row.answer_count += total
+                row.value_sum += value * total
+                row.value_min = value if row.value_min is None else min(row.value_min, value)
+                row.value_max = value if row.value_max is None else max(row.value_max, value)
+                row.histogram[str(value)] = row.histogram.get(str(value), 0) + total
+
+    with transaction.atomic():
+        AnswerRollup.objects.all().delete()
+        AnswerRollup.objects.bulk_create(rows.values(), batch_size=1000)
+
+    logger.info(f"Rebuilt answer rollups: {len(rows)} rows")
+    return len(rows)
+
+
+def get_department_answer_totals(kind, start_date=None, end_date=None, **filters):
+    """
+    Sum the period answer rollups per department and question.
+
+    Date filters use the same overlap rule as the evaluation queries
+    (period_start <= end_date and period_end >= start_date).
+
+    Args:
+        kind: EvaluationStat.EMPLOYEE or EvaluationStat.MANAGER
+        start_date: Optional start of the period filter
+        end_date: Optional end of the period filter
+        **filters: Extra AnswerRollup lookups (e.g. question__order=2)
+
+    Returns:
+        Dictionary mapping department id to {question_id: {'sum', 'count'}}
+    """
+    queryset = AnswerRollup.objects.filter(kind=kind, granularity=AnswerRollup.PERIOD, **filters)
+    if start_date:
+        queryset = queryset.filter(period_end__gte=start_date)
+    if end_date:
+        queryset = queryset.filter(period_start__lte=end_date)
+
+    totals = defaultdict(dict)
+    rows = queryset.order_by().values('department_id', 'question_id').annotate(
+        total_sum=Sum('value_sum'), total_count=Sum('answer_count')
+    )
+    for row in rows:
+        totals[row['department_id']][row['question_id']] = {'sum': row['total_sum'], 'count': row['total_count']}
+    return totals
+
+
+# ---------------------------------------------------------------------------
+# Trends report aggregates
+# ---------------------------------------------------------------------------
+
+def trend_answers(model, department_id, start_date, end_date):
+    """
+    Numeric answers to trend questions of the completed evaluations of a
+    model submitted in the period, of one department or 'all'.
+    """
+    answers = ANSWER_SOURCES[model][0].objects.filter(
+        instance__status=EvaluationStatus.COMPLETED,
+        instance__submitted_at__gte=start_date,
+        instance__submitted_at__lte=end_date,
+        question__include_in_trends=True,
+        int_value__isnull=False,
+    )
+    if department_id != 'all':
+        answers = answers.filter(instance__department_id=department_id)
+    return answers
+
+
+def _trend_rollups(model, department_id, start_date, end_date):
+    """Period rollups of trend questions overlapping the period."""
+    rollups = AnswerRollup.objects.filter(
+        kind=ANSWER_SOURCES[model][1],
+        granularity=AnswerRollup.PERIOD,
+        question__include_in_trends=True,
+        period_end__gte=start_date,
+        period_start__lte=end_date,
+    )
+    if department_id != 'all':
+        rollups = rollups.filter(department_id=department_id)
+    return rollups
+
+
+def use_trend_rollups(model):
+    """
+    Whether the trends report reads the answer rollups of a model: only with
+    TRENDS_REPORT_USE_ROLLUPS enabled and once rollups have been built.
+
+    Rollups are bucketed by evaluation period, so a period that only partly
+    overlaps the report dates counts as a whole, while the answer queries
+    filter on the submission date.
+    """
+    if not getattr(settings, 'TRENDS_REPORT_USE_ROLLUPS', False):
+        return False
+    return AnswerRollup.objects.filter(kind=ANSWER_SOURCES[model][1]).exists()
+
+
+def get_trend_question_stats(model, department_id, start_date, end_date, use_rollups=False):
+    """
+    Answer count, sum and histogram per trend question.
+
+    Args:
+        model: DynamicEvaluation or DynamicManagerEvaluation
+        department_id: Department id, or 'all'
+        start_date: Start of the reported period
+        end_date: End of the reported period
+        use_rollups: Read the answer rollups instead of the answers
+
+    Returns:
+        Dictionary mapping question id to {'count', 'sum', 'histogram'}, the
+        histogram being a Counter of answer values
+    """
+    if use_rollups:
+        rows = (
+            (question_id, int(value), total)
+            for question_id, histogram in _trend_rollups(model, department_id, start_date, end_date)
+            .values_list('question_id', 'histogram').iterator()
+            for value, total in histogram.items()
+        )
+    else:
+        rows = (
+            trend_answers(model, department_id, start_date, end_date)
+            .order_by().values_list('question_id', 'int_value').annotate(total=Count('id'))
+        )
+
+    stats = {}
+    for question_id, value, total in rows:
+        question_stats = stats.setdefault(question_id, {'count': 0, 'sum': 0, 'histogram': Counter()})
+        question_stats['count'] += total
+        question_stats['sum'] += value * total
+        question_stats['histogram'][value] += total
+    return stats
+
+
+def get_trend_period_averages(model, department_id, start_date, end_date, trunc_kind, use_rollups=False):
+    """
+    Average answer to trend questions per week or month.
+
+    Answers are bucketed by submission date, rollups by evaluation period
+    start.
+
+    Args:
+        trunc_kind: 'week' or 'month'
+        (other arguments as get_trend_question_stats)
+
+    Returns:
+        List of (bucket start date, average, answer count) ordered by date
+    """
+    if use_rollups:
+        rows = (
+            _trend_rollups(model, department_id, start_date, end_date)
+            .annotate(bucket=Trunc('period_start', trunc_kind, output_field=DateField()))
+            .order_by().values('bucket')
+            .annotate(total_sum=Sum('value_sum'), total=Sum('answer_count'))
+            .order_by('bucket')
+        )
+        return [(row['bucket'], row['total_sum'] / row['total'], row['total']) for row in rows if row['total']]
+
+    rows = (
+        trend_answers(model, department_id, start_date, end_date)
+        .annotate(bucket=Trunc('instance__submitted_at', trunc_kind, output_field=DateField()))
+        .order_by().values('bucket')
+        .annotate(average=Avg('int_value'), total=Count('id'))
+        .order_by('bucket')
+    )
+    return [(row['bucket'], row['average'], row['total']) for row in rows]
@@ -1,3 +1,1891 @@
-from django.test import TestCase
+from datetime import date, datetime, time as dt_time, timedelta, timezone as dt_timezone
+from importlib import import_module
+from io import BytesIO, StringIO
+import itertools
+import os
+import pickle
+import shutil
+import signal
+import tempfile
+import threading
+import time
+from unittest import skipUnless
+from unittest.mock import Mock, patch
 
-# Create your tests here.
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.contrib.messages import get_messages
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.core import mail
+from django.core.cache import cache, caches
+from django.core.mail import EmailMessage
+from django.core.mail.backends.locmem import EmailBackend as LocmemBackend
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+from reportlab.pdfgen.canvas import Canvas
+
+from authentication.models import Department, OutboxMessage
+from goals.utils.permissions import role_context
+from inventory_app.context_processors import low_stock_processor
+from inventory_app.models import Inventory, UniformCatalog
+from .analytics_snapshot import (
+    AnalyticsSnapshot,
+    _load_partials,
+    build_analytics_snapshot,
+    load_range_partial,
+    split_date_range,
+)
+from .cache_utils import (
+    FILL_LOCK_PREFIX,
+    RANGE_LRU_INDEX_KEY,
+    analytics_dashboard_cache_key,
+    analytics_scope_for,
+    build_dependency_tags,
+    cache_fill_lock,
+    get_analytics_cache,
+    get_analytics_dashboard_users,
+    get_many_tagged,
+    get_many_tagged_lru,
+    get_tagged,
+    invalidate_cache_tags,
+    invalidate_evaluation_cache,
+    read_tagged,
+    schedule_refresh,
+    set_tagged,
+    set_tagged_lru,
+    single_flight,
+    warm_analytics_cache,
+)
+from .constants import EvaluationStatus
+from .forms import DynamicEvaluationForm
+from .lock_state import get_overdue_lock_state, lock_state_cache_key
+from .middleware import OverdueEvaluationLockMiddleware
+from .pdf_reports import NARROW_COLUMNS, PagedTable, monthly_status_chart, write_trends_report
+from .report_charts import CHART_BUILDERS, CHART_HEIGHT, CHART_WIDTH, chart_cache_key, get_chart, render_chart
+from .report_jobs import get_report_storage, process_next_job, purge_expired_reports, report_parameters, request_report
+from .report_resources import get_pdf_styles, get_table_template, registry, warm_report_resources
+from .report_utils import create_question_paragraph, create_summary_table
+from .models import (
+    Answer, AnswerRollup, ManagerAnswer, DynamicEvaluation, DynamicManagerEvaluation, EvalForm, EvaluationStat,
+    Question, ReportHistory, ReportJob,
+)
+from .scaffolding import apply_plan, plan_manager_evaluations, plan_weekly_evaluations
+from .senior_middleware import OverdueManagerEvaluationLockMiddleware
+from .url_policy import OVERDUE_EVALUATION_ALLOWED, OVERDUE_MANAGER_EVALUATION_ALLOWED, PathPolicy
+from .stats_utils import (
+    get_rollup_stats, get_rollup_stats_by, get_trend_period_averages, get_trend_question_stats, rebuild_answer_rollups,
+    rebuild_evaluation_stats, use_trend_rollups,
+)
+from .views import (
+    _build_performance_overview_data,
+    get_department_customer_experience_comparison,
+    get_department_last_question_comparison,
+    get_department_question_comparison,
+    get_department_third_question_comparison,
+    get_all_managers_rating_trends,
+)
+from .utils import calculate_eval_stats
+from firehousemovers.utils.bulk_mail import send_bulk_mail
+
+
+class EvaluationTestDataMixin:
+    """Shared fixtures for evaluation tests."""
+
+    def create_department(self, title):
+        return Department.objects.create(title=title, slug=title.lower().replace(' ', '-'))
+
+    def create_profile(self, username, role='driver', department=None, manager=None):
+        user = User.objects.create_user(username=username, email=f'{username}@example.com', password='testpass123')
+        profile = user.userprofile
+        profile.role = role
+        profile.department = department
+        profile.manager = manager
+        profile.save()
+        return profile
+
+    def create_form(self, department, name='Weekly Evaluation', is_active=True):
+        return EvalForm.objects.create(department=department, name=name, is_active=is_active)
+
+    def create_evaluation(self, form, manager, employee, week_start, status=EvaluationStatus.PENDING):
+        return DynamicEvaluation.objects.create(
+            form=form,
+            department=form.department,
+            manager=manager,
+            employee=employee,
+            week_start=week_start,
+            week_end=week_start + timedelta(days=6),
+            status=status,
+        )
+
+
+    def create_manager_evaluation(self, form, senior_manager, manager, period_start, period_end,
+                                  status=EvaluationStatus.PENDING):
+        return DynamicManagerEvaluation.objects.create(
+            form=form,
+            department=form.department,
+            senior_manager=senior_manager,
+            manager=manager,
+            period_start=period_start,
+            period_end=period_end,
+            status=status,
+        )
+
+
+class TaggedAnalyticsCacheTest(EvaluationTestDataMixin, TestCase):
+    """Test cases for dependency-tracked analytics cache invalidation"""
+
+    def setUp(self):
+        """Set up test data"""
+        get_analytics_cache().clear()
+        caches['default'].clear()
+
+        self.sales = self.create_department('Sales Team')
+        self.claims = self.create_department('Claims Team')
+        self.manager = self.create_profile('manager1', role='manager', department=self.sales)
+        self.employee = self.create_profile('employee1', department=self.sales, manager=self.manager)
+        self.sales_form = self.create_form(self.sales)
+        self.claims_form = self.create_form(self.claims)
+        self.week_start = date(2025, 10, 6)
+
+    def test_tagged_roundtrip(self):
+        """Test values stored with tags are returned while their tags are unchanged"""
+        set_tagged('entry', {'total': 3}, build_dependency_tags(departments=[self.sales]))
+        self.assertEqual(get_tagged('entry'), {'total': 3})
+        self.assertIsNone(get_tagged('missing'))
+
+    def test_evaluation_save_expires_dependent_entries_only(self):
+        """Test saving an evaluation only expires entries that depend on it"""
+        set_tagged('sales', 'sales-data', build_dependency_tags(departments=[self.sales]))
+        set_tagged('claims', 'claims-data', build_dependency_tags(departments=[self.claims]))
+        set_tagged('org', 'org-data', build_dependency_tags())
+
+        self.create_evaluation(self.sales_form, self.manager, self.employee, self.week_start)
+
+        self.assertIsNone(get_tagged('sales'))
+        self.assertIsNone(get_tagged('org'))
+        self.assertEqual(get_tagged('claims'), 'claims-data')
+
+    def test_date_range_dependencies(self):
+        """Test entries for other months survive an evaluation save"""
+        set_tagged('october', 'oct', build_dependency_tags(start_date=date(2025, 10, 1), end_date=date(2025, 10, 31)))
+        set_tagged('january', 'jan', build_dependency_tags(start_date=date(2025, 1, 1), end_date=date(2025, 1, 31)))
+
+        self.create_evaluation(self.sales_form, self.manager, self.employee, self.week_start)
+
+        self.assertIsNone(get_tagged('october'))
+        self.assertEqual(get_tagged('january'), 'jan')
+
+    def test_week_spanning_two_months(self):
+        """Test a week crossing a month boundary expires both months"""
+        set_tagged('november', 'nov', build_dependency_tags(start_date=date(2025, 11, 1), end_date=date(2025, 11, 30)))
+
+        self.create_evaluation(self.sales_form, self.manager, self.employee, date(2025, 10, 27))
+
+        self.assertIsNone(get_tagged('november'))
+
+    def test_manager_dependencies(self):
+        """Test team entries are expired by evaluations of that manager only"""
+        other_manager = self.create_profile('manager2', role='manager', department=self.claims)
+        set_tagged('team1', 'team1', build_dependency_tags(managers=[self.manager]))
+        set_tagged('team2', 'team2', build_dependency_tags(managers=[other_manager]))
+
+        evaluation = self.create_evaluation(self.sales_form, self.manager, self.employee, self.week_start)
+        invalidate_evaluation_cache(evaluation)
+
+        self.assertIsNone(get_tagged('team1'))
+        self.assertEqual(get_tagged('team2'), 'team2')
+
+    def test_form_update_expires_department_entries(self):
+        """Test editing a form expires entries for its department in every period"""
+        set_tagged('sales', 'sales', build_dependency_tags(
+            departments=[self.sales], start_date=date(2024, 1, 1), end_date=date(2024, 3, 31)
+        ))
+        set_tagged('claims', 'claims', build_dependency_tags(departments=[self.claims]))
+
+        self.sales_form.description = 'Updated'
+        self.sales_form.save()
+
+        self.assertIsNone(get_tagged('sales'))
+        self.assertEqual(get_tagged('claims'), 'claims')
+
+    def test_evaluation_save_leaves_default_cache_alone(self):
+        """Test evaluation saves no longer clear unrelated cache aliases"""
+        caches['default'].set('unrelated', 'keep-me')
+
+        evaluation = self.create_evaluation(self.sales_form, self.manager, self.employee, self.week_start)
+        evaluation.status = EvaluationStatus.COMPLETED
+        evaluation.save()
+        evaluation.delete()
+
+        self.assertEqual(caches['default'].get('unrelated'), 'keep-me')
+
+    def test_evicted_tag_version_expires_entry(self):
+        """Test an entry is treated as stale if a tag version was evicted"""
+        set_tagged('entry', 'value', build_dependency_tags(departments=[self.sales]))
+        get_analytics_cache().delete(f'analytics_tag:department:{self.sales.id}')
+
+        self.assertIsNone(get_tagged('entry'))
+
+
+class EvaluationStatRollupTest(EvaluationTestDataMixin, TestCase):
+    """Test cases for the incrementally maintained EvaluationStat rollup"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.sales = self.create_department('Sales Team')
+        self.claims = self.create_department('Claims Team')
+        self.senior = self.create_profile('senior1', role='vp')
+        self.manager = self.create_profile('manager1', role='manager', department=self.sales, manager=self.senior)
+        self.employees = [
+            self.create_profile(f'employee{i}', department=self.sales, manager=self.manager)
+            for i in range(3)
+        ]
+        self.sales_form = self.create_form(self.sales)
+        self.monthly_form = self.create_form(self.claims, name='Manager Review')
+        self.today = date(2025, 10, 15)
+
+    def test_create_update_delete_maintain_counts(self):
+        """Test rollup rows follow evaluation creation, status changes and deletion"""
+        evaluation = self.create_evaluation(self.sales_form, self.manager, self.employees[0], date(2025, 10, 6))
+        row = EvaluationStat.objects.get()
+        self.assertEqual((row.kind, row.status, row.count), (EvaluationStat.EMPLOYEE, EvaluationStatus.PENDING, 1))
+        self.assertEqual(row.evaluator_id, self.manager.id)
+
+        evaluation.status = EvaluationStatus.COMPLETED
+        evaluation.save()
+        row = EvaluationStat.objects.get()
+        self.assertEqual((row.status, row.count), (EvaluationStatus.COMPLETED, 1))
+
+        evaluation.delete()
+        self.assertFalse(EvaluationStat.objects.exists())
+
+    def test_unrelated_update_keeps_counts(self):
+        """Test saves that don't touch rollup fields leave the counts alone"""
+        evaluation = self.create_evaluation(self.sales_form, self.manager, self.employees[0], date(2025, 10, 6))
+        evaluation.is_archived = True
+        evaluation.save(update_fields=['is_archived'])
+        self.assertEqual(EvaluationStat.objects.get().count, 1)
+
+    def test_queryset_delete_updates_counts(self):
+        """Test bulk deletes are reflected in the rollup"""
+        for employee in self.employees:
+            self.create_evaluation(self.sales_form, self.manager, employee, date(2025, 10, 6))
+        self.assertEqual(EvaluationStat.objects.get().count, 3)
+
+        DynamicEvaluation.objects.filter(employee=self.employees[0]).delete()
+        self.assertEqual(EvaluationStat.objects.get().count, 2)
+
+    def test_migration_backfills_existing_evaluations(self):
+        """Test the 0025 migration counts the evaluations that existed before it"""
+        self.create_evaluation(self.sales_form, self.manager, self.employees[0], date(2025, 10, 6))
+        self.create_evaluation(self.sales_form, self.manager, self.employees[1], date(2025, 10, 6),
+                               status=EvaluationStatus.COMPLETED)
+        self.create_manager_evaluation(self.monthly_form, self.senior, self.manager,
+                                       date(2025, 9, 1), date(2025, 9, 30))
+        fields = ('kind', 'department_id', 'manager_id', 'evaluator_id', 'period_start', 'period_end', 'status', 'count')
+        expected = sorted(EvaluationStat.objects.values_list(*fields), key=str)
+        EvaluationStat.objects.all().delete()
+
+        import_module('evaluation.migrations.0025_evaluationstat').backfill_evaluation_stats(apps, None)
+
+        self.assertEqual(sorted(EvaluationStat.objects.values_list(*fields), key=str), expected)
+        self.assertEqual(len(expected), 3)
+
+    def test_rollup_matches_raw_statistics(self):
+        """Test rollup reads agree with calculate_eval_stats on the raw rows"""
+        self.create_evaluation(self.sales_form, self.manager, self.employees[0], date(2025, 9, 29))
+        self.create_evaluation(self.sales_form, self.manager, self.employees[1], date(2025, 10, 13))
+        self.create_evaluation(self.sales_form, self.manager, self.employees[2], date(2025, 10, 6),
+                               status=EvaluationStatus.COMPLETED)
+        self.create_manager_evaluation(self.monthly_form, self.senior, self.manager,
+                                       date(2025, 9, 1), date(2025, 9, 30))
+
+        raw = calculate_eval_stats(DynamicEvaluation.objects.all(), self.today, 'week_end')
+        self.assertEqual(get_rollup_stats(EvaluationStat.EMPLOYEE, self.today), raw)
+        self.assertEqual(raw, {'total': 3, 'completed': 1, 'pending': 2, 'overdue': 1})
+
+        raw_filtered = calculate_eval_stats(
+            DynamicEvaluation.objects.filter(week_start__lte=date(2025, 10, 12), week_end__gte=date(2025, 10, 6)),
+            self.today, 'week_end'
+        )
+        self.assertEqual(
+            get_rollup_stats(EvaluationStat.EMPLOYEE, self.today, date(2025, 10, 6), date(2025, 10, 12)),
+            raw_filtered,
+        )
+
+        by_dept = get_rollup_stats_by(EvaluationStat.MANAGER, 'department', self.today)
+        self.assertEqual(by_dept, {self.claims.id: {'total': 1, 'completed': 0, 'pending': 1, 'overdue': 1}})
+
+    def test_rebuild_command(self):
+        """Test the backfill command reproduces the incrementally maintained rows"""
+        self.create_evaluation(self.sales_form, self.manager, self.employees[0], date(2025, 10, 6))
+        self.create_evaluation(self.sales_form, self.manager, self.employees[1], date(2025, 10, 6),
+                               status=EvaluationStatus.COMPLETED)
+        self.create_manager_evaluation(self.monthly_form, self.senior, self.manager,
+                                       date(2025, 9, 1), date(2025, 9, 30))
+        expected = sorted(EvaluationStat.objects.values_list('kind', 'department_id', 'manager_id', 'evaluator_id',
+                                                             'period_start', 'status', 'count'))
+
+        EvaluationStat.objects.all().delete()
+        call_command('rebuild_evaluation_stats', stdout=StringIO())
+
+        rebuilt = sorted(EvaluationStat.objects.values_list('kind', 'department_id', 'manager_id', 'evaluator_id',
+                                                            'period_start', 'status', 'count'))
+        self.assertEqual(rebuilt, expected)
+        self.assertEqual(rebuild_evaluation_stats(), 3)
+
+    def test_analytics_views_use_rollup(self):
+        """Test the analytics dashboards render their counts from the rollup"""
+        self.create_evaluation(self.sales_form, self.manager, self.employees[0], date(2025, 10, 6),
+                               status=EvaluationStatus.COMPLETED)
+        self.create_evaluation(self.sales_form, self.manager, self.employees[1], date(2025, 10, 6))
+        self.client.force_login(self.senior.user)
+
+        response = self.client.get(reverse('evaluation:senior_analytics_dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['employee_stats']['total_employee_evals'], 2)
+        self.assertEqual(response.context['employee_stats']['completed_employee_evals'], 1)
+        sales_analytics = next(
+            item for item in response.context['department_analytics'] if item.department_id == self.sales.id
+        )
+        self.assertEqual(sales_analytics.employee_stats.total, 2)
+
+        response = self.client.get(reverse('evaluation:analytics_department_detail', args=[self.sales.id]))
+        self.assertEqual(response.context['dept_stats']['total'], 2)
+
+
+class AnswerRollupTest(EvaluationTestDataMixin, TestCase):
+    """Test cases for the trend chart answer rollups"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.sales = self.create_department('Sales Team')
+        self.claims = self.create_department('Claims Team')
+        self.manager = self.create_profile('manager1', role='manager', department=self.sales)
+        self.employees = [
+            self.create_profile(f'employee{i}', department=self.sales, manager=self.manager)
+            for i in range(3)
+        ]
+        self.form = self.create_form(self.sales)
+        self.rating = Question.objects.create(form=self.form, text='Work Volume', qtype='rating',
+                                              order=0, min_value=1, max_value=10)
+        self.notes = Question.objects.create(form=self.form, text='Notes', qtype='short', order=1, required=False)
+
+    def submit(self, evaluation, rating, notes=''):
+        """Submit an evaluation the way handle_evaluation_submission does."""
+        form = DynamicEvaluationForm(
+            {f'q_{self.rating.id}': str(rating), f'q_{self.notes.id}': notes},
+            instance=evaluation,
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        evaluation.status = EvaluationStatus.COMPLETED
+        evaluation.save()
+        form.save()
+
+    def rollup(self, granularity=AnswerRollup.PERIOD, week_start=date(2025, 10, 6)):
+        return AnswerRollup.objects.get(question=self.rating, granularity=granularity,
+                                        period_start=week_start if granularity == AnswerRollup.PERIOD
+                                        else week_start.replace(day=1))
+
+    def test_submission_updates_rollups(self):
+        """Test submitted numeric answers are added to period and month rollups"""
+        for employee, rating in zip(self.employees, (4, 8, 6)):
+            self.submit(self.create_evaluation(self.form, self.manager, employee, date(2025, 10, 6)), rating)
+
+        row = self.rollup()
+        self.assertEqual((row.answer_count, row.value_sum, row.value_min, row.value_max), (3, 18, 4, 8))
+        self.assertEqual(row.histogram, {'4': 1, '8': 1, '6': 1})
+        self.assertEqual(self.rollup(AnswerRollup.MONTH).answer_count, 3)
+        self.assertFalse(AnswerRollup.objects.filter(question=self.notes).exists())
+
+    def test_resubmission_replaces_values(self):
+        """Test editing a completed evaluation moves its value and keeps min/max exact"""
+        first = self.create_evaluation(self.form, self.manager, self.employees[0], date(2025, 10, 6))
+        second = self.create_evaluation(self.form, self.manager, self.employees[1], date(2025, 10, 6))
+        self.submit(first, 2)
+        self.submit(second, 7)
+
+        self.submit(DynamicEvaluation.objects.get(pk=first.pk), 5)
+
+        row = self.rollup()
+        self.assertEqual((row.answer_count, row.value_sum, row.value_min, row.value_max), (2, 12, 5, 7))
+        self.assertEqual(row.histogram, {'5': 1, '7': 1})
+
+    def test_inconsistent_row_is_recomputed(self):
+        """Test a row missing the replaced value or its min/max is rebuilt from the answers"""
+        evaluations = [
+            self.create_evaluation(self.form, self.manager, employee, date(2025, 10, 6)) for employee in self.employees
+        ]
+        for evaluation, rating in zip(evaluations, (2, 6, 9)):
+            self.submit(evaluation, rating)
+        AnswerRollup.objects.filter(pk=self.rollup().pk).update(histogram={'2': 1, '9': 1})
+        AnswerRollup.objects.filter(pk=self.rollup(AnswerRollup.MONTH).pk).update(value_min=None, value_max=None)
+
+        self.submit(DynamicEvaluation.objects.get(pk=evaluations[1].pk), 5)
+
+        for row in (self.rollup(), self.rollup(AnswerRollup.MONTH)):
+            self.assertEqual((row.answer_count, row.value_sum, row.value_min, row.value_max), (3, 16, 2, 9))
+            self.assertEqual(row.histogram, {'2': 1, '5': 1, '9': 1})
+
+    def test_scaffolded_answers_are_not_counted_twice(self):
+        """Test answers saved before completion are only counted on submission"""
+        evaluation = self.create_evaluation(self.form, self.manager, self.employees[0], date(2025, 10, 6))
+        Answer.objects.create(instance=evaluation, question=self.rating, int_value=3)
+
+        self.submit(DynamicEvaluation.objects.get(pk=evaluation.pk), 9)
+
+        row = self.rollup()
+        self.assertEqual((row.answer_count, row.value_sum), (1, 9))
+
+    def test_deleting_evaluation_removes_answers(self):
+        """Test deleted evaluations drop out of the rollups"""
+        keep = self.create_evaluation(self.form, self.manager, self.employees[0], date(2025, 10, 6))
+        drop = self.create_evaluation(self.form, self.manager, self.employees[1], date(2025, 10, 6))
+        self.submit(keep, 4)
+        self.submit(drop, 10)
+
+        drop.delete()
+
+        row = self.rollup()
+        self.assertEqual((row.answer_count, row.value_sum, row.value_max), (1, 4, 4))
+
+    def test_rebuild_matches_incremental_rollups(self):
+        """Test the rebuild command and the 0027 migration reproduce the incrementally maintained rows"""
+        for week_start, employee, rating in ((date(2025, 9, 29), self.employees[0], 3),
+                                             (date(2025, 10, 6), self.employees[1], 8),
+                                             (date(2025, 10, 6), self.employees[2], 5)):
+            self.submit(self.create_evaluation(self.form, self.manager, employee, week_start), rating)
+
+        fields = ('kind', 'question_id', 'department_id', 'granularity', 'period_start', 'period_end',
+                  'answer_count', 'value_sum', 'value_min', 'value_max', 'histogram')
+        expected = sorted(AnswerRollup.objects.values_list(*fields), key=str)
+
+        AnswerRollup.objects.all().delete()
+        call_command('rebuild_answer_rollups', stdout=StringIO())
+
+        self.assertEqual(sorted(AnswerRollup.objects.values_list(*fields), key=str), expected)
+        self.assertEqual(rebuild_answer_rollups(), len(expected))
+
+        AnswerRollup.objects.all().delete()
+        import_module('evaluation.migrations.0027_answerrollup').backfill_answer_rollups(apps, None)
+        self.assertEqual(sorted(AnswerRollup.objects.values_list(*fields), key=str), expected)
+
+    def test_department_question_comparison_reads_rollups(self):
+        """Test the department comparison chart averages answers from the rollups"""
+        claims_manager = self.create_profile('manager2', role='manager', department=self.claims)
+        claims_employee = self.create_profile('employee9', department=self.claims, manager=claims_manager)
+        claims_form = self.create_form(self.claims)
+        claims_rating = Question.objects.create(form=claims_form, text='Claims Closed', qtype='rating',
+                                                order=0, min_value=1, max_value=10)
+
+        self.submit(self.create_evaluation(self.form, self.manager, self.employees[0], date(2025, 10, 6)), 4)
+        self.submit(self.create_evaluation(self.form, self.manager, self.employees[1], date(2025, 10, 13)), 7)
+        claims_eval = self.create_evaluation(claims_form, claims_manager, claims_employee, date(2025, 10, 6))
+        form = DynamicEvaluationForm({f'q_{claims_rating.id}': '9'}, instance=claims_eval)
+        self.assertTrue(form.is_valid(), form.errors)
+        claims_eval.status = EvaluationStatus.COMPLETED
+        claims_eval.save()
+        form.save()
+
+        with self.assertNumQueries(3):
+            chart = get_department_question_comparison(0)
+        self.assertEqual(chart['labels'], ['Claims Team', 'Sales Team'])
+        self.assertEqual(chart['data'], [9.0, 5.5])
+
+        chart = get_department_question_comparison(0, start_date_obj=date(2025, 10, 13), end_date_obj=date(2025, 10, 19))
+        self.assertEqual(chart['labels'], ['Sales Team'])
+        self.assertEqual(chart['data'], [7.0])
+
+        # Sales' last question is free text, so only Claims has a numeric last question
+        chart = get_department_last_question_comparison()
+        self.assertEqual((chart['labels'], chart['data']), (['Claims Team'], [9.0]))
+        self.assertFalse(get_department_third_question_comparison()['has_data'])
+        self.assertFalse(get_department_customer_experience_comparison()['has_data'])
+
+
+class ManagersRatingTrendsTest(EvaluationTestDataMixin, TestCase):
+    """Test cases for the batched manager rating trends"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.department = self.create_department('Operations Team')
+        self.senior = self.create_profile('senior1', role='vp')
+        self.managers = []
+        for i, (first, last) in enumerate((('Alice', 'Adams'), ('Bob', 'Brown'))):
+            manager = self.create_profile(f'manager{i}', role='manager', department=self.department, manager=self.senior)
+            manager.user.first_name, manager.user.last_name = first, last
+            manager.user.save()
+            self.managers.append(manager)
+        self.form = self.create_form(self.department, name='Manager Review')
+        Question.objects.create(form=self.form, text='Goals Achieved', qtype='long', order=0)
+        self.rating = Question.objects.create(form=self.form, text='Overall Rating', qtype='stars', order=1)
+
+    def add_evaluations(self, months, rating_for):
+        """Create one rated evaluation per manager for each month (1-based) of 2025."""
+        for month in months:
+            for manager in self.managers:
+                evaluation = self.create_manager_evaluation(
+                    self.form, self.senior, manager, date(2025, month, 1), date(2025, month, 28),
+                    status=EvaluationStatus.COMPLETED,
+                )
+                ManagerAnswer.objects.create(instance=evaluation, question=self.rating,
+                                             int_value=rating_for(manager, month))
+
+    def test_query_count_is_constant(self):
+        """Test the number of queries doesn't grow with the number of evaluations"""
+        self.add_evaluations([1], lambda manager, month: 3)
+        with self.assertNumQueries(2):
+            get_all_managers_rating_trends('monthly')
+
+        self.add_evaluations(range(2, 13), lambda manager, month: 4)
+        with self.assertNumQueries(2):
+            chart = get_all_managers_rating_trends('monthly')
+        self.assertEqual(len(chart['labels']), 12)
+
+    def test_trend_values(self):
+        """Test averages per manager and period for both aggregation paths"""
+        self.add_evaluations([1, 2, 4], lambda manager, month: month + (1 if manager == self.managers[1] else 0))
+
+        for aggregate_in_db in (False, True):
+            chart = get_all_managers_rating_trends('quarterly', aggregate_in_db=aggregate_in_db)
+            self.assertEqual(chart['labels'], ['Quarter 1 2025', 'Quarter 2 2025'])
+            self.assertEqual(
+                [(dataset['label'], dataset['data']) for dataset in chart['datasets']],
+                [('Alice Adams', [1.5, 4.0]), ('Bob Brown', [2.5, 5.0])],
+            )
+
+        chart = get_all_managers_rating_trends('monthly', start_date_obj=date(2025, 2, 1),
+                                               end_date_obj=date(2025, 3, 31), aggregate_in_db=True)
+        self.assertEqual(chart['labels'], ['Feb 2025'])
+
+
+class AnalyticsSnapshotTest(EvaluationTestDataMixin, TestCase):
+    """Test cases for the single-pass senior analytics snapshot"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.senior = self.create_profile('senior1', role='vp')
+        self.today = date.today()
+        self.week_start = self.today - timedelta(days=self.today.weekday() + 7)
+
+    def add_department(self, index, rating=4):
+        """Create a department with a manager, two employees and a rated evaluation."""
+        department = self.create_department(f'Branch {index}')
+        manager = self.create_profile(f'branch_manager{index}', role='manager', department=department, manager=self.senior)
+        manager.user.first_name, manager.user.last_name = 'Branch', f'Lead {index}'
+        manager.user.save()
+        department.manager = manager
+        department.save()
+        form = self.create_form(department)
+        question = Question.objects.create(form=form, text='Overall Rating', qtype='rating', order=0)
+        employees = [
+            self.create_profile(f'branch{index}_employee{n}', department=department, manager=manager)
+            for n in range(2)
+        ]
+        completed = self.create_evaluation(form, manager, employees[0], self.week_start, status=EvaluationStatus.COMPLETED)
+        DynamicEvaluation.objects.filter(pk=completed.pk).update(submitted_at=timezone.now())
+        Answer.objects.create(instance=completed, question=question, int_value=rating)
+        self.create_evaluation(form, manager, employees[1], self.week_start)
+        self.create_manager_evaluation(form, self.senior, manager, self.week_start, self.week_start + timedelta(days=27))
+        return department, manager
+
+    def test_query_budget_is_independent_of_size(self):
+        """Test the snapshot stays within the query budget as departments and managers grow"""
+        self.add_department(0)
+        with CaptureQueriesContext(connection) as small:
+            build_analytics_snapshot(self.today)
+        self.assertLessEqual(len(small), 8)
+
+        for index in range(1, 6):
+            self.add_department(index)
+        with CaptureQueriesContext(connection) as large:
+            snapshot = build_analytics_snapshot(self.today)
+        self.assertEqual(len(large), len(small))
+        self.assertEqual(len(snapshot.as_context()['department_comparison']), 6)
+
+    def test_snapshot_sections(self):
+        """Test the in-memory sections match the underlying evaluations"""
+        department, manager = self.add_department(0, rating=4)
+        self.add_department(1, rating=2)
+
+        snapshot = build_analytics_snapshot(self.today).as_context()
+
+        comparison = {row['department_name']: row for row in snapshot['department_comparison']}
+        self.assertEqual(comparison['Branch 0']['average_rating'], 4.0)
+        self.assertEqual(comparison['Branch 1']['average_rating'], 2.0)
+        self.assertEqual(comparison['Branch 0']['total_evaluations'], 3)
+        self.assertEqual(comparison['Branch 0']['employee_completion_rate'], 50.0)
+
+        team = next(row for row in snapshot['teams_analytics'] if row.manager_id == manager.id)
+        self.assertEqual(team.name, 'Branch Lead 0')
+        self.assertEqual(team.department_title, 'Branch 0')
+        self.assertEqual(team.team_size, 2)
+        self.assertEqual(team.team_member_stats.total, 2)
+        self.assertEqual(team.team_member_stats.completed, 1)
+        self.assertEqual(team.self_stats.total, 1)
+
+        self.assertEqual(snapshot['employee_stats']['total_employee_evals'], 4)
+        self.assertEqual(snapshot['manager_stats']['pending_manager_evals'], 2)
+        self.assertEqual(snapshot['recent_employee_evals_count'], 2)
+        self.assertEqual(snapshot['recent_employee_evals'][0].department_name, 'Branch 1')
+
+    def test_cache_roundtrip(self):
+        """Test snapshots cache as plain tuples and rebuild to equal objects"""
+        self.add_department(0)
+        snapshot = build_analytics_snapshot(self.today)
+
+        cached = snapshot.to_cache()
+        self.assertNotIn(b'django', pickle.dumps(cached))
+        self.assertEqual(AnalyticsSnapshot.from_cache(cached), snapshot)
+
+        with self.assertRaises(ValueError):
+            AnalyticsSnapshot.from_cache((0,) + cached[1:])
+
+    def test_dashboard_view_renders_snapshot(self):
+        """Test the dashboard view renders from the snapshot"""
+        self.add_department(0)
+        self.client.force_login(self.senior.user)
+        response = self.client.get(reverse('evaluation:senior_analytics_dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['department_comparison'][0]['average_rating'], 4.0)
+        self.assertContains(response, 'Branch Lead 0')
+
+        # A cache hit renders the same sections without model instances
+        response = self.client.get(reverse('evaluation:senior_analytics_dashboard'))
+        self.assertEqual(response.context['department_analytics'][0].title, 'Branch 0')
+
+    def test_status_reports_cached_dashboard_size(self):
+        """Test manage_analytics_cache status reports bytes per cached dashboard"""
+        self.add_department(0)
+        self.client.force_login(self.senior.user)
+        self.client.get(reverse('evaluation:senior_analytics_dashboard'))
+
+        out = StringIO()
+        call_command('manage_analytics_cache', 'status', user_id=self.senior.user.id, stdout=out)
+        self.assertRegex(out.getvalue(), r'org-wide: [\d,]+ bytes')
+
+
+class ScopedAnalyticsCacheTest(EvaluationTestDataMixin, TestCase):
+    """Test cases for permission-scoped analytics cache entries"""
+
+    def setUp(self):
+        """Set up test data"""
+        get_analytics_cache().clear()
+        self.vp = self.create_profile('vp1', role='vp')
+        self.ceo = self.create_profile('ceo1', role='ceo')
+        self.department = self.create_department('Sales Team')
+        self.manager = self.create_profile('manager1', role='manager', department=self.department, manager=self.vp)
+        self.employee = self.create_profile('employee1', department=self.department, manager=self.manager)
+
+    def test_scope_for_roles(self):
+        """Test users map to the scope of the data they can see"""
+        self.assertEqual(analytics_scope_for(self.vp.user), 'org-wide')
+        self.assertEqual(analytics_scope_for(self.ceo.user), 'org-wide')
+        self.assertIsNone(analytics_scope_for(self.manager.user))
+        self.assertIsNone(analytics_scope_for(self.employee.user))
+
+    def test_dashboard_users_share_one_scope(self):
+        """Test warming computes the org-wide snapshot once and skips staff without a profile"""
+        User.objects.create_user('staff1', is_staff=True).userprofile.delete()
+
+        self.assertEqual(
+            set(get_analytics_dashboard_users().values_list('username', flat=True)), {'vp1', 'ceo1'}
+        )
+        with patch('evaluation.analytics_snapshot.build_analytics_snapshot',
+                   wraps=build_analytics_snapshot) as build:
+            self.assertEqual(warm_analytics_cache(), ['org-wide'])
+        self.assertEqual(build.call_count, 1)
+
+    def test_senior_managers_share_one_entry(self):
+        """Test a second executive is served from the first one's cache entry"""
+        url = reverse('evaluation:senior_analytics_dashboard')
+        self.client.force_login(self.vp.user)
+        first = self.client.get(url)
+
+        self.client.force_login(self.ceo.user)
+        with patch('evaluation.analytics_snapshot.build_analytics_snapshot') as build:
+            second = self.client.get(url)
+        build.assert_not_called()
+        self.assertEqual(second.context['data_computed_at'], first.context['data_computed_at'])
+        self.assertGreaterEqual(second.context['last_viewed_at'], first.context['last_viewed_at'])
+        self.assertIsNotNone(get_tagged(analytics_dashboard_cache_key('org-wide', date.today())))
+
+    def test_warming_computes_once_per_scope(self):
+        """Test warming renders the dashboard once for all executives"""
+        with patch('evaluation.analytics_snapshot.build_analytics_snapshot', wraps=build_analytics_snapshot) as build:
+            scopes = warm_analytics_cache()
+        self.assertEqual(scopes, ['org-wide'])
+        self.assertEqual(build.call_count, 1)
+
+        out = StringIO()
+        call_command('warm_analytics_cache', user_id=self.ceo.user.id, force=True, stdout=out)
+        self.assertIn('scope org-wide', out.getvalue())
+
+
+class RangeCacheTest(EvaluationTestDataMixin, TestCase):
+    """Test cases for cached date-filtered analytics"""
+
+    def setUp(self):
+        """Set up test data"""
+        get_analytics_cache().clear()
+        self.today = date(2025, 7, 15)
+        self.senior = self.create_profile('senior1', role='vp')
+        self.department = self.create_department('Sales Team')
+        self.manager = self.create_profile('manager1', role='manager', department=self.department, manager=self.senior)
+        self.employees = [
+            self.create_profile(f'employee{i}', department=self.department, manager=self.manager) for i in range(2)
+        ]
+        self.form = self.create_form(self.department)
+        self.rating = Question.objects.create(form=self.form, text='Overall Rating', qtype='rating', order=0)
+        self.evaluations = []
+        # One week per month from March to July 2025, the last ones still pending
+        for week_start in (date(2025, 3, 3), date(2025, 4, 7), date(2025, 5, 26), date(2025, 6, 30), date(2025, 7, 14)):
+            for employee in self.employees:
+                status = EvaluationStatus.COMPLETED if week_start < date(2025, 6, 1) else EvaluationStatus.PENDING
+                evaluation = self.create_evaluation(self.form, self.manager, employee, week_start, status=status)
+                if status == EvaluationStatus.COMPLETED:
+                    Answer.objects.create(instance=evaluation, question=self.rating, int_value=week_start.month)
+                self.evaluations.append(evaluation)
+        # Completed, so the senior's overdue-evaluation lock doesn't redirect the views
+        for period_start, period_end in ((date(2025, 3, 1), date(2025, 5, 31)), (date(2025, 6, 1), date(2025, 8, 31))):
+            self.create_manager_evaluation(self.form, self.senior, self.manager, period_start, period_end,
+                                           status=EvaluationStatus.COMPLETED)
+
+    def direct_partial(self, start_date, end_date):
+        return _load_partials(self.today, [(start_date, end_date)], start_date)[0]
+
+    def test_split_date_range(self):
+        """Test ranges split into complete past quarters, months and weeks plus one live segment"""
+        segments = split_date_range(date(2025, 3, 31), date(2025, 8, 3), self.today)
+        self.assertEqual(segments, [
+            (date(2025, 3, 31), date(2025, 3, 31), True),
+            (date(2025, 4, 1), date(2025, 6, 30), True),
+            (date(2025, 7, 1), date(2025, 7, 6), True),
+            (date(2025, 7, 7), date(2025, 7, 13), True),
+            (date(2025, 7, 14), date(2025, 8, 3), False),
+        ])
+
+    def test_composed_partial_matches_direct_computation(self):
+        """Test partials composed from cached segments equal a direct computation"""
+        for start_date, end_date in ((date(2025, 3, 10), date(2025, 8, 3)), (date(2025, 1, 6), date(2025, 6, 29))):
+            expected = self.direct_partial(start_date, end_date)
+            for _ in range(2):  # cold, then from cached partials
+                composed = load_range_partial(self.today, start_date, end_date)
+                self.assertEqual(composed.counts, expected.counts)
+                self.assertEqual(composed.employee_counts, expected.employee_counts)
+                self.assertEqual(composed.ratings, expected.ratings)
+
+    def test_cached_partials_are_reused_and_invalidated(self):
+        """Test overlapping ranges reuse past partials and evaluation changes expire them"""
+        load_range_partial(self.today, date(2025, 3, 31), date(2025, 8, 3))
+
+        # Q2 and the July weeks are cached; only the first and the live segment are computed
+        with patch('evaluation.analytics_snapshot._load_partials', wraps=_load_partials) as load:
+            load_range_partial(self.today, date(2025, 3, 24), date(2025, 8, 10))
+        computed = [segment for segments in (call.args[1] for call in load.call_args_list) for segment in segments]
+        self.assertNotIn((date(2025, 4, 1), date(2025, 6, 30)), computed)
+
+        evaluation = self.evaluations[2]  # week of April 7
+        evaluation.status = EvaluationStatus.PENDING
+        evaluation.save()
+        composed = load_range_partial(self.today, date(2025, 3, 24), date(2025, 8, 10))
+        self.assertEqual(composed.counts, self.direct_partial(date(2025, 3, 24), date(2025, 8, 10)).counts)
+
+    def test_partial_expires_when_pending_evaluation_becomes_overdue(self):
+        """Test a cached partial is recomputed once its pending evaluations turn overdue"""
+        # The week of June 30 ends on July 6: pending but not overdue on July 2
+        start_date, end_date = date(2025, 6, 23), date(2025, 6, 30)
+        before = load_range_partial(date(2025, 7, 2), start_date, end_date)
+        self.assertEqual(before.stats(EvaluationStat.EMPLOYEE, 'overall').overdue, 0)
+
+        after = load_range_partial(date(2025, 7, 10), start_date, end_date)
+        self.assertEqual(after.stats(EvaluationStat.EMPLOYEE, 'overall').overdue, 2)
+        self.assertEqual(after.employee_stats(self.employees[0].id).overdue, 1)
+
+    @override_settings(ANALYTICS_RANGE_CACHE_MAX_ENTRIES=2)
+    def test_lru_budget(self):
+        """Test the least recently used range entries are evicted first"""
+        tags = build_dependency_tags()
+        set_tagged_lru('range_a', 1, tags)
+        set_tagged_lru('range_b', 2, tags)
+        self.assertEqual(get_many_tagged_lru(['range_a']), {'range_a': 1})
+        set_tagged_lru('range_c', 3, tags)
+        self.assertEqual(get_many_tagged(['range_a', 'range_b', 'range_c']), {'range_a': 1, 'range_c': 3})
+
+    def test_lru_index_updates_are_serialized(self):
+        """Test an LRU index update waits for the one in progress instead of overwriting it"""
+        tags = build_dependency_tags()
+        set_tagged_lru('range_a', 1, tags)
+        with cache_fill_lock(RANGE_LRU_INDEX_KEY) as acquired:
+            self.assertTrue(acquired)
+            writer = threading.Thread(target=set_tagged_lru, args=('range_b', 2, tags))
+            writer.start()
+            time.sleep(0.3)
+            # Another worker's update in progress
+            get_analytics_cache().set(RANGE_LRU_INDEX_KEY, ['range_a', 'range_c'], timeout=None)
+        writer.join(timeout=10)
+        self.assertFalse(writer.is_alive())
+        self.assertEqual(get_analytics_cache().get(RANGE_LRU_INDEX_KEY), ['range_a', 'range_c', 'range_b'])
+
+    def test_filtered_views_are_cached(self):
+        """Test a repeated date filter is served from the cached dashboard and overview entries"""
+        self.client.force_login(self.senior.user)
+        dashboard_url = reverse('evaluation:senior_analytics_dashboard')
+        overview_url = reverse('evaluation:performance_trends')
+        self.client.get(dashboard_url, {'start_date': '2025-03-04', 'end_date': '2025-06-04'})
+        self.client.get(overview_url, {'start_date': '2025-03-04', 'end_date': '2025-06-04'})
+
+        with patch('evaluation.analytics_snapshot.build_analytics_snapshot') as build_snapshot, \
+                patch('evaluation.views._build_performance_overview_data') as build_overview:
+            self.client.get(dashboard_url, {'start_date': '2025-03-04', 'end_date': '2025-06-04'})
+            overview = self.client.get(overview_url, {'start_date': '2025-03-04', 'end_date': '2025-06-04'})
+        build_snapshot.assert_not_called()
+        build_overview.assert_not_called()
+        self.assertEqual(overview.context['start_date'], '2025-03-04')
+
+    def test_filters_use_the_exact_dates(self):
+        """Test a monthly manager evaluation ending just before the picked start is not counted"""
+        self.create_manager_evaluation(self.form, self.senior, self.manager, date(2025, 6, 1), date(2025, 6, 30),
+                                       status=EvaluationStatus.COMPLETED)
+        self.client.force_login(self.senior.user)
+
+        # Wednesday; widened to Monday 2025-06-30 it would overlap the June evaluation
+        filters = {'start_date': '2025-07-02', 'end_date': '2025-07-15'}
+        with patch('evaluation.views._build_performance_overview_data',
+                   wraps=_build_performance_overview_data) as build_overview:
+            dashboard = self.client.get(reverse('evaluation:senior_analytics_dashboard'), filters)
+            self.client.get(reverse('evaluation:performance_trends'), filters)
+
+        self.assertEqual(dashboard.context['manager_stats']['total_manager_evals'], 1)
+        self.assertEqual(build_overview.call_args.args[1:], (date(2025, 7, 2), date(2025, 7, 15)))
+
+
+class SingleFlightTest(EvaluationTestDataMixin, TestCase):
+    """Test cases for coalesced analytics cache fills"""
+
+    def setUp(self):
+        """Set up test data"""
+        get_analytics_cache().clear()
+        self.tags = build_dependency_tags()
+
+    def fill(self, key, compute, **kwargs):
+        return single_flight(
+            key,
+            load=lambda: read_tagged(key),
+            compute=compute,
+            store=lambda value: set_tagged(key, value, self.tags),
+            **kwargs
+        )
+
+    def hold_fill_lock(self, key):
+        """Simulate another worker filling the key"""
+        get_analytics_cache().add(f"{FILL_LOCK_PREFIX}:{key}", 'other-worker', 60)
+
+    def test_concurrent_misses_compute_once(self):
+        """Test threads missing the same key share one computation"""
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'fresh'
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.fill('sf_key', compute)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [('fresh', False)] * 5)
+        self.assertIsNone(get_analytics_cache().get(f"{FILL_LOCK_PREFIX}:sf_key"))
+
+    def test_stale_value_served_while_refreshing(self):
+        """Test a stale value is served while another worker recomputes it"""
+        set_tagged('sf_key', 'old', self.tags)
+        invalidate_cache_tags(['all'])
+        self.hold_fill_lock('sf_key')
+
+        value, refreshing = self.fill('sf_key', lambda: self.fail('should not compute'))
+        self.assertEqual((value, refreshing), ('old', True))
+
+        # The stale entry is kept for other readers until it is replaced
+        cached = read_tagged('sf_key')
+        self.assertEqual((cached.value, cached.fresh), ('old', False))
+
+    def test_waiter_computes_after_timeout(self):
+        """Test a waiter with nothing to serve computes once the wait runs out"""
+        self.hold_fill_lock('sf_key')
+        value, refreshing = self.fill('sf_key', lambda: 'fresh', wait_timeout=0.2)
+        self.assertEqual((value, refreshing), ('fresh', False))
+        self.assertEqual(get_tagged('sf_key'), 'fresh')
+
+    def test_dashboard_serves_stale_snapshot(self):
+        """Test the dashboard shows a stale snapshot flagged as refreshing during a refill"""
+        senior = self.create_profile('vp1', role='vp')
+        self.client.force_login(senior.user)
+        url = reverse('evaluation:senior_analytics_dashboard')
+        first = self.client.get(url)
+        self.assertFalse(first.context['refreshing'])
+
+        invalidate_cache_tags(['all'])
+        self.hold_fill_lock(analytics_dashboard_cache_key('org-wide', date.today()))
+        with patch('evaluation.analytics_snapshot.build_analytics_snapshot') as build:
+            second = self.client.get(url)
+        build.assert_not_called()
+        self.assertTrue(second.context['refreshing'])
+        self.assertEqual(second.context['data_computed_at'], first.context['data_computed_at'])
+        self.assertContains(second, 'Refreshing')
+
+
+class StaleWhileRevalidateTest(EvaluationTestDataMixin, TestCase):
+    """Test cases for soft TTL background refreshes"""
+
+    def setUp(self):
+        """Set up test data"""
+        get_analytics_cache().clear()
+        self.tags = build_dependency_tags()
+
+    def fill(self, key, compute, **kwargs):
+        return single_flight(
+            key,
+            load=lambda: read_tagged(key),
+            compute=compute,
+            store=lambda value: set_tagged(key, value, self.tags),
+            **kwargs
+        )
+
+    def wait_for(self, key, value, timeout=5):
+        deadline = time.monotonic() + timeout
+        while get_tagged(key) != value and time.monotonic() < deadline:
+            time.sleep(0.05)
+        return get_tagged(key)
+
+    def test_soft_expired_entry_served_and_refreshed(self):
+        """Test an entry past the soft TTL is served at once and refreshed in the background"""
+        set_tagged('swr_key', 'old', self.tags)
+        self.assertEqual(self.fill('swr_key', lambda: 'new', soft_timeout=60), ('old', False))
+
+        value, refreshing = self.fill('swr_key', lambda: 'new', soft_timeout=0)
+        self.assertEqual((value, refreshing), ('old', True))
+        self.assertEqual(self.wait_for('swr_key', 'new'), 'new')
+        self.assertLess(read_tagged('swr_key').age, 5)
+
+    def test_refresh_scheduled_once_per_key(self):
+        """Test concurrent soft expiries schedule a single background refresh"""
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return 'new'
+
+        def store(value):
+            set_tagged('swr_key', value, self.tags)
+
+        load = lambda: read_tagged('swr_key')
+        first = schedule_refresh('swr_key', load, compute, store, soft_timeout=0)
+        self.assertIsNotNone(first)
+        self.assertIsNone(schedule_refresh('swr_key', load, compute, store, soft_timeout=0))
+        release.set()
+        first.result(timeout=5)
+        self.assertEqual(calls, [1])
+        self.assertEqual(get_tagged('swr_key'), 'new')
+
+    def test_dashboard_shows_data_age(self):
+        """Test the dashboard serves a soft-expired snapshot and shows its age"""
+        senior = self.create_profile('vp1', role='vp')
+        self.client.force_login(senior.user)
+        url = reverse('evaluation:senior_analytics_dashboard')
+        first = self.client.get(url)
+        self.assertEqual(first.context['cache_key'], analytics_dashboard_cache_key('org-wide', date.today()))
+        self.assertContains(first, 'Data Age')
+
+        with override_settings(ANALYTICS_CACHE_SOFT_TIMEOUT=0), \
+                patch('evaluation.cache_utils.schedule_refresh') as refresh, \
+                patch('evaluation.analytics_snapshot.build_analytics_snapshot') as build:
+            second = self.client.get(url)
+        build.assert_not_called()
+        refresh.assert_called_once()
+        self.assertTrue(second.context['refreshing'])
+        self.assertGreaterEqual(second.context['cache_age'], 0)
+        self.assertEqual(second.context['data_computed_at'], first.context['data_computed_at'])
+
+
+class RequestUserContextTest(EvaluationTestDataMixin, TestCase):
+    """Test cases for the request-scoped user context shared by middleware and context processors"""
+
+    # Profile with role flags (and overdue counts in live-query mode); the
+    # low-stock summary is served from its cached snapshot
+    QUERY_BUDGET = 1
+
+    def setUp(self):
+        """Set up test data"""
+        # Lock states are keyed by user id, which later tests may reuse
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.factory = RequestFactory()
+        self.vp = self.create_profile('vp1', role='vp')
+        self.department = self.create_department('Sales Team')
+        self.manager = self.create_profile('manager1', role='manager', department=self.department, manager=self.vp)
+        self.employee = self.create_profile('employee1', department=self.department, manager=self.manager)
+        form = self.create_form(self.department)
+        last_month = date.today() - timedelta(days=30)
+        self.create_evaluation(form, self.manager, self.employee, last_month)
+        self.create_manager_evaluation(form, self.vp, self.manager, last_month, last_month + timedelta(days=6))
+
+        jacket = UniformCatalog.objects.create(name='Jacket', minimum_stock_level=10)
+        Inventory.objects.create(uniform=jacket, new_stock=2, used_stock=1)
+        cap = UniformCatalog.objects.create(name='Cap', minimum_stock_level=1)
+        Inventory.objects.create(uniform=cap, new_stock=5)
+
+    def make_request(self, profile, path):
+        request = self.factory.get(path)
+        # A fresh user without a cached profile, as AuthenticationMiddleware provides it
+        request.user = User.objects.get(pk=profile.user.pk)
+        request.session = {}
+        request._messages = FallbackStorage(request)
+        return request
+
+    def run_stack(self, request):
+        """Run both overdue middlewares and the context processors like a page render would"""
+        context = {}
+
+        def render_page(request):
+            context.update(role_context(request))
+            context.update(low_stock_processor(request))
+            context['is_manager'] = context['role'].is_manager()
+            return HttpResponse()
+
+        stack = OverdueEvaluationLockMiddleware(OverdueManagerEvaluationLockMiddleware(render_page))
+        return stack(request), context
+
+    def test_page_query_budget(self):
+        """Test the middleware and context processor stack stays within a fixed query budget"""
+        cases = [
+            (self.manager, '/evaluation/pending/'),
+            (self.vp, '/evaluation/manager-evaluations/'),
+            (self.employee, '/goals/'),
+        ]
+        for (profile, path), lock_state_cache in itertools.product(cases, (True, False)):
+            with self.subTest(role=profile.role, lock_state_cache=lock_state_cache), \
+                    override_settings(EVALUATION_LOCK_STATE_CACHE=lock_state_cache):
+                # Lock states are cached by the first request of each user
+                self.run_stack(self.make_request(profile, path))
+                request = self.make_request(profile, path)
+                with self.assertNumQueries(self.QUERY_BUDGET):
+                    response, context = self.run_stack(request)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(context['is_manager'], profile.role == 'manager')
+                self.assertEqual(context['low_stock']['count'], 1)
+                self.assertEqual(context['low_stock']['items'], [{'uniform_name': 'Jacket', 'total_stock': 3}])
+                self.assertEqual(request.session, {})
+
+    def test_overdue_redirects(self):
+        """Test overdue counts from the shared context still lock managers and senior managers out"""
+        get_overdue_lock_state(self.manager.user.pk)
+        request = self.make_request(self.manager, '/goals/')
+        # Only the role check loads the profile
+        with self.assertNumQueries(1):
+            response, _ = self.run_stack(request)
+        self.assertRedirects(response, reverse('evaluation:pending'), fetch_redirect_response=False)
+        self.assertIn('1 overdue evaluation(s)', str(list(get_messages(request))[0]))
+
+        request = self.make_request(self.vp, '/goals/')
+        response, _ = self.run_stack(request)
+        self.assertRedirects(response, '/evaluation/manager-evaluations/', fetch_redirect_response=False)
+        self.assertIn('1 pending evaluation(s)', str(list(get_messages(request))[0]))
+
+
+class OverdueLockStateTest(EvaluationTestDataMixin, TestCase):
+    """Test cases for the cached overdue lock state"""
+
+    def setUp(self):
+        """Set up test data"""
+        # Lock states are keyed by user id, which later tests may reuse
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.vp = self.create_profile('vp1', role='vp')
+        self.department = self.create_department('Sales Team')
+        self.manager = self.create_profile('manager1', role='manager', department=self.department, manager=self.vp)
+        self.other_manager = self.create_profile('manager2', role='manager', department=self.department, manager=self.vp)
+        self.employee = self.create_profile('employee1', department=self.department, manager=self.manager)
+        self.form = self.create_form(self.department)
+        self.today = timezone.now().date()
+        self.monday = self.today - timedelta(days=self.today.weekday())
+        self.overdue = self.create_evaluation(self.form, self.manager, self.employee, self.monday - timedelta(days=14))
+        self.current = self.create_evaluation(self.form, self.manager, self.employee, self.monday)
+        self.create_manager_evaluation(
+            self.form, self.vp, self.manager, self.monday - timedelta(days=30), self.monday - timedelta(days=1)
+        )
+
+    def test_state_contents(self):
+        """Test the lock state holds the overdue count, earliest overdue id and next deadline"""
+        state = get_overdue_lock_state(self.manager.user.pk)
+        self.assertEqual(state.overdue_count, 1)
+        self.assertEqual(state.earliest_overdue_id, self.overdue.id)
+        self.assertEqual(state.next_deadline, self.current.week_end)
+        self.assertEqual(state.manager_overdue_count, 0)
+        self.assertEqual(state.expires_on, self.current.week_end + timedelta(days=1))
+
+        vp_state = get_overdue_lock_state(self.vp.user.pk)
+        self.assertEqual(vp_state.manager_overdue_count, 1)
+        self.assertIsNone(vp_state.expires_on)
+
+    def test_expires_at_next_deadline(self):
+        """Test the entry lives until the next pending evaluation becomes overdue"""
+        with patch.object(cache, 'set', wraps=cache.set) as cache_set:
+            get_overdue_lock_state(self.manager.user.pk)
+        timeout = cache_set.call_args.args[2]
+        boundary = datetime.combine(self.current.week_end + timedelta(days=1), dt_time.min, tzinfo=dt_timezone.utc)
+        self.assertAlmostEqual(timeout, (boundary - timezone.now()).total_seconds(), delta=5)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_overdue_lock_state(self.manager.user.pk).overdue_count, 1)
+
+    def test_invalidated_for_owner_only(self):
+        """Test saving an evaluation drops only its evaluator's cached state"""
+        get_overdue_lock_state(self.manager.user.pk)
+        get_overdue_lock_state(self.vp.user.pk)
+
+        self.overdue.status = EvaluationStatus.COMPLETED
+        self.overdue.save()
+        self.assertIsNone(cache.get(lock_state_cache_key(self.manager.user.pk)))
+        self.assertIsNotNone(cache.get(lock_state_cache_key(self.vp.user.pk)))
+        self.assertEqual(get_overdue_lock_state(self.manager.user.pk).overdue_count, 0)
+
+        # Saves that can't change the lock state keep it cached
+        self.current.is_archived = True
+        self.current.save(update_fields=['is_archived'])
+        self.assertIsNotNone(cache.get(lock_state_cache_key(self.manager.user.pk)))
+
+    def test_reassignment_invalidates_previous_evaluator(self):
+        """Test moving an overdue evaluation to another manager updates both states"""
+        get_overdue_lock_state(self.manager.user.pk)
+        get_overdue_lock_state(self.other_manager.user.pk)
+
+        self.overdue.manager = self.other_manager
+        self.overdue.save()
+        self.assertEqual(get_overdue_lock_state(self.manager.user.pk).overdue_count, 0)
+        self.assertEqual(get_overdue_lock_state(self.other_manager.user.pk).overdue_count, 1)
+
+    def test_middleware_hot_path_is_cache_only(self):
+        """Test both middlewares pass a user without overdue evaluations without queries"""
+        request = RequestFactory().get('/goals/')
+        request.user = User.objects.get(pk=self.employee.user.pk)
+        stack = OverdueEvaluationLockMiddleware(OverdueManagerEvaluationLockMiddleware(lambda r: HttpResponse()))
+        get_overdue_lock_state(self.employee.user.pk)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(stack(request).status_code, 200)
+
+
+class UrlPolicyTest(EvaluationTestDataMixin, TestCase):
+    """Test cases for the compiled URL policies of the lock middlewares"""
+
+    def test_prefixes_from_url_names(self):
+        """Test allow-lists resolve URL names to the path before their arguments"""
+        self.assertIn('/evaluation/evaluate/', OVERDUE_EVALUATION_ALLOWED.resolve_prefixes())
+        self.assertTrue(OVERDUE_EVALUATION_ALLOWED.matches('/evaluation/evaluate/12/'))
+        self.assertTrue(OVERDUE_EVALUATION_ALLOWED.matches('/logout/'))
+        self.assertFalse(OVERDUE_EVALUATION_ALLOWED.matches('/evaluation/dashboard/'))
+        self.assertTrue(OVERDUE_MANAGER_EVALUATION_ALLOWED.matches('/evaluation/manager-evaluations/view/3/'))
+        self.assertFalse(OVERDUE_MANAGER_EVALUATION_ALLOWED.matches('/goals/'))
+
+    def test_namespace_and_prefix_collapse(self):
+        """Test namespaces cover their subtree and nested prefixes collapse into one"""
+        policy = PathPolicy(names=['evaluation:pending'], namespaces=['evaluation'], prefixes=['/healthz'])
+        self.assertEqual(policy.regex.pattern, '/healthz|/evaluation/')
+        self.assertTrue(policy.matches('/evaluation/analytics/'))
+        self.assertFalse(policy.matches('/goals/'))
+
+        with self.assertRaises(ValueError):
+            PathPolicy(names=['evaluation:missing']).compile()
+
+    def test_skipped_paths_do_no_work(self):
+        """Test static files pass both middlewares without loading the user"""
+        def fail():
+            raise AssertionError('user loaded')
+
+        request = RequestFactory().get('/static/css/output.css')
+        request.user = SimpleLazyObject(fail)
+        stack = OverdueEvaluationLockMiddleware(OverdueManagerEvaluationLockMiddleware(lambda r: HttpResponse()))
+        with self.assertNumQueries(0):
+            self.assertEqual(stack(request).status_code, 200)
+
+    def test_benchmark_command(self):
+        """Test the benchmark command reports per-request timings"""
+        out = StringIO()
+        call_command('benchmark_lock_middleware', '/static/app.css', '/goals/', iterations=10, stdout=out)
+        self.assertIn('skip policy match', out.getvalue())
+        self.assertIn('both middlewares, anonymous', out.getvalue())
+
+
+class CountingBackend(LocmemBackend):
+    """Locmem backend that counts opened connections and rejects one address"""
+
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        if any('bounce@example.com' in message.to for message in messages):
+            raise ConnectionError('mailbox unavailable')
+        return super().send_messages(messages)
+
+
+class BulkReminderMailTest(EvaluationTestDataMixin, TestCase):
+    """Test cases for the bulk reminder emails of the evaluation commands"""
+
+    def setUp(self):
+        """Set up test data"""
+        CountingBackend.opened = 0
+        self.department = self.create_department('Sales Team')
+        self.form = self.create_form(self.department)
+        today = date.today()
+        self.week_start = today - timedelta(days=today.weekday())
+
+    def test_failure_isolation_and_chunks(self):
+        """Test one connection is used, a failing message is isolated and chunks are rate limited"""
+        messages = [
+            EmailMessage('Reminder', 'Body', None, [address])
+            for address in ('a@example.com', 'bounce@example.com', 'b@example.com', 'c@example.com')
+        ]
+        with override_settings(EMAIL_BACKEND='evaluation.tests.CountingBackend'):
+            report = send_bulk_mail(messages, chunk_size=2, rate_limit=100)
+
+        self.assertEqual((report.total, report.sent, report.failed), (4, 3, 1))
+        self.assertEqual(report.failures[0][0], 'bounce@example.com')
+        # The failure reopens the connection once
+        self.assertEqual(CountingBackend.opened, 2)
+        self.assertGreaterEqual(report.elapsed, 0.02)
+        self.assertEqual([m.to[0] for m in mail.outbox], ['a@example.com', 'b@example.com', 'c@example.com'])
+
+    def test_weekly_reminders(self):
+        """Test the Friday branch renders one reminder per manager and sends them together"""
+        for name in ('alpha', 'beta'):
+            manager = self.create_profile(f'manager_{name}', role='manager', department=self.department)
+            for index in range(2):
+                employee = self.create_profile(f'{name}_employee{index}', department=self.department, manager=manager)
+                self.create_evaluation(self.form, manager, employee, self.week_start)
+
+        out = StringIO()
+        with override_settings(EMAIL_BACKEND='evaluation.tests.CountingBackend'):
+            call_command('create_weekly_evaluations', when='friday', chunk_size=1, stdout=out)
+
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['manager_alpha@example.com', 'manager_beta@example.com'])
+        body = next(m.body for m in mail.outbox if m.to == ['manager_alpha@example.com'])
+        self.assertIn('You have 2 weekly evaluation(s) pending', body)
+        self.assertIn('  • alpha_employee1', body)
+        self.assertIn(reverse('evaluation:pending'), body)
+        # One connection for the reminders after the backend check
+        self.assertEqual(CountingBackend.opened, 2)
+        self.assertIn('2/2 sent, 0 failed', out.getvalue())
+
+    def test_weekly_reminders_dry_run(self):
+        """Test a dry run renders the reminders without sending anything"""
+        manager = self.create_profile('manager_alpha', role='manager', department=self.department)
+        employee = self.create_profile('employee_alpha', department=self.department, manager=manager)
+        self.create_evaluation(self.form, manager, employee, self.week_start)
+
+        out = StringIO()
+        call_command('create_weekly_evaluations', when='friday', dry_run=True, stdout=out)
+        self.assertEqual(mail.outbox, [])
+        self.assertIn('(dry-run) Would email manager_alpha@example.com', out.getvalue())
+        self.assertIn('1/1 would be sent', out.getvalue())
+
+    def test_manager_reminders(self):
+        """Test senior manager reminders of all evaluation types share one bulk send"""
+        senior = self.create_profile('vp_alpha', role='vp')
+        manager = self.create_profile('manager_alpha', role='manager', department=self.department)
+        today = date.today()
+        monthly = self.create_form(self.department, name='Monthly Evaluation')
+        quarterly = self.create_form(self.department, name='Quarterly Evaluation')
+        command_module = 'evaluation.management.commands.create_manager_evaluations.Command'
+        with patch(f'{command_module}._is_last_friday_of_period', return_value=True):
+            from evaluation.management.commands.create_manager_evaluations import Command
+            for form in (monthly, quarterly):
+                start, end = Command()._get_evaluation_period(form.name, today)
+                self.create_manager_evaluation(form, senior, manager, start, end)
+
+            out = StringIO()
+            call_command('create_manager_evaluations', send_reminders=True, stdout=out)
+
+        self.assertEqual([m.subject for m in mail.outbox], [
+            'Reminder: Complete Pending Manager Monthly Evaluations',
+            'Reminder: Complete Pending Manager Quarterly Evaluations',
+        ])
+        self.assertIn('  • manager_alpha', mail.outbox[0].body)
+        self.assertIn(reverse('evaluation:manager_evaluation_dashboard'), mail.outbox[0].body)
+        self.assertIn('2/2 sent', out.getvalue())
+
+
+class WeeklyScaffoldingTest(EvaluationTestDataMixin, TestCase):
+    """Test cases for the set-based weekly evaluation creation"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.department = self.create_department('Sales Team')
+        self.form = self.create_form(self.department)
+        for order in range(3):
+            Question.objects.create(form=self.form, text=f'Question {order}', order=order)
+        self.manager = self.create_profile('manager_alpha', role='manager', department=self.department)
+        self.employees = [
+            self.create_profile(f'employee{index}', department=self.department, manager=self.manager)
+            for index in range(3)
+        ]
+        self.unassigned = self.create_profile('floater', manager=self.manager)
+        today = date.today()
+        self.week_start = today - timedelta(days=today.weekday())
+        self.week_end = self.week_start + timedelta(days=6)
+
+    def plan(self):
+        return plan_weekly_evaluations(self.week_start, self.week_end, 'Weekly Evaluation')
+
+    def test_creates_missing_evaluations_with_answers_and_stats(self):
+        """Test missing evaluations, answer stubs and stat rows are created and existing ones kept"""
+        self.create_evaluation(self.form, self.manager, self.employees[0], self.week_start)
+        plan = self.plan()
+        self.assertEqual((len(plan.targets), plan.existing), (2, 1))
+        self.assertEqual(plan.skipped, [('floater@example.com', 'no department assigned')])
+
+        result = apply_plan(plan, batch_size=1)
+
+        self.assertEqual((result.created, result.answers), (2, 6))
+        evaluations = DynamicEvaluation.objects.filter(week_start=self.week_start)
+        self.assertEqual(evaluations.count(), 3)
+        self.assertEqual(Answer.objects.filter(instance__employee=self.employees[1]).count(), 3)
+        stat = EvaluationStat.objects.get(kind=EvaluationStat.EMPLOYEE, manager=self.manager)
+        self.assertEqual((stat.count, stat.status), (3, EvaluationStatus.PENDING))
+
+    def test_rerun_and_stale_plan_are_idempotent(self):
+        """Test applying a stale plan after another run inserts nothing"""
+        first, second = self.plan(), self.plan()
+        self.assertEqual(apply_plan(first).created, 3)
+        self.assertEqual(apply_plan(second).created, 0)
+        self.assertEqual(len(self.plan().targets), 0)
+        self.assertEqual(DynamicEvaluation.objects.count(), 3)
+        self.assertEqual(EvaluationStat.objects.get().count, 3)
+
+    def test_query_count_does_not_grow_with_team_size(self):
+        """Test planning and applying take the same number of queries for 3 or 10 employees"""
+        def count_queries():
+            DynamicEvaluation.objects.all().delete()
+            with CaptureQueriesContext(connection) as queries:
+                apply_plan(self.plan())
+            return len(queries)
+
+        small = count_queries()
+        for index in range(3, 10):
+            self.create_profile(f'employee{index}', department=self.department, manager=self.manager)
+        self.assertEqual(count_queries(), small)
+
+    def test_lock_state_invalidated(self):
+        """Test the manager's cached overdue lock state is dropped for the new evaluations"""
+        self.assertEqual(get_overdue_lock_state(self.manager.user_id).overdue_count, 0)
+
+        two_weeks = timedelta(days=14)
+        apply_plan(plan_weekly_evaluations(
+            self.week_start - two_weeks, self.week_end - two_weeks, 'Weekly Evaluation'
+        ))
+        self.assertEqual(get_overdue_lock_state(self.manager.user_id).overdue_count, 3)
+
+    def test_command_dry_run_reports_counts(self):
+        """Test the Monday dry run reports counts and timings without writing"""
+        out = StringIO()
+        call_command('create_weekly_evaluations', when='monday', dry_run=True, stdout=out)
+        output = out.getvalue()
+        self.assertEqual(DynamicEvaluation.objects.count(), 0)
+        self.assertIn('3 to create, 0 already exist, 1 employee(s) skipped', output)
+        self.assertIn('(dry-run) Skipping emp=floater@example.com - no department assigned', output)
+        self.assertIn('⏱️ Planning: resolve', output)
+
+        call_command('create_weekly_evaluations', when='monday', stdout=out)
+        self.assertIn('Created 3 dynamic evaluations (9 answer stubs)', out.getvalue())
+        self.assertEqual(DynamicEvaluation.objects.count(), 3)
+
+
+@override_settings(OUTBOX_SEND_ON_COMMIT=False)
+class ManagerScaffoldingTest(EvaluationTestDataMixin, TestCase):
+    """Test cases for the set-based manager evaluation creation"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.seniors = [self.create_profile(f'vp_{name}', role='vp') for name in ('alpha', 'beta')]
+        self.managers = []
+        self.forms = []
+        for name in ('alpha', 'beta'):
+            manager = self.create_profile(f'manager_{name}', role='manager')
+            department = Department.objects.create(title=f'Sales Team {name}', slug=f'sales-{name}', manager=manager)
+            self.managers.append(manager)
+            self.forms.append(self.create_form(department, name='Monthly Evaluation'))
+        self.create_profile('manager_unassigned', role='manager')
+        self.period = (date(2026, 10, 1), date(2026, 10, 31))
+
+    def plan(self, **kwargs):
+        return plan_manager_evaluations(*self.period, 'Monthly Evaluation', **kwargs)
+
+    def test_one_evaluation_per_manager_and_form(self):
+        """Test each manager gets one evaluation from the first senior manager, with answer stubs"""
+        # Already assigned to the second senior manager; must not be duplicated
+        self.create_manager_evaluation(self.forms[0], self.seniors[1], self.managers[0], *self.period)
+        plan = self.plan()
+        self.assertEqual((len(plan.targets), plan.existing), (1, 1))
+        self.assertEqual(plan.skipped, [('manager_unassigned@example.com', 'no department assigned')])
+
+        result = apply_plan(plan)
+
+        created = DynamicManagerEvaluation.objects.get(manager=self.managers[1])
+        self.assertEqual(created.senior_manager, self.seniors[0])
+        questions = self.forms[1].questions.count()
+        self.assertGreater(questions, 0)
+        self.assertEqual((result.created, result.answers), (1, questions))
+        self.assertEqual(ManagerAnswer.objects.filter(instance=created).count(), questions)
+        self.assertEqual(
+            EvaluationStat.objects.get(kind=EvaluationStat.MANAGER, manager=self.managers[1]).evaluator,
+            self.seniors[0],
+        )
+
+    def test_only_senior_manager_and_stale_plans(self):
+        """Test the senior manager filter and that a stale plan inserts nothing"""
+        first, second = self.plan(senior_manager_email='vp_beta@example.com'), self.plan()
+        self.assertEqual(apply_plan(first).created, 2)
+        self.assertEqual(apply_plan(second).created, 0)
+        self.assertEqual(
+            set(DynamicManagerEvaluation.objects.values_list('senior_manager', flat=True)), {self.seniors[1].pk}
+        )
+        self.assertEqual(EvaluationStat.objects.filter(kind=EvaluationStat.MANAGER).count(), 2)
+
+    def test_bulk_stats_increment_existing_rows(self):
+        """Test bulk-created rows are added to existing rollup rows"""
+        department = self.forms[0].department
+        other_form = self.create_form(department, name='Quarterly Evaluation')
+        self.create_manager_evaluation(other_form, self.seniors[0], self.managers[0], *self.period)
+
+        apply_plan(self.plan())
+
+        stat = EvaluationStat.objects.get(kind=EvaluationStat.MANAGER, manager=self.managers[0])
+        self.assertEqual(stat.count, 2)
+        rebuilt = {(s.manager_id, s.count) for s in EvaluationStat.objects.all()}
+        rebuild_evaluation_stats()
+        self.assertEqual({(s.manager_id, s.count) for s in EvaluationStat.objects.all()}, rebuilt)
+
+    def test_command_queues_notifications_in_one_batch(self):
+        """Test the command queues one assignment email per senior manager"""
+        out = StringIO()
+        call_command('create_manager_evaluations', create_evaluations=True, stdout=out)
+
+        self.assertIn('Created 2 monthly evaluation evaluations', out.getvalue())
+        queued = OutboxMessage.objects.get()
+        self.assertEqual(queued.to, ['vp_alpha@example.com'])
+        self.assertEqual(queued.subject, 'New Manager Evaluations Assigned')
+        self.assertIn('2 new manager evaluation(s)', queued.body)
+        self.assertIn('  • manager_beta', queued.body)
+
+        call_command('create_manager_evaluations', create_evaluations=True, stdout=out)
+        self.assertEqual(OutboxMessage.objects.count(), 1)
+        self.assertEqual(DynamicManagerEvaluation.objects.count(), 2)
+
+    def test_command_dry_run(self):
+        """Test the dry run reports the plan without writing or queueing"""
+        out = StringIO()
+        call_command('create_manager_evaluations', create_evaluations=True, dry_run=True, stdout=out)
+        self.assertIn('2 to create, 0 already exist, 1 manager(s) skipped', out.getvalue())
+        self.assertEqual(DynamicManagerEvaluation.objects.count(), 0)
+        self.assertEqual(OutboxMessage.objects.count(), 0)
+
+
+class StreamingReportTest(EvaluationTestDataMixin, TestCase):
+    """Test cases for the streamed employee and manager PDF reports"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.department = self.create_department('Sales Team')
+        self.senior = self.create_profile('senior1', role='vp')
+        self.manager = self.create_profile('manager1', role='manager', department=self.department)
+        self.employee = self.create_profile('employee1', department=self.department, manager=self.manager)
+        self.form = self.create_form(self.department)
+
+    def test_paged_table_emits_every_row_one_page_at_a_time(self):
+        """Test rows beyond the old 100-row cap are all laid out, in page-sized tables"""
+        header = ['Employee', 'Manager', 'Week', 'Status', 'Submitted']
+        rows = ([f'Employee {i}', 'Manager', 'Week', 'completed', '2026-10-12'] for i in range(250))
+        flowable = PagedTable(header, rows, NARROW_COLUMNS)
+
+        tables = []
+        while flowable is not None:
+            self.assertGreater(flowable.wrap(456, 690)[1], 690)
+            parts = flowable.split(456, 690)
+            tables.append(parts[0])
+            flowable = parts[1] if len(parts) > 1 else None
+
+        self.assertGreater(len(tables), 1)
+        self.assertTrue(all(table._cellvalues[0] == header for table in tables))
+        self.assertTrue(all(table.wrap(456, 690)[1] <= 690 for table in tables))
+        cells = [row[0] for table in tables for row in table._cellvalues[1:]]
+        self.assertEqual(cells, [f'Employee {i}' for i in range(250)])
+
+    def test_employee_report_is_streamed_from_a_file(self):
+        """Test the employee report is a file download listing the period's evaluations"""
+        for week in range(3):
+            self.create_evaluation(self.form, self.manager, self.employee, date(2026, 9, 7) + timedelta(weeks=week),
+                                   status=EvaluationStatus.COMPLETED)
+        DynamicEvaluation.objects.update(submitted_at=timezone.now() - timedelta(days=2))
+        self.client.force_login(self.senior.user)
+
+        response = self.client.get(reverse('evaluation:generate_employee_report_pdf'),
+                                   {'department': self.department.pk, 'date_range': '30'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertIn('attachment; filename="employee_report_', response['Content-Disposition'])
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+        response.close()
+        self.assertTrue(ReportHistory.objects.filter(report_type='employee', department=self.department).exists())
+
+    def test_manager_report_reads_rows_in_chunks(self):
+        """Test the manager report fetches its rows with a constant number of queries"""
+        other_manager = self.create_profile('manager2', role='manager', department=self.department)
+        for manager in (self.manager, other_manager):
+            self.create_manager_evaluation(self.form, self.senior, manager, date(2026, 9, 1), date(2026, 9, 30),
+                                           status=EvaluationStatus.COMPLETED)
+        DynamicManagerEvaluation.objects.update(submitted_at=timezone.now() - timedelta(days=2))
+        self.client.force_login(self.senior.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('evaluation:generate_manager_report_pdf'), {'department': 'all'})
+        body = b''.join(response.streaming_content)
+        response.close()
+
+        self.assertTrue(body.startswith(b'%PDF'))
+        detail_queries = [q for q in queries.captured_queries if 'ORDER BY' in q['sql']
+                          and 'GROUP BY' not in q['sql'] and 'dynamicmanagerevaluation' in q['sql'].lower()]
+        self.assertEqual(len(detail_queries), 1)
+
+
+class ReportJobTest(EvaluationTestDataMixin, TestCase):
+    """Test cases for background report jobs"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        storage_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, storage_dir, ignore_errors=True)
+        override = override_settings(
+            REPORT_STORAGE={
+                'BACKEND': 'django.core.files.storage.FileSystemStorage',
+                'OPTIONS': {'location': storage_dir},
+            },
+            REPORT_JOBS_RUN_ON_COMMIT=False,
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.department = self.create_department('Sales Team')
+        self.senior = self.create_profile('senior1', role='vp')
+        self.manager = self.create_profile('manager1', role='manager', department=self.department)
+        self.employee = self.create_profile('employee1', department=self.department, manager=self.manager)
+        evaluation = self.create_evaluation(self.create_form(self.department), self.manager, self.employee,
+                                            date(2026, 9, 7), status=EvaluationStatus.COMPLETED)
+        DynamicEvaluation.objects.filter(pk=evaluation.pk).update(submitted_at=timezone.now() - timedelta(days=2))
+        self.client.force_login(self.senior.user)
+
+    def request_job(self, **params):
+        response = self.client.post(reverse('evaluation:request_report_job'), {
+            'report_type': 'employee', 'department': self.department.pk, 'date_range': '30', **params,
+        })
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_worker_builds_queued_report_for_download(self):
+        """Test a requested report is queued, built by the worker and downloadable"""
+        data = self.request_job()
+        self.assertFalse(data['reused'])
+        self.assertEqual(data['job']['status'], ReportJob.QUEUED)
+        self.assertNotIn('download_url', data['job'])
+        job = ReportJob.objects.get(pk=data['job']['id'])
+        self.assertEqual(ReportHistory.objects.get().job, job)
+
+        out = StringIO()
+        call_command('process_report_jobs', once=True, stdout=out)
+        self.assertIn('1 built, 0 failed', out.getvalue())
+
+        status = self.client.get(data['job']['status_url']).json()['job']
+        self.assertEqual((status['status'], status['progress']), (ReportJob.DONE, 100))
+        response = self.client.get(status['download_url'])
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertIn('attachment; filename="employee_report_', response['Content-Disposition'])
+        body = b''.join(response.streaming_content)
+        response.close()
+        self.assertTrue(body.startswith(b'%PDF'))
+        job.refresh_from_db()
+        self.assertEqual(job.file_size, len(body))
+
+    def test_identical_request_reuses_fresh_job(self):
+        """Test the same parameters within the freshness window share one job"""
+        first = self.request_job()
+        self.assertTrue(self.request_job()['reused'])
+        process_next_job()
+        again = self.request_job()
+        self.assertEqual((again['reused'], again['job']['id']), (True, first['job']['id']))
+        self.assertEqual(again['job']['status'], ReportJob.DONE)
+        self.assertEqual(ReportHistory.objects.filter(job_id=first['job']['id']).count(), 3)
+
+        # Another period is another report
+        self.assertFalse(self.request_job(date_range='90')['reused'])
+
+        with override_settings(REPORT_JOB_FRESHNESS_SECONDS=60):
+            ReportJob.objects.filter(pk=first['job']['id']).update(finished_at=timezone.now() - timedelta(minutes=2))
+            stale = self.request_job()
+        self.assertFalse(stale['reused'])
+        self.assertNotEqual(stale['job']['id'], first['job']['id'])
+
+    def test_failed_and_stale_jobs(self):
+        """Test failures are recorded and jobs abandoned by a worker are claimed again"""
+        parameters = report_parameters('999999', date(2026, 9, 1), date(2026, 9, 30))
+        failed, _ = request_report('employee', parameters)
+        self.assertEqual(process_next_job().status, ReportJob.FAILED)
+        failed.refresh_from_db()
+        self.assertIn('DoesNotExist', failed.error)
+        status = self.client.get(reverse('evaluation:report_job_status', args=[failed.pk])).json()['job']
+        self.assertIn('error', status)
+        self.assertEqual(self.client.get(reverse('evaluation:download_report_job', args=[failed.pk])).status_code, 404)
+
+        abandoned, _ = request_report('trends', report_parameters('all', date(2026, 7, 1), date(2026, 9, 29), 90))
+        ReportJob.objects.filter(pk=abandoned.pk).update(
+            status=ReportJob.RUNNING, started_at=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(process_next_job().pk, abandoned.pk)
+        abandoned.refresh_from_db()
+        self.assertEqual(abandoned.status, ReportJob.DONE)
+
+    def test_run_on_commit_and_purge(self):
+        """Test jobs can be built right after the request commits, and expired PDFs are purged"""
+        with override_settings(REPORT_JOBS_RUN_ON_COMMIT=True), self.captureOnCommitCallbacks(execute=True):
+            data = self.request_job()
+        job = ReportJob.objects.get(pk=data['job']['id'])
+        self.assertEqual(job.status, ReportJob.DONE)
+        self.assertTrue(get_report_storage().exists(job.output_path))
+
+        self.assertEqual(purge_expired_reports(), 0)
+        ReportJob.objects.filter(pk=job.pk).update(finished_at=timezone.now() - timedelta(days=31))
+        self.assertEqual(purge_expired_reports(30), 1)
+        self.assertFalse(get_report_storage().exists(job.output_path))
+        self.assertIsNone(ReportHistory.objects.get().job)
+
+    def test_invalid_requests(self):
+        """Test unknown report types and departments are rejected"""
+        for params in ({'report_type': 'payroll'}, {'department': 'nope'}, {'department': '999999'}):
+            response = self.client.post(reverse('evaluation:request_report_job'), {
+                'report_type': 'employee', 'date_range': '30', **params,
+            })
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(ReportJob.objects.exists())
+
+
+class ReportResourcesTest(TestCase):
+    """Test cases for the shared reportlab resources registry"""
+
+    def test_resources_are_built_once(self):
+        """Test styles and table styles are shared between reports"""
+        self.assertGreater(warm_report_resources(), 0)
+        self.assertIs(get_pdf_styles(), get_pdf_styles())
+        first = create_summary_table([['Metric', 'Count'], ['Total', '1']], [100, 100])
+        second = create_summary_table([['Metric', 'Count'], ['Total', '2']], [100, 100])
+        self.assertIsNot(first, second)
+        self.assertEqual(first._bkgrndcmds, second._bkgrndcmds)
+        self.assertIs(create_question_paragraph('A').style, create_question_paragraph('B').style)
+        self.assertEqual(get_table_template('individual_question').options, {'repeatRows': 1})
+
+        with registry.bypass():
+            self.assertIsNot(get_pdf_styles(), get_pdf_styles())
+        self.assertIs(get_pdf_styles(), get_pdf_styles())
+
+    @skipUnless(hasattr(os, 'fork'), 'requires os.fork')
+    def test_forked_child_does_not_inherit_a_held_lock(self):
+        """Test a fork during a build leaves the child a usable registry"""
+        held, release = threading.Event(), threading.Event()
+
+        def build_in_progress():
+            with registry._lock:
+                held.set()
+                release.wait()
+
+        thread = threading.Thread(target=build_in_progress)
+        thread.start()
+        held.wait()
+        try:
+            pid = os.fork()
+            if pid == 0:
+                # Child: a lookup of a resource that is not built yet takes the lock
+                signal.alarm(5)
+                os._exit(0 if registry.get(frozenset, ('forked',)) == frozenset({'forked'}) else 1)
+            _, status = os.waitpid(pid, 0)
+        finally:
+            release.set()
+            thread.join()
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+
+
+class TrendsReportAggregationTest(EvaluationTestDataMixin, TestCase):
+    """Test cases for the database-aggregated trends report"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.department = self.create_department('Sales Team')
+        self.manager = self.create_profile('manager1', role='manager', department=self.department)
+        self.form = self.create_form(self.department)
+        self.volume = Question.objects.create(form=self.form, text='Work Volume', order=0, include_in_trends=True)
+        self.quality = Question.objects.create(form=self.form, text='Work Quality', order=1, include_in_trends=True)
+        self.untracked = Question.objects.create(form=self.form, text='Attitude', order=2)
+        self.today = timezone.now().date()
+        self.start_date, self.end_date = self.today - timedelta(days=30), self.today
+        self.add_employee('employee1', scores=[(5, 3, 1), (4, 4, 2), (2, 5, 3)])
+
+    def add_employee(self, username, scores):
+        """Create an employee with one completed, answered evaluation per week of scores"""
+        employee = self.create_profile(username, department=self.department, manager=self.manager)
+        for weeks_ago, (volume, quality, attitude) in enumerate(scores, 1):
+            week_start = self.today - timedelta(weeks=weeks_ago, days=self.today.weekday())
+            evaluation = self.create_evaluation(self.form, self.manager, employee, week_start,
+                                                status=EvaluationStatus.COMPLETED)
+            DynamicEvaluation.objects.filter(pk=evaluation.pk).update(
+                submitted_at=timezone.now() - timedelta(weeks=weeks_ago - 1, days=2)
+            )
+            Answer.objects.bulk_create([
+                Answer(instance=evaluation, question=self.volume, int_value=volume),
+                Answer(instance=evaluation, question=self.quality, int_value=quality),
+                Answer(instance=evaluation, question=self.untracked, int_value=attitude),
+            ])
+
+    def test_question_stats_match_the_answers(self):
+        """Test SQL and rollup aggregates equal the Python totals the report used to compute"""
+        stats = get_trend_question_stats(DynamicEvaluation, self.department.pk, self.start_date, self.end_date)
+
+        self.assertEqual(set(stats), {self.volume.pk, self.quality.pk})
+        self.assertEqual(stats[self.volume.pk], {'count': 3, 'sum': 11, 'histogram': {5: 1, 4: 1, 2: 1}})
+        self.assertEqual(stats[self.quality.pk]['sum'] / stats[self.quality.pk]['count'], 4)
+
+        rebuild_answer_rollups()
+        rollup_stats = get_trend_question_stats(DynamicEvaluation, self.department.pk, self.start_date,
+                                                self.end_date, use_rollups=True)
+        self.assertEqual(rollup_stats, stats)
+        self.assertEqual(get_trend_question_stats(DynamicEvaluation, 'all', self.start_date, self.end_date), stats)
+
+    def test_period_averages_by_week(self):
+        """Test trend answers are averaged per submission week"""
+        averages = get_trend_period_averages(DynamicEvaluation, 'all', self.start_date, self.end_date, 'week')
+
+        self.assertEqual([(average, total) for _, average, total in averages], [(3.5, 2), (4.0, 2), (4.0, 2)])
+        self.assertTrue(all(bucket.weekday() == 0 for bucket, _, _ in averages))
+
+        with self.settings(TRENDS_REPORT_USE_ROLLUPS=True):
+            self.assertFalse(use_trend_rollups(DynamicEvaluation))
+            rebuild_answer_rollups()
+            self.assertTrue(use_trend_rollups(DynamicEvaluation))
+        self.assertFalse(use_trend_rollups(DynamicEvaluation))
+        monthly = get_trend_period_averages(DynamicEvaluation, 'all', self.start_date, self.end_date, 'month',
+                                            use_rollups=True)
+        self.assertEqual(sum(total for _, _, total in monthly), 6)
+
+    def test_report_queries_do_not_grow_with_answers(self):
+        """Test the trends report aggregates in a fixed number of queries"""
+        def report_queries():
+            with CaptureQueriesContext(connection) as queries:
+                output = BytesIO()
+                write_trends_report(output, self.department.pk, self.department.title,
+                                    self.start_date, self.end_date, 30)
+            self.assertTrue(output.getvalue().startswith(b'%PDF'))
+            return len(queries)
+
+        with patch('evaluation.pdf_reports.get_chart', wraps=get_chart) as chart:
+            baseline = report_queries()
+        self.assertEqual([call.args[0] for call in chart.call_args_list], ['line', 'bar'])
+        self.add_employee('employee2', scores=[(3, 3, 3), (1, 2, 3)])
+        self.assertEqual(report_queries(), baseline)
+
+
+class ReportChartsTest(EvaluationTestDataMixin, TestCase):
+    """Test cases for the cached report charts"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.data = {
+            'categories': ['2026-09-07', '2026-09-14', '2026-09-21'],
+            'series': [('Employee', [3.5, 4.0, None]), ('Manager', [4.0, 3.75, 4.5])],
+        }
+
+    def draw_operators(self, drawing):
+        canvas = Canvas(BytesIO())
+        drawing.drawOn(canvas, 0, 0)
+        return canvas._code
+
+    def test_flattened_chart_draws_like_the_widgets(self):
+        """Test a flattened chart produces the same PDF operators as its widgets"""
+        for chart_type, builder in CHART_BUILDERS.items():
+            self.assertEqual(self.draw_operators(render_chart(chart_type, self.data)),
+                             self.draw_operators(builder(self.data, CHART_WIDTH, CHART_HEIGHT)))
+
+    def test_charts_are_cached_by_data_type_and_size(self):
+        """Test an unchanged chart is drawn from the cache, as a copy of its own"""
+        with patch.dict(CHART_BUILDERS, line=Mock(wraps=CHART_BUILDERS['line'])) as builders:
+            first = get_chart('line', self.data)
+            second = get_chart('line', self.data)
+            self.assertEqual(builders['line'].call_count, 1)
+        self.assertIsNot(first, second)
+        self.assertEqual(self.draw_operators(first), self.draw_operators(second))
+
+        key = chart_cache_key('line', self.data, CHART_WIDTH, CHART_HEIGHT)
+        self.assertNotEqual(key, chart_cache_key('bar', self.data, CHART_WIDTH, CHART_HEIGHT))
+        self.assertNotEqual(key, chart_cache_key('line', self.data, CHART_WIDTH / 2, CHART_HEIGHT))
+        changed = {**self.data, 'series': [('Employee', [3.5, 4.0, 5.0])]}
+        self.assertNotEqual(key, chart_cache_key('line', changed, CHART_WIDTH, CHART_HEIGHT))
+
+        # A single point per series draws markers only
+        single = {'categories': ['2026-09-07'], 'series': [('Employee', [3.5]), ('Manager', [None])]}
+        self.assertTrue(self.draw_operators(get_chart('line', single)))
+
+    def test_manager_report_charts_evaluations_by_month(self):
+        """Test the manager report chart counts completed and pending evaluations per month"""
+        department = self.create_department('Sales Team')
+        senior = self.create_profile('senior1', role='vp')
+        manager = self.create_profile('manager1', role='manager', department=department)
+        form = self.create_form(department)
+        self.create_manager_evaluation(form, senior, manager, date(2026, 8, 1), date(2026, 8, 31),
+                                       status=EvaluationStatus.COMPLETED)
+        self.create_manager_evaluation(form, senior, manager, date(2026, 9, 1), date(2026, 9, 30))
+
+        with patch('evaluation.pdf_reports.get_chart', wraps=get_chart) as chart:
+            flowables = monthly_status_chart(DynamicManagerEvaluation.objects.all(), 'period_start')
+
+        self.assertEqual(len(flowables), 3)
+        chart.assert_called_once_with('bar', {
+            'categories': ['2026-08', '2026-09'],
+            'series': [('Completed', [1, 0]), ('Pending', [0, 1])],
+        })
+        self.assertEqual(monthly_status_chart(DynamicManagerEvaluation.objects.none(), 'period_start'), [])
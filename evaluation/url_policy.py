@@ -0,0 +1,131 @@
+"""
+URL policies for the overdue evaluation lock middlewares.
+
+Allow-lists are declared by URL name or namespace and compiled once, when
+the middlewares are loaded, into one regular expression of literal path
+prefixes. A request then costs a single anchored regex match instead of a
+chain of startswith() calls, and no reverse() lookups.
+"""
+
+import re
+from functools import cached_property
+
+from django.conf import settings
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.urls.resolvers import RoutePattern
+
+# Characters that end the literal part of a regex URL pattern
+_REGEX_SPECIAL = re.compile(r'[\\.^$*+?{}\[\]|()]')
+
+
+def _literal_prefix(pattern):
+    """Literal text a URL pattern starts with, up to its first argument."""
+    if isinstance(pattern, RoutePattern):
+        return str(pattern).split('<', 1)[0]
+    regex = str(pattern).removeprefix('^')
+    match = _REGEX_SPECIAL.search(regex)
+    return regex[:match.start()] if match else regex
+
+
+def iter_url_prefixes(patterns=None, prefix='/', namespace=''):
+    """
+    Yield (name, path prefix) for every named URL and namespace in the URLconf.
+
+    Namespaces are yielded as 'namespace:' and map to the prefix their URLs
+    are included under; names with arguments map to the path before the first
+    argument (e.g. 'evaluation:evaluate' -> '/evaluation/evaluate/').
+    """
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    for entry in patterns:
+        route = prefix + _literal_prefix(entry.pattern)
+        if isinstance(entry, URLResolver):
+            child_namespace = f"{namespace}{entry.namespace}:" if entry.namespace else namespace
+            if entry.namespace:
+                yield child_namespace, route
+            yield from iter_url_prefixes(entry.url_patterns, route, child_namespace)
+        elif isinstance(entry, URLPattern) and entry.name:
+            yield f"{namespace}{entry.name}", route
+
+
+class PathPolicy:
+    """
+    Set of path prefixes matched with one compiled regular expression.
+
+    Args:
+        names: URL names ('evaluation:pending') whose paths are included
+        namespaces: URL namespaces ('evaluation') whose whole subtree is included
+        prefixes: Literal path prefixes, or a callable returning them (read on compile)
+    """
+
+    def __init__(self, names=(), namespaces=(), prefixes=()):
+        self.names = tuple(names)
+        self.namespaces = tuple(f"{namespace}:" for namespace in namespaces)
+        self.prefixes = prefixes
+
+    def resolve_prefixes(self):
+        """Return the sorted literal prefixes of the policy."""
+        wanted = set(self.names) | set(self.namespaces)
+        found = {}
+        if wanted:
+            for name, route in iter_url_prefixes():
+                if name in wanted:
+                    found.setdefault(name, set()).add(route)
+        missing = wanted - set(found)
+        if missing:
+            raise ValueError(f"Unknown URL names in path policy: {', '.join(sorted(missing))}")
+
+        prefixes = {route for routes in found.values() for route in routes}
+        extra = self.prefixes() if callable(self.prefixes) else self.prefixes
+        prefixes.update(p for p in extra if p)
+        return sorted(prefixes)
+
+    @cached_property
+    def regex(self):
+        # Prefixes covered by a shorter one add nothing to the match
+        prefixes = []
+        for prefix in sorted(self.resolve_prefixes(), key=len):
+            if not prefix.startswith(tuple(prefixes)):
+                prefixes.append(prefix)
+        if not prefixes:
+            return None
+        return re.compile('|'.join(re.escape(prefix) for prefix in prefixes))
+
+    def compile(self):
+        """Resolve and compile the prefixes now instead of on the first request."""
+        return self.regex
+
+    def matches(self, path):
+        """Return whether path starts with one of the policy's prefixes."""
+        regex = self.regex
+        return regex is not None and regex.match(path) is not None
+
+
+def _skipped_prefixes():
+    return [settings.STATIC_URL, settings.MEDIA_URL, *getattr(settings, 'EVALUATION_LOCK_SKIP_PATHS', ())]
+
+
+# Requests the lock middlewares ignore entirely - static and media files and
+# health checks - before even loading the user from the session
+SKIP_POLICY = PathPolicy(prefixes=_skipped_prefixes)
+
+AUTH_URLS = ('authentication:login', 'authentication:logout')
+
+# Pages a manager with overdue employee evaluations can still open
+OVERDUE_EVALUATION_ALLOWED = PathPolicy(names=(
+    'evaluation:pending',
+    'evaluation:evaluate',
+    'evaluation:view_evaluation',
+    *AUTH_URLS,
+))
+
+# Pages a senior manager with overdue manager evaluations can still open
+OVERDUE_MANAGER_EVALUATION_ALLOWED = PathPolicy(names=(
+    'evaluation:manager_evaluation_dashboard',
+    'evaluation:manager_evaluation_cards',
+    'evaluation:evaluate_manager_dynamic',
+    'evaluation:view_manager_evaluation',
+    'evaluation:my_manager_evaluations',
+    'evaluation:pending_manager_evaluations',
+    *AUTH_URLS,
+))
@@ -42,6 +42,9 @@ urlpatterns += [
     path("reports/employee-pdf/", views.generate_employee_report_pdf, name="generate_employee_report_pdf"),
     path("reports/manager-pdf/", views.generate_manager_report_pdf, name="generate_manager_report_pdf"),
     path("reports/trends-pdf/", views.generate_trends_report_pdf, name="generate_trends_report_pdf"),
+    path("reports/jobs/", views.request_report_job, name="request_report_job"),
+    path("reports/jobs/<int:job_id>/", views.report_job_status, name="report_job_status"),
+    path("reports/jobs/<int:job_id>/download/", views.download_report_job, name="download_report_job"),
 ]
 
 # Reusable Analytics Dashboard
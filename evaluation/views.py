@@ -2,7 +2,8 @@ from django.contrib.auth.decorators import login_required, user_passes_test
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.db import transaction
-from django.db.models import Count, Q, Avg, Sum, Max
+from django.db.models import Count, Q, Sum, Max, Min
+from django.db.models.functions import TruncMonth, TruncQuarter, TruncYear
 from .models import Question
 from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
@@ -16,26 +17,22 @@ from django.conf import settings
 from django.urls import reverse
 import json
 import logging
-from django.core.cache import cache, caches
 from datetime import datetime
-from django.db.models import Prefetch
 from django.utils import timezone
 from .models import Answer
-from django.http import HttpResponse
-from io import BytesIO, StringIO
+from django.http import FileResponse, Http404
+from io import StringIO
 import csv
 from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import PageBreak
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
-from reportlab.lib import colors as pdf_colors
 
 logger = logging.getLogger(__name__)
 
 from authentication.models import UserProfile, Department
-from .models import EvalForm, Question, DynamicEvaluation, DynamicManagerEvaluation, ManagerAnswer, ReportHistory
+from .models import EvalForm, Question, DynamicEvaluation, DynamicManagerEvaluation, ManagerAnswer, ReportHistory, ReportJob, EvaluationStat
 from .forms_dynamic_admin import EvalFormForm, QuestionForm, QuestionChoiceForm
 from .forms import PreviewEvalForm, DynamicEvaluationForm
 from .constants import EvaluationStatus
@@ -73,17 +70,25 @@ from .manager_performance_views import (
     aggregate_manager_evaluation_data,
     get_manager_emoji_distribution
 )
+from .analytics_snapshot import get_scoped_analytics_snapshot
+from .cache_utils import (
+    analytics_dashboard_cache_key, analytics_scope_for, build_dependency_tags, read_tagged,
+    set_tagged, set_tagged_lru, single_flight,
+)
+from .stats_utils import get_department_answer_totals, get_rollup_stats
+from .report_jobs import get_report_storage, report_filename, report_parameters, request_report
+from .pdf_reports import (
+    pdf_file_response,
+    report_evaluations,
+    write_employee_report,
+    write_manager_report,
+    write_trends_report,
+)
 from .report_utils import (
-    get_pdf_styles,
     parse_date_range,
     get_department_info,
-    create_summary_table,
     create_detail_table,
-    create_chart_metrics_table,
-    create_person_header,
-    create_individual_question_table,
     save_report_history,
-    create_question_paragraph
 )
 
 # Permission checking functions moved to decorators.py
@@ -823,401 +828,29 @@ def senior_manager_analytics_dashboard(request):
     if start_date_obj or end_date_obj:
         logger.info(f"Date filters applied: {start_date_obj} to {end_date_obj}")
     
-    # Create cache key based on user, date, and filters
-    cache_key = f"analytics_dashboard_{request.user.id}_{today_date}_{start_date}_{end_date}"
-    
-    # Skip cache if filters are applied to ensure fresh filtered data
-    has_filters = bool(start_date or end_date)
-    
-    # Try to get cached data first from analytics cache
-    analytics_cache = caches['analytics']
-    cached_data = None
-    if not has_filters:
-        cached_data = analytics_cache.get(cache_key)
-    
-    if cached_data:
-        logger.info(f"Analytics dashboard cache hit for user {request.user.id}")
-        # Update the last viewed timestamp to current time
-        current_time = timezone.now()
-        cached_data['last_viewed_at'] = current_time.isoformat()
-        # Update cache with new timestamp
-        analytics_cache.set(cache_key, cached_data, timeout=1800)
-        
-        # Convert serialized dates back to proper objects for template rendering
-        from datetime import datetime
-        cached_data['today'] = datetime.fromisoformat(cached_data['today']).date()
-        cached_data['data_computed_at'] = datetime.fromisoformat(cached_data['data_computed_at'])
-        cached_data['last_viewed_at'] = current_time  # Use current time object for display
-        
-        return render(request, "evaluation/senior_manager_analytics_dashboard.html", cached_data)
-    
-    logger.info(f"Analytics dashboard cache miss for user {request.user.id}, computing data...")
-    
-    # Helper function to apply date filters (DRY principle)
-    def apply_employee_date_filter(queryset):
-        if start_date_obj and end_date_obj:
-            return queryset.filter(week_start__lte=end_date_obj, week_end__gte=start_date_obj)
-        elif start_date_obj:
-            return queryset.filter(week_end__gte=start_date_obj)
-        elif end_date_obj:
-            return queryset.filter(week_start__lte=end_date_obj)
-        return queryset
-    
-    def apply_manager_date_filter(queryset):
-        if start_date_obj and end_date_obj:
-            return queryset.filter(period_start__lte=end_date_obj, period_end__gte=start_date_obj)
-        elif start_date_obj:
-            return queryset.filter(period_end__gte=start_date_obj)
-        elif end_date_obj:
-            return queryset.filter(period_start__lte=end_date_obj)
-        return queryset
-    
-    # Optimized querysets with date filters
-    employee_qs = apply_employee_date_filter(
-        DynamicEvaluation.objects.only('id', 'status', 'week_end', 'week_start', 'department_id', 'employee_id')
-    )
-    manager_qs = apply_manager_date_filter(
-        DynamicManagerEvaluation.objects.only('id', 'status', 'period_end', 'period_start', 'department_id', 'manager_id')
-    )
-    
-    employee_prefetch = Prefetch('dynamic_evaluations', queryset=employee_qs)
-    manager_prefetch = Prefetch('dynamic_manager_evaluations', queryset=manager_qs)
-    
-    departments = Department.objects.prefetch_related(
-        employee_prefetch,
-        manager_prefetch
-    ).only('id', 'title').all()
-    
-    dept_count = len(departments)
-    logger.info(f"Processing {dept_count} departments for analytics")
-    
-    # Optimized employee evaluations query with select_related to prevent N+1
-    all_employee_evaluations = apply_employee_date_filter(
-        DynamicEvaluation.objects.select_related(
-        'employee__user', 'form', 'department'
-    ).only(
-            'id', 'status', 'week_end', 'week_start', 'submitted_at', 'employee_id', 'department_id', 
-        'form_id', 'employee__user__first_name', 'employee__user__last_name',
-        'department__title', 'form__name'
-    )
-    )
-    
-    # Optimized manager evaluations query with select_related to prevent N+1
-    all_manager_evaluations = apply_manager_date_filter(
-        DynamicManagerEvaluation.objects.select_related(
-        'manager__user', 'form', 'department'
-    ).only(
-            'id', 'status', 'period_end', 'period_start', 'submitted_at', 'manager_id', 'department_id',
-        'form_id', 'manager__user__first_name', 'manager__user__last_name',
-        'department__title', 'form__name'
-    )
-    )
-    
-    emp_eval_count = all_employee_evaluations.count()
-    mgr_eval_count = all_manager_evaluations.count()
-    logger.info(f"Loaded {emp_eval_count} employee evaluations and {mgr_eval_count} manager evaluations")
-    
-    # Overall completion rates
-    employee_stats = calculate_eval_stats(all_employee_evaluations, today_date, "week_end")
-    # Rename keys to match original naming
-    employee_stats = {
-        'total_employee_evals': employee_stats['total'],
-        'completed_employee_evals': employee_stats['completed'],
-        'pending_employee_evals': employee_stats['pending'],
-        'overdue_employee_evals': employee_stats['overdue']
-    }
-    
-    manager_stats = calculate_eval_stats(all_manager_evaluations, today_date, "period_end")
-    # Rename keys to match original naming
-    manager_stats = {
-        'total_manager_evals': manager_stats['total'],
-        'completed_manager_evals': manager_stats['completed'],
-        'pending_manager_evals': manager_stats['pending'],
-        'overdue_manager_evals': manager_stats['overdue']
-    }
-    
-    # Department performance analytics
-    department_analytics = []
-    for dept in departments:
-        # Use prefetched evaluations to avoid N+1 queries
-        dept_employee_evals = dept.dynamic_evaluations.all()
-        dept_manager_evals = dept.dynamic_manager_evaluations.all()
-        
-        dept_employee_stats = calculate_eval_stats(dept_employee_evals, today_date, "week_end")
-        dept_manager_stats = calculate_eval_stats(dept_manager_evals, today_date, "period_end")
-        
-        # Calculate completion rates
-        employee_completion_rate = (dept_employee_stats['completed'] / dept_employee_stats['total'] * 100) if dept_employee_stats['total'] > 0 else 0
-        manager_completion_rate = (dept_manager_stats['completed'] / dept_manager_stats['total'] * 100) if dept_manager_stats['total'] > 0 else 0
-        
-        # Determine if department has no evaluations (not started)
-        has_employee_evals = dept_employee_stats['total'] > 0
-        has_manager_evals = dept_manager_stats['total'] > 0
-        
-        # Determine employee status based on pending/overdue logic
-        employee_status = determine_status(dept_employee_stats['total'], dept_employee_stats['pending'], dept_employee_stats['overdue'])
-            
-        # Determine manager status based on pending/overdue logic
-        manager_status = determine_status(dept_manager_stats['total'], dept_manager_stats['pending'], dept_manager_stats['overdue'])
-        
-        department_analytics.append({
-            'department': dept,
-            'employee_stats': dept_employee_stats,
-            'manager_stats': dept_manager_stats,
-            'employee_completion_rate': round(employee_completion_rate, 1),
-            'manager_completion_rate': round(manager_completion_rate, 1),
-            'has_employee_evals': has_employee_evals,
-            'has_manager_evals': has_manager_evals,
-            'employee_status': employee_status,
-            'manager_status': manager_status,
-        })
-    
-    # Sort departments by employee completion rate
-    department_analytics.sort(key=lambda x: x['employee_completion_rate'], reverse=True)
-    
-    # Manager effectiveness analytics - optimize with prefetch and reuse filter functions
-    mgr_eval_qs = apply_employee_date_filter(
-        DynamicEvaluation.objects.only('id', 'status', 'week_end', 'week_start', 'employee_id', 'manager_id')
-    )
-    mgr_reviews_qs = apply_manager_date_filter(
-        DynamicManagerEvaluation.objects.only('id', 'status', 'period_end', 'period_start', 'manager_id', 'senior_manager_id')
-    )
+    # Every user with the same permission scope sees the same numbers, so the
+    # entry is shared by scope; per-user fields are added at render time
+    analytics_scope = analytics_scope_for(request.user)
     
-    mgr_evaluations_prefetch = Prefetch('dynamic_mgr_evaluations', queryset=mgr_eval_qs)
-    manager_reviews_prefetch = Prefetch('dynamic_manager_reviews', queryset=mgr_reviews_qs)
-    team_members_prefetch = Prefetch(
-        'team_members',
-        queryset=UserProfile.objects.only('id', 'user__first_name', 'user__last_name', 'role')
+    # Concurrent misses build the snapshot once; the others may get the stale one flagged as refreshing
+    snapshot, data_computed_at, refreshing = get_scoped_analytics_snapshot(
+        analytics_scope, today_date, start_date_obj, end_date_obj
     )
     
-    managers = UserProfile.objects.filter(role='manager').select_related('user').prefetch_related(
-        mgr_evaluations_prefetch,
-        manager_reviews_prefetch,
-        team_members_prefetch
-    ).only('id', 'user__first_name', 'user__last_name', 'role')
-    
-    manager_count = managers.count()
-    logger.info(f"Processing {manager_count} managers for effectiveness analytics")
-    
-    manager_effectiveness = []
-    
-    for manager in managers:
-        # Use prefetched evaluations to avoid N+1 queries
-        manager_team_evals = manager.dynamic_mgr_evaluations.all()
-        manager_self_evals = manager.dynamic_manager_reviews.all()
-        
-        team_stats = calculate_eval_stats(manager_team_evals, today_date, "week_end")
-        self_stats = calculate_eval_stats(manager_self_evals, today_date, "period_end")
-        
-        team_completion_rate = (team_stats['completed'] / team_stats['total'] * 100) if team_stats['total'] > 0 else 0
-        self_completion_rate = (self_stats['completed'] / self_stats['total'] * 100) if self_stats['total'] > 0 else 0
-        
-        # Determine manager team status based on pending/overdue logic
-        team_status = determine_status(team_stats['total'], team_stats['pending'], team_stats['overdue'])
-        
-        # Get the senior manager who manages this manager
-        senior_manager = manager.manager if hasattr(manager, 'manager') and manager.manager else None
-        
-        manager_effectiveness.append({
-            'manager': manager,
-            'senior_manager': senior_manager,
-            'team_stats': team_stats,
-            'self_stats': self_stats,
-            'team_completion_rate': round(team_completion_rate, 1),
-            'self_completion_rate': round(self_completion_rate, 1),
-            'team_status': team_status,
-        })
-    
-    # Sort managers by team completion rate
-    manager_effectiveness.sort(key=lambda x: x['team_completion_rate'], reverse=True)
-    
-    # Teams performance analytics (grouped by manager/team leader)
-    # Pre-compute team member evaluations to avoid database hits
-    team_member_evaluations = {}
-    for eval in all_employee_evaluations:
-        employee_id = eval.employee_id
-        if employee_id not in team_member_evaluations:
-            team_member_evaluations[employee_id] = []
-        team_member_evaluations[employee_id].append(eval)
-    
-    teams_analytics = []
-    for manager in managers:
-        # Use prefetched team members to avoid N+1 queries
-        team_members = list(manager.team_members.all())
-        
-        # Get evaluations for all team members using pre-computed data
-        team_employee_evals = []
-        for member in team_members:
-            team_employee_evals.extend(team_member_evaluations.get(member.id, []))
-        team_manager_evals = list(manager.dynamic_manager_reviews.all())
-        
-        team_employee_stats = calculate_eval_stats(team_employee_evals, today_date, "week_end")
-        team_manager_stats = calculate_eval_stats(team_manager_evals, today_date, "period_end")
-        
-        # Calculate completion rates
-        team_employee_completion_rate = (team_employee_stats['completed'] / team_employee_stats['total'] * 100) if team_employee_stats['total'] > 0 else 0
-        team_manager_completion_rate = (team_manager_stats['completed'] / team_manager_stats['total'] * 100) if team_manager_stats['total'] > 0 else 0
-        
-        # Determine if team has no evaluations (not started)
-        has_employee_evals = team_employee_stats['total'] > 0
-        has_manager_evals = team_manager_stats['total'] > 0
-        
-        # Determine team status based on pending/overdue logic
-        # Use the more critical status between employee and manager evaluations
-        employee_status = determine_status(team_employee_stats['total'], team_employee_stats['pending'], team_employee_stats['overdue'])
-        manager_status = determine_status(team_manager_stats['total'], team_manager_stats['pending'], team_manager_stats['overdue'])
-        
-        # If either is critical, team is critical; if either needs attention, team needs attention
-        if employee_status == 'critical' or manager_status == 'critical':
-            team_status = 'critical'
-        elif employee_status == 'needs_attention' or manager_status == 'needs_attention':
-            team_status = 'needs_attention'
-        elif employee_status == 'awaiting' and manager_status == 'awaiting':
-            team_status = 'awaiting'
-        else:
-            team_status = 'on_track'
-        
-        # Get team size (use len() to avoid DB hit on prefetched data)
-        team_size = len(team_members)
-        
-        teams_analytics.append({
-            'manager': manager,
-            'team_members': team_members,
-            'team_size': team_size,
-            'employee_stats': team_employee_stats,
-            'manager_stats': team_manager_stats,
-            'employee_completion_rate': round(team_employee_completion_rate, 1),
-            'manager_completion_rate': round(team_manager_completion_rate, 1),
-            'has_employee_evals': has_employee_evals,
-            'has_manager_evals': has_manager_evals,
-            'team_status': team_status,
-        })
-    
-    # Sort teams by employee completion rate
-    teams_analytics.sort(key=lambda x: x['employee_completion_rate'], reverse=True)
-    
-    # Calculate overall completion rates
-    total_employee_evals = employee_stats['total_employee_evals']
-    total_manager_evals = manager_stats['total_manager_evals']
-    
-    overall_employee_completion_rate = (employee_stats['completed_employee_evals'] / total_employee_evals * 100) if total_employee_evals > 0 else 0
-    overall_manager_completion_rate = (manager_stats['completed_manager_evals'] / total_manager_evals * 100) if total_manager_evals > 0 else 0
-    
-    # Recent activity (last 30 days)
-    thirty_days_ago = today - timedelta(days=30)
-    recent_employee_evals = all_employee_evaluations.filter(submitted_at__gte=thirty_days_ago)
-    recent_manager_evals = all_manager_evaluations.filter(submitted_at__gte=thirty_days_ago)
-    
-    logger.info(f"Recent activity: {recent_employee_evals.count()} employee evals, {recent_manager_evals.count()} manager evals (last 30 days)")
-    
-    
-    # Department comparison data (reuse already prefetched evaluations to avoid N+1)
-    department_comparison = []
-    for dept in departments:
-        dept_employee_evals = dept.dynamic_evaluations.all()
-        dept_manager_evals = dept.dynamic_manager_evaluations.all()
-        
-        dept_emp_completed = len([e for e in dept_employee_evals if e.status == EvaluationStatus.COMPLETED])
-        dept_emp_total = len(dept_employee_evals)
-        dept_emp_completion_rate = (dept_emp_completed / dept_emp_total * 100) if dept_emp_total > 0 else 0
-        
-        dept_mgr_completed = len([e for e in dept_manager_evals if e.status == EvaluationStatus.COMPLETED])
-        dept_mgr_total = len(dept_manager_evals)
-        dept_mgr_completion_rate = (dept_mgr_completed / dept_mgr_total * 100) if dept_mgr_total > 0 else 0
-        
-        # Calculate department average rating (only if needed)
-        dept_avg_rating = 0
-        if dept_emp_completed > 0:
-            dept_ratings = Answer.objects.filter(
-                instance__in=dept_employee_evals.filter(status=EvaluationStatus.COMPLETED),
-                question__qtype='rating'
-            ).aggregate(avg_rating=Avg('int_value'))['avg_rating'] or 0
-            dept_avg_rating = round(dept_ratings, 1)
-        
-        department_comparison.append({
-            'department_name': dept.title,
-            'employee_completion_rate': round(dept_emp_completion_rate, 1),
-            'manager_completion_rate': round(dept_mgr_completion_rate, 1),
-            'average_rating': dept_avg_rating,
-            'total_evaluations': dept_emp_total + dept_mgr_total,
-            'completed_evaluations': dept_emp_completed + dept_mgr_completed
-        })
-    
-    logger.info(f"Department comparison data compiled for {len(department_comparison)} departments")
-    
-    # Prepare context data with current time
-    current_time = timezone.now()
-    
-    # Serialize departments to avoid caching ORM objects
-    departments_data = [
-        {
-            'id': dept.id,
-            'title': dept.title,
-        }
-        for dept in departments
-    ]
-    
-    # Serialize recent evaluations to avoid caching ORM objects
-    recent_employee_evals_data = [
-        {
-            'id': eval.id,
-            'employee_name': f"{eval.employee.user.first_name} {eval.employee.user.last_name}",
-            'department_name': eval.department.title,
-            'form_name': eval.form.name,
-            'status': eval.status,
-            'week_end': eval.week_end.isoformat() if eval.week_end else None,
-            'submitted_at': eval.submitted_at.isoformat() if eval.submitted_at else None,
-        }
-        for eval in recent_employee_evals
-    ]
-    
-    recent_manager_evals_data = [
-        {
-            'id': eval.id,
-            'manager_name': f"{eval.manager.user.first_name} {eval.manager.user.last_name}",
-            'department_name': eval.department.title,
-            'form_name': eval.form.name,
-            'status': eval.status,
-            'period_end': eval.period_end.isoformat() if eval.period_end else None,
-            'submitted_at': eval.submitted_at.isoformat() if eval.submitted_at else None,
-        }
-        for eval in recent_manager_evals
-    ]
-    
     context_data = {
-        'departments': departments_data,
-        'department_analytics': department_analytics,
-        'teams_analytics': teams_analytics,
-        'manager_effectiveness': manager_effectiveness,
-        'employee_stats': employee_stats,
-        'manager_stats': manager_stats,
-        'overall_employee_completion_rate': round(overall_employee_completion_rate, 1),
-        'overall_manager_completion_rate': round(overall_manager_completion_rate, 1),
-        'recent_employee_evals': recent_employee_evals_data,
-        'recent_manager_evals': recent_manager_evals_data,
-        'recent_employee_evals_count': len(recent_employee_evals),  # Pre-computed count
-        'recent_manager_evals_count': len(recent_manager_evals),    # Pre-computed count
-        'today': today_date.isoformat(),  # Serialize date
-        'department_comparison': department_comparison,
-        'data_computed_at': current_time.isoformat(),  # Serialize datetime
-        'last_viewed_at': current_time.isoformat(),    # Serialize datetime
+        **snapshot.as_context(),
+        'today': today_date,
+        'data_computed_at': data_computed_at,
+        'last_viewed_at': timezone.now(),
+        'refreshing': refreshing,
+        'cache_key': analytics_dashboard_cache_key(analytics_scope, today_date, start_date_obj, end_date_obj),
+        'cache_age': int((timezone.now() - data_computed_at).total_seconds()),  # Seconds since computed
+        'analytics_scope': analytics_scope,
         'start_date': start_date,  # Date filter
         'end_date': end_date,  # Date filter
     }
     
-    # Cache the computed data for 30 minutes (1800 seconds) - skip caching if filters applied
-    if not has_filters:
-        analytics_cache.set(cache_key, context_data, timeout=1800)
-        logger.info(f"Analytics dashboard data cached for user {request.user.id} (30 min TTL)")
-    else:
-        logger.info(f"Analytics dashboard data NOT cached (filters active) for user {request.user.id}")
-    
-    # Convert serialized data back to proper objects for template rendering
-    context_data['today'] = today_date
-    context_data['data_computed_at'] = current_time
-    context_data['last_viewed_at'] = current_time
-    
-    logger.info(f"Analytics dashboard computed successfully for user {request.user.id}")
+    logger.info(f"Analytics dashboard rendered for user {request.user.id}")
     return render(request, "evaluation/senior_manager_analytics_dashboard.html", context_data)
 
 
@@ -1263,7 +896,7 @@ def analytics_department_detail(request, department_id):
     logger.info(f"Department {department.title}: {emp_eval_count} employee evals, {mgr_eval_count} manager evals")
     
     # Department statistics
-    dept_stats = calculate_eval_stats(dept_employee_evals, today_date, "week_end")
+    dept_stats = get_rollup_stats(EvaluationStat.EMPLOYEE, today_date, department=department)
     dept_completion_rate = (dept_stats['completed'] / dept_stats['total'] * 100) if dept_stats['total'] > 0 else 0
     
     logger.info(f"Department {department.title} completion rate: {dept_completion_rate:.1f}%")
@@ -1379,7 +1012,7 @@ def analytics_team_detail(request, team_leader_id):
     
     # Calculate team and manager statistics
     team_stats = calculate_eval_stats(team_employee_evals, today_date, "week_end")
-    manager_stats = calculate_eval_stats(team_manager_evals, today_date, "period_end")
+    manager_stats = get_rollup_stats(EvaluationStat.MANAGER, today_date, manager=team_leader)
     
     team_completion_rate = (team_stats['completed'] / team_stats['total'] * 100) if team_stats['total'] > 0 else 0
     manager_completion_rate = (manager_stats['completed'] / manager_stats['total'] * 100) if manager_stats['total'] > 0 else 0
@@ -1886,44 +1519,18 @@ def manager_performance_dashboard(request):
     return render(request, "evaluation/manager_performance_dashboard.html", context)
 
 
-@login_required
-@require_senior_management_access
-def senior_manager_performance_overview(request):
+def _build_performance_overview_data(period_type, start_date_obj=None, end_date_obj=None):
     """
-    Senior Manager Performance Overview - Shows department metrics and all managers rating trends.
-    Only accessible to senior managers and admins.
-    Optimized with prefetch_related to prevent N+1 queries.
+    Compute the cacheable sections of the senior manager performance overview.
+
+    Args:
+        period_type: 'monthly', 'quarterly' or 'annually' for the rating trends
+        start_date_obj: Optional start of the period filter
+        end_date_obj: Optional end of the period filter
+
+    Returns:
+        dict: Department metrics (departments as plain dicts) and chart data
     """
-    checker = get_role_checker(request.user)
-    
-    logger.info(f"Senior manager performance overview accessed by user {request.user.id} ({request.user.username})")
-    
-    period_type = request.GET.get('period', 'monthly')
-    if period_type not in ['monthly', 'quarterly', 'annually']:
-        period_type = 'monthly'
-    
-    # Parse date filters
-    start_date = request.GET.get('start_date')
-    end_date = request.GET.get('end_date')
-    start_date_obj = None
-    end_date_obj = None
-    
-    if start_date:
-        try:
-            start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
-        except ValueError:
-            logger.warning(f"Invalid start_date format: {start_date}")
-            start_date = None
-    if end_date:
-        try:
-            end_date_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
-        except ValueError:
-            logger.warning(f"Invalid end_date format: {end_date}")
-            end_date = None
-    
-    if start_date_obj or end_date_obj:
-        logger.info(f"Date filters applied: {start_date_obj} to {end_date_obj}")
-    
     # Optimized: Prefetch related data to prevent N+1 queries
     all_departments = Department.objects.all().prefetch_related(
         'members', 
@@ -1963,6 +1570,7 @@ def senior_manager_performance_overview(request):
         dept_employees = dept.members.filter(is_employee=True)
         employee_count = dept_employees.count()
         default_label = get_default_metric_label(dept.title)
+        department_data = {'id': dept.id, 'title': dept.title}
         
         # Get active weekly form
         active_form = dept.eval_forms.filter(
@@ -1972,7 +1580,7 @@ def senior_manager_performance_overview(request):
         
         if not active_form:
             department_metrics.append({
-                'department': dept,
+                'department': department_data,
                 'employee_count': employee_count,
                 'metric_value': 0,
                 'metric_label': default_label,
@@ -1984,7 +1592,7 @@ def senior_manager_performance_overview(request):
         
         if not first_question:
             department_metrics.append({
-                'department': dept,
+                'department': department_data,
                 'employee_count': employee_count,
                 'metric_value': 0,
                 'metric_label': default_label,
@@ -2058,7 +1666,7 @@ def senior_manager_performance_overview(request):
         metric_label = customize_metric_label(dept.title, first_question.text)
         
         department_metrics.append({
-            'department': dept,
+            'department': department_data,
             'employee_count': employee_count,
             'metric_value': total_value,
             'metric_label': metric_label,
@@ -2068,7 +1676,6 @@ def senior_manager_performance_overview(request):
     
     # Get all managers' rating trends
     managers_rating_trends = get_all_managers_rating_trends(period_type, start_date_obj, end_date_obj)
-    managers_rating_trends_json = json.dumps(managers_rating_trends)
     
     # Get department comparisons for Q1-Q5 (weekly evaluation questions)
     # Q1: Work Volume (number) - Bar chart
@@ -2076,132 +1683,224 @@ def senior_manager_performance_overview(request):
         question_order=0, chart_type='bar', 
         start_date_obj=start_date_obj, end_date_obj=end_date_obj
     )
-    dept_q1_work_volume_json = json.dumps(dept_q1_work_volume)
     
     # Q2: Quality/Timeliness (numeric %) - Bar chart
     dept_q2_quality = get_department_question_comparison(
         question_order=1, chart_type='bar',
         start_date_obj=start_date_obj, end_date_obj=end_date_obj
     )
-    dept_q2_quality_json = json.dumps(dept_q2_quality)
     
     # Q3: 5-Star Rating - Line chart
     dept_q3_rating = get_department_question_comparison(
         question_order=2, chart_type='line',
         start_date_obj=start_date_obj, end_date_obj=end_date_obj
     )
-    dept_q3_rating_json = json.dumps(dept_q3_rating)
     
     # Q4: Emoji Satisfaction - Pie chart
     dept_q4_satisfaction = get_department_question_comparison(
         question_order=3, chart_type='pie',
         start_date_obj=start_date_obj, end_date_obj=end_date_obj
     )
-    dept_q4_satisfaction_json = json.dumps(dept_q4_satisfaction)
     
     # Q5: Confidence Rating (1-10) - Bar chart
     dept_q5_confidence = get_department_question_comparison(
         question_order=4, chart_type='bar',
         start_date_obj=start_date_obj, end_date_obj=end_date_obj
     )
-    dept_q5_confidence_json = json.dumps(dept_q5_confidence)
     
-    context = {
+    return {
         'department_metrics': department_metrics,
         'managers_rating_trends': managers_rating_trends,
-        'managers_rating_trends_json': managers_rating_trends_json,
         'dept_q1_work_volume': dept_q1_work_volume,
-        'dept_q1_work_volume_json': dept_q1_work_volume_json,
         'dept_q2_quality': dept_q2_quality,
-        'dept_q2_quality_json': dept_q2_quality_json,
         'dept_q3_rating': dept_q3_rating,
-        'dept_q3_rating_json': dept_q3_rating_json,
         'dept_q4_satisfaction': dept_q4_satisfaction,
-        'dept_q4_satisfaction_json': dept_q4_satisfaction_json,
         'dept_q5_confidence': dept_q5_confidence,
-        'dept_q5_confidence_json': dept_q5_confidence_json,
+    }
+
+
+@login_required
+@require_senior_management_access
+def senior_manager_performance_overview(request):
+    """
+    Senior Manager Performance Overview - Shows department metrics and all managers rating trends.
+    Only accessible to senior managers and admins.
+    Optimized with prefetch_related to prevent N+1 queries.
+    """
+    checker = get_role_checker(request.user)
+    
+    logger.info(f"Senior manager performance overview accessed by user {request.user.id} ({request.user.username})")
+    
+    period_type = request.GET.get('period', 'monthly')
+    if period_type not in ['monthly', 'quarterly', 'annually']:
+        period_type = 'monthly'
+    
+    # Parse date filters
+    start_date = request.GET.get('start_date')
+    end_date = request.GET.get('end_date')
+    start_date_obj = None
+    end_date_obj = None
+    
+    if start_date:
+        try:
+            start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
+        except ValueError:
+            logger.warning(f"Invalid start_date format: {start_date}")
+            start_date = None
+    if end_date:
+        try:
+            end_date_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
+        except ValueError:
+            logger.warning(f"Invalid end_date format: {end_date}")
+            end_date = None
+    
+    if start_date_obj or end_date_obj:
+        logger.info(f"Date filters applied: {start_date_obj} to {end_date_obj}")
+    
+    cache_key = (
+        f"performance_overview_{analytics_scope_for(request.user)}_{period_type}_{start_date_obj}_{end_date_obj}"
+    )
+    filtered = bool(start_date_obj or end_date_obj)
+    
+    # Arbitrary date ranges count against the range cache budget
+    store = set_tagged_lru if filtered else set_tagged
+    overview_data, refreshing = single_flight(
+        cache_key,
+        load=lambda: read_tagged(cache_key, lru=filtered),
+        compute=lambda: {
+            **_build_performance_overview_data(period_type, start_date_obj, end_date_obj),
+            'data_computed_at': timezone.now(),
+        },
+        store=lambda data: store(cache_key, data, build_dependency_tags(start_date=start_date_obj, end_date=end_date_obj)),
+    )
+    
+    context = {
+        **overview_data,
+        'managers_rating_trends_json': json.dumps(overview_data['managers_rating_trends']),
+        'dept_q1_work_volume_json': json.dumps(overview_data['dept_q1_work_volume']),
+        'dept_q2_quality_json': json.dumps(overview_data['dept_q2_quality']),
+        'dept_q3_rating_json': json.dumps(overview_data['dept_q3_rating']),
+        'dept_q4_satisfaction_json': json.dumps(overview_data['dept_q4_satisfaction']),
+        'dept_q5_confidence_json': json.dumps(overview_data['dept_q5_confidence']),
         'period_type': period_type,
         'start_date': start_date,
         'end_date': end_date,
         'last_viewed_at': timezone.now(),
+        'refreshing': refreshing,
+        'cache_key': cache_key,
+        'cache_age': int((timezone.now() - overview_data['data_computed_at']).total_seconds())
+        if overview_data.get('data_computed_at') else None,
     }
     
     logger.info(f"Senior manager performance overview rendered successfully with period_type={period_type}")
     return render(request, "evaluation/senior_manager_performance_overview.html", context)
 
 
-def get_all_managers_rating_trends(period_type='monthly', start_date_obj=None, end_date_obj=None):
+# SQL truncation used by the database-side aggregation path of get_all_managers_rating_trends
+PERIOD_TRUNCATIONS = {
+    'monthly': TruncMonth,
+    'quarterly': TruncQuarter,
+    'annually': TruncYear,
+}
+
+
+def _format_trend_period(period_start, ptype):
+    """Format a period start date as a chart label for the given period type."""
+    if ptype == "monthly":
+        return period_start.strftime('%b %Y')
+    elif ptype == "quarterly":
+        quarter = (period_start.month - 1) // 3 + 1
+        return f"Quarter {quarter} {period_start.year}"
+    elif ptype == "annually":
+        return str(period_start.year)
+    return period_start.strftime('%b %Y')
+
+
+def _sort_trend_periods(period_list, ptype):
+    """Sort chart labels produced by _format_trend_period chronologically."""
+    if ptype == "monthly":
+        return sorted(period_list, key=lambda x: datetime.strptime(x, '%b %Y'))
+    elif ptype == "quarterly":
+        return sorted(period_list, key=lambda x: (int(x.split()[2]), int(x.split()[1])))
+    elif ptype == "annually":
+        return sorted(period_list, key=lambda x: int(x))
+    return sorted(period_list)
+
+
+def get_all_managers_rating_trends(period_type='monthly', start_date_obj=None, end_date_obj=None, aggregate_in_db=False):
     """
     Get rating trends for all managers based on period type (monthly, quarterly, annually).
     Returns data formatted for line chart showing manager performance over time.
-    Optimized with select_related to prevent N+1 queries.
-    """
-    # Optimized: Get evaluations with select_related to prevent N+1
-    base_evaluations = DynamicManagerEvaluation.objects.filter(
-        status='completed'
-    ).select_related('manager__user', 'form')
     
-    total_evals = base_evaluations.count()
-    logger.info(f"get_all_managers_rating_trends - Total completed evaluations: {total_evals}, period={period_type}")
+    Runs a constant number of queries: the "Overall Rating" question is resolved
+    once per form and all matching answers are fetched in one joined query.
     
-    # Helper function to apply date filters (DRY principle)
-    def apply_date_filters(queryset):
-        if start_date_obj and end_date_obj:
-            return queryset.filter(period_start__lte=end_date_obj, period_end__gte=start_date_obj)
-        elif start_date_obj:
-            return queryset.filter(period_end__gte=start_date_obj)
-        elif end_date_obj:
-            return queryset.filter(period_start__lte=end_date_obj)
-        return queryset
+    Args:
+        period_type: "monthly", "quarterly" or "annually"
+        start_date_obj: Start date filter
+        end_date_obj: End date filter
+        aggregate_in_db: Sum and count per manager and period in SQL (Trunc* + SUM/COUNT)
+            instead of grouping answer rows in Python
     
-    base_evaluations = apply_date_filters(base_evaluations)
-    filtered_count = base_evaluations.count()
-    logger.info(f"get_all_managers_rating_trends - After date filter: {filtered_count} evaluations")
-    
-    # Helper function to format period (DRY principle)
-    def format_period(period_start, ptype):
-        if ptype == "monthly":
-            return period_start.strftime('%b %Y')
-        elif ptype == "quarterly":
-            quarter = (period_start.month - 1) // 3 + 1
-            return f"Quarter {quarter} {period_start.year}"
-        elif ptype == "annually":
-            return str(period_start.year)
-        return period_start.strftime('%b %Y')
+    Returns:
+        dict: Chart data with labels and one dataset per manager
+    """
+    evaluations = DynamicManagerEvaluation.objects.filter(status='completed')
+    
+    # Overlapping periods that also start inside the range
+    if start_date_obj:
+        evaluations = evaluations.filter(period_end__gte=start_date_obj, period_start__gte=start_date_obj)
+    if end_date_obj:
+        evaluations = evaluations.filter(period_start__lte=end_date_obj)
+    
+    # Resolve the first "Overall Rating" question of every form in use (single query)
+    overall_rating_by_form = {}
+    rating_questions = Question.objects.filter(
+        form_id__in=evaluations.values('form_id'),
+        text__icontains="Overall Rating"
+    ).order_by('form_id', 'order', 'id').values_list('form_id', 'id')
+    for form_id, question_id in rating_questions:
+        overall_rating_by_form.setdefault(form_id, question_id)
+    
+    # Each answer's question belongs to its evaluation's form, so filtering on the
+    # resolved question ids selects exactly one answer per evaluation
+    answers = ManagerAnswer.objects.filter(
+        instance__in=evaluations,
+        question_id__in=overall_rating_by_form.values(),
+        int_value__isnull=False
+    ).exclude(int_value=0)
     
-    # Calculate average ratings per manager per period
-    manager_trends = defaultdict(lambda: defaultdict(list))
+    # (manager name -> period label -> [sum, count]), in first-evaluation order
+    manager_trends = defaultdict(lambda: defaultdict(lambda: [0, 0]))
     
-    for evaluation in base_evaluations:
-        # Check if evaluation period falls within date filter
-        if start_date_obj and evaluation.period_start < start_date_obj:
-            continue
-        if end_date_obj and evaluation.period_start > end_date_obj:
-            continue
-        
-        period = format_period(evaluation.period_start, period_type)
-        
-        # Optimized: Get Overall Rating question (already select_related on form)
-        overall_rating_question = Question.objects.filter(
-            form=evaluation.form,
-            text__icontains="Overall Rating"
-        ).first()
-        
-        if overall_rating_question:
-            # Optimized: Get answer with select_related
-            overall_rating_answer = ManagerAnswer.objects.filter(
-                instance=evaluation,
-                question=overall_rating_question,
-                int_value__isnull=False
-            ).select_related('question', 'instance').first()
-            
-            if overall_rating_answer and overall_rating_answer.int_value:
-                manager_name = evaluation.manager.user.get_full_name() or evaluation.manager.user.username
-                manager_trends[manager_name][period].append(overall_rating_answer.int_value)
-            else:
-                logger.debug(f"No overall rating answer for evaluation {evaluation.id}")
-        else:
-            logger.debug(f"No Overall Rating question for form {evaluation.form.name}")
+    def manager_label(row):
+        full_name = f"{row['instance__manager__user__first_name']} {row['instance__manager__user__last_name']}".strip()
+        return full_name or row['instance__manager__user__username']
+    
+    name_fields = (
+        'instance__manager__user__first_name',
+        'instance__manager__user__last_name',
+        'instance__manager__user__username',
+    )
+    
+    if aggregate_in_db and period_type in PERIOD_TRUNCATIONS:
+        rows = answers.annotate(
+            period=PERIOD_TRUNCATIONS[period_type]('instance__period_start')
+        ).values('instance__manager_id', *name_fields, 'period').annotate(
+            total=Sum('int_value'),
+            count=Count('id'),
+            first_instance=Min('instance_id')
+        ).order_by('first_instance')
+        for row in rows:
+            totals = manager_trends[manager_label(row)][_format_trend_period(row['period'], period_type)]
+            totals[0] += row['total']
+            totals[1] += row['count']
+    else:
+        rows = answers.values('int_value', 'instance__period_start', *name_fields).order_by('instance_id')
+        for row in rows:
+            totals = manager_trends[manager_label(row)][_format_trend_period(row['instance__period_start'], period_type)]
+            totals[0] += row['int_value']
+            totals[1] += 1
     
     # If no data found, return empty structure
     if not manager_trends:
@@ -2219,17 +1918,7 @@ def get_all_managers_rating_trends(period_type='monthly', start_date_obj=None, e
     for manager_data in manager_trends.values():
         periods.update(manager_data.keys())
     
-    # Helper function to sort periods (DRY principle)
-    def sort_periods(period_list, ptype):
-        if ptype == "monthly":
-            return sorted(period_list, key=lambda x: datetime.strptime(x, '%b %Y'))
-        elif ptype == "quarterly":
-            return sorted(period_list, key=lambda x: (int(x.split()[2]), int(x.split()[1])))
-        elif ptype == "annually":
-            return sorted(period_list, key=lambda x: int(x))
-        return sorted(period_list)
-    
-    periods = sort_periods(list(periods), period_type)
+    periods = _sort_trend_periods(list(periods), period_type)
     
     chart_data = {
         'labels': periods,
@@ -2246,8 +1935,8 @@ def get_all_managers_rating_trends(period_type='monthly', start_date_obj=None, e
         data_points = []
         for period in periods:
             if period in period_data:
-                avg = sum(period_data[period]) / len(period_data[period])
-                data_points.append(round(avg, 2))
+                total, count = period_data[period]
+                data_points.append(round(total / count, 2))
             else:
                 data_points.append(None)
         
@@ -2266,41 +1955,46 @@ def get_all_managers_rating_trends(period_type='monthly', start_date_obj=None, e
     return chart_data
 
 
-def _apply_date_filters(queryset, start_date_obj=None, end_date_obj=None):
-    """Helper function to apply date filters to evaluation querysets."""
-    if start_date_obj and end_date_obj:
-        return queryset.filter(week_start__lte=end_date_obj, week_end__gte=start_date_obj)
-    elif start_date_obj:
-        return queryset.filter(week_end__gte=start_date_obj)
-    elif end_date_obj:
-        return queryset.filter(week_start__lte=end_date_obj)
-    return queryset
-
-
-def _get_department_evaluations_bulk(start_date_obj=None, end_date_obj=None):
+def _get_department_rollup_answers(start_date_obj=None, end_date_obj=None, **filters):
     """
-    Get all completed evaluations grouped by department in a single optimized query.
-    Returns tuple: (dict mapping department_id to list of evaluation IDs, dict mapping eval_id to form_id)
-    """
-    evaluations_qs = DynamicEvaluation.objects.filter(status='completed').select_related('department')
-    evaluations_qs = _apply_date_filters(evaluations_qs, start_date_obj, end_date_obj)
-    
-    # Group evaluations by department and build eval->form mapping
-    dept_evaluations = defaultdict(list)
-    eval_to_form = {}
+    Load per-department answer totals of completed employee evaluations from
+    the AnswerRollup table (a few hundred rows regardless of history size).
     
-    for eval_obj in evaluations_qs.only('id', 'department_id', 'form_id'):
-        dept_evaluations[eval_obj.department_id].append(eval_obj.id)
-        eval_to_form[eval_obj.id] = eval_obj.form_id
+    Args:
+        start_date_obj: Start date filter
+        end_date_obj: End date filter
+        **filters: Extra AnswerRollup lookups (e.g. question__order=2)
     
-    logger.info(f"_get_department_evaluations_bulk - Found {len(eval_to_form)} evaluations for {len(dept_evaluations)} departments")
-    return dept_evaluations, eval_to_form
+    Returns:
+        list: (department, {question: {'sum', 'count'}}) tuples ordered by department title
+    """
+    dept_totals = get_department_answer_totals(EvaluationStat.EMPLOYEE, start_date_obj, end_date_obj, **filters)
+    question_ids = {qid for totals in dept_totals.values() for qid in totals}
+    questions = Question.objects.in_bulk(question_ids)
+    departments = Department.objects.filter(id__in=dept_totals.keys()).order_by('title')
+    
+    logger.info(f"_get_department_rollup_answers - Found {len(question_ids)} questions for {len(dept_totals)} departments")
+    return [
+        (dept, {questions[qid]: totals for qid, totals in dept_totals[dept.id].items() if qid in questions})
+        for dept in departments
+    ]
+
+
+def _most_answered(question_totals):
+    """Return the question with the most answers from a {question: totals} mapping."""
+    return max(question_totals, key=lambda q: (question_totals[q]['count'], -q.id))
+
+
+def _average(totals_list):
+    """Average over several {'sum', 'count'} totals, or None without answers."""
+    total_count = sum(t['count'] for t in totals_list)
+    return sum(t['sum'] for t in totals_list) / total_count if total_count else None
 
 
 def get_department_question_comparison(question_order, chart_type='bar', start_date_obj=None, end_date_obj=None):
     """
     Generic function to get question data across all departments by question order.
-    Optimized to avoid N+1 queries.
+    Reads the pre-aggregated answer rollups instead of individual answers.
     
     Args:
         question_order: The order number of the question (0-4 for Q1-Q5)
@@ -2313,82 +2007,27 @@ def get_department_question_comparison(question_order, chart_type='bar', start_d
     """
     logger.info(f"get_department_question_comparison - Starting for Q{question_order + 1} (order={question_order})")
     
-    # Get all departments
-    departments = Department.objects.all().order_by('title')
-    dept_count = departments.count()
-    logger.info(f"Processing {dept_count} departments for Q{question_order + 1}")
+    department_data = []
+    question_text = None
     
-    # Get all evaluations grouped by department (single query)
-    dept_eval_ids, eval_to_form = _get_department_evaluations_bulk(start_date_obj, end_date_obj)
-    
-    if not dept_eval_ids:
-        logger.warning(f"get_department_question_comparison Q{question_order + 1} - No evaluations found")
-        return {
-            'labels': [],
-            'data': [],
-            'question_text': '',
-            'chart_type': chart_type,
-            'has_data': False
-        }
-    
-    # Get all relevant questions for this order across all forms (single query)
-    all_eval_ids = [eid for eids in dept_eval_ids.values() for eid in eids]
-    form_ids = set(eval_to_form.values())
-    
-    questions_by_form = {}
-    for question in Question.objects.filter(form_id__in=form_ids, order=question_order).select_related('form'):
-        questions_by_form[question.form_id] = question
-    
-    logger.info(f"Found {len(questions_by_form)} unique questions with order={question_order} across {len(form_ids)} forms")
-    
-    # Get all answers for relevant evaluations in bulk (single query)
-    question_ids = list(questions_by_form.values())
-    answers_data = Answer.objects.filter(
-        instance_id__in=all_eval_ids,
-        question__in=question_ids,
-        int_value__isnull=False
-    ).values('instance_id', 'instance__department_id', 'question_id', 'int_value')
-    
-    # Group answers by department
-    dept_answer_sums = defaultdict(lambda: {'sum': 0, 'count': 0, 'question_id': None})
-    
-    for answer in answers_data:
-        dept_id = answer['instance__department_id']
-        dept_answer_sums[dept_id]['sum'] += answer['int_value']
-        dept_answer_sums[dept_id]['count'] += 1
-        if not dept_answer_sums[dept_id]['question_id']:
-            dept_answer_sums[dept_id]['question_id'] = answer['question_id']
-    
-    logger.info(f"Calculated averages for {len(dept_answer_sums)} departments")
-    
-    # Build mapping of question_id to question object for faster lookup
-    question_id_to_obj = {q.id: q for q in questions_by_form.values()}
-    
-    # Build department data
-    department_data = []
-    question_text = None
-    
-    for dept in departments:
-        if dept.id not in dept_answer_sums or dept_answer_sums[dept.id]['count'] == 0:
+    for dept, question_totals in _get_department_rollup_answers(
+        start_date_obj, end_date_obj, question__order=question_order
+    ):
+        avg_value = _average(question_totals.values())
+        if avg_value is None:
             logger.debug(f"No answers for Q{question_order + 1} in {dept.title}")
             continue
         
-        stats = dept_answer_sums[dept.id]
-        avg_value = stats['sum'] / stats['count']
-        question = question_id_to_obj.get(stats['question_id'])
-        
-        if not question_text and question:
+        question = _most_answered(question_totals)
+        if not question_text:
             question_text = question.text
         
         department_data.append({
             'department': dept.title,
             'avg_value': round(avg_value, 2),
-            'question_text': question.text if question else f'Question {question_order + 1}'
+            'question_text': question.text
         })
-        logger.debug(f"Department {dept.title}: avg Q{question_order + 1} = {avg_value:.2f} ({stats['count']} answers)")
-    
-    # Sort by department name
-    department_data.sort(key=lambda x: x['department'])
+        logger.debug(f"Department {dept.title}: avg Q{question_order + 1} = {avg_value:.2f}")
     
     if not department_data:
         logger.warning(f"get_department_question_comparison Q{question_order + 1} - No data after processing")
@@ -2420,57 +2059,14 @@ def get_department_customer_experience_comparison(start_date_obj=None, end_date_
     """
     logger.info("get_department_customer_experience_comparison - Starting calculation")
     
-    # Helper function to apply date filters
-    def apply_date_filters(queryset):
-        if start_date_obj and end_date_obj:
-            return queryset.filter(week_start__lte=end_date_obj, week_end__gte=start_date_obj)
-        elif start_date_obj:
-            return queryset.filter(week_end__gte=start_date_obj)
-        elif end_date_obj:
-            return queryset.filter(week_start__lte=end_date_obj)
-        return queryset
-    
-    # Get all departments
-    departments = Department.objects.all().prefetch_related('eval_forms', 'eval_forms__questions')
-    
     department_data = []
     
-    for dept in departments:
-        logger.info(f"Processing department: {dept.title}")
-        
-        # Get completed evaluations for this department
-        dept_evaluations = apply_date_filters(
-            DynamicEvaluation.objects.filter(department=dept, status='completed')
-        )
-        
-        eval_count = dept_evaluations.count()
-        logger.info(f"Found {eval_count} completed evaluations for {dept.title}")
-        
-        if eval_count == 0:
-            logger.warning(f"No completed evaluations for {dept.title}")
-            continue
-        
-        # Get all forms used in these evaluations
-        eval_form_ids = dept_evaluations.values_list('form_id', flat=True).distinct()
-        
-        # Look for emoji type questions in these forms
-        emoji_question = Question.objects.filter(
-            form_id__in=eval_form_ids,
-            qtype='emoji'
-        ).first()
-        
-        if not emoji_question:
-            logger.warning(f"No emoji question found in completed evaluations for department {dept.title}")
-            continue
-        
-        logger.info(f"Found emoji question in {dept.title}: {emoji_question.text}")
-        
-        # Calculate average rating for the emoji question from completed evaluations
-        avg_rating = Answer.objects.filter(
-            instance__in=dept_evaluations,
-            question=emoji_question,
-            int_value__isnull=False
-        ).aggregate(avg=Avg('int_value'))['avg']
+    for dept, question_totals in _get_department_rollup_answers(
+        start_date_obj, end_date_obj, question__qtype=Question.QType.EMOJI
+    ):
+        # Use the department's first emoji question, as the form presents it
+        emoji_question = min(question_totals, key=lambda q: (q.order, q.id))
+        avg_rating = _average([question_totals[emoji_question]])
         
         if avg_rating:
             department_data.append({
@@ -2478,11 +2074,6 @@ def get_department_customer_experience_comparison(start_date_obj=None, end_date_
                 'avg_rating': round(avg_rating, 2)
             })
             logger.info(f"Department {dept.title}: avg customer satisfaction (emoji) = {avg_rating:.2f}")
-        else:
-            logger.warning(f"No emoji answers found for {dept.title}")
-    
-    # Sort by department name for consistency
-    department_data.sort(key=lambda x: x['department'])
     
     # If no data found, return empty structure
     if not department_data:
@@ -2504,103 +2095,34 @@ def get_department_customer_experience_comparison(start_date_obj=None, end_date_
     return chart_data
 
 
-def get_department_third_question_comparison(start_date_obj=None, end_date_obj=None):
+def _build_question_comparison_chart(department_rows, default_text):
     """
-    Get 3rd question data from weekly evaluations across all departments.
-    Returns data formatted for bar chart showing department comparison.
+    Build bar chart data from (department, question) rows, using the most
+    answered question of each department.
     """
-    logger.info("get_department_third_question_comparison - Starting calculation")
-    
-    # Helper function to apply date filters
-    def apply_date_filters(queryset):
-        if start_date_obj and end_date_obj:
-            return queryset.filter(week_start__lte=end_date_obj, week_end__gte=start_date_obj)
-        elif start_date_obj:
-            return queryset.filter(week_end__gte=start_date_obj)
-        elif end_date_obj:
-            return queryset.filter(week_start__lte=end_date_obj)
-        return queryset
-    
-    # Get all departments
-    departments = Department.objects.all().prefetch_related('eval_forms', 'eval_forms__questions')
-    
     department_data = []
     question_text = None
     
-    for dept in departments:
-        logger.info(f"Processing 3rd question for department: {dept.title}")
-        
-        # Get completed evaluations for this department
-        dept_evaluations = apply_date_filters(
-            DynamicEvaluation.objects.filter(department=dept, status='completed')
-        )
-        
-        eval_count = dept_evaluations.count()
-        logger.info(f"Found {eval_count} completed evaluations for {dept.title}")
-        
-        if eval_count == 0:
-            logger.warning(f"No completed evaluations for {dept.title}")
+    for dept, question_totals in department_rows:
+        if not question_totals:
             continue
-        
-        # Get all forms used in these evaluations
-        eval_form_ids = dept_evaluations.values_list('form_id', flat=True).distinct()
-        
-        # Find all questions with order=2 in these forms
-        questions_order_2 = Question.objects.filter(
-            form_id__in=eval_form_ids,
-            order=2
-        )
-        
-        if not questions_order_2.exists():
-            logger.warning(f"No question with order=2 found in completed evaluations for department {dept.title}")
-            continue
-        
-        # Find the most commonly used question by counting answers
-        third_question = None
-        max_answer_count = 0
-        
-        for q in questions_order_2:
-            answer_count = Answer.objects.filter(
-                instance__in=dept_evaluations,
-                question=q,
-                int_value__isnull=False
-            ).count()
-            if answer_count > max_answer_count:
-                max_answer_count = answer_count
-                third_question = q
-        
-        if not third_question:
-            logger.warning(f"No answers found for any question with order=2 in {dept.title}")
+        question = _most_answered(question_totals)
+        avg_value = _average([question_totals[question]])
+        if not avg_value:
             continue
         
         if not question_text:
-            question_text = third_question.text
-        
-        logger.info(f"Found 3rd question in {dept.title}: {third_question.text} ({max_answer_count} answers)")
-        
-        # Calculate average for the 3rd question from completed evaluations
-        avg_value = Answer.objects.filter(
-            instance__in=dept_evaluations,
-            question=third_question,
-            int_value__isnull=False
-        ).aggregate(avg=Avg('int_value'))['avg']
+            question_text = question.text
         
-        if avg_value:
-            department_data.append({
-                'department': dept.title,
-                'avg_value': round(avg_value, 2),
-                'question_text': third_question.text
-            })
-            logger.info(f"Department {dept.title}: avg 3rd question value = {avg_value:.2f}")
-        else:
-            logger.warning(f"No answers found for 3rd question in {dept.title}")
-    
-    # Sort by department name for consistency
-    department_data.sort(key=lambda x: x['department'])
+        department_data.append({
+            'department': dept.title,
+            'avg_value': round(avg_value, 2),
+            'question_text': question.text
+        })
+        logger.info(f"Department {dept.title}: avg '{question.text}' = {avg_value:.2f}")
     
     # If no data found, return empty structure
     if not department_data:
-        logger.warning("get_department_third_question_comparison - No data found for any department")
         return {
             'labels': [],
             'data': [],
@@ -2608,16 +2130,28 @@ def get_department_third_question_comparison(start_date_obj=None, end_date_obj=N
             'has_data': False
         }
     
-    # Format data for bar chart
-    chart_data = {
+    return {
         'labels': [item['department'] for item in department_data],
         'data': [item['avg_value'] for item in department_data],
         'question_texts': [item['question_text'] for item in department_data],
-        'question_text': question_text or 'Question 3',
+        'question_text': question_text or default_text,
         'has_data': True
     }
+
+
+def get_department_third_question_comparison(start_date_obj=None, end_date_obj=None):
+    """
+    Get 3rd question data from weekly evaluations across all departments.
+    Returns data formatted for bar chart showing department comparison.
+    """
+    logger.info("get_department_third_question_comparison - Starting calculation")
     
-    logger.info(f"get_department_third_question_comparison - Returning data for {len(department_data)} departments")
+    chart_data = _build_question_comparison_chart(
+        _get_department_rollup_answers(start_date_obj, end_date_obj, question__order=2),
+        'Question 3'
+    )
+    
+    logger.info(f"get_department_third_question_comparison - Returning data for {len(chart_data['labels'])} departments")
     return chart_data
 
 
@@ -2628,122 +2162,27 @@ def get_department_last_question_comparison(start_date_obj=None, end_date_obj=No
     """
     logger.info("get_department_last_question_comparison - Starting calculation")
     
-    # Helper function to apply date filters
-    def apply_date_filters(queryset):
-        if start_date_obj and end_date_obj:
-            return queryset.filter(week_start__lte=end_date_obj, week_end__gte=start_date_obj)
-        elif start_date_obj:
-            return queryset.filter(week_end__gte=start_date_obj)
-        elif end_date_obj:
-            return queryset.filter(week_start__lte=end_date_obj)
-        return queryset
-    
-    # Get all departments
-    departments = Department.objects.all().prefetch_related('eval_forms', 'eval_forms__questions')
-    
-    department_data = []
-    question_text = None
+    department_rows = _get_department_rollup_answers(start_date_obj, end_date_obj)
     
-    for dept in departments:
-        logger.info(f"Processing last question for department: {dept.title}")
-        
-        # Get completed evaluations for this department
-        dept_evaluations = apply_date_filters(
-            DynamicEvaluation.objects.filter(department=dept, status='completed')
-        )
-        
-        eval_count = dept_evaluations.count()
-        logger.info(f"Found {eval_count} completed evaluations for {dept.title}")
-        
-        if eval_count == 0:
-            logger.warning(f"No completed evaluations for {dept.title}")
-            continue
-        
-        # Get all forms used in these evaluations
-        eval_form_ids = dept_evaluations.values_list('form_id', flat=True).distinct()
-        
-        # Get the highest order number across all forms
-        max_order = Question.objects.filter(
-            form_id__in=eval_form_ids
-        ).aggregate(max_order=Max('order'))['max_order']
-        
-        if max_order is None:
-            logger.warning(f"No questions found in forms for department {dept.title}")
-            continue
-        
-        # Find all questions with the highest order (last questions)
-        last_questions = Question.objects.filter(
-            form_id__in=eval_form_ids,
-            order=max_order
-        )
-        
-        if not last_questions.exists():
-            logger.warning(f"No last question found in completed evaluations for department {dept.title}")
-            continue
-        
-        # Find the most commonly used last question by counting answers
-        last_question = None
-        max_answer_count = 0
-        
-        for q in last_questions:
-            answer_count = Answer.objects.filter(
-                instance__in=dept_evaluations,
-                question=q,
-                int_value__isnull=False
-            ).count()
-            if answer_count > max_answer_count:
-                max_answer_count = answer_count
-                last_question = q
-        
-        if not last_question:
-            logger.warning(f"No answers found for any last question in {dept.title}")
-            continue
-        
-        if not question_text:
-            question_text = last_question.text
-        
-        logger.info(f"Found last question in {dept.title}: {last_question.text} (order: {last_question.order}, {max_answer_count} answers)")
-        
-        # Calculate average for the last question from completed evaluations
-        avg_value = Answer.objects.filter(
-            instance__in=dept_evaluations,
-            question=last_question,
-            int_value__isnull=False
-        ).aggregate(avg=Avg('int_value'))['avg']
-        
-        if avg_value:
-            department_data.append({
-                'department': dept.title,
-                'avg_value': round(avg_value, 2),
-                'question_text': last_question.text
-            })
-            logger.info(f"Department {dept.title}: avg last question value = {avg_value:.2f}")
-        else:
-            logger.warning(f"No answers found for last question in {dept.title}")
+    # Highest question order of every form with answers (single query)
+    form_ids = {question.form_id for _, question_totals in department_rows for question in question_totals}
+    max_order_by_form = dict(
+        Question.objects.filter(form_id__in=form_ids)
+        .values('form_id')
+        .annotate(max_order=Max('order'))
+        .values_list('form_id', 'max_order')
+    )
     
-    # Sort by department name for consistency
-    department_data.sort(key=lambda x: x['department'])
+    last_question_rows = []
+    for dept, question_totals in department_rows:
+        max_order = max(max_order_by_form.get(question.form_id, -1) for question in question_totals)
+        last_question_rows.append((dept, {
+            question: totals for question, totals in question_totals.items() if question.order == max_order
+        }))
     
-    # If no data found, return empty structure
-    if not department_data:
-        logger.warning("get_department_last_question_comparison - No data found for any department")
-        return {
-            'labels': [],
-            'data': [],
-            'question_text': '',
-            'has_data': False
-        }
-    
-    # Format data for bar chart
-    chart_data = {
-        'labels': [item['department'] for item in department_data],
-        'data': [item['avg_value'] for item in department_data],
-        'question_texts': [item['question_text'] for item in department_data],
-        'question_text': question_text or 'Employee Confidence',
-        'has_data': True
-    }
+    chart_data = _build_question_comparison_chart(last_question_rows, 'Employee Confidence')
     
-    logger.info(f"get_department_last_question_comparison - Returning data for {len(department_data)} departments")
+    logger.info(f"get_department_last_question_comparison - Returning data for {len(chart_data['labels'])} departments")
     return chart_data
 
 
@@ -3557,7 +2996,7 @@ def report_generation(request):
     last_year = today - relativedelta(years=1)
     
     # Get recent reports
-    recent_reports = ReportHistory.objects.select_related('generated_by', 'department')[:10]
+    recent_reports = ReportHistory.objects.select_related('generated_by__user', 'department', 'job')[:10]
     
     context = {
         'user_profile': user_profile,
@@ -3595,115 +3034,19 @@ def generate_employee_report_pdf(request):
     
     logger.info(f"Generating employee report: dept={dept_name}, dates={start_date} to {end_date}, user={user_profile.user.get_full_name()}")
     
-    # Build query with optimized select_related (avoid N+1 queries)
-    evaluations = DynamicEvaluation.objects.filter(
-        submitted_at__gte=start_date,
-        submitted_at__lte=end_date
-    ).select_related('employee__user', 'manager__user', 'department', 'form')
-    
-    if department_id != 'all':
-        evaluations = evaluations.filter(department_id=department_id)
-    
-    # Create PDF
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=72, leftMargin=72,
-                           topMargin=72, bottomMargin=18)
-    
-    elements = []
-    styles, title_style, heading_style = get_pdf_styles()
-    
-    elements.append(Paragraph("Employee Evaluation Report", title_style))
-    elements.append(Paragraph(f"Department: {dept_name}", styles['Normal']))
-    elements.append(Paragraph(f"Period: {start_date} to {end_date}", styles['Normal']))
-    elements.append(Paragraph(f"Generated: {timezone.now().strftime('%Y-%m-%d %H:%M')}", styles['Normal']))
-    elements.append(Spacer(1, 20))
-    
-    # Summary Statistics
-    total_evals = evaluations.count()
-    completed_evals = evaluations.filter(status=EvaluationStatus.COMPLETED).count()
-    pending_evals = evaluations.filter(status=EvaluationStatus.PENDING).count()
-    
-    elements.append(Paragraph("Executive Summary", heading_style))
-    
-    summary_data = [
-        ['Metric', 'Count'],
-        ['Total Evaluations', str(total_evals)],
-        ['Completed Evaluations', str(completed_evals)],
-        ['Pending Evaluations', str(pending_evals)],
-        ['Completion Rate', f'{(completed_evals/total_evals*100):.1f}%' if total_evals > 0 else 'N/A'],
-    ]
-    
-    summary_table = create_summary_table(summary_data, [3*inch, 2*inch])
-    elements.append(summary_table)
-    elements.append(Spacer(1, 20))
-    
-    # Detailed Evaluations
-    if total_evals > 0:
-        elements.append(Paragraph("Evaluation Details", heading_style))
-        
-        # Add department column header when showing all departments
-        if department_id == 'all':
-            eval_data = [['Employee', 'Department', 'Manager', 'Week', 'Status', 'Submitted']]
-        else:
-            eval_data = [['Employee', 'Manager', 'Week', 'Status', 'Submitted']]
-        
-        for eval in evaluations[:100]:  # Increased to 100 for better coverage
-            if department_id == 'all':
-                eval_data.append([
-                    eval.employee.user.get_full_name(),
-                    eval.department.title,
-                    eval.manager.user.get_full_name(),
-                    f"{eval.week_start} to {eval.week_end}",
-                    eval.status,
-                    eval.submitted_at.strftime('%Y-%m-%d') if eval.submitted_at else 'N/A'
-                ])
-            else:
-                eval_data.append([
-                    eval.employee.user.get_full_name(),
-                    eval.manager.user.get_full_name(),
-                    f"{eval.week_start} to {eval.week_end}",
-                    eval.status,
-                    eval.submitted_at.strftime('%Y-%m-%d') if eval.submitted_at else 'N/A'
-                ])
-        
-        # Adjust column widths based on whether department is shown
-        if department_id == 'all':
-            eval_table = Table(eval_data, colWidths=[1.3*inch, 1.2*inch, 1.3*inch, 1.3*inch, 0.8*inch, 0.8*inch])
-        else:
-            eval_table = Table(eval_data, colWidths=[1.5*inch, 1.5*inch, 1.5*inch, 1*inch, 1*inch])
-        
-        eval_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), pdf_colors.HexColor('#DC2626')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), pdf_colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            ('FONTSIZE', (0, 1), (-1, -1), 7),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), pdf_colors.white),
-            ('GRID', (0, 0), (-1, -1), 0.5, pdf_colors.HexColor('#D1D5DB')),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [pdf_colors.white, pdf_colors.HexColor('#F3F4F6')])
-        ]))
-        
-        elements.append(eval_table)
-        
-        if total_evals > 100:
-            elements.append(Spacer(1, 10))
-            elements.append(Paragraph(f"Note: Showing first 100 of {total_evals} evaluations", styles['Italic']))
-    else:
-        elements.append(Paragraph("No evaluations found for the selected period.", styles['Normal']))
+    evaluations = report_evaluations(DynamicEvaluation, department_id, start_date, end_date)
     
-    # Build PDF
-    doc.build(elements)
+    # Every evaluation is listed; rows are streamed into a temporary file
+    response = pdf_file_response(
+        lambda output: write_employee_report(
+            output, evaluations, dept_name, start_date, end_date, include_department=department_id == 'all'
+        ),
+        f"employee_report_{start_date}_{end_date}.pdf",
+    )
     
     # Save report history
     save_report_history('employee', user_profile, dept_obj, start_date, end_date)
     
-    # Return response
-    buffer.seek(0)
-    response = HttpResponse(buffer, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="employee_report_{start_date}_{end_date}.pdf"'
-    
     return response
 
 
@@ -3727,124 +3070,19 @@ def generate_manager_report_pdf(request):
     
     logger.info(f"Generating manager report: dept={dept_name}, dates={start_date} to {end_date}, user={user_profile.user.get_full_name()}")
     
-    # Build query with optimized select_related (avoid N+1 queries)
-    evaluations = DynamicManagerEvaluation.objects.filter(
-        submitted_at__gte=start_date,
-        submitted_at__lte=end_date
-    ).select_related('manager__user', 'senior_manager__user', 'department', 'form')
-    
-    if department_id != 'all':
-        evaluations = evaluations.filter(department_id=department_id)
-    
-    # Create PDF
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=72, leftMargin=72,
-                           topMargin=72, bottomMargin=18)
-    
-    elements = []
-    styles, title_style, heading_style = get_pdf_styles()
-    
-    elements.append(Paragraph("Manager Evaluation Report", title_style))
-    elements.append(Paragraph(f"Department: {dept_name}", styles['Normal']))
-    elements.append(Paragraph(f"Period: {start_date} to {end_date}", styles['Normal']))
-    elements.append(Paragraph(f"Generated: {timezone.now().strftime('%Y-%m-%d %H:%M')}", styles['Normal']))
-    elements.append(Spacer(1, 20))
-    
-    # Summary Statistics
-    total_evals = evaluations.count()
-    completed_evals = evaluations.filter(status=EvaluationStatus.COMPLETED).count()
-    pending_evals = evaluations.filter(status=EvaluationStatus.PENDING).count()
-    
-    elements.append(Paragraph("Executive Summary", heading_style))
-    
-    summary_data = [
-        ['Metric', 'Count'],
-        ['Total Evaluations', str(total_evals)],
-        ['Completed Evaluations', str(completed_evals)],
-        ['Pending Evaluations', str(pending_evals)],
-        ['Completion Rate', f'{(completed_evals/total_evals*100):.1f}%' if total_evals > 0 else 'N/A'],
-    ]
+    evaluations = report_evaluations(DynamicManagerEvaluation, department_id, start_date, end_date)
     
-    summary_table = Table(summary_data, colWidths=[3*inch, 2*inch])
-    summary_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), pdf_colors.HexColor('#DC2626')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), pdf_colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), pdf_colors.HexColor('#F3F4F6')),
-        ('GRID', (0, 0), (-1, -1), 1, pdf_colors.HexColor('#D1D5DB'))
-    ]))
-    
-    elements.append(summary_table)
-    elements.append(Spacer(1, 20))
-    
-    # Detailed Evaluations
-    if total_evals > 0:
-        elements.append(Paragraph("Evaluation Details", heading_style))
-        
-        # Add department column header when showing all departments
-        if department_id == 'all':
-            eval_data = [['Manager', 'Department', 'Evaluator', 'Period', 'Status', 'Submitted']]
-        else:
-            eval_data = [['Manager', 'Evaluator', 'Period', 'Status', 'Submitted']]
-        
-        for eval in evaluations[:100]:  # Increased to 100 for better coverage
-            if department_id == 'all':
-                eval_data.append([
-                    eval.manager.user.get_full_name(),
-                    eval.department.title,
-                    eval.senior_manager.user.get_full_name(),
-                    f"{eval.period_start} to {eval.period_end}",
-                    eval.status,
-                    eval.submitted_at.strftime('%Y-%m-%d') if eval.submitted_at else 'N/A'
-                ])
-            else:
-                eval_data.append([
-                    eval.manager.user.get_full_name(),
-                    eval.senior_manager.user.get_full_name(),
-                    f"{eval.period_start} to {eval.period_end}",
-                    eval.status,
-                    eval.submitted_at.strftime('%Y-%m-%d') if eval.submitted_at else 'N/A'
-                ])
-        
-        # Adjust column widths based on whether department is shown
-        if department_id == 'all':
-            eval_table = Table(eval_data, colWidths=[1.3*inch, 1.2*inch, 1.3*inch, 1.3*inch, 0.8*inch, 0.8*inch])
-        else:
-            eval_table = Table(eval_data, colWidths=[1.5*inch, 1.5*inch, 1.5*inch, 1*inch, 1*inch])
-        
-        eval_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), pdf_colors.HexColor('#DC2626')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), pdf_colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            ('FONTSIZE', (0, 1), (-1, -1), 7),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), pdf_colors.white),
-            ('GRID', (0, 0), (-1, -1), 0.5, pdf_colors.HexColor('#D1D5DB')),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [pdf_colors.white, pdf_colors.HexColor('#F3F4F6')])
-        ]))
-        
-        elements.append(eval_table)
-        
-        if total_evals > 100:
-            elements.append(Spacer(1, 10))
-            elements.append(Paragraph(f"Note: Showing first 100 of {total_evals} evaluations", styles['Italic']))
-    else:
-        elements.append(Paragraph("No evaluations found for the selected period.", styles['Normal']))
-    
-    doc.build(elements)
+    # Every evaluation is listed; rows are streamed into a temporary file
+    response = pdf_file_response(
+        lambda output: write_manager_report(
+            output, evaluations, dept_name, start_date, end_date, include_department=department_id == 'all'
+        ),
+        f"manager_report_{start_date}_{end_date}.pdf",
+    )
     
     # Save report history
     save_report_history('manager', user_profile, dept_obj, start_date, end_date)
     
-    buffer.seek(0)
-    response = HttpResponse(buffer, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="manager_report_{start_date}_{end_date}.pdf"'
-    
     return response
 
 
@@ -3866,330 +3104,94 @@ def generate_trends_report_pdf(request):
     
     logger.info(f"Generating trends report: dept={dept_name}, period={period} days, user={user_profile.user.get_full_name()}")
     
-    # Get EMPLOYEE evaluations with answers (optimized to avoid N+1 queries)
-    employee_evaluations = DynamicEvaluation.objects.filter(
-        status=EvaluationStatus.COMPLETED,
-        submitted_at__gte=start_date,
-        submitted_at__lte=end_date
-    ).select_related('employee__user', 'department', 'manager__user').prefetch_related(
-        'answers__question__form'  # Prefetch question.form to avoid N+1 when accessing answer.question.form.name
+    response = pdf_file_response(
+        lambda output: write_trends_report(output, department_id, dept_name, start_date, end_date, period),
+        f"trends_report_{start_date}_{end_date}.pdf",
     )
     
-    # Get MANAGER evaluations with answers (optimized to avoid N+1 queries)
-    manager_evaluations = DynamicManagerEvaluation.objects.filter(
-        status=EvaluationStatus.COMPLETED,
-        submitted_at__gte=start_date,
-        submitted_at__lte=end_date
-    ).select_related('manager__user', 'department', 'senior_manager__user').prefetch_related(
-        'answers__question__form'  # Prefetch question.form to avoid N+1 when accessing answer.question.form.name
-    )
-    
-    if department_id != 'all':
-        employee_evaluations = employee_evaluations.filter(department_id=department_id)
-        manager_evaluations = manager_evaluations.filter(department_id=department_id)
-    
-    logger.info(f"Fetched {employee_evaluations.count()} employee evals, {manager_evaluations.count()} manager evals")
-    
-    # Get questions marked for trends (include_in_trends=True)
-    trend_questions = Question.objects.filter(include_in_trends=True).select_related('form')
-    
-    # Calculate performance by question for EMPLOYEES
-    employee_question_performance = {}
-    for question in trend_questions:
-        question_key = f"{question.form.name} - {question.text}"
-        employee_question_performance[question_key] = {
-            'question': question,
-            'responses': [],
-            'response_count': 0
-        }
-    
-    for eval in employee_evaluations:
-        for answer in eval.answers.all():
-            if answer.question.include_in_trends:
-                question_key = f"{answer.question.form.name} - {answer.question.text}"
-                if question_key in employee_question_performance:
-                    if answer.int_value is not None:
-                        employee_question_performance[question_key]['responses'].append(answer.int_value)
-                        employee_question_performance[question_key]['response_count'] += 1
-    
-    # Calculate performance by question for MANAGERS
-    manager_question_performance = {}
-    for question in trend_questions:
-        question_key = f"{question.form.name} - {question.text}"
-        manager_question_performance[question_key] = {
-            'question': question,
-            'responses': [],
-            'response_count': 0
-        }
-    
-    for eval in manager_evaluations:
-        for answer in eval.answers.all():
-            if answer.question.include_in_trends:
-                question_key = f"{answer.question.form.name} - {answer.question.text}"
-                if question_key in manager_question_performance:
-                    if answer.int_value is not None:
-                        manager_question_performance[question_key]['responses'].append(answer.int_value)
-                        manager_question_performance[question_key]['response_count'] += 1
-    
-    # Create PDF
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=72, leftMargin=72,
-                           topMargin=72, bottomMargin=18)
-    
-    elements = []
-    styles, title_style, heading_style = get_pdf_styles()
-    
-    elements.append(Paragraph("Performance Trends Report", title_style))
-    elements.append(Paragraph(f"Department: {dept_name}", styles['Normal']))
-    elements.append(Paragraph(f"Period: Last {period} days ({start_date} to {end_date})", styles['Normal']))
-    elements.append(Paragraph(f"Generated: {timezone.now().strftime('%Y-%m-%d %H:%M')}", styles['Normal']))
-    elements.append(Spacer(1, 20))
-    
-    # Overall Summary Statistics
-    elements.append(Paragraph("Evaluation Summary", heading_style))
-    
-    summary_data = [
-        ['Metric', 'Employee', 'Manager'],
-        ['Completed Evaluations', str(employee_evaluations.count()), str(manager_evaluations.count())],
-        ['Questions Tracked for Trends', str(len([q for q in employee_question_performance.values() if q['response_count'] > 0])), 
-         str(len([q for q in manager_question_performance.values() if q['response_count'] > 0]))],
-        ['Total Employees/Managers', str(employee_evaluations.values('employee').distinct().count()), 
-         str(manager_evaluations.values('manager').distinct().count())],
-    ]
+    # Save report history
+    save_report_history('trends', user_profile, dept_obj, start_date, end_date)
     
-    summary_table = create_summary_table(summary_data, [2.5*inch, 1.5*inch, 1.5*inch])
-    # Override center alignment for columns 1 and 2
-    summary_table.setStyle(TableStyle([
-        ('ALIGN', (1, 0), (-1, -1), 'CENTER'),
-    ]))
+    return response
+
+
+def report_job_payload(job):
+    """JSON description of a ReportJob for the report page."""
+    payload = {
+        'id': job.pk,
+        'report_type': job.report_type,
+        'status': job.status,
+        'progress': job.progress,
+        'status_url': reverse('evaluation:report_job_status', args=[job.pk]),
+    }
+    if job.status == ReportJob.DONE:
+        payload['download_url'] = reverse('evaluation:download_report_job', args=[job.pk])
+    elif job.status == ReportJob.FAILED:
+        payload['error'] = 'The report could not be generated. Please try again.'
+    return payload
+
+
+@login_required
+@require_senior_management_access
+@require_http_methods(["POST"])
+def request_report_job(request):
+    """Queue a report for the background worker, or reuse a fresh identical one."""
+    user_profile = get_user_profile_safely(request.user)
     
-    elements.append(summary_table)
-    elements.append(Spacer(1, 20))
+    report_type = request.POST.get('report_type', '')
+    if report_type not in dict(ReportHistory.REPORT_TYPES):
+        return JsonResponse({'success': False, 'error': 'Unknown report type'}, status=400)
     
-    # Employee Question Performance (Chart Questions)
-    if employee_question_performance:
-        elements.append(Paragraph("Employee Performance by Question (Chart Metrics)", heading_style))
-        
-        emp_q_data = [['Question', 'Responses', 'Avg', '5⭐', '4⭐', '3⭐', '2⭐', '1⭐']]
-        
-        # Filter and process questions that have responses
-        for question_key, data in sorted(employee_question_performance.items()):
-            if data['response_count'] > 0:
-                responses = data['responses']
-                avg = sum(responses) / len(responses) if responses else 0
-                
-                # Count each star rating
-                counts = {i: responses.count(i) for i in range(1, 6)}
-                
-                # Use helper for question paragraph
-                question_para = create_question_paragraph(question_key)
-                
-                emp_q_data.append([
-                    question_para,
-                    str(data['response_count']),
-                    f'{avg:.2f}',
-                    str(counts.get(5, 0)),
-                    str(counts.get(4, 0)),
-                    str(counts.get(3, 0)),
-                    str(counts.get(2, 0)),
-                    str(counts.get(1, 0))
-                ])
-        
-        if len(emp_q_data) > 1:  # Has data beyond header
-            emp_q_table = create_chart_metrics_table(
-                emp_q_data, 
-                [3*inch, 0.7*inch, 0.45*inch, 0.45*inch, 0.45*inch, 0.45*inch, 0.45*inch, 0.45*inch]
-            )
-            elements.append(emp_q_table)
-            elements.append(Spacer(1, 20))
+    department_id = request.POST.get('department', 'all')
+    try:
+        dept_name, dept_obj = get_department_info(department_id)
+        if report_type == 'trends':
+            period = int(request.POST.get('period', '90'))
+            end_date = timezone.now().date()
+            start_date = end_date - timedelta(days=period)
         else:
-            elements.append(Paragraph("No employee questions marked for charts in this period.", styles['Normal']))
-            elements.append(Spacer(1, 20))
-    
-    # Manager Question Performance (Chart Questions)
-    if manager_question_performance:
-        elements.append(Paragraph("Manager Performance by Question (Chart Metrics)", heading_style))
-        
-        mgr_q_data = [['Question', 'Responses', 'Avg', '5', '4', '3', '2', '1']]
-        
-        # Filter and process questions that have responses
-        for question_key, data in sorted(manager_question_performance.items()):
-            if data['response_count'] > 0:
-                responses = data['responses']
-                avg = sum(responses) / len(responses) if responses else 0
-                
-                # Count each star rating
-                counts = {i: responses.count(i) for i in range(1, 6)}
-                
-                # Use helper for question paragraph
-                question_para = create_question_paragraph(question_key)
-                
-                mgr_q_data.append([
-                    question_para,
-                    str(data['response_count']),
-                    f'{avg:.2f}',
-                    str(counts.get(5, 0)),
-                    str(counts.get(4, 0)),
-                    str(counts.get(3, 0)),
-                    str(counts.get(2, 0)),
-                    str(counts.get(1, 0))
-                ])
-        
-        if len(mgr_q_data) > 1:  # Has data beyond header
-            mgr_q_table = create_chart_metrics_table(
-                mgr_q_data,
-                [3*inch, 0.7*inch, 0.45*inch, 0.45*inch, 0.45*inch, 0.45*inch, 0.45*inch, 0.45*inch]
+            period = None
+            start_date, end_date = parse_date_range(
+                request.POST.get('date_range', '30'),
+                request.POST.get('start_date', ''),
+                request.POST.get('end_date', ''),
             )
-            elements.append(mgr_q_table)
-            elements.append(Spacer(1, 20))
-        else:
-            elements.append(Paragraph("No manager questions marked for charts in this period.", styles['Normal']))
-            elements.append(Spacer(1, 20))
-    
-    # Individual Employee Performance - Detailed by Person
-    if employee_evaluations.exists():
-        elements.append(Paragraph("Individual Employee Performance Details", heading_style))
-        elements.append(Spacer(1, 10))
-        
-        # Collect individual employee data with question details including dates
-        employee_individual_data = {}
-        for eval in employee_evaluations:
-            emp_name = eval.employee.user.get_full_name()
-            if emp_name not in employee_individual_data:
-                employee_individual_data[emp_name] = {
-                    'department': eval.department.title,
-                    'questions': {}
-                }
-            
-            eval_date = eval.submitted_at.strftime('%Y-%m-%d') if eval.submitted_at else 'N/A'
-            
-            # Get responses for tracked questions only
-            for answer in eval.answers.all():
-                if answer.question.include_in_trends and answer.int_value is not None:
-                    question_text = answer.question.text
-                    question_type = answer.question.get_qtype_display()
-                    
-                    if question_text not in employee_individual_data[emp_name]['questions']:
-                        employee_individual_data[emp_name]['questions'][question_text] = {
-                            'type': question_type,
-                            'responses': []
-                        }
-                    
-                    employee_individual_data[emp_name]['questions'][question_text]['responses'].append({
-                        'score': answer.int_value,
-                        'date': eval_date
-                    })
-        
-        # Create table for each employee
-        for emp_name in sorted(employee_individual_data.keys()):
-            data = employee_individual_data[emp_name]
-            
-            if data['questions']:  # Only show if they have tracked question responses
-                # Employee header with red background
-                emp_header = create_person_header(emp_name, data['department'])
-                elements.append(emp_header)
-                elements.append(Spacer(1, 8))
-                
-                # Questions table with dates
-                emp_q_table_data = [['Question', 'Type', 'Score', 'Date']]
-                
-                for question_text, q_data in sorted(data['questions'].items()):
-                    # Add each response as a separate row
-                    for i, response in enumerate(q_data['responses']):
-                        # Only show question text on first row for this question
-                        question_display = create_question_paragraph(question_text) if i == 0 else ''
-                        
-                        emp_q_table_data.append([
-                            question_display,
-                            q_data['type'] if i == 0 else '',
-                            str(response['score']),
-                            response['date']
-                        ])
-                
-                emp_q_table = create_individual_question_table(
-                    emp_q_table_data, 
-                    [2.6*inch, 1.4*inch, 0.7*inch, 1.1*inch]
-                )
-                elements.append(emp_q_table)
-                elements.append(Spacer(1, 20))
-    
-    # Individual Manager Performance - Detailed by Person
-    if manager_evaluations.exists():
-        elements.append(Paragraph("Individual Manager Performance Details", heading_style))
-        elements.append(Spacer(1, 10))
-        
-        # Collect individual manager data with question details including dates
-        manager_individual_data = {}
-        for eval in manager_evaluations:
-            mgr_name = eval.manager.user.get_full_name()
-            if mgr_name not in manager_individual_data:
-                manager_individual_data[mgr_name] = {
-                    'department': eval.department.title,
-                    'questions': {}
-                }
-            
-            eval_date = eval.submitted_at.strftime('%Y-%m-%d') if eval.submitted_at else 'N/A'
-            
-            # Get responses for tracked questions only
-            for answer in eval.answers.all():
-                if answer.question.include_in_trends and answer.int_value is not None:
-                    question_text = answer.question.text
-                    question_type = answer.question.get_qtype_display()
-                    
-                    if question_text not in manager_individual_data[mgr_name]['questions']:
-                        manager_individual_data[mgr_name]['questions'][question_text] = {
-                            'type': question_type,
-                            'responses': []
-                        }
-                    
-                    manager_individual_data[mgr_name]['questions'][question_text]['responses'].append({
-                        'score': answer.int_value,
-                        'date': eval_date
-                    })
-        
-        # Create table for each manager
-        for mgr_name in sorted(manager_individual_data.keys()):
-            data = manager_individual_data[mgr_name]
-            
-            if data['questions']:  # Only show if they have tracked question responses
-                # Manager header with red background
-                mgr_header = create_person_header(mgr_name, data['department'])
-                elements.append(mgr_header)
-                elements.append(Spacer(1, 8))
-                
-                # Questions table with dates
-                mgr_q_table_data = [['Question', 'Type', 'Score', 'Date']]
-                
-                for question_text, q_data in sorted(data['questions'].items()):
-                    # Add each response as a separate row
-                    for i, response in enumerate(q_data['responses']):
-                        # Only show question text on first row for this question
-                        question_display = create_question_paragraph(question_text) if i == 0 else ''
-                        
-                        mgr_q_table_data.append([
-                            question_display,
-                            q_data['type'] if i == 0 else '',
-                            str(response['score']),
-                            response['date']
-                        ])
-                
-                mgr_q_table = create_individual_question_table(
-                    mgr_q_table_data,
-                    [2.6*inch, 1.4*inch, 0.7*inch, 1.1*inch]
-                )
-                elements.append(mgr_q_table)
-                elements.append(Spacer(1, 20))
+    except (Department.DoesNotExist, ValueError):
+        return JsonResponse({'success': False, 'error': 'Invalid report parameters'}, status=400)
     
-    doc.build(elements)
+    parameters = report_parameters(department_id, start_date, end_date, period)
+    job, reused = request_report(report_type, parameters, requested_by=user_profile)
+    save_report_history(report_type, user_profile, dept_obj, start_date, end_date, job=job)
     
-    # Save report history
-    save_report_history('trends', user_profile, dept_obj, start_date, end_date)
-    
-    buffer.seek(0)
-    response = HttpResponse(buffer, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="trends_report_{start_date}_{end_date}.pdf"'
+    logger.info(f"Report job #{job.pk} for {report_type}: dept={dept_name}, dates={start_date} to {end_date}, reused={reused}")
     
-    return response
+    # The job may already have run (REPORT_JOBS_RUN_ON_COMMIT)
+    job.refresh_from_db()
+    return JsonResponse({'success': True, 'reused': reused, 'job': report_job_payload(job)})
+
+
+@login_required
+@require_senior_management_access
+def report_job_status(request, job_id):
+    """Polling endpoint for a report job's status and progress."""
+    job = get_object_or_404(ReportJob, pk=job_id)
+    return JsonResponse({'success': True, 'job': report_job_payload(job)})
+
+
+@login_required
+@require_senior_management_access
+def download_report_job(request, job_id):
+    """Download the PDF of a finished report job."""
+    job = get_object_or_404(ReportJob, pk=job_id, status=ReportJob.DONE)
+    storage = get_report_storage()
+    if not job.output_path or not storage.exists(job.output_path):
+        raise Http404("Report file is no longer available")
+    return FileResponse(
+        storage.open(job.output_path, 'rb'),
+        as_attachment=True,
+        filename=report_filename(job),
+        content_type='application/pdf',
+    )
 
 
 # Archive/Unarchive functionality
@@ -162,12 +162,19 @@ MESSAGE_TAGS = {
 # -------------------------
 # File storage (local vs cloud)
 # -------------------------
+# Report PDFs built by process_report_jobs are kept outside MEDIA_ROOT and
+# only downloaded through the evaluation views.
 if DEBUG:
     DEFAULT_FILE_STORAGE = "django.core.files.storage.FileSystemStorage"
     MEDIA_ROOT = os.path.join(BASE_DIR, "media")
+    REPORT_STORAGE = {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+        "OPTIONS": {"location": os.path.join(BASE_DIR, "report_artifacts")},
+    }
 else:
     INSTALLED_APPS += ["cloudinary", "cloudinary_storage"]
     DEFAULT_FILE_STORAGE = "cloudinary_storage.storage.MediaCloudinaryStorage"
+    REPORT_STORAGE = {"BACKEND": "cloudinary_storage.storage.RawMediaCloudinaryStorage"}
     CLOUDINARY_STORAGE = {
         "CLOUD_NAME": os.environ.get("CLOUDINARY_CLOUD_NAME"),
         "API_KEY": os.environ.get("CLOUDINARY_API_KEY"),
@@ -247,6 +254,19 @@ EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", "True") == "True"
 EMAIL_HOST_USER = env("EMAIL_HOST_USER", default="")
 EMAIL_HOST_PASSWORD = env("EMAIL_HOST_PASSWORD", default="")
 
+# Outbox: request handlers queue mail (authentication.outbox) and the
+# process_outbox command delivers it. OUTBOX_EMAIL_BACKEND overrides
+# EMAIL_BACKEND for the worker (e.g. the console or file backend offline).
+OUTBOX_EMAIL_BACKEND = os.getenv("OUTBOX_EMAIL_BACKEND") or None
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_RETRY_BASE_SECONDS = int(os.getenv("OUTBOX_RETRY_BASE_SECONDS", "60"))
+OUTBOX_RETRY_MAX_SECONDS = int(os.getenv("OUTBOX_RETRY_MAX_SECONDS", str(6 * 3600)))
+# Claimed messages are held back from other workers this long while a batch is sent
+OUTBOX_LEASE_SECONDS = int(os.getenv("OUTBOX_LEASE_SECONDS", "600"))
+# Also deliver right after the queueing transaction commits (no worker needed)
+OUTBOX_SEND_ON_COMMIT = os.getenv("OUTBOX_SEND_ON_COMMIT", str(DEBUG)) == "True"
+
 
 # -------------------------
 # Caching Configuration
@@ -266,7 +286,7 @@ CACHES = {
         'LOCATION': 'analytics-cache',
         'TIMEOUT': 1800,  # 30 minutes for analytics data
         'OPTIONS': {
-            'MAX_ENTRIES': 100,
+            'MAX_ENTRIES': 1000,
             'CULL_FREQUENCY': 2,
         }
     }
@@ -292,7 +312,61 @@ if APP_ENV == "production":
         }
     }
 
+# Filtered (date range) analytics entries kept in the analytics cache;
+# the least recently used ones are evicted first
+ANALYTICS_RANGE_CACHE_MAX_ENTRIES = int(os.getenv("ANALYTICS_RANGE_CACHE_MAX_ENTRIES", "200"))
+
+# Analytics entries older than this (seconds) are still served but recomputed
+# in the background; past the 30 minute hard TTL requests wait for the result
+ANALYTICS_CACHE_SOFT_TIMEOUT = int(os.getenv("ANALYTICS_CACHE_SOFT_TIMEOUT", "600"))
+ANALYTICS_REFRESH_WORKERS = int(os.getenv("ANALYTICS_REFRESH_WORKERS", "2"))
+
+# Overdue lock middlewares read a per-user cached lock state; set to False to
+# query the evaluation tables on every request instead
+EVALUATION_LOCK_STATE_CACHE = os.getenv("EVALUATION_LOCK_STATE_CACHE", "True") == "True"
+
+# Extra path prefixes (e.g. load balancer health checks) the overdue lock
+# middlewares skip without loading the user; static and media URLs always are
+EVALUATION_LOCK_SKIP_PATHS = [p for p in os.getenv("EVALUATION_LOCK_SKIP_PATHS", "").split(",") if p]
+
 # -------------------------
 # Default PK
 # -------------------------
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# Maximum age (seconds) of the cached navbar low-stock summary; saves through
+# the Inventory and UniformCatalog models refresh it immediately
+LOW_STOCK_SNAPSHOT_TIMEOUT = int(os.getenv("LOW_STOCK_SNAPSHOT_TIMEOUT", "3600"))
+
+# Reminder emails of the evaluation commands are sent over one connection in
+# chunks of this size; set a rate limit (emails per second) if the provider
+# throttles
+BULK_MAIL_CHUNK_SIZE = int(os.getenv("BULK_MAIL_CHUNK_SIZE", "50"))
+BULK_MAIL_RATE_LIMIT = float(os.getenv("BULK_MAIL_RATE_LIMIT", "0")) or None
+
+# Rows per INSERT when the evaluation commands create evaluations and their
+# blank answers in bulk
+EVALUATION_SCAFFOLD_BATCH_SIZE = int(os.getenv("EVALUATION_SCAFFOLD_BATCH_SIZE", "500"))
+
+# Evaluation rows fetched per database round trip while PDF reports stream
+# their detail tables
+REPORT_CHUNK_SIZE = int(os.getenv("REPORT_CHUNK_SIZE", "2000"))
+
+# Report jobs: the report page queues a ReportJob that process_report_jobs
+# builds. A request for the same report within the freshness window gets the
+# existing PDF. Jobs running longer than the timeout are assumed to have lost
+# their worker and are claimed again.
+REPORT_JOB_FRESHNESS_SECONDS = int(os.getenv("REPORT_JOB_FRESHNESS_SECONDS", str(6 * 3600)))
+REPORT_JOB_TIMEOUT_SECONDS = int(os.getenv("REPORT_JOB_TIMEOUT_SECONDS", "1800"))
+REPORT_JOB_RETENTION_DAYS = int(os.getenv("REPORT_JOB_RETENTION_DAYS", "30"))
+# Also build a new job right after the request commits (no worker needed)
+REPORT_JOBS_RUN_ON_COMMIT = os.getenv("REPORT_JOBS_RUN_ON_COMMIT", str(DEBUG)) == "True"
+
+# Trends report: read question averages from the AnswerRollup table (once
+# rebuild_answer_rollups has run) instead of aggregating the answers. Rollups
+# count whole evaluation periods that overlap the report dates.
+TRENDS_REPORT_USE_ROLLUPS = os.getenv("TRENDS_REPORT_USE_ROLLUPS", "False") == "True"
+
+# Rendered report charts are kept in the default cache, keyed by their data,
+# type and size, for this many seconds
+REPORT_CHART_CACHE_TIMEOUT = int(os.getenv("REPORT_CHART_CACHE_TIMEOUT", str(24 * 3600)))
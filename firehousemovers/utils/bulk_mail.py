@@ -0,0 +1,122 @@
+"""
+Bulk mail helper for management commands that email many people at once.
+
+All messages are rendered up front from one compiled template, then sent
+over a single backend connection in chunks, optionally rate limited. A
+failing message is recorded and skipped instead of aborting the run, and
+the caller gets a BulkMailReport to print.
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import get_template
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BulkMailReport:
+    """Outcome of a send_bulk_mail() run."""
+
+    total: int = 0
+    sent: int = 0
+    failures: list = field(default_factory=list)  # [(recipient, error message)]
+    elapsed: float = 0.0
+    dry_run: bool = False
+
+    @property
+    def failed(self):
+        return len(self.failures)
+
+    def summary(self):
+        verb = "would be sent" if self.dry_run else "sent"
+        return f"{self.sent}/{self.total} {verb}, {self.failed} failed in {self.elapsed:.2f}s"
+
+
+def render_messages(template_name, recipients, from_email=None):
+    """
+    Render one plain-text email per recipient from a single compiled template.
+
+    Args:
+        template_name: Text template rendered with each recipient's context
+        recipients: Iterable of (to_address, subject, context)
+        from_email: Sender (defaults to DEFAULT_FROM_EMAIL)
+
+    Returns:
+        list[EmailMessage]
+    """
+    template = get_template(template_name)
+    from_email = from_email or settings.DEFAULT_FROM_EMAIL
+    return [
+        EmailMessage(subject, template.render(context), from_email, [to_address])
+        for to_address, subject, context in recipients
+    ]
+
+
+def send_bulk_mail(messages, chunk_size=None, rate_limit=None, dry_run=False, connection=None):
+    """
+    Send messages over one connection, chunk by chunk.
+
+    Args:
+        messages: EmailMessage objects (see render_messages)
+        chunk_size: Messages per chunk (defaults to BULK_MAIL_CHUNK_SIZE)
+        rate_limit: Maximum messages per second (defaults to
+            BULK_MAIL_RATE_LIMIT; None or 0 for no limit)
+        dry_run: Only count the messages
+        connection: Backend connection to use instead of get_connection()
+
+    Returns:
+        BulkMailReport
+    """
+    chunk_size = max(chunk_size or getattr(settings, "BULK_MAIL_CHUNK_SIZE", 50), 1)
+    if rate_limit is None:
+        rate_limit = getattr(settings, "BULK_MAIL_RATE_LIMIT", None)
+    report = BulkMailReport(total=len(messages), dry_run=dry_run)
+    start = time.monotonic()
+
+    if dry_run or not messages:
+        report.sent = len(messages) if dry_run else 0
+        return report
+
+    connection = connection or get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as error:
+        logger.error(f"Could not open the bulk mail connection: {error}", exc_info=True)
+        report.failures = [(", ".join(message.to), f"{type(error).__name__}: {error}") for message in messages]
+        report.elapsed = time.monotonic() - start
+        return report
+
+    try:
+        for offset in range(0, len(messages), chunk_size):
+            chunk_start = time.monotonic()
+            for message in messages[offset:offset + chunk_size]:
+                message.connection = connection
+                try:
+                    # One message per call so a rejected recipient only fails itself
+                    report.sent += connection.send_messages([message]) or 0
+                except Exception as error:
+                    recipient = ", ".join(message.to)
+                    report.failures.append((recipient, f"{type(error).__name__}: {error}"))
+                    logger.error(f"Bulk mail to {recipient} failed: {error}", exc_info=True)
+                    # The connection may be broken; start a fresh one for the rest
+                    connection.close()
+                    try:
+                        connection.open()
+                    except Exception:
+                        logger.exception("Could not reopen the bulk mail connection")
+
+            if rate_limit and offset + chunk_size < len(messages):
+                remaining = chunk_size / rate_limit - (time.monotonic() - chunk_start)
+                if remaining > 0:
+                    time.sleep(remaining)
+    finally:
+        connection.close()
+        report.elapsed = time.monotonic() - start
+
+    logger.info(f"Bulk mail: {report.summary()}")
+    return report
@@ -0,0 +1,134 @@
+"""
+Request-scoped user context shared by middleware and context processors.
+
+The overdue evaluation middlewares, the role context processor and the
+low-stock context processor all need the current user's profile and a few
+counts. RequestUserContext resolves them lazily, once per request: the
+overdue counts from the cached lock state (evaluation.lock_state), the
+profile with its role flags in one query and the low-stock summary from
+its cached snapshot (inventory_app.low_stock). With
+EVALUATION_LOCK_STATE_CACHE disabled the overdue counts are annotated onto
+the profile query instead.
+"""
+from functools import cached_property
+
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils.timezone import now
+
+from firehousemovers.utils.permissions import RoleChecker
+
+REQUEST_ATTRIBUTE = '_user_context'
+
+
+def _count_subquery(queryset, outer_field):
+    """Correlated COUNT(*) of queryset rows whose outer_field points at the outer profile."""
+    counts = (
+        queryset.filter(**{outer_field: OuterRef('pk')})
+        .order_by()
+        .values(outer_field)
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+class RequestUserContext:
+    """
+    Lazily resolved data about the user of one request.
+
+    Attributes are computed on first access and cached for the rest of the
+    request, so components that never look at a value never pay for it.
+    """
+
+    def __init__(self, request):
+        self.user = request.user
+        self.today = now().date()
+
+    @cached_property
+    def profile(self):
+        """UserProfile (annotated with overdue counts in live-query mode), or None."""
+        if not self.user.is_authenticated:
+            return None
+
+        from authentication.models import UserProfile
+        from evaluation.models import DynamicEvaluation, DynamicManagerEvaluation
+
+        queryset = UserProfile.objects.filter(user=self.user)
+        if not self.use_lock_state:
+            queryset = queryset.annotate(
+                overdue_evaluation_count=_count_subquery(
+                    DynamicEvaluation.objects.filter(status="pending", week_end__lt=self.today),
+                    'manager',
+                ),
+                overdue_manager_evaluation_count=_count_subquery(
+                    DynamicManagerEvaluation.objects.filter(status="pending", period_end__lt=self.today),
+                    'senior_manager',
+                ),
+            )
+        profile = queryset.first()
+
+        if profile is not None:
+            # Later user.userprofile / profile.user lookups reuse these objects
+            self.user.userprofile = profile
+        return profile
+
+    @cached_property
+    def roles(self):
+        """RoleChecker for the user (no extra queries)."""
+        return RoleChecker(self.profile)
+
+    @cached_property
+    def use_lock_state(self):
+        from evaluation.lock_state import lock_state_cache_enabled
+        return lock_state_cache_enabled()
+
+    @cached_property
+    def lock_state(self):
+        """Cached OverdueLockState of the user, or None for anonymous users."""
+        if not self.user.is_authenticated:
+            return None
+
+        from evaluation.lock_state import get_overdue_lock_state
+        return get_overdue_lock_state(self.user.pk, self.today)
+
+    @property
+    def overdue_evaluation_count(self):
+        """Pending employee evaluations past their week_end that the user manages."""
+        if self.use_lock_state:
+            return self.lock_state.overdue_count if self.lock_state else 0
+        return self.profile.overdue_evaluation_count if self.profile else 0
+
+    @property
+    def overdue_manager_evaluation_count(self):
+        """Pending manager evaluations past their period_end assigned to the user."""
+        if self.use_lock_state:
+            return self.lock_state.manager_overdue_count if self.lock_state else 0
+        return self.profile.overdue_manager_evaluation_count if self.profile else 0
+
+    @cached_property
+    def low_stock(self):
+        """
+        Uniform inventory below its minimum stock level (cached snapshot).
+
+        Returns:
+            dict: {'items': [{'uniform_name', 'total_stock'}, ...], 'count': int}
+        """
+        from inventory_app.low_stock import get_low_stock_snapshot
+        return get_low_stock_snapshot()
+
+def get_user_context(request):
+    """
+    Return the RequestUserContext of a request, creating it on first use.
+
+    Args:
+        request: HttpRequest (after AuthenticationMiddleware)
+
+    Returns:
+        RequestUserContext shared by everything handling the request
+    """
+    context = getattr(request, REQUEST_ATTRIBUTE, None)
+    if context is None:
+        context = RequestUserContext(request)
+        setattr(request, REQUEST_ATTRIBUTE, context)
+    return context
@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "firehousemovers.settings")
 
 application = get_wsgi_application()
+
+# Build the PDF report styles now: with gunicorn --preload this runs once in
+# the master and the forked workers share the result
+from evaluation.report_resources import warm_report_resources  # noqa: E402
+
+warm_report_resources()
@@ -5,10 +5,10 @@ from django.utils import timezone
 from django.core.exceptions import ValidationError, PermissionDenied
 from django.db import IntegrityError
 from datetime import date, timedelta
-from unittest.mock import patch, MagicMock
+from unittest.mock import MagicMock
 import json
 
-from authentication.models import UserProfile
+from authentication.models import OutboxMessage, UserProfile
 from .models import Goal
 from .forms import GoalForm, GoalEditForm
 from .utils.validators import (
@@ -621,9 +621,8 @@ class GoalViewTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, 'Employee Goal')
 
-    @patch('goals.views.send_mail')
-    def test_add_goals_email_notification(self, mock_send_mail):
-        """Test that email notifications are sent when goals are added"""
+    def test_add_goals_email_notification(self):
+        """Test that email notifications are queued when goals are added"""
         self.client.login(username='manager', password='testpass123')
         
         # Create form data
@@ -643,8 +642,10 @@ class GoalViewTest(TestCase):
             data=form_data
         )
         
-        # Check that email was sent
-        mock_send_mail.assert_called_once()
+        # Check that one email was queued for the employee
+        queued = OutboxMessage.objects.get()
+        self.assertEqual(queued.to, ['employee@example.com'])
+        self.assertEqual(queued.status, OutboxMessage.PENDING)
         self.assertEqual(response.status_code, 302)  # Redirect after success
 
     def test_goals_management_filtering(self):
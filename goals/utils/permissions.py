@@ -7,6 +7,8 @@ from django.core.exceptions import PermissionDenied
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
 
+from firehousemovers.utils.request_context import get_user_context
+
 
 def get_user_profile_safe(user):
     """
@@ -243,5 +245,6 @@ def role_context(request):
     Usage in templates: {% if role.is_manager %}...{% endif %}
     """
     if request.user.is_authenticated:
-        return {'role': role_checker(request.user)}
+        # Reuses the profile the overdue middlewares already loaded for this request
+        return {'role': RoleChecker(get_user_context(request).profile)}
     return {'role': RoleChecker(None)}
@@ -28,7 +28,7 @@ from .utils.helpers import (
     get_display_name, get_user_profile_display_name, get_goal_counts_summary, 
     can_add_more_goals, get_goal_status_indicator, get_empty_state_message
 )
-from django.core.mail import send_mail
+from authentication.outbox import queue_mail
 from django.conf import settings
 from django.db.models import Count, Q
 from django.urls import reverse
@@ -256,15 +256,15 @@ Follow this link to see your goals:
 Regards,
 Team Firehouse."""
                             
-                            send_mail(
+                            # Delivered by the outbox worker once the goals are committed
+                            queue_mail(
                                 subject=subject_text,
                                 message=text_message,
                                 html_message=html_message,
                                 from_email=default_email,
                                 recipient_list=[recipient_email],
-                                fail_silently=True,  # This prevents email errors from blocking form submission
                             )
-                            logger.info(f"Email notification sent successfully to {recipient_email} for employee {employee.user.username} with {len(created_goals)} goal(s)")
+                            logger.info(f"Email notification queued to {recipient_email} for employee {employee.user.username} with {len(created_goals)} goal(s)")
                         else:
                             logger.warning(f"No email address found for employee {employee.user.username}, skipping email notification")
                     except Exception as e:
@@ -552,12 +552,11 @@ def send_schedule_email(request):
     try:
         default_email = os.getenv("DEFAULT_FROM_EMAIL", settings.DEFAULT_FROM_EMAIL)
         recipient_email = getattr(request.user, "email", None) or default_email
-        send_mail(
+        queue_mail(
             subject="New Meeting Scheduled",
             message="A user clicked Schedule Meeting on the website.",
             from_email=default_email,
             recipient_list=[recipient_email],
-            fail_silently=False,
         )
         return JsonResponse({"status": "success"})
     except Exception as e:
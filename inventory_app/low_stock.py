@@ -0,0 +1,86 @@
+"""
+Precomputed low-stock summary shown in the navbar.
+
+The summary is computed once and stored in the default cache under a key
+that includes a version counter. Saving an inventory row or a catalog entry
+in a way that can change the summary bumps the counter, so the next reader
+computes a fresh snapshot and old ones simply expire. Pages get the summary
+through a lazy template variable, so only renders that actually show it
+read the cache.
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+LOW_STOCK_VERSION_KEY = 'low_stock_version'
+LOW_STOCK_SNAPSHOT_KEY_PREFIX = 'low_stock_snapshot'
+
+
+def get_snapshot_timeout():
+    """Upper bound on a snapshot's age, for changes made without save() (queryset.update())."""
+    return getattr(settings, 'LOW_STOCK_SNAPSHOT_TIMEOUT', 3600)
+
+
+def get_low_stock_version():
+    """Current version of the low-stock summary (starts at 1)."""
+    cache.add(LOW_STOCK_VERSION_KEY, 1, None)
+    return cache.get(LOW_STOCK_VERSION_KEY) or 1
+
+
+def _bump_version():
+    try:
+        cache.incr(LOW_STOCK_VERSION_KEY)
+    except ValueError:
+        # Counter evicted or never set; any value readers have not seen yet will do
+        cache.add(LOW_STOCK_VERSION_KEY, 2, None)
+
+
+def invalidate_low_stock_snapshot():
+    """
+    Make readers compute a new low-stock snapshot.
+
+    The version is bumped right away and again once the surrounding
+    transaction commits, so a snapshot computed from the old rows in between
+    is never served afterwards.
+    """
+    _bump_version()
+    transaction.on_commit(_bump_version)
+
+
+def compute_low_stock_snapshot():
+    """
+    Query the uniforms whose inventory is below their minimum stock level,
+    most severe first.
+
+    Returns:
+        dict: {'items': [{'uniform_name', 'total_stock'}, ...], 'count': int}
+    """
+    from .models import Inventory
+
+    items = [
+        {'uniform_name': name, 'total_stock': total_stock}
+        for name, total_stock in Inventory.objects.low_stock().values_list('uniform__name', 'total_stock')
+    ]
+    return {'items': items, 'count': len(items)}
+
+
+def get_low_stock_snapshot():
+    """
+    Get the current low-stock snapshot, computing it on a miss.
+
+    Returns:
+        dict: {'items': [...], 'count': int}
+    """
+    version = get_low_stock_version()
+    cache_key = f"{LOW_STOCK_SNAPSHOT_KEY_PREFIX}_v{version}"
+    snapshot = cache.get(cache_key)
+    if snapshot is None:
+        snapshot = compute_low_stock_snapshot()
+        cache.set(cache_key, snapshot, get_snapshot_timeout())
+        logger.debug(f"Computed low-stock snapshot v{version} ({snapshot['count']} items)")
+    return snapshot
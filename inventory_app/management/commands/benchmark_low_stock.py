@@ -0,0 +1,104 @@
+"""
+Management command to compare the low-stock lookup done in Python against
+Inventory.objects.low_stock() on a generated data set.
+
+All rows are created inside a transaction that is rolled back at the end,
+so the command can be run against any database.
+"""
+
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from inventory_app.models import Inventory, UniformCatalog
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the Python and SQL low-stock lookups over generated inventory rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=50000,
+            help='Inventory rows to generate (default 50000)',
+        )
+        parser.add_argument(
+            '--uniforms',
+            type=int,
+            default=500,
+            help='Uniform catalog entries the rows are spread over (default 500)',
+        )
+        parser.add_argument(
+            '--explain',
+            action='store_true',
+            help='Print the query plan of low_stock()',
+        )
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        rng = random.Random(42)
+
+        with transaction.atomic():
+            self.stdout.write(f'📦 Generating {rows:,} inventory rows over {options["uniforms"]} uniforms...')
+            uniforms = UniformCatalog.objects.bulk_create([
+                UniformCatalog(name=f'Benchmark uniform {i}', minimum_stock_level=rng.choice([None, 10, 25, 50]))
+                for i in range(options['uniforms'])
+            ])
+            inventory = []
+            for _ in range(rows):
+                new_stock, used_stock, in_use = rng.randint(0, 60), rng.randint(0, 20), rng.randint(0, 10)
+                inventory.append(Inventory(
+                    uniform=rng.choice(uniforms),
+                    new_stock=new_stock,
+                    used_stock=used_stock,
+                    in_use=in_use,
+                    # bulk_create skips save(), which computes the total
+                    total_stock=new_stock + used_stock + in_use,
+                ))
+            Inventory.objects.bulk_create(inventory, batch_size=2000)
+
+            results = {}
+            results['python'] = self._measure(lambda: [
+                item.pk for item in Inventory.objects.filter(uniform__minimum_stock_level__isnull=False)
+                .select_related('uniform') if item.is_low_stock
+            ])
+            results['python (no select_related)'] = self._measure(lambda: [
+                item.pk for item in Inventory.objects.filter(uniform__minimum_stock_level__isnull=False)
+                if item.is_low_stock
+            ])
+            results['sql low_stock()'] = self._measure(lambda: [item.pk for item in Inventory.objects.low_stock()])
+            results['sql low_stock() values'] = self._measure(
+                lambda: list(Inventory.objects.low_stock().values_list('pk', flat=True))
+            )
+
+            baseline = set(results['python'][2])
+            for label, (seconds, queries, found) in results.items():
+                self.stdout.write(f'  {label}: {seconds * 1000:.1f} ms, {queries} queries, {len(found):,} low-stock rows')
+                if set(found) != baseline:
+                    self.stdout.write(self.style.ERROR(f'  ❌ {label} returned different rows than the Python lookup'))
+
+            if options['explain']:
+                self.stdout.write('\nQuery plan of low_stock():')
+                self.stdout.write(Inventory.objects.low_stock().explain())
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('\n✅ Benchmark complete (generated rows rolled back)'))
+
+    def _measure(self, func):
+        """Return (seconds, query count, result) of func()."""
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            start = time.perf_counter()
+            result = func()
+            seconds = time.perf_counter() - start
+        return seconds, queries, result
@@ -1,4 +1,5 @@
 from django.core.management.base import BaseCommand
+from inventory_app.low_stock import invalidate_low_stock_snapshot
 from inventory_app.models import UniformCatalog, Inventory
 from django.db import transaction
 from django.db import connection
@@ -186,6 +187,8 @@ class Command(BaseCommand):
                 # Bulk insert into the Inventory table
                 if uniforms_to_create:
                     Inventory.objects.bulk_create(uniforms_to_create)
+                    # bulk_create skips save(), so refresh the navbar summary here
+                    invalidate_low_stock_snapshot()
                     self.stdout.write(
                         self.style.SUCCESS("✅ Inventory data seeded successfully!")
                     )
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.4 on 2026-10-17 21:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory_app", "0005_alter_uniformassignment_employee"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="inventory",
+            index=models.Index(
+                fields=["uniform", "new_stock", "used_stock"],
+                name="inventory_stock_level_idx",
+            ),
+        ),
+    ]
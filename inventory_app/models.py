@@ -1,8 +1,44 @@
 from django.db import models
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.functions import Coalesce, Greatest
 from authentication.models import UserProfile
+from .low_stock import invalidate_low_stock_snapshot
 
 
-class UniformCatalog(models.Model):
+class LowStockTrackedMixin:
+    """
+    Invalidates the low-stock snapshot when a field it is computed from changes.
+
+    The values of low_stock_fields are remembered when a row is loaded, so
+    saves that leave them untouched do not invalidate anything.
+    """
+
+    low_stock_fields = ()
+
+    def _low_stock_state(self):
+        # Read __dict__ directly so deferred fields are not loaded
+        return tuple(self.__dict__.get(name) for name in self.low_stock_fields)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_low_stock_state = instance._low_stock_state()
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        state = self._low_stock_state()
+        if state != getattr(self, '_loaded_low_stock_state', None):
+            invalidate_low_stock_snapshot()
+            self._loaded_low_stock_state = state
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        invalidate_low_stock_snapshot()
+        return result
+
+
+class UniformCatalog(LowStockTrackedMixin, models.Model):
     name = models.CharField(max_length=255, null=True, blank=True)
     category = models.CharField(max_length=255, null=True, blank=True)
     gender = models.CharField(
@@ -13,6 +49,8 @@ class UniformCatalog(models.Model):
     )
     minimum_stock_level = models.PositiveIntegerField(null=True, blank=True)
 
+    low_stock_fields = ('name', 'minimum_stock_level')
+
     def __str__(self):
         return self.name
 
@@ -40,7 +78,52 @@ class UniformAssignment(models.Model):
         return f"{self.uniform.name} assigned to {self.employee}"
 
 
-class Inventory(models.Model):
+class InventoryQuerySet(models.QuerySet):
+    def with_stock_levels(self):
+        """
+        Annotate stock levels against the uniform's minimum, computed in SQL.
+
+        Annotations:
+            available_stock: new_stock + used_stock (what is_low_stock compares)
+            shortfall: Units missing to reach the minimum stock level (0 if none)
+            severity: "critical" at or below half the minimum, "warning" below
+                the minimum, otherwise None
+            severity_rank: 0 critical, 1 warning, 2 sufficient (for ordering)
+        """
+        minimum = F("uniform__minimum_stock_level")
+        return self.annotate(
+            available_stock=Coalesce("new_stock", 0) + Coalesce("used_stock", 0),
+        ).annotate(
+            shortfall=Greatest(Coalesce(minimum, 0) - F("available_stock"), Value(0)),
+            severity_rank=Case(
+                When(uniform__minimum_stock_level__isnull=True, then=Value(2)),
+                When(available_stock__lte=minimum / 2, then=Value(0)),
+                When(available_stock__lt=minimum, then=Value(1)),
+                default=Value(2),
+                output_field=IntegerField(),
+            ),
+            severity=Case(
+                When(severity_rank=0, then=Value("critical")),
+                When(severity_rank=1, then=Value("warning")),
+                default=None,
+                output_field=models.CharField(),
+            ),
+        )
+
+    def low_stock(self):
+        """Inventory below its minimum stock level, most severe first."""
+        return (
+            self.with_stock_levels()
+            .filter(
+                uniform__minimum_stock_level__isnull=False,
+                available_stock__lt=F("uniform__minimum_stock_level"),
+            )
+            .select_related("uniform")
+            .order_by("severity_rank", "-shortfall", "uniform__name")
+        )
+
+
+class Inventory(LowStockTrackedMixin, models.Model):
     uniform = models.ForeignKey(
         UniformCatalog, on_delete=models.CASCADE, null=True, blank=True
     )
@@ -54,6 +137,19 @@ class Inventory(models.Model):
     return_to_supplier = models.PositiveIntegerField(null=True, blank=True, default=0)
     total_bought = models.PositiveIntegerField(editable=False, null=True, blank=True)
 
+    objects = InventoryQuerySet.as_manager()
+
+    low_stock_fields = ('uniform_id', 'new_stock', 'used_stock', 'total_stock')
+
+    class Meta:
+        indexes = [
+            # Covers the low_stock() join so it reads no inventory table rows
+            models.Index(
+                fields=["uniform", "new_stock", "used_stock"],
+                name="inventory_stock_level_idx",
+            ),
+        ]
+
     def save(self, *args, **kwargs):
         # Safely sum the stock values, treating None as 0
         self.total_stock = (
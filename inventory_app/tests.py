@@ -1,3 +1,111 @@
-from django.test import TestCase
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase
+
+from .context_processors import low_stock_processor
+from .low_stock import get_low_stock_snapshot, get_low_stock_version
+from .models import Inventory, UniformCatalog
+
+
+class LowStockSnapshotTest(TestCase):
+    """Test cases for the cached low-stock snapshot and its template variable"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.jacket = UniformCatalog.objects.create(name='Jacket', minimum_stock_level=10)
+        self.jacket_stock = Inventory.objects.create(uniform=self.jacket, new_stock=2, used_stock=1)
+        cap = UniformCatalog.objects.create(name='Cap', minimum_stock_level=1)
+        Inventory.objects.create(uniform=cap, new_stock=5)
+
+    def test_snapshot_is_cached(self):
+        """Test the snapshot is computed once and then served from cache"""
+        snapshot = get_low_stock_snapshot()
+        self.assertEqual(snapshot, {'items': [{'uniform_name': 'Jacket', 'total_stock': 3}], 'count': 1})
+        with self.assertNumQueries(0):
+            self.assertEqual(get_low_stock_snapshot(), snapshot)
+
+    def test_quantity_changes_bump_version(self):
+        """Test saves changing stock invalidate the snapshot and other saves do not"""
+        get_low_stock_snapshot()
+        version = get_low_stock_version()
+
+        inventory = Inventory.objects.get(pk=self.jacket_stock.pk)
+        inventory.disposed = 4
+        inventory.save()
+        self.assertEqual(get_low_stock_version(), version)
+
+        inventory.new_stock = 20
+        inventory.save()
+        self.assertGreater(get_low_stock_version(), version)
+        self.assertEqual(get_low_stock_snapshot()['count'], 0)
+
+        jacket = UniformCatalog.objects.get(pk=self.jacket.pk)
+        jacket.minimum_stock_level = 50
+        jacket.save()
+        self.assertEqual(get_low_stock_snapshot()['count'], 1)
+
+        inventory.delete()
+        self.assertEqual(get_low_stock_snapshot()['count'], 0)
+
+    def test_lazy_template_variable(self):
+        """Test the context processor does no work unless a template reads it, and never touches the session"""
+        get_low_stock_snapshot()
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        request.session = {}
+
+        with self.assertNumQueries(0):
+            context = low_stock_processor(request)
+        self.assertFalse(hasattr(request, '_user_context'))
+
+        rendered = Template(
+            '{{ low_stock.count }}{% for item in low_stock.items|slice:":3" %} {{ item.uniform_name }}{% endfor %}'
+        ).render(Context(context))
+        self.assertEqual(rendered, '1 Jacket')
+        self.assertEqual(request.session, {})
+
+
+class LowStockQuerySetTest(TestCase):
+    """Test cases for the SQL low-stock lookup"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.boots = UniformCatalog.objects.create(name='Boots', minimum_stock_level=10)
+        self.shirt = UniformCatalog.objects.create(name='Shirt', minimum_stock_level=10)
+        self.cap = UniformCatalog.objects.create(name='Cap', minimum_stock_level=4)
+        self.belt = UniformCatalog.objects.create(name='Belt')
+        Inventory.objects.create(uniform=self.boots, new_stock=3, used_stock=None, in_use=20)
+        Inventory.objects.create(uniform=self.shirt, new_stock=6, used_stock=2)
+        Inventory.objects.create(uniform=self.cap, new_stock=4)
+        Inventory.objects.create(uniform=self.belt, new_stock=0)
+
+    def test_low_stock_matches_is_low_stock(self):
+        """Test low_stock() returns the rows is_low_stock flags, most severe first"""
+        expected = {item.pk for item in Inventory.objects.all() if item.is_low_stock}
+        with self.assertNumQueries(1):
+            rows = [(item.uniform.name, item.shortfall, item.severity) for item in Inventory.objects.low_stock()]
+        self.assertEqual(rows, [('Boots', 7, 'critical'), ('Shirt', 2, 'warning')])
+        self.assertEqual(set(Inventory.objects.low_stock().values_list('pk', flat=True)), expected)
+
+    def test_stock_levels_for_all_rows(self):
+        """Test rows at or without a minimum level are annotated as sufficient"""
+        levels = {
+            item.uniform.name: (item.available_stock, item.shortfall, item.severity)
+            for item in Inventory.objects.with_stock_levels().select_related('uniform')
+        }
+        self.assertEqual(levels['Cap'], (4, 0, None))
+        self.assertEqual(levels['Belt'], (0, 0, None))
+
+    def test_benchmark_command(self):
+        """Test the benchmark command compares both lookups and rolls its rows back"""
+        out = StringIO()
+        call_command('benchmark_low_stock', rows=200, uniforms=10, stdout=out)
+        self.assertIn('sql low_stock()', out.getvalue())
+        self.assertNotIn('returned different rows', out.getvalue())
+        self.assertEqual(Inventory.objects.count(), 4)
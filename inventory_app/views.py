@@ -433,7 +433,11 @@ class Reports_view(View):
     def post(self, request):
         inventory_summary = request.POST.get("employee")
         if inventory_summary == "inventory_summary":
-            inventory_records = Inventory.objects.all()
+            inventory_records = (
+                Inventory.objects.with_stock_levels()
+                .select_related("uniform")
+                .order_by("severity_rank", "uniform__name")
+            )
             return render(
                 request, "reports.html", {"inventory_records": inventory_records}
             )
@@ -468,10 +472,7 @@ def get_email(request):
 
 
 def low_stock_alerts(request):
-    low_stock_items = Inventory.objects.filter(
-        uniform__minimum_stock_level__isnull=False
-    )
-    low_stock_items = [item for item in low_stock_items if item.is_low_stock]
+    low_stock_items = Inventory.objects.low_stock()
 
     return render(request, 'low_stock_alerts.html', {
         'low_stock_items': low_stock_items